@@ -36,6 +36,7 @@ from ironic.api.controllers.v1 import inspection_rule
 from ironic.api.controllers.v1 import node
 from ironic.api.controllers.v1 import port
 from ironic.api.controllers.v1 import portgroup
+from ironic.api.controllers.v1 import provision_job
 from ironic.api.controllers.v1 import ramdisk
 from ironic.api.controllers.v1 import runbook
 from ironic.api.controllers.v1 import shard
@@ -84,6 +85,7 @@ VERSIONED_CONTROLLERS = {
     'shards': utils.allow_shards_endpoint,
     'runbooks': utils.allow_runbooks,
     'inspection_rules': utils.allow_inspection_rules,
+    'provision_jobs': utils.allow_provision_jobs,
     # NOTE(dtantsur): continue_inspection is available in 1.1 as a
     # compatibility hack to make it usable with IPA without changes.
     # Hide this fact from consumers since it was not actually available
@@ -139,7 +141,8 @@ class Controller(object):
         'shards': shard.ShardController(),
         'continue_inspection': ramdisk.ContinueInspectionController(),
         'runbooks': runbook.RunbooksController(),
-        'inspection_rules': inspection_rule.InspectionRuleController()
+        'inspection_rules': inspection_rule.InspectionRuleController(),
+        'provision_jobs': provision_job.ProvisionJobsController(),
     }
 
     @method.expose()
@@ -0,0 +1,293 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+from http import client as http_client
+
+from oslo_log import log
+from oslo_utils import uuidutils
+from pecan import rest
+from webob import exc as webob_exc
+
+from ironic import api
+from ironic.api.controllers import link
+from ironic.api.controllers.v1 import node as node_ctl
+from ironic.api.controllers.v1 import utils as api_utils
+from ironic.api.controllers.v1 import versions
+from ironic.api import method
+from ironic.api.schemas.v1 import provision_job as schema
+from ironic.api import validation
+from ironic.common import exception
+from ironic.common.i18n import _
+from ironic.common import metrics_utils
+from ironic.common import state_machine
+from ironic.common import states as ir_states
+from ironic.conductor import steps as conductor_steps
+import ironic.conf
+from ironic import objects
+
+
+CONF = ironic.conf.CONF
+LOG = log.getLogger(__name__)
+METRICS = metrics_utils.get_metrics_logger(__name__)
+
+_NODE_STATE_FIELDS = ['uuid', 'provision_state', 'target_provision_state',
+                      'last_error']
+
+
+def _job_state(batches):
+    batch_states = {batch.state for batch in batches}
+    if batch_states == {ir_states.PROVISION_JOB_FINISHED}:
+        return ir_states.PROVISION_JOB_FINISHED
+    if batch_states == {ir_states.PROVISION_JOB_PENDING}:
+        return ir_states.PROVISION_JOB_PENDING
+    return ir_states.PROVISION_JOB_RUNNING
+
+
+def convert_with_links(job_uuid, batches):
+    """Build the API representation of a provision job from its batches."""
+    nodes = []
+    for batch in batches:
+        results = batch.results or {}
+        for ident in batch.nodes:
+            result = results.get(ident, {})
+            nodes.append({
+                'node': ident,
+                'status': result.get('status',
+                                     ir_states.PROVISION_JOB_PENDING),
+                'error': result.get('error'),
+            })
+
+    # Fetch the current state of all nodes of the job with one query.
+    uuids = [item['node'] for item in nodes
+             if uuidutils.is_uuid_like(item['node'])]
+    current = {}
+    if uuids:
+        current = {
+            n.uuid: n for n in objects.Node.list(
+                api.request.context, filters={'uuid_in': uuids},
+                fields=_NODE_STATE_FIELDS)
+        }
+    for item in nodes:
+        rpc_node = current.get(item['node'])
+        for field in _NODE_STATE_FIELDS[1:]:
+            item[field] = getattr(rpc_node, field) if rpc_node else None
+
+    updated = [batch.updated_at for batch in batches if batch.updated_at]
+    url = api.request.public_url
+    return {
+        'uuid': job_uuid,
+        'target': batches[0].target,
+        'state': _job_state(batches),
+        'nodes': nodes,
+        'created_at': min(batch.created_at for batch in batches).isoformat(),
+        'updated_at': max(updated).isoformat() if updated else None,
+        'links': [
+            link.make_link('self', url, 'provision_jobs', job_uuid),
+            link.make_link('bookmark', url, 'provision_jobs', job_uuid,
+                           bookmark=True),
+        ],
+    }
+
+
+def _validate_job(job):
+    """Validate the parameters of a job which do not depend on nodes.
+
+    :raises: ClientSideError (HTTP 400) on invalid combinations.
+    :raises: InvalidParameterValue or StepNotAllowed on invalid steps.
+    """
+    target = job['target']
+    if len(job['nodes']) > CONF.api.provision_job_max_nodes:
+        msg = (_('A provision job can include at most %d nodes')
+               % CONF.api.provision_job_max_nodes)
+        raise exception.ClientSideError(
+            msg, status_code=http_client.BAD_REQUEST)
+
+    clean_steps = job.get('clean_steps')
+    if target == ir_states.VERBS['clean']:
+        if not clean_steps:
+            msg = (_('"clean_steps" is required when setting target '
+                     'provision state to %s') % ir_states.VERBS['clean'])
+            raise exception.ClientSideError(
+                msg, status_code=http_client.BAD_REQUEST)
+        node_ctl._check_clean_steps(clean_steps)
+    elif clean_steps or job.get('disable_ramdisk') is not None:
+        msg = (_('"clean_steps" and "disable_ramdisk" are only valid when '
+                 'setting target provision state to %s')
+               % ir_states.VERBS['clean'])
+        raise exception.ClientSideError(
+            msg, status_code=http_client.BAD_REQUEST)
+
+    deploy_steps = job.get('deploy_steps')
+    if deploy_steps:
+        if target not in (ir_states.ACTIVE, ir_states.REBUILD):
+            msg = (_('"deploy_steps" is only valid when setting target '
+                     'provision state to %s or %s')
+                   % (ir_states.ACTIVE, ir_states.REBUILD))
+            raise exception.ClientSideError(
+                msg, status_code=http_client.BAD_REQUEST)
+        node_ctl._check_deploy_steps(deploy_steps)
+
+
+def _check_node(node_ident, job):
+    """Check that the job's action may be requested on the node.
+
+    These are the same checks that a provision state change of a single node
+    does before calling the conductor.
+
+    :returns: RPC node identified by node_ident.
+    :raises: IronicException subclasses if the node cannot be included.
+    """
+    target = job['target']
+    clean_steps = job.get('clean_steps')
+    rpc_node = api_utils.check_node_policy_and_retrieve(
+        'baremetal:node:set_provision_state', node_ident)
+    if clean_steps:
+        api_utils.check_owner_policy(
+            'node', 'baremetal:node:set_provision_state:clean_steps',
+            rpc_node['owner'], rpc_node['lessee'], conceal_node=False)
+    conductor_steps.validate_user_steps_policy(
+        api.request.context,
+        (job.get('deploy_steps') or []) + (clean_steps or []),
+        node=rpc_node)
+
+    if (target in (ir_states.ACTIVE, ir_states.REBUILD)
+            and rpc_node.maintenance):
+        raise exception.NodeInMaintenance(op=_('provisioning'),
+                                          node=rpc_node.uuid)
+
+    m = state_machine.machine.copy()
+    m.initialize(rpc_node.provision_state)
+    if not m.is_actionable_event(ir_states.VERBS.get(target, target)):
+        if rpc_node.reservation:
+            raise exception.NodeLocked(node=rpc_node.uuid,
+                                       host=rpc_node.reservation)
+        raise exception.InvalidStateRequested(
+            action=target, node=rpc_node.uuid,
+            state=rpc_node.provision_state)
+    return rpc_node
+
+
+class ProvisionJobsController(rest.RestController):
+    """REST controller for bulk provisioning jobs."""
+
+    @METRICS.timer('ProvisionJobsController.get_one')
+    @method.expose()
+    @validation.api_version(
+        min_version=versions.MINOR_115_PROVISION_JOBS,
+        message=_('The API version does not allow provision jobs'),
+    )
+    @validation.request_parameter_schema(schema.show_request_parameter)
+    @validation.response_body_schema(schema.show_response_body)
+    def get_one(self, job_uuid):
+        """Retrieve the progress of a provision job.
+
+        :param job_uuid: UUID of a provision job.
+        """
+        batches = objects.ProvisionJobBatch.list_by_job_uuid(
+            api.request.context, job_uuid)
+        try:
+            # Project scoped users only see the jobs of their project.
+            api_utils.check_owner_policy(
+                'provision_job', 'baremetal:provision_job:get',
+                batches[0].project)
+        except exception.NotAuthorized:
+            raise exception.ProvisionJobNotFound(job=job_uuid)
+        return convert_with_links(job_uuid, batches)
+
+    @METRICS.timer('ProvisionJobsController.post')
+    @method.expose(status_code=http_client.ACCEPTED)
+    @method.body('job')
+    @validation.api_version(
+        min_version=versions.MINOR_115_PROVISION_JOBS,
+        message=_('The API version does not allow provision jobs'),
+        exception_class=webob_exc.HTTPMethodNotAllowed,
+    )
+    @validation.request_body_schema(schema.create_request_body)
+    @validation.response_body_schema(schema.create_response_body)
+    def post(self, job):
+        """Request a provision state change for a set of nodes.
+
+        Nodes which cannot be moved to the target (e.g. because of their
+        current state or access rights) are rejected upfront. The rest are
+        grouped by the conductor managing them and sent to the conductors in
+        batches of at most ``[api]provision_job_batch_size`` nodes. Each
+        conductor checks the concurrent action limits once per batch and
+        records the outcome for every node, which can be followed with the
+        returned job.
+
+        :param job: a provision job within the request body.
+        """
+        context = api.request.context
+        api_utils.check_policy('baremetal:provision_job:create')
+        _validate_job(job)
+
+        rpcapi = api.request.rpcapi
+        job_uuid = uuidutils.generate_uuid()
+        rejected = {}
+        by_conductor = collections.defaultdict(list)
+        for node_ident in job['nodes']:
+            try:
+                rpc_node = _check_node(node_ident, job)
+                conductor = rpcapi.get_conductor_for(rpc_node)
+            except exception.IronicException as e:
+                rejected[node_ident] = {
+                    'status': ir_states.PROVISION_JOB_REJECTED,
+                    'error': str(e),
+                }
+                continue
+            if rpc_node.uuid not in by_conductor[conductor]:
+                by_conductor[conductor].append(rpc_node.uuid)
+
+        params = {key: job[key]
+                  for key in ('clean_steps', 'deploy_steps',
+                              'disable_ramdisk')
+                  if job.get(key) is not None}
+        values = {'job_uuid': job_uuid, 'target': job['target'],
+                  'project': context.project_id}
+        if rejected:
+            batch = objects.ProvisionJobBatch(
+                context, nodes=list(rejected), params={}, results=rejected,
+                state=ir_states.PROVISION_JOB_FINISHED, **values)
+            batch.create()
+
+        batch_size = CONF.api.provision_job_batch_size
+        for conductor, nodes in by_conductor.items():
+            topic = '%s.%s' % (rpcapi.topic, conductor)
+            for start in range(0, len(nodes), batch_size):
+                batch = objects.ProvisionJobBatch(
+                    context, nodes=nodes[start:start + batch_size],
+                    params=params, results={}, conductor=conductor,
+                    state=ir_states.PROVISION_JOB_PENDING, **values)
+                batch.create()
+                try:
+                    rpcapi.do_bulk_provisioning(context, batch.uuid,
+                                                topic=topic)
+                except Exception as e:
+                    LOG.error('Failed to send batch %(batch)s of provision '
+                              'job %(job)s to conductor %(conductor)s: '
+                              '%(err)s', {'batch': batch.uuid,
+                                          'job': job_uuid,
+                                          'conductor': conductor, 'err': e})
+                    batch.reject_unprocessed(
+                        _('Failed to send the request to conductor '
+                          '%(conductor)s: %(err)s')
+                        % {'conductor': conductor, 'err': e})
+
+        LOG.info('Created provision job %(job)s with target %(target)s for '
+                 '%(count)d nodes, %(rejected)d rejected upfront',
+                 {'job': job_uuid, 'target': job['target'],
+                  'count': len(job['nodes']), 'rejected': len(rejected)})
+        api.response.location = link.build_url('provision_jobs', job_uuid)
+        return convert_with_links(
+            job_uuid,
+            objects.ProvisionJobBatch.list_by_job_uuid(context, job_uuid))
@@ -41,6 +41,7 @@ from ironic.common.i18n import _
 from ironic.common import policy
 from ironic.common import state_machine
 from ironic.common import states
+from ironic.common import template_catalogue
 from ironic.common import utils
 from ironic.conductor import steps as conductor_steps
 from ironic import objects
@@ -717,15 +718,11 @@ def get_rpc_runbook(runbook_ident):
     :raises: InvalidUuidOrName if the name or uuid provided is not valid.
     :raises: RunbookNotFound if the runbook is not found.
     """
-    # If runbook_ident is instead a valid UUID, treat it as a UUID.
-    if uuidutils.is_uuid_like(runbook_ident):
-        return objects.Runbook.get_by_uuid(api.request.context,
-                                           runbook_ident)
-
-    # Else, we can refer to runbooks by their name too
-    if utils.is_valid_logical_name(runbook_ident):
-        return objects.Runbook.get_by_name(api.request.context,
-                                           runbook_ident)
+    # Runbooks are referred to by UUID or by name.
+    if (uuidutils.is_uuid_like(runbook_ident)
+            or utils.is_valid_logical_name(runbook_ident)):
+        return template_catalogue.get_runbook(api.request.context,
+                                              runbook_ident)
     raise exception.InvalidUuidOrName(name=runbook_ident)
 
 
@@ -2312,6 +2309,14 @@ def allow_shards_endpoint():
     return api.request.version.minor >= versions.MINOR_82_NODE_SHARD
 
 
+def allow_provision_jobs():
+    """Check if accessing provision job endpoints is allowed.
+
+    Version 1.115 of the API exposed provision job endpoints.
+    """
+    return api.request.version.minor >= versions.MINOR_115_PROVISION_JOBS
+
+
 def new_continue_inspection_endpoint():
     """Check if /v1/continue_inspection endpoint is explicitly requested."""
     return api.request.version.minor >= versions.MINOR_84_CONTINUE_INSPECTION
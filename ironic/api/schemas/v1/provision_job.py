@@ -0,0 +1,95 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+
+from ironic.api.schemas.common import response_types
+
+_targets = [
+    'active', 'rebuild', 'deleted', 'undeploy', 'clean', 'manage', 'provide',
+]
+
+# request parameter schemas
+
+show_request_parameter = {
+    'type': 'object',
+    'properties': {
+        'job_uuid': {'type': 'string', 'format': 'uuid'},
+    },
+    'required': ['job_uuid'],
+    'additionalProperties': False,
+}
+
+# request body schemas
+
+create_request_body = {
+    'type': 'object',
+    'properties': {
+        'nodes': {
+            'type': 'array',
+            'minItems': 1,
+            'uniqueItems': True,
+            'items': {'type': 'string', 'minLength': 1, 'maxLength': 255},
+        },
+        'target': {'type': 'string', 'enum': _targets},
+        # NOTE: the steps are further validated the same way as for
+        # a single node provision state change.
+        'clean_steps': {'type': 'array', 'items': {'type': 'object'}},
+        'deploy_steps': {'type': 'array', 'items': {'type': 'object'}},
+        'disable_ramdisk': {'type': 'boolean'},
+    },
+    'required': ['nodes', 'target'],
+    'additionalProperties': False,
+}
+
+# response body schemas
+
+_provision_job_response_body = {
+    'type': 'object',
+    'properties': {
+        'uuid': {'type': 'string', 'format': 'uuid'},
+        'target': {'type': 'string', 'enum': _targets},
+        'state': {
+            'type': 'string',
+            'enum': ['pending', 'running', 'finished'],
+        },
+        'nodes': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'node': {'type': 'string'},
+                    'status': {
+                        'type': 'string',
+                        'enum': ['pending', 'accepted', 'rejected'],
+                    },
+                    'error': {'type': ['string', 'null']},
+                    'provision_state': {'type': ['string', 'null']},
+                    'target_provision_state': {'type': ['string', 'null']},
+                    'last_error': {'type': ['string', 'null']},
+                },
+                'required': ['node', 'status', 'error', 'provision_state',
+                             'target_provision_state', 'last_error'],
+                'additionalProperties': False,
+            },
+        },
+        'created_at': {'type': 'string', 'format': 'date-time'},
+        'updated_at': {'type': ['string', 'null'], 'format': 'date-time'},
+        'links': response_types.links,
+    },
+    'required': ['uuid', 'target', 'state', 'nodes', 'created_at',
+                 'updated_at', 'links'],
+    'additionalProperties': False,
+}
+
+show_response_body = copy.deepcopy(_provision_job_response_body)
+create_response_body = copy.deepcopy(_provision_job_response_body)
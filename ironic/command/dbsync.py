@@ -66,6 +66,7 @@ dbapi = db_api.get_instance()
 ONLINE_MIGRATIONS = (
     (dbapi, 'migrate_to_builtin_inspection'),
     (dbapi, 'migrate_runbook_names_to_traits'),
+    (dbapi, 'backfill_node_async_operations'),
     # NOTE(rloo): Don't remove this; it should always be last
     (dbapi, 'update_to_latest_versions'),
 )
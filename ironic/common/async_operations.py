@@ -0,0 +1,47 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Registry of asynchronous operations recorded in the database.
+
+Drivers keep the state of long-running operations on the BMC, such as
+firmware updates or RAID configuration, under a key of the node's
+``driver_internal_info`` and poll them from periodic tasks. Once the key is
+registered here, saving a node records in an indexed table whether the
+operation is pending, so that the periodic tasks can find the nodes with a
+pending operation without decoding ``driver_internal_info`` of every node.
+"""
+
+_KINDS = set()
+
+
+def register(kind):
+    """Register a kind of asynchronous operation.
+
+    :param kind: the key of ``driver_internal_info`` which is set to a
+        non-empty value while the operation is pending.
+    """
+    _KINDS.add(kind)
+
+
+def registered():
+    """Get all registered kinds of asynchronous operations."""
+    return frozenset(_KINDS)
+
+
+def pending(driver_internal_info):
+    """Get the registered operations pending according to the given info.
+
+    :param driver_internal_info: the ``driver_internal_info`` of a node.
+    :returns: a frozenset of kinds of operations.
+    """
+    info = driver_internal_info or {}
+    return frozenset(kind for kind in _KINDS if info.get(kind))
@@ -30,6 +30,13 @@ LOG = log.getLogger(__name__)
 EM_SEMAPHORE = 'extension_manager'
 
 
+# Cache of validated driver compositions: composition key -> (calculated
+# default interface names, interface implementations).
+_COMPOSITIONS = {}
+
+_MISSING = object()
+
+
 def build_driver_for_task(task):
     """Builds a composable driver for a given task.
 
@@ -37,6 +44,10 @@ def build_driver_for_task(task):
     various driver interfaces to it. They come from separate
     driver factories and are configurable via the database.
 
+    The interface implementations are shared by all tasks. Once the
+    composition of a hardware type with a set of interfaces has been
+    validated, it is cached and not validated again.
+
     :param task: The task containing the node to build a driver for.
     :returns: A driver object for the task.
     :raises: DriverNotFound if node.driver could not be found in the
@@ -48,29 +59,71 @@ def build_driver_for_task(task):
     """
     node = task.node
 
-    hw_type = get_hardware_type(node.driver)
-    check_and_update_node_interfaces(node, hw_type=hw_type)
+    key = _composition_key(node)
+    try:
+        defaults, impls = _COMPOSITIONS[key]
+    except KeyError:
+        hw_type = get_hardware_type(node.driver)
+        check_and_update_node_interfaces(node, hw_type=hw_type)
+        impls = _get_interfaces(node, hw_type)
+        if key is not None:
+            defaults = {field_name: getattr(node, field_name)
+                        for field_name, _value, _override, needs_default,
+                        _default in key[1] if needs_default}
+            _COMPOSITIONS[key] = (defaults, impls)
+    else:
+        for field_name, impl_name in defaults.items():
+            setattr(node, field_name, impl_name)
 
     bare_driver = driver_base.BareDriver()
-    _attach_interfaces_to_driver(bare_driver, node, hw_type)
+    for iface, impl in impls.items():
+        setattr(bare_driver, iface, impl)
 
     return bare_driver
 
 
-def _attach_interfaces_to_driver(bare_driver, node, hw_type):
-    """Attach interface implementations to a bare driver object.
+def _composition_key(node):
+    """Get the key of the driver composition of a node.
+
+    It consists of the hardware type and, for each interface, the name set on
+    the node, the override from instance_info and, if neither is set, the
+    configured default used to calculate it.
+
+    :returns: the key or None if the composition cannot be cached.
+    """
+    instance_info = node.instance_info if 'instance_info' in node else {}
+    fields = []
+    for iface in _INTERFACE_LOADERS:
+        field_name = '%s_interface' % iface
+        value = getattr(node, field_name) if field_name in node else None
+        override = instance_info.get(field_name, _MISSING)
+        if (override is not _MISSING
+                and not isinstance(override, (str, type(None)))):
+            return None
+        needs_default = value is None and override in (None, _MISSING)
+        default = (getattr(CONF, 'default_%s' % field_name)
+                   if needs_default else None)
+        fields.append((field_name, value, override, needs_default, default))
+    return node.driver, tuple(fields)
+
+
+def reset_composition_cache():
+    """Drop all cached driver compositions."""
+    _COMPOSITIONS.clear()
+
+
+def _get_interfaces(node, hw_type):
+    """Get the interface implementations for a node.
 
-    :param bare_driver: BareDriver instance to attach interfaces to
     :param node: Node object
     :param hw_type: hardware type instance
+    :returns: a dict mapping interface types to implementation instances.
     :raises: InterfaceNotFoundInEntrypoint if the entry point was not found.
     :raises: IncompatibleInterface if driver is a hardware type and
              the requested implementation is not compatible with it.
     """
-    for iface in _INTERFACE_LOADERS:
-        impl_name = node.get_interface(iface)
-        impl = get_interface(hw_type, iface, impl_name)
-        setattr(bare_driver, iface, impl)
+    return {iface: get_interface(hw_type, iface, node.get_interface(iface))
+            for iface in _INTERFACE_LOADERS}
 
 
 def get_interface(hw_type,
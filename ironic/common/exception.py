@@ -936,6 +936,10 @@ class NodeInventoryNotFound(NotFound):
     _msg_fmt = _("Node inventory record for node %(node)s could not be found.")
 
 
+class ProvisionJobNotFound(NotFound):
+    _msg_fmt = _("Provision job %(job)s could not be found.")
+
+
 class IncorrectConfiguration(IronicException):
     _msg_fmt = _("Supplied configuration is incorrect and must be fixed. "
                  "Error: %(error)s")
@@ -44,16 +44,20 @@ class Base(object):
         return required_args, optional_args
 
     def _normalize_list_args(self, required_args, optional_args, op_args):
-        """Convert list arguments into dictionary format."""
+        """Convert list arguments into dictionary format.
+
+        The arguments of the rule are never modified, a new list or
+        dictionary is built when context fields need to be added.
+        """
         if not isinstance(op_args, list):
             # Initialize required context fields if needed
             if isinstance(op_args, dict) and self.REQUIRES_PLUGIN_DATA:
-                op_args['plugin_data'] = {}
+                op_args = dict(op_args, plugin_data={})
             return op_args
 
         # Initialize required context fields if needed
         if self.REQUIRES_PLUGIN_DATA:
-            op_args.append({})
+            op_args = op_args + [{}]
 
         if len(op_args) < len(required_args):
             missing = [p for p in required_args[len(op_args):]]
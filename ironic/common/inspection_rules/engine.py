@@ -10,6 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+import os
+import threading
+
 from oslo_log import log
 import yaml
 
@@ -87,6 +91,85 @@ def get_built_in_rules(rules_file):
     return built_in_rules
 
 
+class RuleRepository(object):
+    """Cache of inspection rules shared by all inspections.
+
+    The built-in rules file is only parsed again when its modification time
+    or size changes. The rules from the database are cached per phase along
+    with the revision of the rules table they were loaded with, so that
+    they are only loaded again after a rule is created, updated or deleted.
+    Services of the previous release do not increment the revision, so the
+    rules from the database are not cached during a rolling upgrade.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # (file name, modification time, size), rules
+        self._built_in = (None, [])
+        # phase -> (generation, rules)
+        self._db_rules = {}
+
+    def get_built_in_rules(self):
+        """Return the built-in rules, parsing the file only if it changed."""
+        rules_file = CONF.inspection_rules.built_in_rules
+        try:
+            stat = os.stat(rules_file) if rules_file else None
+        except OSError:
+            stat = None
+        if stat is None:
+            # Nothing to cache, or let the loading report the error.
+            return get_built_in_rules(rules_file)
+
+        key = (rules_file, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached_key, rules = self._built_in
+        if cached_key != key:
+            rules = get_built_in_rules(rules_file)
+            with self._lock:
+                self._built_in = (key, rules)
+        return rules
+
+    def get_db_rules(self, context, phase):
+        """Return the rules from the database for the inspection phase."""
+        if CONF.pin_release_version:
+            return objects.InspectionRule.list(
+                context=context, filters={'phase': phase})
+        # The generation is read first, so that a concurrent change is
+        # noticed on the next call at the latest.
+        generation = objects.InspectionRule.get_generation(context)
+        with self._lock:
+            cached_generation, rules = self._db_rules.get(phase, (None, None))
+        if rules is None or cached_generation != generation:
+            rules = objects.InspectionRule.list(
+                context=context, filters={'phase': phase})
+            with self._lock:
+                self._db_rules[phase] = (generation, rules)
+        return rules
+
+    def get_rules(self, context, phase):
+        """Return all rules to apply in the inspection phase.
+
+        The returned list is new, but the rules themselves are shared and
+        must not be modified.
+        """
+        return self.get_db_rules(context, phase) + self.get_built_in_rules()
+
+    def reset(self):
+        """Drop all cached rules."""
+        with self._lock:
+            self._built_in = (None, [])
+            self._db_rules = {}
+
+
+_REPOSITORY = RuleRepository()
+
+
+def reset_rules_cache():
+    """Drop all cached inspection rules."""
+    _REPOSITORY.reset()
+
+
 def check_conditions(task, rule, inventory, plugin_data):
     try:
         if not rule.get('conditions', None):
@@ -193,12 +276,10 @@ def apply_rules(task, inventory, plugin_data, inspection_phase):
     """Apply inspection rules to a node."""
     node = task.node
 
-    all_rules = objects.InspectionRule.list(
-        context=task.context,
-        filters={'phase': inspection_phase})
-
-    built_in_rules = get_built_in_rules(CONF.inspection_rules.built_in_rules)
-    rules = all_rules + built_in_rules
+    # The cached rules are shared by all inspections, the actions and the
+    # operators must only ever see private copies of their arguments.
+    rules = [copy.deepcopy(rule)
+             for rule in _REPOSITORY.get_rules(task.context, inspection_phase)]
 
     if not rules:
         LOG.debug("No inspection rules to apply for phase "
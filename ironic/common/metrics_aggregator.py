@@ -0,0 +1,149 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import threading
+
+from oslo_config import cfg
+
+from ironic.common import metrics
+
+
+CONF = cfg.CONF
+
+_LOCK = threading.Lock()
+STATISTIC_DATA = {}
+
+
+class _Histogram(object):
+    """Distribution of timer values over fixed buckets."""
+
+    __slots__ = ('bounds', 'buckets', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One bucket per upper bound plus the +Inf bucket.
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within its bucket."""
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[index - 1] if index else self.min
+                upper = (self.bounds[index] if index < len(self.bounds)
+                         else self.max)
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def snapshot(self, quantiles):
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'buckets': buckets,
+            'quantiles': {str(q): self.quantile(q) for q in quantiles},
+            'type': 'timer',
+        }
+
+
+class AggregatingMetricLogger(metrics.MetricLogger):
+    """Metric logger that aggregates metrics in memory.
+
+    Unlike the ``collector`` backend, timers are recorded as histograms with
+    cumulative buckets (in milliseconds) configured by
+    ``[metrics]aggregator_buckets``, from which quantiles are estimated. The
+    aggregated data is retrieved with ``get_metrics_data``, e.g. to be sent
+    as conductor sensor data and scraped into Prometheus.
+    """
+
+    GAUGE_TYPE = 'g'
+    COUNTER_TYPE = 'c'
+    TIMER_TYPE = 'ms'
+
+    def _send(self, name, value, metric_type, sample_rate=None):
+        """Aggregate the metric in memory.
+
+        :param name: Metric name
+        :param value: Metric value
+        :param metric_type: Metric type (GAUGE_TYPE, COUNTER_TYPE,
+            or TIMER_TYPE)
+        :param sample_rate: Probabilistic rate at which counter values are
+            sent, used to scale them back.
+        """
+        with _LOCK:
+            if metric_type == self.TIMER_TYPE:
+                histogram = STATISTIC_DATA.get(name)
+                if histogram is None:
+                    bounds = sorted(CONF.metrics.aggregator_buckets)
+                    histogram = STATISTIC_DATA[name] = _Histogram(bounds)
+                histogram.observe(value)
+            elif metric_type == self.GAUGE_TYPE:
+                STATISTIC_DATA[name] = {'value': value, 'type': 'gauge'}
+            elif metric_type == self.COUNTER_TYPE:
+                if sample_rate:
+                    value = value / sample_rate
+                counter = STATISTIC_DATA.setdefault(
+                    name, {'count': 0, 'type': 'counter'})
+                counter['count'] += value
+
+    def _gauge(self, name, value):
+        return self._send(name, value, self.GAUGE_TYPE)
+
+    def _counter(self, name, value, sample_rate=None):
+        return self._send(name, value, self.COUNTER_TYPE,
+                          sample_rate=sample_rate)
+
+    def _timer(self, name, value):
+        return self._send(name, value, self.TIMER_TYPE)
+
+    def get_metrics_data(self):
+        """Return a snapshot of the aggregated metrics.
+
+        :returns: Dictionary with metric names as keys. The values are
+                  dictionaries with a ``type`` field. A counter has a
+                  ``count`` field and a gauge has a ``value`` field. A timer
+                  has ``count``, ``sum``, ``min`` and ``max`` fields,
+                  cumulative ``buckets`` keyed by their upper bound and
+                  estimated ``quantiles`` keyed by the quantile.
+        """
+        quantiles = CONF.metrics.aggregator_quantiles
+        with _LOCK:
+            return {
+                name: (value.snapshot(quantiles)
+                       if isinstance(value, _Histogram) else dict(value))
+                for name, value in STATISTIC_DATA.items()
+            }
@@ -15,7 +15,10 @@
 
 import contextlib
 import logging
+import os
 import socket
+import threading
+import time
 
 from oslo_config import cfg
 
@@ -27,6 +30,47 @@ LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 
 
+class _PacketBuffer(object):
+    """Metrics waiting to be sent to a statsd target."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lines = []
+        self.size = 0
+        self.last_flush = time.monotonic()
+
+    def add(self, line, max_size, interval):
+        """Add a metric, returning the packets which are due to be sent."""
+        packets = []
+        with self.lock:
+            if self.lines and self.size + len(line) + 1 > max_size:
+                packets.append(self._take())
+            self.lines.append(line)
+            self.size += len(line) + 1
+            if time.monotonic() - self.last_flush >= interval:
+                packets.append(self._take())
+        return packets
+
+    def flush(self):
+        """Return all buffered metrics as a packet, if any."""
+        with self.lock:
+            return self._take() if self.lines else None
+
+    def _take(self):
+        packet = '\n'.join(self.lines)
+        self.lines = []
+        self.size = 0
+        self.last_flush = time.monotonic()
+        return packet
+
+
+# Buffers are shared by all loggers sending to the same target.
+_BUFFERS = {}
+_BUFFERS_LOCK = threading.Lock()
+# PID of the process running the flusher thread, threads do not survive fork.
+_FLUSHER_PID = None
+
+
 class StatsdMetricLogger(metrics.MetricLogger):
     """Metric logger that reports data via the statsd protocol."""
 
@@ -55,6 +99,9 @@ class StatsdMetricLogger(metrics.MetricLogger):
     def _send(self, name, value, metric_type, sample_rate=None):
         """Send metrics to the statsd backend
 
+        If ``[metrics_statsd]statsd_flush_interval`` is set, the metric is
+        buffered and sent later together with other metrics in one packet.
+
         :param name: Metric name
         :param value: Metric value
         :param metric_type: Metric type (GAUGE_TYPE, COUNTER_TYPE,
@@ -66,18 +113,54 @@ class StatsdMetricLogger(metrics.MetricLogger):
         else:
             metric = '%s:%s|%s@%s' % (name, value, metric_type, sample_rate)
 
+        interval = CONF.metrics_statsd.statsd_flush_interval
+        if interval <= 0:
+            self._send_packet(metric)
+            return
+
+        self._ensure_flusher()
+        for packet in self._get_buffer(self._target).add(
+                metric, CONF.metrics_statsd.statsd_max_packet_size,
+                interval):
+            self._send_packet(packet)
+
+    def _send_packet(self, packet):
+        """Send one packet of newline-separated metrics."""
         # Ideally, we'd cache a sending socket in self, but that
         # results in a socket getting shared by multiple green threads.
         with contextlib.closing(self._open_socket()) as sock:
             try:
                 sock.settimeout(0.0)
-                sock.sendto(metric.encode(), self._target)
+                sock.sendto(packet.encode(), self._target)
             except socket.error as e:
                 LOG.warning("Failed to send the metric value to host "
                             "%(host)s, port %(port)s. Error: %(error)s",
                             {'host': self._host, 'port': self._port,
                              'error': e})
 
+    @staticmethod
+    def _get_buffer(target):
+        with _BUFFERS_LOCK:
+            try:
+                return _BUFFERS[target]
+            except KeyError:
+                buf = _BUFFERS[target] = _PacketBuffer()
+                return buf
+
+    def _ensure_flusher(self):
+        global _FLUSHER_PID
+        if _FLUSHER_PID == os.getpid():
+            return
+        with _BUFFERS_LOCK:
+            if _FLUSHER_PID == os.getpid():
+                return
+            # Buffers inherited from a parent process belong to it.
+            _BUFFERS.clear()
+            _FLUSHER_PID = os.getpid()
+        thread = threading.Thread(target=_flush_periodically,
+                                  name='statsd-flusher', daemon=True)
+        thread.start()
+
     def _open_socket(self):
         return socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
@@ -90,3 +173,28 @@ class StatsdMetricLogger(metrics.MetricLogger):
 
     def _timer(self, name, value):
         return self._send(name, value, self.TIMER_TYPE)
+
+
+def flush(host=None, port=None):
+    """Send all buffered metrics.
+
+    :param host: The statsd host, defaults to the configured one.
+    :param port: The statsd port, defaults to the configured one.
+    """
+    logger = StatsdMetricLogger('', host=host, port=port)
+    packet = logger._get_buffer(logger._target).flush()
+    if packet:
+        logger._send_packet(packet)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(max(CONF.metrics_statsd.statsd_flush_interval, 0.1))
+        with _BUFFERS_LOCK:
+            targets = list(_BUFFERS)
+        for host, port in targets:
+            try:
+                flush(host, port)
+            except Exception:
+                LOG.exception('Failed to flush metrics to host %(host)s, '
+                              'port %(port)s', {'host': host, 'port': port})
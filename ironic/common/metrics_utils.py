@@ -18,6 +18,7 @@ from oslo_config import cfg
 from ironic.common import exception
 from ironic.common.i18n import _
 from ironic.common import metrics
+from ironic.common import metrics_aggregator
 from ironic.common import metrics_collector
 from ironic.common import metrics_statsd
 
@@ -35,7 +36,8 @@ def get_metrics_logger(prefix='', backend=None, host=None, delimiter='.'):
     :param prefix: Prefix for this metric logger.
         Value should be a string or None.
     :param backend: Backend to use for the metrics system.
-        Possible values are 'noop' and 'statsd'.
+        Possible values are 'noop', 'statsd', 'collector' and
+        'aggregator'.
     :param host: Name of this node.
     :param delimiter: Delimiter to use for the metrics name.
     :return: The new MetricLogger.
@@ -69,8 +71,12 @@ def get_metrics_logger(prefix='', backend=None, host=None, delimiter='.'):
     elif backend == 'collector':
         return metrics_collector.DictCollectionMetricLogger(
             prefix, delimiter=delimiter)
+    elif backend == 'aggregator':
+        return metrics_aggregator.AggregatingMetricLogger(
+            prefix, delimiter=delimiter)
     else:
         msg = (_("The backend is set to an unsupported type: "
-                 "%s. Value should be 'noop' or 'statsd'.")
+                 "%s. Value should be 'noop', 'statsd', 'collector' or "
+                 "'aggregator'.")
                % backend)
         raise exception.InvalidMetricConfig(msg)
@@ -183,6 +183,18 @@ ALLOCATION_CREATOR = (
     '(' + SYSTEM_MEMBER + ') or (role:member)'
 )
 
+PROVISION_JOB_OWNER_READER = ('role:reader and '
+                              'project_id:%(provision_job.owner)s')
+
+PROVISION_JOB_READER = (
+    '(' + SYSTEM_READER + ') or (' + PROVISION_JOB_OWNER_READER + ')'
+)
+
+# The node provision state policies are additionally checked for every node.
+PROVISION_JOB_CREATOR = (
+    '(' + SYSTEM_MEMBER + ') or (role:member)'
+)
+
 # Special purpose aliases for things like "ability to access the API
 # as a reader, or permission checking that does not require node
 # owner relationship checking
@@ -2053,6 +2065,27 @@ rule_policies = [
     )
 ]
 
+provision_job_policies = [
+    policy.DocumentedRuleDefault(
+        name='baremetal:provision_job:create',
+        check_str=PROVISION_JOB_CREATOR,
+        scope_types=['system', 'project'],
+        description='Create a bulk provisioning job. The '
+                    'baremetal:node:set_provision_state policy is '
+                    'additionally checked for every node of the job.',
+        operations=[{'path': '/provision_jobs', 'method': 'POST'}],
+    ),
+    policy.DocumentedRuleDefault(
+        name='baremetal:provision_job:get',
+        check_str=PROVISION_JOB_READER,
+        scope_types=['system', 'project'],
+        description='Retrieve the progress of a bulk provisioning job. '
+                    'Project scoped users only see the jobs created in '
+                    'their project.',
+        operations=[{'path': '/provision_jobs/{job_uuid}', 'method': 'GET'}],
+    ),
+]
+
 
 def list_policies():
     policies = itertools.chain(
@@ -2071,6 +2104,7 @@ def list_policies():
         deploy_template_policies,
         runbook_policies,
         rule_policies,
+        provision_job_policies,
     )
     return policies
 
@@ -1044,8 +1044,8 @@ RELEASE_MAPPING = {
     # make it below. To release, we will preserve a version matching
     # the release as a separate block of text, like above.
     'master': {
-        'api': '1.114',
-        'rpc': '1.62',
+        'api': '1.115',
+        'rpc': '1.63',
         'networking_rpc': '1.0',
         'objects': {
             'Allocation': ['1.3', '1.2', '1.1'],
@@ -1068,6 +1068,7 @@ RELEASE_MAPPING = {
             'RunbookTrait': ['1.0'],
             'RunbookTraitList': ['1.0'],
             'InspectionRule': ['1.1', '1.0'],
+            'ProvisionJobBatch': ['1.0'],
         }
     },
 }
@@ -17,6 +17,7 @@ from oslo_config import cfg
 from oslo_log import log
 try:
     from oslo_reports import guru_meditation_report as gmr
+    from oslo_reports.models import with_default_views as gmr_models
     from oslo_reports import opts as gmr_opts
 except ImportError:
     gmr = None
@@ -33,6 +34,9 @@ from ironic import version
 
 LOG = log.getLogger(__name__)
 
+# Services running a conductor, which hold node locks.
+_CONDUCTOR_SERVICES = ('ironic', 'ironic_conductor')
+
 
 def _get_global_conf():
     """Return the process-local CONF singleton when CONF is unpickled.
@@ -88,6 +92,17 @@ def prepare_command(argv=None):
     objects.register_all()
 
 
+def _held_locks_report():
+    """Generate the guru meditation report section with held node locks."""
+    # NOTE: imported here to avoid loading the conductor code in services
+    # which do not need it.
+    from ironic.conductor import task_manager
+
+    locks = ['%(node)s: %(purpose)s (held %(age).1f seconds)' % lock
+             for lock in task_manager.get_held_locks()]
+    return gmr_models.ModelWithDefaultViews({'locks': locks})
+
+
 def prepare_service(name, argv=None, conf=CONF):
     """Prepare an Ironic service executable.
 
@@ -100,6 +115,9 @@ def prepare_service(name, argv=None, conf=CONF):
     if gmr is not None:
         gmr_opts.set_defaults(CONF)
         gmr.TextGuruMeditation.setup_autorun(version, conf=CONF)
+        if name in _CONDUCTOR_SERVICES:
+            gmr.TextGuruMeditation.register_section('Held Node Locks',
+                                                    _held_locks_report)
     else:
         LOG.debug('Guru meditation reporting is disabled '
                   'because oslo.reports is not installed')
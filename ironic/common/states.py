@@ -327,6 +327,25 @@ ALLOCATING = 'allocating'
 
 # States ERROR and ACTIVE are reused.
 
+#############################
+# Provision job batch states
+#############################
+
+PROVISION_JOB_PENDING = 'pending'
+""" Batch has been recorded, but its conductor has not picked it up yet. """
+
+PROVISION_JOB_RUNNING = 'running'
+""" Batch is being processed by its conductor. """
+
+PROVISION_JOB_FINISHED = 'finished'
+""" All nodes of the batch have been either accepted or rejected. """
+
+PROVISION_JOB_ACCEPTED = 'accepted'
+""" The requested action has been started on the node. """
+
+PROVISION_JOB_REJECTED = 'rejected'
+""" The requested action could not be started on the node. """
+
 ###########################
 # History Event State Types
 ###########################
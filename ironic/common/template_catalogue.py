@@ -0,0 +1,177 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-memory catalogue of deploy templates and runbooks.
+
+Every deployment looks up the deploy templates named after the instance
+traits of its node, and every use of a runbook looks it up by UUID or name.
+With ``[DEFAULT]template_cache_size`` set, the API and conductor services
+keep all deploy templates and all runbooks in memory, indexed by UUID and
+name. They are only loaded again when their revision changes, which is
+checked with one small query.
+"""
+
+import threading
+
+from oslo_log import log
+from oslo_utils import uuidutils
+
+from ironic.conf import CONF
+from ironic import objects
+
+LOG = log.getLogger(__name__)
+
+
+class _Index(object):
+    """Records indexed by UUID and name."""
+
+    def __init__(self, records):
+        self.by_uuid = {record.uuid: record for record in records}
+        self.by_name = {record.name: record for record in records}
+
+
+def _copy(record, context):
+    record = record.obj_clone()
+    record._context = context
+    return record
+
+
+class Catalogue(object):
+    """A catalogue of records validated by their revision.
+
+    All records of the object class are cached if there are no more than
+    ``[DEFAULT]template_cache_size`` of them, otherwise they are loaded from
+    the database on each lookup. Lookups of records which are not cached
+    are also passed to the database, so that the usual exceptions are
+    raised.
+
+    Services of the previous release do not increment the revision, so
+    nothing is cached while ``[DEFAULT]pin_release_version`` is set.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, object_name):
+        self._object_name = object_name
+        # (generation, size, index or None if there are too many records)
+        self._entry = (None, None, None)
+
+    @property
+    def _object_class(self):
+        return getattr(objects, self._object_name)
+
+    def _get_index(self, context):
+        """Return the index of all records, or None if they are not cached."""
+        size = CONF.template_cache_size
+        if not size or CONF.pin_release_version:
+            return None
+
+        generation = self._object_class.get_generation(context)
+        with self._lock:
+            cached_generation, cached_size, index = self._entry
+        if cached_generation == generation and cached_size == size:
+            return index
+
+        records = self._object_class.list(context, limit=size + 1)
+        if len(records) > size:
+            LOG.debug('Not caching %(type)s records, there are more than '
+                      '%(size)d of them',
+                      {'type': self._object_name, 'size': size})
+            index = None
+        else:
+            index = _Index(records)
+
+        # The generation was read before the records, so the cached records
+        # are at least as recent as the generation, and newer records are
+        # loaded on the next lookup.
+        with self._lock:
+            self._entry = (generation, size, index)
+        return index
+
+    def get_by_uuid(self, context, uuid):
+        """Get a record by its UUID.
+
+        :param context: security context.
+        :param uuid: the UUID of the record.
+        :returns: an object owned by the caller.
+        """
+        index = self._get_index(context)
+        if index is not None and uuid in index.by_uuid:
+            return _copy(index.by_uuid[uuid], context)
+        return self._object_class.get_by_uuid(context, uuid)
+
+    def get_by_name(self, context, name):
+        """Get a record by its name.
+
+        :param context: security context.
+        :param name: the name of the record.
+        :returns: an object owned by the caller.
+        """
+        index = self._get_index(context)
+        if index is not None and name in index.by_name:
+            return _copy(index.by_name[name], context)
+        return self._object_class.get_by_name(context, name)
+
+    def list_by_names(self, context, names):
+        """List the records with one of the names.
+
+        :param context: security context.
+        :param names: a list of names.
+        :returns: a list of objects owned by the caller, ordered by ID.
+        """
+        index = self._get_index(context)
+        if index is None:
+            return self._object_class.list_by_names(context, names)
+        records = {index.by_name[name] for name in names
+                   if name in index.by_name}
+        return [_copy(record, context)
+                for record in sorted(records, key=lambda r: r.id)]
+
+    def reset(self):
+        """Drop all cached records."""
+        with self._lock:
+            self._entry = (None, None, None)
+
+
+_DEPLOY_TEMPLATES = Catalogue('DeployTemplate')
+_RUNBOOKS = Catalogue('Runbook')
+
+
+def get_deploy_templates_by_names(context, names):
+    """Get the deploy templates with one of the names.
+
+    Deploy templates are named after the traits they apply to.
+
+    :param context: security context.
+    :param names: a list of names, usually instance traits of a node.
+    :returns: a list of :class:`DeployTemplate` objects.
+    """
+    return _DEPLOY_TEMPLATES.list_by_names(context, names)
+
+
+def get_runbook(context, runbook_ident):
+    """Get a runbook from its UUID or name.
+
+    :param context: security context.
+    :param runbook_ident: the UUID or name of a runbook.
+    :returns: a :class:`Runbook` object.
+    :raises: RunbookNotFound if the runbook is not found.
+    """
+    if uuidutils.is_uuid_like(runbook_ident):
+        return _RUNBOOKS.get_by_uuid(context, runbook_ident)
+    return _RUNBOOKS.get_by_name(context, runbook_ident)
+
+
+def reset_template_catalogue():
+    """Drop all cached deploy templates and runbooks."""
+    _DEPLOY_TEMPLATES.reset()
+    _RUNBOOKS.reset()
@@ -0,0 +1,144 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Admission control for concurrent deploy and clean actions."""
+
+import threading
+import time
+
+from oslo_log import log
+
+from ironic.common import states
+from ironic.conf import CONF
+from ironic.db import api as dbapi
+
+LOG = log.getLogger(__name__)
+
+# Actions subject to a concurrency limit mapped to the counter they use.
+# Unprovisioning and cleaning share the same limit and node states.
+_ACTION_COUNTERS = {
+    'provisioning': 'deploy',
+    'unprovisioning': 'clean',
+    'cleaning': 'clean',
+}
+
+# NOTE(TheJulia): This also checks for the deleting state which is super
+# transitory, *but* you can get a node into the state. So in order to guard
+# against a DoS attack, we need to check even the super transitory node state.
+_COUNTER_STATES = {
+    'deploy': [states.DEPLOYING, states.DEPLOYWAIT],
+    'clean': [states.DELETING, states.CLEANING, states.CLEANWAIT],
+}
+
+
+def _limit(counter):
+    if counter == 'deploy':
+        return CONF.conductor.max_concurrent_deploy
+    return CONF.conductor.max_concurrent_clean
+
+
+def _conductor_group():
+    if CONF.conductor.max_concurrent_per_conductor_group:
+        return CONF.conductor.conductor_group
+    return None
+
+
+class ConcurrentActionCounters(object):
+    """Approximate counters of nodes with a limited action in progress.
+
+    Counting nodes in the database on every deploy or clean request is
+    expensive when many requests arrive at once. The counters are loaded
+    from the database at most every
+    ``[conductor]concurrent_action_count_interval`` seconds, together with
+    the number of online conductors sharing the limit. Actions started by
+    the other conductors are not seen until the next refresh, so every
+    action started here is assumed to be matched by an action started on
+    each of the other conductors. Nodes finishing an action are only
+    noticed on the next refresh. The database is always consulted when
+    fewer than ``[conductor]concurrent_action_count_margin`` actions may
+    still start according to this estimate.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # (counter, conductor group) -> (count, monotonic update time,
+        # actions started here since the update, online conductors)
+        self._counts = {}
+
+    def _refresh(self, key):
+        counter, conductor_group = key
+        db = dbapi.get_instance()
+        count = db.count_nodes_in_provision_state(
+            _COUNTER_STATES[counter], conductor_group=conductor_group)
+        conductors = max(len(db.get_online_conductors(
+            conductor_group=conductor_group)), 1)
+        LOG.debug('Counted %(count)d nodes with a %(counter)s action in '
+                  'progress in conductor group %(group)s with %(cond)d '
+                  'online conductors',
+                  {'count': count, 'counter': counter,
+                   'group': conductor_group, 'cond': conductors})
+        with self._lock:
+            self._counts[key] = (count, time.monotonic(), 0, conductors)
+        return count
+
+    def capacity(self, action):
+        """Calculate how many more actions of the given type may start.
+
+        :param action: the type of the action, e.g. 'provisioning'.
+        :returns: the number of actions which can still be started without
+            exceeding the configured limit, or None if the action is not
+            subject to a concurrency limit.
+        """
+        counter = _ACTION_COUNTERS.get(action)
+        if counter is None:
+            return None
+
+        key = (counter, _conductor_group())
+        limit = _limit(counter)
+        interval = CONF.conductor.concurrent_action_count_interval
+        margin = CONF.conductor.concurrent_action_count_margin
+        with self._lock:
+            count, updated_at, started, conductors = self._counts.get(
+                key, (None, 0, 0, 1))
+
+        if count is not None:
+            # The other conductors may have started as many actions.
+            count += started * conductors
+        if (count is None
+                or time.monotonic() - updated_at >= interval
+                or limit - count <= margin):
+            count = self._refresh(key)
+        return max(limit - count, 0)
+
+    def record_start(self, action):
+        """Account for an action started by this conductor.
+
+        :param action: the type of the action, e.g. 'provisioning'.
+        """
+        counter = _ACTION_COUNTERS.get(action)
+        if counter is None:
+            return
+
+        key = (counter, _conductor_group())
+        with self._lock:
+            try:
+                count, updated_at, started, conductors = self._counts[key]
+            except KeyError:
+                # Nothing cached, the next check will count from scratch.
+                return
+            self._counts[key] = (count, updated_at, started + 1, conductors)
+
+    def reset(self):
+        """Drop all cached counts."""
+        with self._lock:
+            self._counts = {}
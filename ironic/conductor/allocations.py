@@ -13,6 +13,8 @@
 """Functionality related to allocations."""
 
 import random
+import threading
+import time
 
 from oslo_config import cfg
 from oslo_log import log
@@ -30,6 +32,9 @@ CONF = cfg.CONF
 LOG = log.getLogger(__name__)
 METRICS = metrics_utils.get_metrics_logger(__name__)
 
+# Number of candidate nodes offered to the database in one claim attempt.
+_CLAIM_CHUNK_SIZE = 20
+
 
 def do_allocate(context, allocation):
     """Process the allocation.
@@ -46,14 +51,8 @@ def do_allocate(context, allocation):
     try:
         nodes = _candidate_nodes(context, allocation)
         _allocate_node(context, allocation, nodes)
-    except exception.AllocationFailed as exc:
-        LOG.error(str(exc))
-        _allocation_failed(allocation, exc)
     except Exception as exc:
-        LOG.exception("Unexpected exception during processing of "
-                      "allocation %s", allocation.uuid)
-        reason = _("Unexpected exception during allocation: %s") % exc
-        _allocation_failed(allocation, reason)
+        _processing_failed(allocation, exc)
 
 
 def verify_node_for_deallocation(node, allocation):
@@ -82,6 +81,21 @@ def verify_node_for_deallocation(node, allocation):
         raise exception.InvalidState(msg)
 
 
+def _processing_failed(allocation, exc):
+    """Log and record an exception raised when processing the allocation.
+
+    Must be called from an exception handler.
+    """
+    if isinstance(exc, exception.AllocationFailed):
+        LOG.error(str(exc))
+        _allocation_failed(allocation, exc)
+    else:
+        LOG.exception("Unexpected exception during processing of "
+                      "allocation %s", allocation.uuid)
+        reason = _("Unexpected exception during allocation: %s") % exc
+        _allocation_failed(allocation, reason)
+
+
 def _allocation_failed(allocation, reason):
     """Failure handler for the allocation."""
     try:
@@ -100,8 +114,8 @@ def _traits_match(traits, node):
     return {t.trait for t in node.traits.objects}.issuperset(traits)
 
 
-def _candidate_nodes(context, allocation):
-    """Get a list of candidate nodes for the allocation."""
+def _candidate_filters(allocation):
+    """Get the node filters matching the allocation."""
     # NOTE(dtantsur): not checking the retired flag because it's impossible
     # (by the API contract) to have a retired node in the available state.
     filters = {'resource_class': allocation.resource_class,
@@ -115,11 +129,45 @@ def _candidate_nodes(context, allocation):
         filters['uuid_in'] = allocation.candidate_nodes
     if allocation.owner:
         filters['project'] = allocation.owner
+    if allocation.traits:
+        filters['with_traits'] = allocation.traits
+    return filters
+
+
+def _name_match_first(nodes, allocation):
+    # NOTE(sbaker): if the allocation name matches a node name, attempt that
+    # node first. This will reduce confusion when nodes have the same naming
+    # scheme as allocations.
+    if allocation.name:
+        for i, node in enumerate(nodes):
+            if node.name == allocation.name:
+                nodes.insert(0, nodes.pop(i))
+                break
+
+
+def _candidate_nodes(context, allocation, count=1):
+    """Get a list of candidate nodes for the allocation.
+
+    Only the fields required to try the nodes are loaded, the nodes are
+    checked again when they are claimed.
 
-    nodes = objects.Node.list(context, filters=filters)
+    :param count: the number of allocations with the same requirements that
+        will share the candidates.
+    """
+    filters = _candidate_filters(allocation)
+    nodes = objects.Node.list(context, filters=filters,
+                              fields=['uuid', 'name'])
 
     if not nodes:
-        if allocation.candidate_nodes:
+        # Tell whether the traits or the other filters do not match.
+        without_traits = {key: value for key, value in filters.items()
+                          if key != 'with_traits'}
+        if (allocation.traits
+                and objects.Node.list(context, filters=without_traits,
+                                      fields=['uuid'], limit=1)):
+            error = (_("no suitable nodes have the requested traits %s") %
+                     ', '.join(allocation.traits))
+        elif allocation.candidate_nodes:
             error = _("none of the requested nodes are available and match "
                       "the resource class %s") % allocation.resource_class
         else:
@@ -127,70 +175,68 @@ def _candidate_nodes(context, allocation):
                 allocation.resource_class)
         raise exception.AllocationFailed(uuid=allocation.uuid, error=error)
 
-    # TODO(dtantsur): database-level filtering?
-    if allocation.traits:
-        traits = set(allocation.traits)
-        nodes = [n for n in nodes if _traits_match(traits, n)]
-        if not nodes:
-            error = (_("no suitable nodes have the requested traits %s") %
-                     ', '.join(traits))
-            raise exception.AllocationFailed(uuid=allocation.uuid, error=error)
-
     # NOTE(dtantsur): make sure that parallel allocations do not try the nodes
     # in the same order.
     random.shuffle(nodes)
+    _name_match_first(nodes, allocation)
 
-    # NOTE(sbaker): if the allocation name matches a node name, attempt that
-    # node first. This will reduce confusion when nodes have the same naming
-    # scheme as allocations.
-    if allocation.name:
-        for i, node in enumerate(nodes):
-            if node.name == allocation.name:
-                nodes.insert(0, nodes.pop(i))
-                break
+    limit = CONF.conductor.allocation_candidate_limit * count
+    if limit and len(nodes) > limit:
+        LOG.debug('Trying %(limit)d random nodes out of %(count)d suitable '
+                  'nodes for allocation %(uuid)s',
+                  {'limit': limit, 'count': len(nodes),
+                   'uuid': allocation.uuid})
+        nodes = nodes[:limit]
 
     LOG.debug('%(count)d nodes are candidates for allocation %(uuid)s',
               {'count': len(nodes), 'uuid': allocation.uuid})
     return nodes
 
 
-def _verify_node(node, allocation):
-    """Check that the node still satisfiest the request."""
-    if node.maintenance:
-        LOG.debug('Node %s is now in maintenance, skipping',
-                  node.uuid)
-        return False
-
-    if node.instance_uuid:
-        LOG.debug('Node %(node)s is already associated with instance '
-                  '%(inst)s, skipping',
-                  {'node': node.uuid, 'inst': node.instance_uuid})
-        return False
-
-    if node.provision_state != states.AVAILABLE:
-        LOG.debug('Node %s is no longer available, skipping',
-                  node.uuid)
-        return False
-
-    if node.resource_class != allocation.resource_class:
-        LOG.debug('Resource class of node %(node)s no longer '
-                  'matches requested resource class %(rsc)s for '
-                  'allocation %(uuid)s, skipping',
-                  {'node': node.uuid,
-                   'rsc': allocation.resource_class,
-                   'uuid': allocation.uuid})
-        return False
-
-    if allocation.traits and not _traits_match(set(allocation.traits), node):
-        LOG.debug('List of traits of node %(node)s no longer '
-                  'matches requested traits %(traits)s for '
-                  'allocation %(uuid)s, skipping',
-                  {'node': node.uuid,
-                   'traits': allocation.traits,
-                   'uuid': allocation.uuid})
-        return False
+def _claim_node(context, allocation, nodes):
+    """Try to claim one of the nodes for the allocation once.
+
+    Instead of locking every node in turn, the nodes are offered to the
+    database in chunks, which reserves the first of them that is still
+    suitable, not locked and not associated with a single transaction.
+
+    :returns: the claimed node.
+    :raises: AllocationFailed with the nodes list rewritten to only contain
+        the nodes that are worth retrying.
+    """
+    filters = _candidate_filters(allocation)
+    # The node matching the allocation name is tried on its own.
+    first = int(bool(allocation.name and nodes
+                     and nodes[0].name == allocation.name))
+    chunks = [nodes[i:i + _CLAIM_CHUNK_SIZE]
+              for i in range(first, len(nodes), _CLAIM_CHUNK_SIZE)]
+    if first:
+        chunks.insert(0, nodes[:1])
+    for chunk in chunks:
+        chunk = {node.uuid: node for node in chunk}
+        if allocation.claim_node(list(chunk), filters):
+            node = next(n for n in chunk.values()
+                        if n.id == allocation.node_id)
+            LOG.info('Node %(node)s has been successfully reserved for '
+                     'allocation %(uuid)s',
+                     {'node': node.uuid, 'uuid': allocation.uuid})
+            return node
 
-    return True
+    # NOTE(dtantsur): rewrite the passed list to only contain the nodes that
+    # are worth retrying, e.g. locked ones. Do not include nodes that are no
+    # longer suitable.
+    if nodes:
+        suitable = {node.uuid for node in objects.Node.list(
+            context, fields=['uuid'],
+            filters=dict(filters, uuid_in=[node.uuid for node in nodes]))}
+        nodes[:] = [node for node in nodes if node.uuid in suitable]
+
+    if nodes:
+        error = _('could not reserve any of %d suitable nodes') % len(nodes)
+    else:
+        error = _('all nodes were filtered out during reservation')
+
+    raise exception.AllocationFailed(uuid=allocation.uuid, error=error)
 
 
 # NOTE(dtantsur): instead of trying to allocate each node
@@ -206,50 +252,194 @@ def _verify_node(node, allocation):
     reraise=True)
 def _allocate_node(context, allocation, nodes):
     """Go through the list of nodes and try to allocate one of them."""
-    retry_nodes = []
-    for node in nodes:
-        try:
-            # NOTE(dtantsur): retries are done for all nodes above, so disable
-            # per-node retry. Also disable loading the driver, since the
-            # current conductor may not have the required hardware type or
-            # interfaces (it's picked at random).
-            with task_manager.acquire(context, node.uuid, shared=False,
-                                      retry=False, load_driver=False,
-                                      purpose='allocating') as task:
-                # NOTE(dtantsur): double-check the node details, since they
-                # could have changed before we acquired the lock.
-                if not _verify_node(task.node, allocation):
-                    continue
-
-                allocation.node_id = task.node.id
-                allocation.state = states.ACTIVE
-                # NOTE(dtantsur): the node.instance_uuid and allocation_id are
-                # updated inside of the save() call within the same
-                # transaction to avoid races. NodeAssociated can be raised if
-                # another process allocates this node first.
-                allocation.save()
-                LOG.info('Node %(node)s has been successfully reserved for '
-                         'allocation %(uuid)s',
-                         {'node': node.uuid, 'uuid': allocation.uuid})
-                return allocation
-        except exception.NodeLocked:
-            LOG.debug('Node %s is currently locked, moving to the next one',
-                      node.uuid)
-            retry_nodes.append(node)
-        except exception.NodeAssociated:
-            LOG.debug('Node %s is already associated, moving to the next one',
-                      node.uuid)
+    return _claim_node(context, allocation, nodes)
 
-    # NOTE(dtantsur): rewrite the passed list to only contain the nodes that
-    # are worth retrying. Do not include nodes that are no longer suitable.
-    nodes[:] = retry_nodes
 
-    if nodes:
-        error = _('could not reserve any of %d suitable nodes') % len(nodes)
+def _allocate_once(context, allocation, nodes=None, retry=False):
+    """Try to allocate a node once, recording the failure if any.
+
+    :param context: an admin context
+    :param allocation: an allocation object
+    :param nodes: the candidate nodes, listed if not provided.
+    :param retry: whether the allocation will be retried if some of the
+        candidate nodes are still worth trying.
+    :returns: the nodes to retry the allocation with, or None if it does not
+        need to be retried.
+    """
+    try:
+        if nodes is None:
+            nodes = _candidate_nodes(context, allocation)
+        _claim_node(context, allocation, nodes)
+    except exception.AllocationFailed as exc:
+        if retry and nodes:
+            LOG.debug('Will retry allocation %(uuid)s: %(err)s',
+                      {'uuid': allocation.uuid, 'err': exc})
+            return nodes
+        _processing_failed(allocation, exc)
+    except Exception as exc:
+        _processing_failed(allocation, exc)
+
+
+def _batch_key(allocation):
+    return (allocation.resource_class, allocation.owner,
+            tuple(sorted(allocation.traits or ())),
+            tuple(sorted(allocation.candidate_nodes or ())))
+
+
+def _allocate_batch(batch, retry=False):
+    """Process allocations with the same requirements together.
+
+    The candidate nodes are listed once for the whole batch, and the
+    allocations are tried one after another on the shared list, so that
+    they do not compete for the same nodes. Allocations which could not be
+    processed on the shared list are tried again on their own candidates.
+
+    :param batch: a list of tuples (context, allocation).
+    :param retry: whether the allocations will be retried if some of their
+        candidate nodes are still worth trying.
+    :returns: a list of tuples (context, allocation, nodes) to retry.
+    """
+    if len(batch) == 1:
+        separate = batch
     else:
-        error = _('all nodes were filtered out during reservation')
+        context, allocation = batch[0]
+        try:
+            nodes = _candidate_nodes(context, allocation, count=len(batch))
+        except exception.AllocationFailed:
+            # Let each allocation record its own error.
+            nodes = []
+
+        separate = []
+        for context, allocation in batch:
+            candidates = list(nodes)
+            _name_match_first(candidates, allocation)
+            try:
+                node = _claim_node(context, allocation, candidates)
+            except Exception:
+                separate.append((context, allocation))
+            else:
+                nodes.remove(node)
+
+    retries = []
+    for context, allocation in separate:
+        nodes = _allocate_once(context, allocation, retry=retry)
+        if nodes is not None:
+            retries.append((context, allocation, nodes))
+    return retries
+
+
+class AllocationBatcher(object):
+    """Processes the allocations created on this conductor in batches.
+
+    Allocations arriving while previous ones are being processed are queued
+    and then processed together by a single worker, grouped by their
+    requirements, instead of each of them competing for the same nodes in
+    a separate worker.
+
+    Allocations that could not reserve a node, e.g. because the suitable
+    nodes were locked, are queued again to be retried after
+    ``[conductor]node_locked_retry_interval`` seconds, so that waiting for
+    them does not delay the other allocations.
+    """
 
-    raise exception.AllocationFailed(uuid=allocation.uuid, error=error)
+    _cond = threading.Condition()
+
+    def __init__(self):
+        self._pending = []
+        # Tuples (retry time, attempt, context, allocation, nodes).
+        self._retries = []
+        self._processing = False
+
+    def submit(self, context, allocation, spawn):
+        """Queue an allocation for processing.
+
+        :param context: an admin context
+        :param allocation: an allocation object
+        :param spawn: a function to spawn a worker thread with, if there is
+            no worker already processing allocations.
+        :raises: the exception raised by spawn, the allocation is not
+            queued in this case.
+        """
+        with self._cond:
+            self._pending.append((context, allocation))
+            if self._processing:
+                self._cond.notify()
+                return
+            self._processing = True
+
+        try:
+            spawn(self._process)
+        except Exception:
+            with self._cond:
+                self._processing = False
+                self._pending.remove((context, allocation))
+            raise
+
+    def _next(self):
+        """Wait for the allocations to process next.
+
+        :returns: a tuple (new allocations, allocations to retry), both
+            empty when there is nothing left to process.
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = [item for item in self._retries if item[0] <= now]
+                self._retries = [item for item in self._retries
+                                 if item[0] > now]
+                pending, self._pending = self._pending, []
+                if pending or ready:
+                    return pending, ready
+                if not self._retries:
+                    self._processing = False
+                    return [], []
+                self._cond.wait(min(item[0] for item in self._retries)
+                                - now)
+
+    def _requeue(self, retries, attempt):
+        retry_at = (time.monotonic()
+                    + CONF.conductor.node_locked_retry_interval)
+        with self._cond:
+            self._retries.extend((retry_at, attempt, context, allocation,
+                                  nodes)
+                                 for context, allocation, nodes in retries)
+
+    def _process(self):
+        attempts = CONF.conductor.node_locked_retry_attempts
+        while True:
+            pending, ready = self._next()
+            if not pending and not ready:
+                return
+
+            # Like in _allocate_node, *any* node is tried
+            # node_locked_retry_attempts times.
+            for _retry_at, attempt, context, allocation, nodes in ready:
+                nodes = _allocate_once(context, allocation, nodes,
+                                       retry=attempt + 1 < attempts)
+                if nodes is not None:
+                    self._requeue([(context, allocation, nodes)],
+                                  attempt + 1)
+
+            groups = {}
+            for item in pending:
+                groups.setdefault(_batch_key(item[1]), []).append(item)
+            if groups:
+                LOG.debug('Processing %(count)d allocations in %(groups)d '
+                          'batches', {'count': len(pending),
+                                      'groups': len(groups)})
+            for batch in groups.values():
+                try:
+                    retries = _allocate_batch(batch, retry=attempts > 1)
+                except Exception as exc:
+                    LOG.exception('Unexpected exception when processing '
+                                  'allocations %s',
+                                  ', '.join(a.uuid for _c, a in batch))
+                    reason = (_("Unexpected exception during allocation: %s")
+                              % exc)
+                    for _context, allocation in batch:
+                        _allocation_failed(allocation, reason)
+                else:
+                    self._requeue(retries, 1)
 
 
 def backfill_allocation(context, allocation, node_id):
@@ -38,11 +38,13 @@ from ironic.common import utils as common_utils
 from ironic.conductor import allocations
 from ironic.conductor import notification_utils as notify_utils
 from ironic.conductor import periodics as conductor_periodics
+from ironic.conductor import power_waiter
 from ironic.conductor import task_manager
 from ironic.conductor import utils
 from ironic.conf import CONF
 from ironic.db import api as dbapi
 from ironic.drivers.modules import deploy_utils
+from ironic.drivers.modules.redfish import events as redfish_events
 from ironic import objects
 from ironic.objects import fields as obj_fields
 from ironic import version
@@ -62,6 +64,7 @@ class BaseConductorManager(object):
         self._started = False
         self._shutdown = threading.Event()
         self._zeroconf = None
+        self._event_listener = None
         self.dbapi = None
 
     def __getstate__(self):
@@ -254,6 +257,10 @@ class BaseConductorManager(object):
 
         self._collect_periodic_tasks(admin_context)
 
+        # Fail on an invalid configuration of the event listener before
+        # registering, binding its port can only fail when it starts.
+        event_listener = self._create_event_listener()
+
         try:
             # Register this conductor with the cluster
             self.conductor = objects.Conductor.register(
@@ -281,6 +288,10 @@ class BaseConductorManager(object):
             self.del_host()
             raise
 
+        # Receive the events of the subscribed BMCs
+        if event_listener is not None:
+            self._start_event_listener(event_listener)
+
         # Start periodic tasks
         self._periodic_tasks_worker = self._executor.submit(
             self._periodic_tasks.start, allow_empty=True)
@@ -309,6 +320,10 @@ class BaseConductorManager(object):
             self.del_host()
             raise
 
+        # Batches of provision jobs do not survive a restart.
+        self._reject_unfinished_provision_job_batches(
+            ironic_context.get_admin_context())
+
         # Resume allocations that started before the restart.
         try:
             if start_allocations:
@@ -454,6 +469,10 @@ class BaseConductorManager(object):
         # having work complete normally.
         self._periodic_tasks.stop()
         self._periodic_tasks.wait()
+        # Power actions with a deferred wait hold their node locks until the
+        # waiter finishes them, which needs the executors.
+        power_waiter.stop_power_waiter(
+            CONF.conductor.power_state_change_timeout)
         # Shutdown the reserved and normal executors.
         if self._reserved_executor is not None:
             self._reserved_executor.shutdown(wait=True)
@@ -463,6 +482,10 @@ class BaseConductorManager(object):
             self._zeroconf.close()
             self._zeroconf = None
 
+        if getattr(self, '_event_listener', None) is not None:
+            self._event_listener.stop()
+            self._event_listener = None
+
         self._started = False
 
     def get_online_conductor_count(self):
@@ -754,6 +777,20 @@ class BaseConductorManager(object):
             LOG.debug('Resuming unfinished allocation %s', allocation.uuid)
             allocations.do_allocate(context, allocation)
 
+    def _reject_unfinished_provision_job_batches(self, context):
+        """Finish provision job batches interrupted by a restart."""
+        for batch in objects.ProvisionJobBatch.list_unfinished(
+                context, [self.host]):
+            LOG.warning('Rejecting the unprocessed nodes of batch %(batch)s '
+                        'of provision job %(job)s interrupted by a restart',
+                        {'batch': batch.uuid, 'job': batch.job_uuid})
+            try:
+                batch.reject_unprocessed(
+                    _('Conductor %s was restarted before recording the '
+                      'outcome for the node') % self.host)
+            except exception.ProvisionJobNotFound:
+                continue
+
     def _publish_endpoint(self):
         params = {}
         if CONF.debug:
@@ -763,6 +800,20 @@ class BaseConductorManager(object):
                                         deploy_utils.get_ironic_api_url(),
                                         params=params)
 
+    def _create_event_listener(self):
+        if CONF.redfish_events.enabled:
+            return redfish_events.EventListener()
+
+    def _start_event_listener(self, listener=None):
+        listener = listener or redfish_events.EventListener()
+        try:
+            listener.start()
+        except Exception as e:
+            LOG.error('Failed to start the Redfish event listener. %s', e)
+            self.del_host()
+            raise
+        self._event_listener = listener
+
 
 def reject_when_reached(pool_size):
     """Return a function to reject new work for Ironic.
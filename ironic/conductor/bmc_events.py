@@ -0,0 +1,238 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Conductor-local dispatching of events received from BMCs.
+
+Drivers subscribe to the events of the BMCs of the nodes and report the
+received events here. Events wake up the tasks waiting for a change of a
+node, and let the periodic tasks skip polling the BMCs of subscribed nodes
+until an event is received or ``[redfish_events]safety_poll_interval``
+passes.
+
+For nodes without a subscription, waiting for an event is a plain sleep and
+the periodic tasks always poll the BMCs, so that callers do not need to
+distinguish them.
+"""
+
+import collections
+import hmac
+import secrets
+import threading
+import time
+
+from ironic.conf import CONF
+
+POWER = 'power'
+"""The power state of a node has changed."""
+
+TASK = 'task'
+"""The state of an asynchronous task on the BMC has changed."""
+
+RESOURCE = 'resource'
+"""Any other resource of the BMC, e.g. the boot mode, has changed."""
+
+ALL = frozenset([POWER, TASK, RESOURCE])
+
+
+class EventHub(object):
+    """Tracks event subscriptions and wakes up the waiting consumers."""
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # node UUID -> the secret token of the subscription
+        self._tokens = {}
+        # (node UUID, kind) -> monotonic time of the last event
+        self._events = {}
+        # (node UUID, kind, consumer) -> monotonic time of the last poll
+        self._polls = {}
+        # node UUID -> list of (kinds, threading.Event)
+        self._watchers = collections.defaultdict(list)
+
+    def subscribe(self, node_uuid):
+        """Start accepting the events of a node.
+
+        :param node_uuid: the UUID of a node.
+        :returns: a new secret token which must be sent with the events.
+        """
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._tokens[node_uuid] = token
+        return token
+
+    def unsubscribe(self, node_uuid):
+        """Stop accepting the events of a node."""
+        with self._lock:
+            self._tokens.pop(node_uuid, None)
+            for key in [key for key in self._polls if key[0] == node_uuid]:
+                del self._polls[key]
+            for kind in ALL:
+                self._events.pop((node_uuid, kind), None)
+
+    def is_subscribed(self, node_uuid):
+        """Check if the events of a node are accepted."""
+        with self._lock:
+            return node_uuid in self._tokens
+
+    def check_token(self, node_uuid, token):
+        """Check the token sent with an event of a node."""
+        with self._lock:
+            expected = self._tokens.get(node_uuid)
+        return (expected is not None and isinstance(token, str)
+                and hmac.compare_digest(expected, token))
+
+    def notify(self, node_uuid, kinds):
+        """Report events of a node.
+
+        :param node_uuid: the UUID of a node.
+        :param kinds: an iterable of kinds of the events.
+        """
+        kinds = frozenset(kinds)
+        now = time.monotonic()
+        with self._lock:
+            for kind in kinds:
+                self._events[(node_uuid, kind)] = now
+            watchers = list(self._watchers.get(node_uuid, ()))
+        for watched, event in watchers:
+            if watched & kinds:
+                event.set()
+
+    def wait(self, node_uuid, kinds, timeout, since=None):
+        """Sleep until an event of a node is received or a timeout passes.
+
+        If the node is not subscribed, simply sleeps for the timeout.
+
+        :param node_uuid: the UUID of a node.
+        :param kinds: an iterable of kinds of the events to wait for.
+        :param timeout: the maximum number of seconds to sleep.
+        :param since: the monotonic time of the previous check of the node.
+            If an event was received after it, returns immediately.
+        :returns: True if an event was received, otherwise False.
+        """
+        entry = (frozenset(kinds), threading.Event())
+        with self._lock:
+            subscribed = node_uuid in self._tokens
+            if subscribed:
+                if since is not None and any(
+                        self._events.get((node_uuid, kind), since) > since
+                        for kind in entry[0]):
+                    return True
+                self._watchers[node_uuid].append(entry)
+        if not subscribed:
+            time.sleep(timeout)
+            return False
+
+        try:
+            return entry[1].wait(timeout)
+        finally:
+            with self._lock:
+                watchers = self._watchers[node_uuid]
+                watchers.remove(entry)
+                if not watchers:
+                    del self._watchers[node_uuid]
+
+    def should_poll(self, node_uuid, kind, consumer):
+        """Check if a periodic task should poll the BMC of a node.
+
+        The BMC of a node without a subscription is always polled. The BMC
+        of a subscribed node is polled if an event of the given kind was
+        received since the previous poll by the same consumer, or if
+        ``[redfish_events]safety_poll_interval`` has passed since then.
+
+        The poll is not recorded, the consumer must call
+        :meth:`record_poll` once it actually polls the BMC, e.g. after
+        locking the node.
+
+        :param node_uuid: the UUID of a node.
+        :param kind: the kind of the events of interest.
+        :param consumer: the name of the periodic task.
+        :returns: a boolean.
+        """
+        interval = CONF.redfish_events.safety_poll_interval
+        now = time.monotonic()
+        with self._lock:
+            if node_uuid not in self._tokens:
+                return True
+            last_poll = self._polls.get((node_uuid, kind, consumer))
+            last_event = self._events.get((node_uuid, kind))
+        return (last_poll is None
+                or (last_event is not None and last_event >= last_poll)
+                or now - last_poll >= interval)
+
+    def record_poll(self, node_uuid, kind, consumer):
+        """Record that a periodic task is polling the BMC of a node.
+
+        Events received from now on make :meth:`should_poll` return True
+        again for the same consumer.
+
+        :param node_uuid: the UUID of a node.
+        :param kind: the kind of the events of interest.
+        :param consumer: the name of the periodic task.
+        """
+        with self._lock:
+            if node_uuid in self._tokens:
+                self._polls[(node_uuid, kind, consumer)] = time.monotonic()
+
+    def reset(self):
+        """Forget all subscriptions and events."""
+        with self._lock:
+            self._tokens.clear()
+            self._events.clear()
+            self._polls.clear()
+
+
+_HUB = EventHub()
+
+
+def subscribe(node_uuid):
+    """Start accepting the events of a node, see :meth:`EventHub.subscribe`."""
+    return _HUB.subscribe(node_uuid)
+
+
+def unsubscribe(node_uuid):
+    """Stop accepting the events of a node."""
+    _HUB.unsubscribe(node_uuid)
+
+
+def is_subscribed(node_uuid):
+    """Check if the events of a node are accepted."""
+    return _HUB.is_subscribed(node_uuid)
+
+
+def check_token(node_uuid, token):
+    """Check the token sent with an event of a node."""
+    return _HUB.check_token(node_uuid, token)
+
+
+def notify(node_uuid, kinds):
+    """Report events of a node, see :meth:`EventHub.notify`."""
+    _HUB.notify(node_uuid, kinds)
+
+
+def wait(node_uuid, kinds, timeout, since=None):
+    """Sleep until an event of a node, see :meth:`EventHub.wait`."""
+    return _HUB.wait(node_uuid, kinds, timeout, since=since)
+
+
+def should_poll(node_uuid, kind, consumer):
+    """Check if a BMC should be polled, see :meth:`EventHub.should_poll`."""
+    return _HUB.should_poll(node_uuid, kind, consumer)
+
+
+def record_poll(node_uuid, kind, consumer):
+    """Record a poll of a BMC, see :meth:`EventHub.record_poll`."""
+    _HUB.record_poll(node_uuid, kind, consumer)
+
+
+def reset_event_hub():
+    """Forget all subscriptions and events."""
+    _HUB.reset()
@@ -0,0 +1,177 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Fast path for agent heartbeats which do not require any action."""
+
+import threading
+import time
+
+from oslo_log import log
+from oslo_utils import timeutils
+
+from ironic.common import async_steps
+from ironic.common import states
+from ironic.conductor import utils
+from ironic.conf import CONF
+from ironic import objects
+
+LOG = log.getLogger(__name__)
+
+# States in which a heartbeat is only recorded to identify the node as
+# on-line, mirroring the behavior of the agent heartbeat handler.
+_RECORD_ONLY_STATES = frozenset([
+    states.DEPLOYING, states.CLEANING, states.RESCUING, states.SERVICING,
+    states.DEPLOYHOLD, states.CLEANHOLD, states.SERVICEHOLD,
+])
+
+# Wait states in which an in-band step may be running: state -> (polling
+# flag, node field with the current step).
+_STEP_WAIT_STATES = {
+    states.DEPLOYWAIT: (async_steps.DEPLOYMENT_POLLING, 'deploy_step'),
+    states.CLEANWAIT: (async_steps.CLEANING_POLLING, 'clean_step'),
+    states.SERVICEWAIT: (async_steps.SERVICING_POLLING, 'service_step'),
+}
+
+
+class HeartbeatCoalescer(object):
+    """Records heartbeats which do not require any action.
+
+    Processing a heartbeat normally involves acquiring a task for the node,
+    which loads its ports, port groups and driver and reserves the node,
+    often just to update its ``agent_last_heartbeat`` while a long step is
+    running. When the agent URL and version are unchanged and the node's
+    state does not require any action, e.g. the current step is polled by
+    the driver, the heartbeat is recorded with a single database
+    transaction instead.
+
+    Additionally, when ``[conductor]heartbeat_coalesce_window`` is set,
+    heartbeats for a node with an in-band step running are only fully
+    processed once per window, the others are only recorded.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # node UUID -> monotonic time of the last fully processed heartbeat
+        self._processed = {}
+        self._pruned_at = time.monotonic()
+
+    def _recently_processed(self, node_uuid, window):
+        with self._lock:
+            processed_at = self._processed.get(node_uuid)
+        return (processed_at is not None
+                and time.monotonic() - processed_at < window)
+
+    def _needs_processing(self, node):
+        """Check if a heartbeat requires a full task to be processed.
+
+        :returns: None if a full task is required, otherwise a boolean
+            indicating whether the provisioning must be marked as alive.
+        """
+        if node.provision_state in _RECORD_ONLY_STATES:
+            return False
+
+        try:
+            polling_flag, step_field = _STEP_WAIT_STATES[
+                node.provision_state]
+        except KeyError:
+            return None
+
+        if node.driver_internal_info.get(polling_flag):
+            return True
+
+        # Without a step in progress the heartbeat starts the steps.
+        window = CONF.conductor.heartbeat_coalesce_window
+        if (window and getattr(node, step_field)
+                and (node.provision_state != states.DEPLOYWAIT
+                     or node.driver_internal_info.get(
+                         'agent_cached_deploy_steps'))
+                and self._recently_processed(node.uuid, window)):
+            return True
+
+        return None
+
+    def record(self, context, node_id, callback_url, agent_version,
+               agent_token=None, agent_verify_ca=None, agent_status=None,
+               agent_status_message=None):
+        """Try to record a heartbeat without acquiring a task.
+
+        Any validation failure is left to the regular heartbeat processing,
+        which raises the appropriate error.
+
+        :param context: request context.
+        :param node_id: node id or uuid.
+        :param callback_url: URL to reach back to the ramdisk.
+        :param agent_version: The version of the agent that is heartbeating.
+        :param agent_token: randomly generated validation token.
+        :param agent_verify_ca: TLS certificate for the agent.
+        :param agent_status: Status of the heartbeating agent.
+        :param agent_status_message: Message describing agent's status.
+        :raises: InvalidParameterValue if the agent certificate has changed.
+        :returns: True if the heartbeat has been recorded, False if it must
+            be processed with a task.
+        """
+        if not CONF.conductor.heartbeat_fast_path:
+            return False
+
+        # Status updates are always processed by the deploy interface.
+        if agent_status or agent_status_message:
+            return False
+
+        node = objects.Node.get(context, node_id)
+        info = node.driver_internal_info
+        if (node.maintenance or node.reservation
+                or not utils.is_agent_token_valid(node, agent_token)
+                or (CONF.agent.require_tls and callback_url
+                    and not callback_url.startswith('https://'))
+                or info.get('agent_url') != callback_url
+                or info.get('agent_version') != agent_version):
+            return self._processing(node)
+
+        if agent_verify_ca:
+            if not info.get('agent_verify_ca'):
+                return self._processing(node)
+            # Raises InvalidParameterValue if the certificate has changed.
+            utils.store_agent_certificate(node, agent_verify_ca)
+
+        touch_provisioning = self._needs_processing(node)
+        if touch_provisioning is None:
+            return self._processing(node)
+
+        recorded = node.record_heartbeat(
+            {'agent_last_heartbeat': timeutils.utcnow().isoformat()},
+            touch_provisioning=touch_provisioning)
+        if not recorded:
+            return self._processing(node)
+
+        LOG.debug('Heartbeat from node %(node)s in state %(state)s recorded '
+                  'without further processing',
+                  {'node': node.uuid, 'state': node.provision_state})
+        return True
+
+    def _processing(self, node):
+        """Account for a heartbeat processed with a task."""
+        window = CONF.conductor.heartbeat_coalesce_window
+        if not window:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            self._processed[node.uuid] = now
+            if now - self._pruned_at >= window:
+                self._processed = {
+                    uuid: processed_at
+                    for uuid, processed_at in self._processed.items()
+                    if now - processed_at < window
+                }
+                self._pruned_at = now
+        return False
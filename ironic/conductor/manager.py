@@ -62,14 +62,20 @@ from ironic.common import network
 from ironic.common import nova
 from ironic.common import rpc
 from ironic.common import states
+from ironic.common import template_catalogue
 from ironic.common import utils as common_utils
+from ironic.conductor import admission
 from ironic.conductor import allocations
 from ironic.conductor import base_manager
+from ironic.conductor import bmc_events
 from ironic.conductor import cleaning
 from ironic.conductor import deployments
+from ironic.conductor import heartbeats
 from ironic.conductor import inspection
 from ironic.conductor import notification_utils as notify_utils
 from ironic.conductor import periodics
+from ironic.conductor import power_waiter
+from ironic.conductor import sensor_publisher
 from ironic.conductor import servicing
 from ironic.conductor import steps as conductor_steps
 from ironic.conductor import task_manager
@@ -92,6 +98,18 @@ METRICS = metrics_utils.get_metrics_logger(__name__)
 SYNC_EXCLUDED_STATES = (states.DEPLOYWAIT, states.CLEANWAIT, states.ENROLL,
                         states.ADOPTFAIL)
 
+# Targets supported by bulk provisioning jobs mapped to the concurrent
+# action limit guarding them.
+BULK_PROVISION_LIMITS = {
+    states.ACTIVE: 'provisioning',
+    states.REBUILD: 'provisioning',
+    states.DELETED: 'unprovisioning',
+    states.UNDEPLOY: 'unprovisioning',
+    states.VERBS['clean']: 'cleaning',
+    states.VERBS['manage']: None,
+    states.VERBS['provide']: None,
+}
+
 
 class ConductorManager(base_manager.BaseConductorManager):
     """Ironic Conductor manager main class."""
@@ -99,7 +117,7 @@ class ConductorManager(base_manager.BaseConductorManager):
     # NOTE(rloo): This must be in sync with rpcapi.ConductorAPI's.
     # NOTE(pas-ha): This also must be in sync with
     #               ironic.common.release_mappings.RELEASE_MAPPING['master']
-    RPC_API_VERSION = '1.62'
+    RPC_API_VERSION = '1.63'
 
     target = messaging.Target(version=RPC_API_VERSION)
 
@@ -108,6 +126,9 @@ class ConductorManager(base_manager.BaseConductorManager):
         # NOTE(TheJulia): This is less a metric-able count, but a means to
         # sort out nodes and prioritise a subset (of non-responding nodes).
         self.power_state_sync_count = collections.defaultdict(int)
+        self._action_counters = admission.ConcurrentActionCounters()
+        self._heartbeats = heartbeats.HeartbeatCoalescer()
+        self._allocations = allocations.AllocationBatcher()
 
     @METRICS.timer('ConductorManager._clean_up_caches')
     @periodics.periodic(spacing=CONF.conductor.cache_clean_up_interval,
@@ -365,7 +386,14 @@ class ConductorManager(base_manager.BaseConductorManager):
             task.node.save()
             task.set_spawn_error_hook(utils.power_state_error_handler,
                                       task.node, task.node.power_state)
-            task.spawn_after(self._spawn_worker, utils.node_power_action,
+            # Power on and off only wait once for the power state, which
+            # can be done without keeping the worker busy.
+            if (CONF.conductor.background_power_state_wait
+                    and new_state in (states.POWER_ON, states.POWER_OFF)):
+                spawn_method = power_waiter.spawn(self._spawn_worker)
+            else:
+                spawn_method = self._spawn_worker
+            task.spawn_after(spawn_method, utils.node_power_action,
                              task, new_state, timeout=power_timeout)
 
     @METRICS.timer('ConductorManager.change_node_boot_mode')
@@ -931,6 +959,17 @@ class ConductorManager(base_manager.BaseConductorManager):
         """
         LOG.debug("RPC do_node_deploy called for node %s.", node_id)
         self._concurrent_action_limit(action='provisioning')
+        self._start_node_deploy(context, node_id, rebuild=rebuild,
+                                configdrive=configdrive,
+                                deploy_steps=deploy_steps)
+
+    def _start_node_deploy(self, context, node_id, rebuild=False,
+                           configdrive=None, deploy_steps=None):
+        """Validate a node and start deploying it in the background.
+
+        This is do_node_deploy without the concurrent action limit check,
+        see do_node_deploy for the parameters and exceptions.
+        """
         event = 'rebuild' if rebuild else 'deploy'
 
         # NOTE(comstud): If the _sync_power_states() periodic task happens
@@ -948,6 +987,7 @@ class ConductorManager(base_manager.BaseConductorManager):
                     deploy_steps, 'deploy', raise_on_disallowed=True)
             deployments.start_deploy(task, self, configdrive, event=event,
                                      deploy_steps=deploy_steps)
+        self._action_counters.record_start('provisioning')
 
     @METRICS.timer('ConductorManager.continue_node_deploy')
     def continue_node_deploy(self, context, node_id):
@@ -1069,7 +1109,14 @@ class ConductorManager(base_manager.BaseConductorManager):
         """
         LOG.debug("RPC do_node_tear_down called for node %s.", node_id)
         self._concurrent_action_limit(action='unprovisioning')
+        self._start_node_tear_down(context, node_id)
+
+    def _start_node_tear_down(self, context, node_id):
+        """Validate a node and start tearing it down in the background.
 
+        This is do_node_tear_down without the concurrent action limit check,
+        see do_node_tear_down for the parameters and exceptions.
+        """
         with task_manager.acquire(context, node_id, shared=False,
                                   purpose='node tear down') as task:
             # Record of any pre-existing agent_url should be removed.
@@ -1098,6 +1145,7 @@ class ConductorManager(base_manager.BaseConductorManager):
                 raise exception.InvalidStateRequested(
                     action='delete', node=task.node.uuid,
                     state=task.node.provision_state)
+        self._action_counters.record_start('unprovisioning')
 
     @task_manager.require_exclusive_lock
     def _do_node_tear_down(self, task, initial_state):
@@ -1346,6 +1394,16 @@ class ConductorManager(base_manager.BaseConductorManager):
                  configured limits of the deployment.
         """
         self._concurrent_action_limit(action='cleaning')
+        self._start_node_clean(context, node_id, clean_steps,
+                               disable_ramdisk=disable_ramdisk)
+
+    def _start_node_clean(self, context, node_id, clean_steps,
+                          disable_ramdisk=False):
+        """Validate a node and start manual cleaning in the background.
+
+        This is do_node_clean without the concurrent action limit check,
+        see do_node_clean for the parameters and exceptions.
+        """
         with task_manager.acquire(context, node_id, shared=False,
                                   purpose='node manual cleaning') as task:
             node = task.node
@@ -1385,6 +1443,7 @@ class ConductorManager(base_manager.BaseConductorManager):
                 raise exception.InvalidStateRequested(
                     action='manual clean', node=node.uuid,
                     state=node.provision_state)
+        self._action_counters.record_start('cleaning')
 
     @METRICS.timer('ConductorManager.continue_node_clean')
     def continue_node_clean(self, context, node_id):
@@ -1446,6 +1505,14 @@ class ConductorManager(base_manager.BaseConductorManager):
         :raises: NoFreeConductorWorker
         :raises: NodeInMaintenance
         """
+        self._start_provisioning_action(context, node_id, action)
+
+    def _start_provisioning_action(self, context, node_id, action):
+        """Initiate a provisioning state transition.
+
+        This is the body of do_provisioning_action, split out so that it can
+        be reused without the RPC exception wrapping.
+        """
         with task_manager.acquire(context, node_id, shared=False,
                                   purpose='provision action %s'
                                   % action) as task:
@@ -1769,61 +1836,95 @@ class ConductorManager(base_manager.BaseConductorManager):
         # (through to its DB API call) so that we can eliminate our call
         # and first set of checks below.
 
+        prefetcher = task_manager.ResourcePrefetcher(
+            context, page_size=self._prefetch_page_size(
+                nodes, min(CONF.conductor.sync_power_state_workers,
+                           CONF.conductor.periodic_max_workers)))
+        with prefetcher:
+            for node_uuid, *_ in prefetcher.iterate(self._iter_queue(nodes)):
+                if self._shutdown.is_set():
+                    break
+                try:
+                    self._sync_power_state_node(context, node_uuid)
+                finally:
+                    # Yield on every iteration
+                    time.sleep(0)
+
+    def _sync_power_state_node(self, context, node_uuid):
+        """Invokes power state sync on a node."""
+        # Nodes subscribed to the events of their BMC are only polled after
+        # a change of the power state is reported or as a safety net.
+        if not bmc_events.should_poll(node_uuid, bmc_events.POWER,
+                                      'power state sync'):
+            return
+        try:
+            # NOTE(dtantsur): start with a shared lock, upgrade if needed
+            with task_manager.acquire(context, node_uuid,
+                                      purpose='power state sync',
+                                      shared=True) as task:
+                # A node skipped because it is locked is checked again on
+                # the next run.
+                bmc_events.record_poll(node_uuid, bmc_events.POWER,
+                                       'power state sync')
+                # NOTE(tenbrae): we should not acquire a lock on a node in
+                #             DEPLOYWAIT/CLEANWAIT, as this could cause
+                #             an error within a deploy ramdisk POSTing back
+                #             at the same time.
+                # NOTE(dtantsur): it's also pointless (and dangerous) to
+                # sync power state when a power action is in progress
+                # NOTE(iurygregory): skip sync power state during firmware
+                # update, as BMC may be temporarily unresponsive and power
+                # cycling can interrupt the update process.
+                has_fw_update = (
+                    task.node.driver_internal_info.get(
+                        'redfish_fw_updates') is not None
+                )
+                if (task.node.provision_state in SYNC_EXCLUDED_STATES
+                        or task.node.maintenance
+                        or task.node.target_power_state
+                        or task.node.reservation
+                        or has_fw_update):
+                    return
+                count = do_sync_power_state(
+                    task, self.power_state_sync_count[node_uuid])
+                if count:
+                    self.power_state_sync_count[node_uuid] = count
+                else:
+                    # don't bloat the dict with non-failing nodes
+                    del self.power_state_sync_count[node_uuid]
+        except exception.NodeNotFound:
+            LOG.info("During sync_power_state, node %(node)s was not "
+                     "found and presumed deleted by another process.",
+                     {'node': node_uuid})
+            # TODO(TheJulia): The chance exists that we orphan a node
+            # in power_state_sync_count, albeit it is not much data,
+            # it could eventually cause the memory footprint to grow
+            # on an exceptionally large ironic deployment. We should
+            # make sure we clean it up at some point, but overall given
+            # minimal impact, it is definite low hanging fruit.
+        except exception.NodeLocked:
+            LOG.info("During sync_power_state, node %(node)s was "
+                     "already locked by another process. Skip.",
+                     {'node': node_uuid})
+
+    def _iter_queue(self, nodes):
+        """Take nodes from a queue until it is empty or on shutdown."""
         while not self._shutdown.is_set():
             try:
-                (node_uuid, driver, conductor_group,
-                 node_id) = nodes.get_nowait()
+                yield nodes.get_nowait()
             except queue.Empty:
-                break
+                return
 
-            try:
-                # NOTE(dtantsur): start with a shared lock, upgrade if needed
-                with task_manager.acquire(context, node_uuid,
-                                          purpose='power state sync',
-                                          shared=True) as task:
-                    # NOTE(tenbrae): we should not acquire a lock on a node in
-                    #             DEPLOYWAIT/CLEANWAIT, as this could cause
-                    #             an error within a deploy ramdisk POSTing back
-                    #             at the same time.
-                    # NOTE(dtantsur): it's also pointless (and dangerous) to
-                    # sync power state when a power action is in progress
-                    # NOTE(iurygregory): skip sync power state during firmware
-                    # update, as BMC may be temporarily unresponsive and power
-                    # cycling can interrupt the update process.
-                    has_fw_update = (
-                        task.node.driver_internal_info.get(
-                            'redfish_fw_updates') is not None
-                    )
-                    if (task.node.provision_state in SYNC_EXCLUDED_STATES
-                            or task.node.maintenance
-                            or task.node.target_power_state
-                            or task.node.reservation
-                            or has_fw_update):
-                        continue
-                    count = do_sync_power_state(
-                        task, self.power_state_sync_count[node_uuid])
-                    if count:
-                        self.power_state_sync_count[node_uuid] = count
-                    else:
-                        # don't bloat the dict with non-failing nodes
-                        del self.power_state_sync_count[node_uuid]
-            except exception.NodeNotFound:
-                LOG.info("During sync_power_state, node %(node)s was not "
-                         "found and presumed deleted by another process.",
-                         {'node': node_uuid})
-                # TODO(TheJulia): The chance exists that we orphan a node
-                # in power_state_sync_count, albeit it is not much data,
-                # it could eventually cause the memory footprint to grow
-                # on an exceptionally large ironic deployment. We should
-                # make sure we clean it up at some point, but overall given
-                # minimal impact, it is definite low hanging fruit.
-            except exception.NodeLocked:
-                LOG.info("During sync_power_state, node %(node)s was "
-                         "already locked by another process. Skip.",
-                         {'node': node_uuid})
-            finally:
-                # Yield on every iteration
-                time.sleep(0)
+    @staticmethod
+    def _prefetch_page_size(nodes, workers):
+        """Get the page size for prefetching resources of queued nodes.
+
+        Pages are kept small enough for all workers to get a share of the
+        nodes. Prefetching for a single node is pointless.
+        """
+        page_size = min(CONF.conductor.periodic_prefetch_page_size,
+                        nodes.qsize() // max(1, workers))
+        return page_size if page_size > 1 else 0
 
     @METRICS.timer('ConductorManager._power_failure_recovery')
     @periodics.node_periodic(
@@ -2958,82 +3059,97 @@ class ConductorManager(base_manager.BaseConductorManager):
         return driver.get_properties()
 
     @METRICS.timer('ConductorManager._sensors_nodes_task')
-    def _sensors_nodes_task(self, context, nodes):
+    def _sensors_nodes_task(self, context, nodes, publisher=None):
         """Sends sensors data for nodes from synchronized queue."""
-        while not self._shutdown.is_set():
-            try:
-                (node_uuid, driver, conductor_group,
-                 instance_uuid) = nodes.get_nowait()
-            except queue.Empty:
-                break
-            # populate the message which will be sent to ceilometer
-            message = {'message_id': uuidutils.generate_uuid(),
-                       'instance_uuid': instance_uuid,
-                       'node_uuid': node_uuid,
-                       'timestamp': timeutils.utcnow()}
+        if publisher is None:
+            publisher = sensor_publisher.SensorPublisher(
+                self.sensors_notifier, context)
+        prefetcher = task_manager.ResourcePrefetcher(
+            context, page_size=self._prefetch_page_size(
+                nodes, CONF.sensor_data.workers))
+        try:
+            with prefetcher:
+                for (node_uuid, driver, _conductor_group,
+                     instance_uuid) in prefetcher.iterate(
+                         self._iter_queue(nodes)):
+                    if self._shutdown.is_set():
+                        break
+                    try:
+                        self._send_node_sensors_data(context, node_uuid,
+                                                     driver, instance_uuid,
+                                                     publisher)
+                    finally:
+                        # Yield on every iteration
+                        time.sleep(0)
+        finally:
+            publisher.flush()
 
-            try:
-                lock_purpose = 'getting sensors data'
-                with task_manager.acquire(context,
-                                          node_uuid,
-                                          shared=True,
-                                          purpose=lock_purpose) as task:
-                    if task.node.maintenance:
-                        LOG.debug('Skipping sending sensors data for node '
-                                  '%s as it is in maintenance mode',
-                                  task.node.uuid)
-                        continue
-                    # Add the node name, as the name would be hand for other
-                    # notifier plugins
-                    message['node_name'] = task.node.name
-                    # We should convey the proper hardware type,
-                    # which previously was hard coded to ipmi, but other
-                    # drivers were transmitting other values under the
-                    # guise of ipmi.
-                    ev_type = 'hardware.{driver}.metrics'.format(
-                        driver=task.node.driver)
-                    message['event_type'] = ev_type + '.update'
-
-                    task.driver.management.validate(task)
-                    sensors_data = task.driver.management.get_sensors_data(
-                        task)
-            except NotImplementedError:
-                # NOTE(JayF): In mixed deployments with some nodes supporting
-                # sensor data and others not, logging this at warning level
-                # creates unreasonable levels of logging noise.
-                # See https://bugs.launchpad.net/ironic/+bug/2047709
-                LOG.debug(
-                    'get_sensors_data is not implemented for driver'
-                    ' %(driver)s, node_uuid is %(node)s',
-                    {'node': node_uuid, 'driver': driver})
-            except exception.FailedToParseSensorData as fps:
-                LOG.warning(
-                    "During get_sensors_data, could not parse "
-                    "sensor data for node %(node)s. Error: %(err)s.",
-                    {'node': node_uuid, 'err': str(fps)})
-            except exception.FailedToGetSensorData as fgs:
-                LOG.warning(
-                    "During get_sensors_data, could not get "
-                    "sensor data for node %(node)s. Error: %(err)s.",
-                    {'node': node_uuid, 'err': str(fgs)})
-            except exception.NodeNotFound:
-                LOG.warning(
-                    "During send_sensor_data, node %(node)s was not "
-                    "found and presumed deleted by another process.",
-                    {'node': node_uuid})
-            except Exception as e:
-                LOG.warning(
-                    "Failed to get sensor data for node %(node)s. "
-                    "Error: %(error)s", {'node': node_uuid, 'error': e})
-            else:
-                message['payload'] = (
-                    self._filter_out_unsupported_types(sensors_data))
-                if message['payload']:
-                    self.sensors_notifier.info(
-                        context, ev_type, message)
-            finally:
-                # Yield on every iteration
-                time.sleep(0)
+    def _send_node_sensors_data(self, context, node_uuid, driver,
+                                instance_uuid, publisher):
+        """Sends sensors data for a node."""
+        # populate the message which will be sent to ceilometer
+        message = {'message_id': uuidutils.generate_uuid(),
+                   'instance_uuid': instance_uuid,
+                   'node_uuid': node_uuid,
+                   'timestamp': timeutils.utcnow()}
+
+        try:
+            lock_purpose = 'getting sensors data'
+            with task_manager.acquire(context,
+                                      node_uuid,
+                                      shared=True,
+                                      purpose=lock_purpose) as task:
+                if task.node.maintenance:
+                    LOG.debug('Skipping sending sensors data for node '
+                              '%s as it is in maintenance mode',
+                              task.node.uuid)
+                    return
+                # Add the node name, as the name would be hand for other
+                # notifier plugins
+                message['node_name'] = task.node.name
+                # We should convey the proper hardware type,
+                # which previously was hard coded to ipmi, but other
+                # drivers were transmitting other values under the
+                # guise of ipmi.
+                ev_type = 'hardware.{driver}.metrics'.format(
+                    driver=task.node.driver)
+                message['event_type'] = ev_type + '.update'
+
+                task.driver.management.validate(task)
+                sensors_data = task.driver.management.get_sensors_data(
+                    task)
+        except NotImplementedError:
+            # NOTE(JayF): In mixed deployments with some nodes supporting
+            # sensor data and others not, logging this at warning level
+            # creates unreasonable levels of logging noise.
+            # See https://bugs.launchpad.net/ironic/+bug/2047709
+            LOG.debug(
+                'get_sensors_data is not implemented for driver'
+                ' %(driver)s, node_uuid is %(node)s',
+                {'node': node_uuid, 'driver': driver})
+        except exception.FailedToParseSensorData as fps:
+            LOG.warning(
+                "During get_sensors_data, could not parse "
+                "sensor data for node %(node)s. Error: %(err)s.",
+                {'node': node_uuid, 'err': str(fps)})
+        except exception.FailedToGetSensorData as fgs:
+            LOG.warning(
+                "During get_sensors_data, could not get "
+                "sensor data for node %(node)s. Error: %(err)s.",
+                {'node': node_uuid, 'err': str(fgs)})
+        except exception.NodeNotFound:
+            LOG.warning(
+                "During send_sensor_data, node %(node)s was not "
+                "found and presumed deleted by another process.",
+                {'node': node_uuid})
+        except Exception as e:
+            LOG.warning(
+                "Failed to get sensor data for node %(node)s. "
+                "Error: %(error)s", {'node': node_uuid, 'error': e})
+        else:
+            message['payload'] = (
+                self._filter_out_unsupported_types(sensors_data))
+            publisher.publish(ev_type, message)
 
     def _sensors_conductor(self, context):
         """Called to collect and send metrics "sensors" for the conductor."""
@@ -3093,12 +3209,14 @@ class ConductorManager(base_manager.BaseConductorManager):
 
         number_of_threads = min(CONF.sensor_data.workers,
                                 nodes.qsize())
+        publisher = sensor_publisher.SensorPublisher(self.sensors_notifier,
+                                                     context)
         futures = []
         for thread_number in range(number_of_threads):
             try:
                 futures.append(
                     self._spawn_worker(self._sensors_nodes_task,
-                                       context, nodes))
+                                       context, nodes, publisher))
             except exception.NoFreeConductorWorker:
                 LOG.warning("There is no more conductor workers for "
                             "task of sending sensors data. %(workers)d "
@@ -3111,6 +3229,11 @@ class ConductorManager(base_manager.BaseConductorManager):
         if not_done:
             LOG.warning("%d workers for send sensors data did not complete",
                         len(not_done))
+        # Nodes which are no longer evaluated get a full snapshot when they
+        # come back
+        sensor_publisher.expire_deltas(
+            max(3 * CONF.sensor_data.interval,
+                CONF.sensor_data.full_snapshot_interval))
         runtime = time.time() - started
         LOG.debug('Completed sending sensor data, evaluated %d '
                   'nodes with %d workers in %.2f seconds',
@@ -3561,6 +3684,13 @@ class ConductorManager(base_manager.BaseConductorManager):
                 _('Agent did not transmit a version, and a version is '
                   'required. Please update the agent being used.'))
 
+        if self._heartbeats.record(context, node_id, callback_url,
+                                   agent_version, agent_token=agent_token,
+                                   agent_verify_ca=agent_verify_ca,
+                                   agent_status=agent_status,
+                                   agent_status_message=agent_status_message):
+            return
+
         # NOTE(dtantsur): we acquire a shared lock to begin with, drivers are
         # free to promote it to an exclusive one.
         with task_manager.acquire(context, node_id, shared=True,
@@ -3920,10 +4050,11 @@ class ConductorManager(base_manager.BaseConductorManager):
             # This is a fast operation and should be done synchronously
             allocations.backfill_allocation(context, allocation, node_id)
         else:
-            # Spawn an asynchronous worker to process the allocation. Copy it
-            # to avoid data races.
-            self._spawn_worker(allocations.do_allocate,
-                               context, allocation.obj_clone())
+            # Queue the allocation to be processed by an asynchronous worker,
+            # together with other allocations arriving at the same time. Copy
+            # it to avoid data races.
+            self._allocations.submit(context, allocation.obj_clone(),
+                                     self._spawn_worker)
 
         # Return the current status of the allocation
         return allocation
@@ -3982,6 +4113,38 @@ class ConductorManager(base_manager.BaseConductorManager):
                     LOG.exception('Unexpected exception when taking over '
                                   'allocation %s', allocation.uuid)
 
+    @METRICS.timer('ConductorManager._check_orphan_provision_job_batches')
+    @periodics.periodic(
+        spacing=CONF.conductor.check_provision_state_interval,
+        enabled=CONF.conductor.check_provision_state_interval > 0)
+    def _check_orphan_provision_job_batches(self, context):
+        """Periodically finishes provision job batches of offline conductors.
+
+        A batch which is pending or running on a conductor that went offline
+        will never be processed. Its nodes without an outcome are rejected,
+        so that the job can finish.
+
+        :param context: request context.
+        """
+        offline_conductors = utils.exclude_current_conductor(
+            self.host, self.dbapi.get_offline_conductors())
+        if not offline_conductors:
+            return
+
+        for batch in objects.ProvisionJobBatch.list_unfinished(
+                context, offline_conductors):
+            LOG.warning('Rejecting the unprocessed nodes of batch %(batch)s '
+                        'of provision job %(job)s as conductor %(old)s went '
+                        'offline', {'batch': batch.uuid,
+                                    'job': batch.job_uuid,
+                                    'old': batch.conductor})
+            try:
+                batch.reject_unprocessed(
+                    _('Conductor %s went offline before recording the '
+                      'outcome for the node') % batch.conductor)
+            except exception.ProvisionJobNotFound:
+                continue
+
     @METRICS.timer('ConductorManager.get_node_with_token')
     @messaging.expected_exceptions(exception.NodeLocked,
                                    exception.Invalid)
@@ -4086,6 +4249,29 @@ class ConductorManager(base_manager.BaseConductorManager):
             LOG.error(
                 'Encountered error while cleaning up stale conductors: %s', e)
 
+    @METRICS.timer('ConductorManager.cleanup_provision_jobs')
+    @periodics.periodic(
+        spacing=CONF.conductor.provision_job_cleanup_interval,
+        enabled=CONF.conductor.provision_job_cleanup_interval > 0
+    )
+    def cleanup_provision_jobs(self, context):
+        """Periodically delete finished bulk provisioning jobs.
+
+        Jobs are deleted once all their batches finished more than
+        ``[conductor]provision_job_max_age`` seconds ago.
+        """
+        limit = (timeutils.utcnow() - datetime.timedelta(
+            seconds=CONF.conductor.provision_job_max_age))
+        try:
+            count = self.dbapi.destroy_finished_provision_jobs(
+                limit, CONF.conductor.provision_job_cleanup_batch_size)
+        except Exception as e:
+            LOG.error('Encountered error while cleaning up provision '
+                      'jobs: %s', e)
+            return
+        if count:
+            LOG.info('Deleted %d finished provision jobs', count)
+
     def _cleanup_stale_conductors(self, context):
         """Clean up stale conductors from the database.
 
@@ -4180,6 +4366,16 @@ class ConductorManager(base_manager.BaseConductorManager):
             # impact DB access if done in excess.
             time.sleep(0)
 
+    def _concurrent_action_capacity(self, action):
+        """Calculate how many more actions of the given type may start.
+
+        :param action: the type of the action, e.g. 'provisioning'.
+        :returns: the number of actions which can still be started without
+            exceeding the configured limit, or None if the action is not
+            subject to a concurrency limit.
+        """
+        return self._action_counters.capacity(action)
+
     def _concurrent_action_limit(self, action):
         """Check Concurrency limits and block operations if needed.
 
@@ -4190,33 +4386,112 @@ class ConductorManager(base_manager.BaseConductorManager):
         :raises: ConcurrentActionLimit If the system configuration
                  is exceeded.
         """
-        # NOTE(TheJulia): Keeping this all in one place for simplicity.
-        # Determine if we should filter by conductor group
-        conductor_group = None
-        if CONF.conductor.max_concurrent_per_conductor_group:
-            conductor_group = CONF.conductor.conductor_group
-
-        if action == 'provisioning':
-            node_count = self.dbapi.count_nodes_in_provision_state(
-                [states.DEPLOYING, states.DEPLOYWAIT],
-                conductor_group=conductor_group
-            )
-            if node_count >= CONF.conductor.max_concurrent_deploy:
-                raise exception.ConcurrentActionLimit(
-                    task_type=action)
-
-        if action == 'unprovisioning' or action == 'cleaning':
-            # NOTE(TheJulia): This also checks for the deleting state
-            # which is super transitory, *but* you can get a node into
-            # the state. So in order to guard against a DoS attack, we
-            # need to check even the super transitory node state.
-            node_count = self.dbapi.count_nodes_in_provision_state(
-                [states.DELETING, states.CLEANING, states.CLEANWAIT],
-                conductor_group=conductor_group
-            )
-            if node_count >= CONF.conductor.max_concurrent_clean:
-                raise exception.ConcurrentActionLimit(
-                    task_type=action)
+        if self._concurrent_action_capacity(action) == 0:
+            raise exception.ConcurrentActionLimit(task_type=action)
+
+    @METRICS.timer('ConductorManager.do_bulk_provisioning')
+    def do_bulk_provisioning(self, context, batch_uuid):
+        """RPC method to process a batch of a bulk provisioning job.
+
+        The batch record lists the nodes and the requested target. The
+        work is done in a background worker: the concurrent action limit is
+        checked once for the whole batch, then the action is started on
+        every node the limit allows, exactly like a request for a single
+        node would do. The outcome for each node is recorded in the batch
+        as soon as its action has started.
+
+        :param context: an admin context.
+        :param batch_uuid: the UUID of a provision job batch.
+        """
+        LOG.debug("RPC do_bulk_provisioning called for batch %s.",
+                  batch_uuid)
+        try:
+            self._spawn_worker(self._do_bulk_provisioning, context,
+                               batch_uuid)
+        except exception.NoFreeConductorWorker as e:
+            batch = objects.ProvisionJobBatch.get_by_uuid(context, batch_uuid)
+            batch.reject_unprocessed(str(e))
+
+    def _do_bulk_provisioning(self, context, batch_uuid):
+        """Start the requested action on all nodes of a batch.
+
+        :param context: an admin context.
+        :param batch_uuid: the UUID of a provision job batch.
+        """
+        batch = objects.ProvisionJobBatch.get_by_uuid(context, batch_uuid)
+        if batch.state != states.PROVISION_JOB_PENDING:
+            # Already given up on, e.g. when this conductor was restarted.
+            LOG.warning('Not processing batch %(batch)s of provision job '
+                        '%(job)s in state %(state)s',
+                        {'batch': batch_uuid, 'job': batch.job_uuid,
+                         'state': batch.state})
+            return
+        batch.state = states.PROVISION_JOB_RUNNING
+        batch.save()
+        target = batch.target
+        params = batch.params or {}
+        action = BULK_PROVISION_LIMITS.get(target)
+        capacity = self._concurrent_action_capacity(action)
+
+        results = {}
+        for node_id in batch.nodes:
+            if capacity is not None and capacity <= 0:
+                error = exception.ConcurrentActionLimit(task_type=action)
+                results[node_id] = {'status': states.PROVISION_JOB_REJECTED,
+                                    'error': str(error)}
+                continue
+
+            try:
+                self._start_bulk_provisioning_action(context, node_id,
+                                                     target, params)
+            except Exception as e:
+                if not isinstance(e, exception.IronicException):
+                    LOG.exception('Unexpected error when starting %(target)s '
+                                  'on node %(node)s as part of provision job '
+                                  '%(job)s', {'target': target,
+                                              'node': node_id,
+                                              'job': batch.job_uuid})
+                results[node_id] = {'status': states.PROVISION_JOB_REJECTED,
+                                    'error': str(e)}
+            else:
+                results[node_id] = {'status': states.PROVISION_JOB_ACCEPTED}
+                if capacity is not None:
+                    capacity -= 1
+                # Record the outcome right away, so that the node is not
+                # rejected if this conductor goes away before the end.
+                batch.results = dict(results)
+                batch.save()
+
+        accepted = [node for node, result in results.items()
+                    if result['status'] == states.PROVISION_JOB_ACCEPTED]
+        LOG.info('Processed batch %(batch)s of provision job %(job)s with '
+                 'target %(target)s: %(accepted)d of %(total)d nodes '
+                 'accepted', {'batch': batch_uuid, 'job': batch.job_uuid,
+                              'target': target, 'accepted': len(accepted),
+                              'total': len(results)})
+        batch.results = results
+        batch.state = states.PROVISION_JOB_FINISHED
+        batch.save()
+
+    def _start_bulk_provisioning_action(self, context, node_id, target,
+                                        params):
+        """Start the requested action on one node of a bulk job."""
+        if target in (states.ACTIVE, states.REBUILD):
+            self._start_node_deploy(
+                context, node_id, rebuild=(target == states.REBUILD),
+                deploy_steps=params.get('deploy_steps'))
+        elif target in (states.DELETED, states.UNDEPLOY):
+            self._start_node_tear_down(context, node_id)
+        elif target == states.VERBS['clean']:
+            self._start_node_clean(
+                context, node_id, params['clean_steps'],
+                disable_ramdisk=params.get('disable_ramdisk', False))
+        elif target in (states.VERBS['manage'], states.VERBS['provide']):
+            self._start_provisioning_action(context, node_id, target)
+        else:
+            raise exception.InvalidParameterValue(
+                _('Target %s is not supported by bulk provisioning')
+                % target)
 
     @METRICS.timer('ConductorManager.continue_inspection')
     @messaging.expected_exceptions(exception.NodeLocked,
@@ -4474,13 +4749,7 @@ class ConductorManager(base_manager.BaseConductorManager):
         :raises: InvalidUuidOrName if the name or uuid provided is not valid.
         :raises: RunbookNotFound if the runbook is not found.
         """
-        # If runbook_ident is instead a valid UUID, treat it as a UUID.
-        if uuidutils.is_uuid_like(runbook_ident):
-            return objects.Runbook.get_by_uuid(
-                context, runbook_ident)
-        else:
-            return objects.Runbook.get_by_name(
-                context, runbook_ident)
+        return template_catalogue.get_runbook(context, runbook_ident)
 
 
 # NOTE(TheJulia): This is the end of the class definition for the
@@ -0,0 +1,144 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Conductor-local cache of nodes for tasks with a shared lock."""
+
+import collections
+import datetime
+import threading
+
+from oslo_log import log
+from oslo_utils import strutils
+from oslo_utils import uuidutils
+
+from ironic.conf import CONF
+from ironic import objects
+
+LOG = log.getLogger(__name__)
+
+# Timestamps may be stored with a precision of one second, so an update made
+# in the same second as the previous one may not change the generation.
+_TIMESTAMP_PRECISION = datetime.timedelta(seconds=1)
+
+
+class NodeCache(object):
+    """A bounded cache of nodes validated by their generation.
+
+    Tasks with a shared lock load their node from the database even if it
+    has not changed since the previous task. With the cache enabled by
+    ``[conductor]node_cache_size``, a node is only loaded if its generation
+    (the time of its last update and its traits) differs from the one of
+    the cached copy, which is checked with one small query.
+
+    A node updated less than a second before it was loaded is not cached,
+    since a following update in the same second may not change the time of
+    the last update. The age of the update is measured with the clock of
+    the database rather than the one of this conductor.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # node ID -> (generation, node)
+        self._nodes = collections.OrderedDict()
+        # node UUID -> node ID
+        self._ids = {}
+
+    def _lookup(self, node_id):
+        """Find a cached node, must be called with the lock held."""
+        if strutils.is_int_like(node_id):
+            node_id = int(node_id)
+        else:
+            node_id = self._ids.get(node_id)
+        try:
+            entry = self._nodes[node_id]
+        except KeyError:
+            return None, None
+        self._nodes.move_to_end(node_id)
+        return entry
+
+    def _store(self, generation, node, size):
+        """Cache a node, must be called with the lock held."""
+        self._nodes[node.id] = (generation, node)
+        self._nodes.move_to_end(node.id)
+        self._ids[node.uuid] = node.id
+        while len(self._nodes) > size:
+            _generation, evicted = self._nodes.popitem(last=False)[1]
+            self._ids.pop(evicted.uuid, None)
+
+    def get(self, context, node_id):
+        """Get a node, from the cache if it has not changed.
+
+        :param context: security context.
+        :param node_id: the ID or UUID of a node.
+        :returns: a :class:`Node` object owned by the caller.
+        :raises: NodeNotFound if the node does not exist.
+        :raises: InvalidIdentity if node_id is neither an ID nor a UUID.
+        """
+        size = CONF.conductor.node_cache_size
+        if not size or not (strutils.is_int_like(node_id)
+                            or uuidutils.is_uuid_like(node_id)):
+            return objects.Node.get(context, node_id)
+
+        updated_at, traits, checked_at = objects.Node.get_generation(
+            context, node_id)
+        generation = (updated_at, traits)
+        with self._lock:
+            cached_generation, node = self._lookup(node_id)
+        if node is not None and cached_generation == generation:
+            LOG.debug('Using cached node %s', node.uuid)
+            node = node.obj_clone()
+            node._context = context
+            return node
+
+        node = objects.Node.get(context, node_id)
+        if (updated_at is not None
+                and checked_at - updated_at < _TIMESTAMP_PRECISION):
+            with self._lock:
+                self._forget(node)
+            return node
+
+        # The generation was read before the node, so the cached copy is at
+        # least as recent as the generation, and a newer copy is reloaded
+        # on the next access.
+        with self._lock:
+            self._store(generation, node.obj_clone(), size)
+        return node
+
+    def _forget(self, node):
+        """Drop a node from the cache, must be called with the lock held."""
+        self._nodes.pop(node.id, None)
+        self._ids.pop(node.uuid, None)
+
+    def reset(self):
+        """Drop all cached nodes."""
+        with self._lock:
+            self._nodes.clear()
+            self._ids.clear()
+
+
+_CACHE = NodeCache()
+
+
+def get_node(context, node_id):
+    """Get a node for a task with a shared lock.
+
+    :param context: security context.
+    :param node_id: the ID or UUID of a node.
+    :returns: a :class:`Node` object owned by the caller.
+    """
+    return _CACHE.get(context, node_id)
+
+
+def reset_node_cache():
+    """Drop all cached nodes."""
+    _CACHE.reset()
@@ -20,10 +20,13 @@ import time
 from futurist import periodics
 from oslo_log import log
 
+from ironic.common import async_operations
 from ironic.common import exception
 from ironic.common import metrics_utils
 from ironic.conductor import base_manager
+from ironic.conductor import bmc_events
 from ironic.conductor import task_manager
+from ironic.conf import CONF
 from ironic.drivers import base as driver_base
 
 
@@ -105,9 +108,40 @@ class Stop(Exception):
     """A signal to stop the current iteration of a periodic task."""
 
 
+def _node_filters(filters, async_operation):
+    """Get the database-level filters for a periodic task on nodes."""
+    # The operations of nodes saved by conductors of a previous release may
+    # not be recorded yet, fall back to checking all nodes.
+    if async_operation is None or CONF.pin_release_version:
+        return filters
+    return dict(filters or {}, async_operation=async_operation)
+
+
+def _node_matcher(predicate, poll_event, consumer):
+    """Build a function checking if a periodic task should act on a node."""
+    # Accepting a conductor manager is a bit of an edge case, doing a bit of
+    # a signature magic to avoid passing it everywhere.
+    accepts_manager = (predicate is not None
+                       and len(inspect.signature(predicate).parameters) > 1)
+
+    def matches(node, manager):
+        if predicate is not None:
+            if accepts_manager:
+                result = predicate(node, manager)
+            else:
+                result = predicate(node)
+            if not result:
+                return False
+        return (poll_event is None
+                or bmc_events.should_poll(node.uuid, poll_event, consumer))
+
+    return matches
+
+
 def node_periodic(purpose, spacing, enabled=True, filters=None,
                   predicate=None, predicate_extra_fields=(), limit=None,
-                  shared_task=True, node_count_metric_name=None):
+                  shared_task=True, node_count_metric_name=None,
+                  async_operation=None, poll_event=None):
     """A decorator to define a periodic task to act on nodes.
 
     Defines a periodic task that fetches the list of nodes mapped to the
@@ -148,16 +182,26 @@ def node_periodic(purpose, spacing, enabled=True, filters=None,
     :param node_count_metric_name: A string value to identify a metric
         representing the count of matching nodes to be recorded upon the
         completion of the periodic.
+    :param async_operation: the kind of the asynchronous operation the task
+        polls, i.e. the key of ``driver_internal_info`` holding its state.
+        Only nodes with this operation recorded as pending in the database
+        are fetched, see :mod:`ironic.common.async_operations`. The
+        ``predicate`` is still applied to the fetched nodes.
+    :param poll_event: the kind of BMC events reporting a change the task
+        polls the BMC for, see :mod:`ironic.conductor.bmc_events`. Nodes
+        subscribed to the events of their BMC are skipped until such an
+        event is received or ``[redfish_events]safety_poll_interval``
+        passes.
     """
+    if async_operation is not None:
+        async_operations.register(async_operation)
+
     node_type = collections.namedtuple(
         'Node',
         ['uuid', 'driver', 'conductor_group'] + list(predicate_extra_fields)
     )
 
-    # Accepting a conductor manager is a bit of an edge case, doing a bit of
-    # a signature magic to avoid passing it everywhere.
-    accepts_manager = (predicate is not None
-                       and len(inspect.signature(predicate).parameters) > 1)
+    matches = _node_matcher(predicate, poll_event, purpose)
 
     def decorator(func):
         @periodic(spacing=spacing, enabled=enabled)
@@ -181,60 +225,68 @@ def node_periodic(purpose, spacing, enabled=True, filters=None,
                 local_limit = limit
             assert local_limit is None or local_limit > 0
             node_count = 0
-            nodes = manager.iter_nodes(filters=filters,
-                                       fields=predicate_extra_fields)
-            for (node_uuid, *other) in nodes:
-                node_count += 1
-                if predicate is not None:
-                    node = node_type(node_uuid, *other)
-                    if accepts_manager:
-                        result = predicate(node, manager)
-                    else:
-                        result = predicate(node)
-                    if not result:
-                        continue
-
-                try:
-                    with task_manager.acquire(context, node_uuid,
-                                              purpose=purpose,
-                                              shared=shared_task) as task:
-                        if interface_type is not None:
-                            impl = getattr(task.driver, interface_type)
-                            # Match the node's interface by exact type
-                            # rather than isinstance().  When a subclass
-                            # (e.g. DracRedfishBIOS) inherits a periodic
-                            # from its base (RedfishBIOS) and both are
-                            # enabled, each interface is collected as its
-                            # own task.  An isinstance() check would let
-                            # the base task also match subclass nodes, so
-                            # the same node would be processed by two
-                            # tasks (duplicate resume RPCs).  Exact-type
-                            # matching keeps the node sets disjoint and
-                            # ensures each node is handled by its own
-                            # implementation.
-                            if type(impl) is not type(self):
-                                continue
-
-                        result = func(self, task, *args, **kwargs)
-                except exception.NodeNotFound:
-                    LOG.info("During %(action)s, node %(node)s was not found "
-                             "and presumed deleted by another process.",
-                             {'node': node_uuid, 'action': purpose})
-                except exception.NodeLocked:
-                    LOG.info("During %(action)s, node %(node)s was already "
-                             "locked by another process. Skip.",
-                             {'node': node_uuid, 'action': purpose})
-                except Stop:
-                    break
-                finally:
-                    # Yield on every iteration
-                    time.sleep(0)
-
-                if (local_limit is not None
-                        and (result is None or result)):
-                    local_limit -= 1
-                    if not local_limit:
-                        return
+
+            def matching_nodes():
+                nonlocal node_count
+                nodes = manager.iter_nodes(
+                    filters=_node_filters(filters, async_operation),
+                    fields=predicate_extra_fields)
+                for (node_uuid, *other) in nodes:
+                    node_count += 1
+                    if matches(node_type(node_uuid, *other), manager):
+                        yield (node_uuid,)
+
+            # Exclusive tasks load the resources after locking the node
+            prefetcher = task_manager.ResourcePrefetcher(
+                context, page_size=None if shared_task else 0)
+            with prefetcher:
+                for (node_uuid,) in prefetcher.iterate(matching_nodes()):
+                    result = None
+                    try:
+                        with task_manager.acquire(context, node_uuid,
+                                                  purpose=purpose,
+                                                  shared=shared_task) as task:
+                            if interface_type is not None:
+                                impl = getattr(task.driver, interface_type)
+                                # Match the node's interface by exact type
+                                # rather than isinstance().  When a subclass
+                                # (e.g. DracRedfishBIOS) inherits a periodic
+                                # from its base (RedfishBIOS) and both are
+                                # enabled, each interface is collected as its
+                                # own task.  An isinstance() check would let
+                                # the base task also match subclass nodes, so
+                                # the same node would be processed by two
+                                # tasks (duplicate resume RPCs).  Exact-type
+                                # matching keeps the node sets disjoint and
+                                # ensures each node is handled by its own
+                                # implementation.
+                                if type(impl) is not type(self):
+                                    continue
+
+                            if poll_event is not None:
+                                bmc_events.record_poll(node_uuid, poll_event,
+                                                       purpose)
+                            result = func(self, task, *args, **kwargs)
+                    except exception.NodeNotFound:
+                        LOG.info("During %(action)s, node %(node)s was not "
+                                 "found and presumed deleted by another "
+                                 "process.",
+                                 {'node': node_uuid, 'action': purpose})
+                    except exception.NodeLocked:
+                        LOG.info("During %(action)s, node %(node)s was "
+                                 "already locked by another process. Skip.",
+                                 {'node': node_uuid, 'action': purpose})
+                    except Stop:
+                        break
+                    finally:
+                        # Yield on every iteration
+                        time.sleep(0)
+
+                    if (local_limit is not None
+                            and (result is None or result)):
+                        local_limit -= 1
+                        if not local_limit:
+                            return
             if node_count_metric_name:
                 # Send post-run metrics.
                 METRICS.send_gauge(
@@ -0,0 +1,343 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Waiting for power state transitions without holding conductor workers.
+
+Power interfaces wait for the requested power state by polling the BMC,
+which keeps a conductor worker busy for up to
+``[conductor]power_state_change_timeout``. Power actions spawned with
+:func:`spawn` instead hand the wait over to a single waiter thread, which
+multiplexes the pending transitions of all nodes:
+
+* :func:`ironic.conductor.utils.node_wait_for_power_state` calls
+  :func:`defer_wait` and returns right away if the wait was deferred.
+* :func:`ironic.conductor.utils.node_power_action` calls
+  :func:`defer_completion` with the callback finishing the power action.
+* The waiter polls the due transitions in batches on conductor workers and
+  calls the callback once the node reaches the power state, fails or the
+  timeout passes. Only then the lock of the task is released.
+* :func:`stop_power_waiter` waits for the pending transitions when the
+  conductor stops, before its workers are shut down.
+"""
+
+import collections
+import functools
+import heapq
+import itertools
+import threading
+import time
+
+import futurist
+from futurist import waiters
+from oslo_log import log
+
+from ironic.common import exception
+
+LOG = log.getLogger(__name__)
+
+# Maximum number of nodes polled by one worker at a time
+_BATCH_SIZE = 10
+
+# Seconds before the first poll, doubled after each poll
+_INITIAL_INTERVAL = 1
+
+_local = threading.local()
+
+
+class _Deferral(object):
+    """A power action with its wait for the power state deferred."""
+
+    def __init__(self, task, spawn_method):
+        self.task = task
+        self.spawn_method = spawn_method
+        self.done = futurist.Future()
+        self.target_state = None
+        self.deadline = None
+        self.timeout = None
+        self.interval = _INITIAL_INTERVAL
+        self.callback = None
+
+
+class PowerWaiter(object):
+    """Polls the pending power transitions of the conductor."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        # heap of (monotonic time of the next poll, sequence, deferral)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._thread = None
+        # deferrals scheduled and not finished yet
+        self._pending = set()
+
+    def spawn(self, spawn_method, func, task, *args, **kwargs):
+        """Spawn a power action, deferring its wait for the power state.
+
+        :param spawn_method: the method spawning conductor workers, e.g.
+            ``BaseConductorManager._spawn_worker``.
+        :param func: the power action, called as
+            ``func(task, *args, **kwargs)``.
+        :param task: a TaskManager instance with an exclusive lock.
+        :returns: a future, which is done when the power action is
+            finished, including the deferred wait.
+        :raises: NoFreeConductorWorker if no worker is available.
+        """
+        deferral = _Deferral(task, spawn_method)
+        future = spawn_method(self._run_deferring, deferral, func, task,
+                              *args, **kwargs)
+        future.add_done_callback(functools.partial(self._spawned, deferral))
+        return deferral.done
+
+    def _run_deferring(self, deferral, func, *args, **kwargs):
+        _local.deferral = deferral
+        try:
+            func(*args, **kwargs)
+        finally:
+            _local.deferral = None
+        if deferral.callback is not None:
+            with self._condition:
+                self._pending.add(deferral)
+            self._schedule(deferral)
+
+    def _spawned(self, deferral, future):
+        try:
+            error = future.exception()
+        except futurist.CancelledError as e:
+            error = e
+        if error is not None:
+            deferral.done.set_exception(error)
+        elif deferral.callback is None:
+            # The power action has not deferred its wait
+            deferral.done.set_result(None)
+
+    def _schedule(self, deferral):
+        with self._condition:
+            if deferral not in self._pending:
+                # Failed by stop() in the meantime
+                return
+            heapq.heappush(self._queue,
+                           (time.monotonic() + deferral.interval,
+                            next(self._sequence), deferral))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='power-waiter',
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._queue:
+                        self._thread = None
+                        return
+                    delay = self._queue[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+
+                now = time.monotonic()
+                due = []
+                while self._queue and self._queue[0][0] <= now:
+                    due.append(heapq.heappop(self._queue)[2])
+
+            for batch in _batches(due):
+                try:
+                    batch[0].spawn_method(self._poll, batch)
+                except Exception as e:
+                    # No free worker, or the workers are shut down already
+                    if not isinstance(e, exception.NoFreeConductorWorker):
+                        LOG.warning('Cannot spawn a worker to poll power '
+                                    'states, polling in the waiter thread: '
+                                    '%s', e)
+                    self._poll(batch)
+
+    def _poll(self, batch):
+        """Poll the power states of a batch of nodes."""
+        try:
+            self._check(batch)
+        except Exception as e:
+            LOG.exception('Failed to check the power states of nodes %s',
+                          ', '.join(d.task.node.uuid for d in batch))
+            for deferral in batch:
+                self._finish(deferral, e)
+
+    def _check(self, batch):
+        tasks = [deferral.task for deferral in batch]
+        try:
+            power_states = tasks[0].driver.power.get_power_states(tasks)
+        except Exception as e:
+            if len(tasks) == 1:
+                power_states = [e]
+            else:
+                power_states = [_get_power_state(task) for task in tasks]
+
+        now = time.monotonic()
+        for deferral, power_state in zip(batch, power_states):
+            if isinstance(power_state, Exception):
+                self._finish(deferral, power_state)
+            elif power_state == deferral.target_state:
+                self._finish(deferral)
+            elif now >= deferral.deadline:
+                LOG.error('Timed out after %(retry_timeout)s secs waiting '
+                          'for %(state)s on node %(node_id)s.',
+                          {'retry_timeout': deferral.timeout,
+                           'state': deferral.target_state,
+                           'node_id': deferral.task.node.uuid})
+                self._finish(deferral, exception.PowerStateFailure(
+                    pstate=deferral.target_state))
+            else:
+                deferral.interval = min(deferral.interval * 2,
+                                        deferral.deadline - now)
+                self._schedule(deferral)
+
+    def _finish(self, deferral, error=None):
+        with self._condition:
+            if deferral not in self._pending:
+                # Finished already
+                return
+            self._pending.discard(deferral)
+        try:
+            deferral.callback(error)
+        except Exception as e:
+            LOG.exception('Failed to finish the power action on node %s',
+                          deferral.task.node.uuid)
+            error = error or e
+        finally:
+            if error is None:
+                deferral.done.set_result(None)
+            else:
+                deferral.done.set_exception(error)
+
+    def stop(self, timeout):
+        """Wait for the pending transitions, then fail the remaining ones.
+
+        :param timeout: the number of seconds to wait.
+        """
+        with self._condition:
+            pending = [deferral.done for deferral in self._pending]
+        if pending:
+            LOG.info('Waiting for %d pending power state transitions',
+                     len(pending))
+            waiters.wait_for_all(pending, timeout)
+        with self._condition:
+            remaining = list(self._pending)
+            self._queue.clear()
+            self._condition.notify()
+        for deferral in remaining:
+            LOG.error('Stopped waiting for %(state)s on node %(node_id)s, '
+                      'the conductor is shutting down.',
+                      {'state': deferral.target_state,
+                       'node_id': deferral.task.node.uuid})
+            self._finish(deferral, exception.PowerStateFailure(
+                pstate=deferral.target_state))
+
+    def reset(self):
+        """Forget all pending transitions."""
+        with self._condition:
+            self._queue.clear()
+            self._pending.clear()
+            self._condition.notify()
+
+
+def _batches(deferrals):
+    """Split deferrals into batches with the same power interface."""
+    groups = collections.defaultdict(list)
+    for deferral in deferrals:
+        groups[type(deferral.task.driver.power)].append(deferral)
+    for group in groups.values():
+        for start in range(0, len(group), _BATCH_SIZE):
+            yield group[start:start + _BATCH_SIZE]
+
+
+def _get_power_state(task):
+    try:
+        return task.driver.power.get_power_state(task)
+    except Exception as e:
+        return e
+
+
+def _current(task):
+    deferral = getattr(_local, 'deferral', None)
+    if deferral is not None and deferral.task is task:
+        return deferral
+
+
+_WAITER = PowerWaiter()
+
+
+def spawn(spawn_method):
+    """Wrap a spawn method to defer the waits of power actions.
+
+    The result can be passed to :meth:`TaskManager.spawn_after` instead of
+    ``spawn_method`` to spawn :func:`ironic.conductor.utils.node_power_action`
+    with its wait for the power state handed over to the waiter. The lock of
+    the task is held until the power action is finished.
+
+    Only actions with a single wait for the power state, i.e. power on and
+    off, may be spawned this way.
+
+    :param spawn_method: the method spawning conductor workers.
+    """
+    return functools.partial(_WAITER.spawn, spawn_method)
+
+
+def defer_wait(task, new_state, timeout):
+    """Defer a wait for the power state of a node, if possible.
+
+    :param task: a TaskManager instance.
+    :param new_state: the desired new power state.
+    :param timeout: number of seconds to wait before giving up.
+    :returns: True if the wait is deferred, in which case the power action
+        must pass its completion to :func:`defer_completion`. False if the
+        caller must wait.
+    """
+    deferral = _current(task)
+    if deferral is None or deferral.target_state is not None:
+        return False
+    deferral.target_state = new_state
+    deferral.timeout = timeout
+    deferral.deadline = time.monotonic() + timeout
+    return True
+
+
+def defer_completion(task, callback):
+    """Defer the completion of a power action until its wait is over.
+
+    :param task: a TaskManager instance.
+    :param callback: called with the error, or None on success, once the
+        node is in the new power state or the wait has failed.
+    :returns: True if the completion is deferred, False if the wait for the
+        power state is already over and the caller must complete the power
+        action.
+    """
+    deferral = _current(task)
+    if deferral is None or deferral.target_state is None:
+        return False
+    deferral.callback = callback
+    return True
+
+
+def stop_power_waiter(timeout):
+    """Wait for the pending transitions, then fail the remaining ones.
+
+    Must be called before the conductor workers are shut down.
+
+    :param timeout: the number of seconds to wait.
+    """
+    _WAITER.stop(timeout)
+
+
+def reset_power_waiter():
+    """Forget all pending transitions."""
+    _WAITER.reset()
@@ -161,12 +161,13 @@ class ConductorAPI(object):
     |    1.60 - Added continue_node_service
     |    1.61 - Added get virtual media support
     |    1.62 - Added update_portgroup_physical_network
+    |    1.63 - Added do_bulk_provisioning
     """
 
     # NOTE(rloo): This must be in sync with manager.ConductorManager's.
     # NOTE(pas-ha): This also must be in sync with
     #               ironic.common.release_mappings.RELEASE_MAPPING['master']
-    RPC_API_VERSION = '1.62'
+    RPC_API_VERSION = '1.63'
 
     def __init__(self, topic=None):
         super(ConductorAPI, self).__init__()
@@ -1559,3 +1560,18 @@ class ConductorAPI(object):
         return cctxt.call(context, 'update_portgroup_physical_network',
                           portgroup=portgroup_obj,
                           new_physical_network=new_physical_network)
+
+    def do_bulk_provisioning(self, context, batch_uuid, topic=None):
+        """Signal to conductor service to process a bulk provisioning batch.
+
+        NOTE: this is an RPC cast, there will be no response or exception
+        raised by the conductor for this RPC. The outcome for every node of
+        the batch is recorded in the batch record.
+
+        :param context: request context.
+        :param batch_uuid: UUID of a provision job batch.
+        :param topic: RPC topic. Defaults to self.topic.
+        """
+        cctxt = self._prepare_call(topic=topic, version='1.63')
+        return cctxt.cast(context, 'do_bulk_provisioning',
+                          batch_uuid=batch_uuid)
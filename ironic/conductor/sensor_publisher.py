@@ -0,0 +1,216 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Publishing of the sensor data of nodes.
+
+By default, one notification with all sensors of a node is sent per node
+and ``[sensor_data]interval``. On large deployments, the load on the
+message bus can be reduced:
+
+* With ``[sensor_data]send_changes_only``, only the sensors whose readings
+  changed since they were last sent are published, with a full snapshot
+  every ``[sensor_data]full_snapshot_interval`` seconds.
+* With ``[sensor_data]batch_size`` greater than 1, the messages of several
+  nodes are aggregated into a single notification.
+"""
+
+import threading
+import time
+
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from ironic.common import metrics_utils
+from ironic.conf import CONF
+
+METRICS = metrics_utils.get_metrics_logger(__name__)
+
+BATCH_EVENT_TYPE = 'hardware.metrics.batch'
+"""Event type of the notifications with the messages of several nodes."""
+
+FULL = 'full'
+DELTA = 'delta'
+
+
+def _reading_changed(old, new, threshold):
+    if (threshold and isinstance(old, (int, float))
+            and isinstance(new, (int, float))
+            and not isinstance(old, bool) and not isinstance(new, bool)):
+        if not old:
+            return bool(new)
+        return abs(new - old) > threshold * abs(old)
+    return old != new
+
+
+def _sensor_changed(old, new, threshold):
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        return _reading_changed(old, new, threshold)
+    if old.keys() != new.keys():
+        return True
+    return any(_reading_changed(old[field], new[field], threshold)
+               for field in new)
+
+
+class _NodeSensors(object):
+    """The sensors last sent for a node."""
+
+    def __init__(self, payload, now):
+        self.sensors = {sensor_type: dict(sensors)
+                        for sensor_type, sensors in payload.items()
+                        if isinstance(sensors, dict)}
+        self.full_at = now
+        self.seen_at = now
+
+
+class SensorDeltas(object):
+    """Reduces the sensor data of nodes to the changed sensors."""
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # node UUID -> _NodeSensors
+        self._nodes = {}
+
+    def encode(self, node_uuid, payload):
+        """Reduce the sensor data of a node to the changed sensors.
+
+        Sensors which are not sent keep the reading they were last sent
+        with as a reference, so that slow drifts are eventually sent.
+
+        :param node_uuid: the UUID of the node.
+        :param payload: the sensor data, a dict of sensor types to dicts of
+            sensors.
+        :returns: a tuple with the payload to send, possibly empty, and its
+            type, :data:`FULL` or :data:`DELTA`.
+        """
+        now = time.monotonic()
+        interval = CONF.sensor_data.full_snapshot_interval
+        threshold = CONF.sensor_data.change_threshold
+        with self._lock:
+            state = self._nodes.get(node_uuid)
+            if state is None or now - state.full_at >= interval:
+                self._nodes[node_uuid] = _NodeSensors(payload, now)
+                return payload, FULL
+
+            state.seen_at = now
+            delta = {}
+            for sensor_type, sensors in payload.items():
+                if not isinstance(sensors, dict):
+                    delta[sensor_type] = sensors
+                    continue
+                sent = state.sensors.setdefault(sensor_type, {})
+                changed = {
+                    name: sensor for name, sensor in sensors.items()
+                    if name not in sent
+                    or _sensor_changed(sent[name], sensor, threshold)}
+                if changed:
+                    sent.update(changed)
+                    delta[sensor_type] = changed
+            return delta, DELTA
+
+    def expire(self, max_age):
+        """Forget the nodes whose sensor data was not seen recently.
+
+        :param max_age: the age in seconds after which a node is forgotten.
+        """
+        limit = time.monotonic() - max_age
+        with self._lock:
+            for node_uuid in [node_uuid for node_uuid, state
+                              in self._nodes.items()
+                              if state.seen_at < limit]:
+                del self._nodes[node_uuid]
+
+    def reset(self):
+        """Forget all nodes."""
+        with self._lock:
+            self._nodes.clear()
+
+
+_DELTAS = SensorDeltas()
+
+
+def expire_deltas(max_age):
+    """Forget the nodes whose sensor data was not seen recently."""
+    _DELTAS.expire(max_age)
+
+
+def reset_sensor_deltas():
+    """Forget the sensors sent for all nodes."""
+    _DELTAS.reset()
+
+
+class SensorPublisher(object):
+    """Publishes the sensor data messages of nodes.
+
+    One publisher is shared by the workers of a run of the sensor data
+    periodic task. The messages are sent in batches of
+    ``[sensor_data]batch_size``, each worker flushes the pending messages
+    once it is done.
+    """
+
+    def __init__(self, notifier, context):
+        self._notifier = notifier
+        self._context = context
+        self._lock = threading.Lock()
+        self._messages = []
+        self._queued_at = None
+
+    def publish(self, event_type, message):
+        """Publish the sensor data message of a node.
+
+        :param event_type: the event type of the notification, e.g.
+            ``hardware.ipmi.metrics``.
+        :param message: the message, with the sensor data in ``payload``.
+            Nothing is sent if it ends up empty.
+        """
+        if CONF.sensor_data.send_changes_only:
+            payload, payload_type = _DELTAS.encode(message['node_uuid'],
+                                                   message['payload'])
+            message = dict(message, payload=payload,
+                           payload_type=payload_type)
+        if not message['payload']:
+            return
+
+        if CONF.sensor_data.batch_size <= 1:
+            self._notifier.info(self._context, event_type, message)
+            return
+
+        with self._lock:
+            if not self._messages:
+                self._queued_at = time.monotonic()
+            self._messages.append(message)
+            if len(self._messages) < CONF.sensor_data.batch_size:
+                return
+            batch, queued_at = self._take()
+        self._send(batch, queued_at)
+
+    def flush(self):
+        """Send the pending messages."""
+        with self._lock:
+            batch, queued_at = self._take()
+        if batch:
+            self._send(batch, queued_at)
+
+    def _take(self):
+        batch, self._messages = self._messages, []
+        return batch, self._queued_at
+
+    def _send(self, batch, queued_at):
+        self._notifier.info(
+            self._context, BATCH_EVENT_TYPE,
+            {'message_id': uuidutils.generate_uuid(),
+             'event_type': BATCH_EVENT_TYPE + '.update',
+             'timestamp': timeutils.utcnow(),
+             'payload': batch})
+        METRICS.send_gauge('SensorPublisher.batch_size', len(batch))
+        METRICS.send_timer('SensorPublisher.batch_latency',
+                           (time.monotonic() - queued_at) * 1000)
@@ -11,6 +11,7 @@
 #    under the License.
 
 import collections
+import threading
 import time
 
 from oslo_config import cfg
@@ -20,8 +21,8 @@ from ironic.common import exception
 from ironic.common.i18n import _
 from ironic.common import policy
 from ironic.common import states
+from ironic.common import template_catalogue
 from ironic.conductor import utils
-from ironic.objects import deploy_template
 
 LOG = log.getLogger(__name__)
 CONF = cfg.CONF
@@ -145,6 +146,81 @@ def find_step(steps, step):
     return next((x for x in steps if is_equivalent(x, step)), None)
 
 
+class StepCache(object):
+    """A bounded cache of the steps reported by the interfaces of nodes.
+
+    The steps of an interface are cached under the key returned by its
+    ``get_steps_cache_key`` method, see
+    :meth:`ironic.drivers.base.BaseInterface.get_steps_cache_key`. A change
+    of the key, e.g. because the interface of the node or the steps cached
+    from its agent changed, replaces the cached steps. Steps which are the
+    same for all nodes are cached once.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # node UUID, or None for the steps of all nodes ->
+        # {(interface name, interface class, step type): (key, steps)}
+        self._nodes = collections.OrderedDict()
+
+    def get_steps(self, task, name, interface, step_type):
+        """Get the steps of an interface for a node.
+
+        :param task: A TaskManager object
+        :param name: the name of the interface, e.g. 'deploy'.
+        :param interface: the interface.
+        :param step_type: 'clean', 'deploy', 'verify' or 'service'.
+        :returns: A list of step dictionaries owned by the caller.
+        """
+        get_method = getattr(interface, 'get_%s_steps' % step_type)
+        size = CONF.conductor.step_cache_size
+        key = interface.get_steps_cache_key(task, step_type) if size else None
+        if key is None:
+            return [step.copy() for step in get_method(task)]
+
+        node_uuid = task.node.uuid if key else None
+        entry_key = (name, type(interface), step_type)
+        with self._lock:
+            entries = self._nodes.get(node_uuid)
+            if entries is not None:
+                self._nodes.move_to_end(node_uuid)
+                cached_key, steps = entries.get(entry_key, (None, None))
+                if cached_key == key:
+                    return [step.copy() for step in steps]
+
+        steps = [step.copy() for step in get_method(task)]
+        with self._lock:
+            self._nodes.setdefault(node_uuid, {})[entry_key] = (key, steps)
+            self._nodes.move_to_end(node_uuid)
+            while len(self._nodes) > size:
+                self._nodes.popitem(last=False)
+        return [step.copy() for step in steps]
+
+    def forget(self, node_uuid):
+        """Drop the cached steps of a node."""
+        with self._lock:
+            self._nodes.pop(node_uuid, None)
+
+    def reset(self):
+        """Drop all cached steps."""
+        with self._lock:
+            self._nodes.clear()
+
+
+_STEP_CACHE = StepCache()
+
+
+def forget_node_steps(node_uuid):
+    """Drop the cached steps of a node, e.g. when its agent changes."""
+    _STEP_CACHE.forget(node_uuid)
+
+
+def reset_step_cache():
+    """Drop all cached steps."""
+    _STEP_CACHE.reset()
+
+
 def _get_steps(task, interfaces, get_method, enabled=False,
                sort_step_key=None, prio_overrides=None):
     """Get steps for task.node.
@@ -170,14 +246,16 @@ def _get_steps(task, interfaces, get_method, enabled=False,
     :returns: A list of step dictionaries
     """
     # Get steps from each interface
+    step_type = get_method[len('get_'):-len('_steps')]
     steps = list()
-    for interface in interfaces:
-        interface = getattr(task.driver, interface)
+    for name in interfaces:
+        interface = getattr(task.driver, name)
         if interface:
             # NOTE(janders) get all steps to start with, regardless of whether
             # enabled is True and priority is zero or not; we need to apply
             # priority overrides prior to filtering out disabled steps
-            interface_steps = [x for x in getattr(interface, get_method)(task)]
+            interface_steps = _STEP_CACHE.get_steps(task, name, interface,
+                                                    step_type)
             steps.extend(interface_steps)
     # Iterate over steps to apply prio overrides if set
     if prio_overrides is not None:
@@ -392,8 +470,8 @@ def _get_deployment_templates(task):
     if not node.instance_info.get('traits'):
         return []
     instance_traits = node.instance_info['traits']
-    return deploy_template.DeployTemplate.list_by_names(task.context,
-                                                        instance_traits)
+    return template_catalogue.get_deploy_templates_by_names(task.context,
+                                                            instance_traits)
 
 
 def _get_steps_from_deployment_templates(task, templates):
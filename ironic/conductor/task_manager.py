@@ -100,8 +100,13 @@ raised in the background thread.):
 
 """
 
+import collections
 import copy
 import functools
+import itertools
+import re
+import threading
+import time
 import traceback
 
 import futurist
@@ -113,17 +118,48 @@ import tenacity
 from ironic.common import driver_factory
 from ironic.common import exception
 from ironic.common.i18n import _
+from ironic.common import metrics_utils
 from ironic.common import state_machine
 from ironic.common import states
 from ironic.common.trait_based_networking.loader import tbn_config_file_traits
+from ironic.conductor import node_cache
 from ironic.conductor import notification_utils as notify
 from ironic import objects
 from ironic.objects import fields
 
 LOG = logging.getLogger(__name__)
 
+METRICS = metrics_utils.get_metrics_logger(__name__)
+
 CONF = cfg.CONF
 
+# Exclusive locks held by this process: node UUID -> (purpose, monotonic
+# acquisition time).
+_HELD_LOCKS = {}
+_HELD_LOCKS_LOCK = threading.Lock()
+
+# The ResourcePrefetcher active in the current thread, if any.
+_PREFETCH = threading.local()
+
+
+def _metric_purpose(purpose):
+    """Convert a lock purpose into a metric name component."""
+    return re.sub(r'[^a-zA-Z0-9]+', '_', purpose).strip('_') or 'unspecified'
+
+
+def get_held_locks():
+    """Get a snapshot of exclusive node locks held by this process.
+
+    :returns: a list of dictionaries with keys ``node`` (node UUID),
+        ``purpose`` and ``age`` (seconds since the lock was acquired),
+        the oldest locks first.
+    """
+    now = time.monotonic()
+    with _HELD_LOCKS_LOCK:
+        locks = [{'node': node, 'purpose': purpose, 'age': now - acquired}
+                 for node, (purpose, acquired) in _HELD_LOCKS.items()]
+    return sorted(locks, key=lambda lock: lock['age'], reverse=True)
+
 
 def require_exclusive_lock(f):
     """Decorator to require an exclusive lock.
@@ -167,6 +203,106 @@ def acquire(context, *args, **kwargs):
     return TaskManager(context, *args, **kwargs)
 
 
+class ResourcePrefetcher(object):
+    """Loads the ports and port groups of many nodes at once.
+
+    Periodic tasks create shared tasks for many nodes one after another,
+    and loading the ports and port groups of each of them takes one query
+    per node. Instead, the prefetcher loads them for a page of nodes with
+    one query per resource. While the prefetcher is active in a thread,
+    shared tasks created in this thread for the prefetched nodes receive
+    the loaded resources instead of querying them.
+
+    Since the resources are loaded before a task is created, they may be
+    slightly outdated. The page size limits for how long. They are loaded
+    again if the lock of the task is upgraded to an exclusive one.
+
+    ::
+
+        with task_manager.ResourcePrefetcher(context) as prefetcher:
+            for node_uuid, *other in prefetcher.iterate(nodes):
+                with task_manager.acquire(context, node_uuid,
+                                          shared=True) as task:
+                    ...
+
+    """
+
+    def __init__(self, context, page_size=None):
+        """Create a new ResourcePrefetcher.
+
+        :param context: request context
+        :param page_size: number of nodes to prefetch the resources for at
+            once, defaults to ``[conductor]periodic_prefetch_page_size``.
+            If 0, nothing is prefetched.
+        """
+        if page_size is None:
+            page_size = CONF.conductor.periodic_prefetch_page_size
+        self.context = context
+        self.page_size = page_size
+        self._node_uuids = set()
+        self._ports = {}
+        self._portgroups = {}
+
+    def __enter__(self):
+        _PREFETCH.current = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        _PREFETCH.current = None
+
+    def prefetch(self, node_uuids):
+        """Load the resources of nodes, dropping the previous ones.
+
+        :param node_uuids: an iterable of node UUIDs.
+        """
+        self._node_uuids = set(node_uuids)
+        self._ports = collections.defaultdict(list)
+        self._portgroups = collections.defaultdict(list)
+        if not self._node_uuids:
+            return
+        node_uuids = list(self._node_uuids)
+        for port in objects.Port.list_by_node_uuids(self.context,
+                                                    node_uuids):
+            self._ports[port.node_id].append(port)
+        for portgroup in objects.Portgroup.list_by_node_uuids(self.context,
+                                                              node_uuids):
+            self._portgroups[portgroup.node_id].append(portgroup)
+
+    def iterate(self, nodes):
+        """Iterate over nodes, prefetching their resources page by page.
+
+        :param nodes: an iterable of tuples starting with a node UUID, e.g.
+            as returned by ``iter_nodes`` of the conductor manager.
+        """
+        if not self.page_size:
+            yield from nodes
+            return
+
+        nodes = iter(nodes)
+        while True:
+            page = list(itertools.islice(nodes, self.page_size))
+            if not page:
+                return
+            self.prefetch(node_info[0] for node_info in page)
+            yield from page
+
+    def apply(self, task):
+        """Hand the prefetched resources of the task's node to the task.
+
+        The resources are handed out only once.
+
+        :param task: a TaskManager instance.
+        :returns: whether the resources were prefetched.
+        """
+        node = task.node
+        if node.uuid not in self._node_uuids:
+            return False
+        self._node_uuids.discard(node.uuid)
+        task.ports = self._ports.pop(node.id, [])
+        task.portgroups = self._portgroups.pop(node.id, [])
+        return True
+
+
 class TaskManager(object):
     """Context manager for tasks.
 
@@ -221,6 +357,7 @@ class TaskManager(object):
         self._retry = retry
         self._patient = patient
         self._tbn_traits = None
+        self._prefetched = False
 
         self.fsm = state_machine.machine.copy()
         self._purpose = purpose
@@ -233,7 +370,10 @@ class TaskManager(object):
         self._saved_node = None
 
         try:
-            node = objects.Node.get(context, node_id)
+            if self.shared:
+                node = node_cache.get_node(context, node_id)
+            else:
+                node = objects.Node.get(context, node_id)
             LOG.debug("Attempting to get %(type)s lock on node %(node)s (for "
                       "%(purpose)s)",
                       {'type': 'shared' if shared else 'exclusive',
@@ -243,6 +383,11 @@ class TaskManager(object):
             else:
                 self._debug_timer.restart()
                 self.node = node
+                # Prefetched resources may predate the lock, so only
+                # shared tasks use them.
+                prefetcher = getattr(_PREFETCH, 'current', None)
+                if prefetcher is not None:
+                    self._prefetched = prefetcher.apply(self)
 
             if load_driver:
                 self.driver = driver_factory.build_driver_for_task(self)
@@ -342,6 +487,8 @@ class TaskManager(object):
 
     def _lock(self):
         self._debug_timer.restart()
+        metric_purpose = _metric_purpose(self._purpose)
+        attempts = 0
 
         if self._patient:
             stop_after = tenacity.stop_never
@@ -364,6 +511,8 @@ class TaskManager(object):
                 CONF.conductor.node_locked_retry_interval),
             reraise=True)
         def reserve_node():
+            nonlocal attempts
+            attempts += 1
             if self._debug_timer.elapsed() > max_lock_time:
                 LOG.warning('We have exceeded the normal maximum time window '
                             'to complete a node lock attempting to reserve '
@@ -377,9 +526,34 @@ class TaskManager(object):
                       "(took %(time).2f seconds)",
                       {'node': self.node.uuid, 'purpose': self._purpose,
                        'time': self._debug_timer.elapsed()})
+            METRICS.send_timer('TaskManager.lock_wait.%s' % metric_purpose,
+                               self._debug_timer.elapsed() * 1000)
             self._debug_timer.restart()
+            with _HELD_LOCKS_LOCK:
+                _HELD_LOCKS[self.node.uuid] = (self._purpose,
+                                               time.monotonic())
 
-        reserve_node()
+        try:
+            reserve_node()
+        except exception.NodeLocked:
+            METRICS.send_counter('TaskManager.lock_failed.%s' % metric_purpose,
+                                 1)
+            raise
+        finally:
+            if attempts > 1:
+                METRICS.send_counter(
+                    'TaskManager.lock_retries.%s' % metric_purpose,
+                    attempts - 1)
+
+    def _forget_lock(self):
+        """Record that the exclusive lock on the node is released."""
+        with _HELD_LOCKS_LOCK:
+            held = _HELD_LOCKS.pop(self.node.uuid, None)
+        if held is not None:
+            purpose, acquired = held
+            METRICS.send_timer(
+                'TaskManager.lock_hold.%s' % _metric_purpose(purpose),
+                (time.monotonic() - acquired) * 1000)
 
     def upgrade_lock(self, purpose=None, retry=None):
         """Upgrade a shared lock to an exclusive lock.
@@ -407,6 +581,11 @@ class TaskManager(object):
                        'time': self._debug_timer.elapsed()})
             self._lock()
             self.shared = False
+            if self._prefetched:
+                # Reload the resources now that the node is locked
+                self._ports = None
+                self._portgroups = None
+                self._prefetched = False
 
     def spawn_after(self, _spawn_method, *args, **kwargs):
         """Call this to spawn a thread to complete the task.
@@ -446,6 +625,7 @@ class TaskManager(object):
 
         if not self.shared:
             objects.Node.release(self.context, CONF.host, self.node.id)
+            self._forget_lock()
             self.shared = True
             self.node.refresh()
             LOG.debug("Successfully downgraded lock for %(purpose)s "
@@ -468,6 +648,8 @@ class TaskManager(object):
                 # squelch the exception if the node was deleted
                 # within the task's context.
                 pass
+            if self.node:
+                self._forget_lock()
         if self.node:
             LOG.debug("Successfully released %(type)s lock for %(purpose)s "
                       "on node %(node)s (lock was held %(time).2f sec)",
@@ -39,7 +39,9 @@ from ironic.common import network
 from ironic.common import nova
 from ironic.common import states
 from ironic.common import utils
+from ironic.conductor import bmc_events
 from ironic.conductor import notification_utils as notify_utils
+from ironic.conductor import power_waiter
 from ironic.conductor import task_manager
 from ironic.drivers.modules import deploy_utils
 from ironic.objects import fields
@@ -178,6 +180,11 @@ def node_wait_for_power_state(task, new_state, timeout=None):
     :raises: PowerStateFailure if timed out
     """
     retry_timeout = (timeout or CONF.conductor.power_state_change_timeout)
+    # The power action finishes once the waiter sees the new power state
+    if power_waiter.defer_wait(task, new_state, retry_timeout):
+        return new_state
+    if bmc_events.is_subscribed(task.node.uuid):
+        return _wait_for_power_state_event(task, new_state, retry_timeout)
 
     def _wait():
         status = task.driver.power.get_power_state(task)
@@ -198,6 +205,38 @@ def node_wait_for_power_state(task, new_state, timeout=None):
         raise exception.PowerStateFailure(pstate=new_state)
 
 
+def _wait_for_power_state_event(task, new_state, timeout):
+    """Wait for node to be in new power state, woken up by BMC events.
+
+    The power state is polled when the BMC reports a change of it, and with
+    an exponential back-off in case the event is lost.
+
+    :param task: a TaskManager instance.
+    :param new_state: the desired new power state.
+    :param timeout: number of seconds to wait before giving up.
+    :raises: PowerStateFailure if timed out
+    """
+    deadline = time.monotonic() + timeout
+    interval = 1
+    while True:
+        checked_at = time.monotonic()
+        status = task.driver.power.get_power_state(task)
+        if status == new_state:
+            return status
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        bmc_events.wait(task.node.uuid, [bmc_events.POWER],
+                        min(interval, remaining), since=checked_at)
+        interval *= 2
+
+    LOG.error('Timed out after %(retry_timeout)s secs waiting for '
+              '%(state)s on node %(node_id)s.',
+              {'retry_timeout': timeout,
+               'state': new_state, 'node_id': task.node.uuid})
+    raise exception.PowerStateFailure(pstate=new_state)
+
+
 def _calculate_target_state(new_state):
     if new_state in (states.POWER_ON, states.REBOOT, states.SOFT_REBOOT):
         target_state = states.POWER_ON
@@ -371,45 +410,64 @@ def node_power_action(task, new_state, timeout=None):
             # really verify what cinder has connector wise.
             task.driver.power.reboot(task, timeout=timeout)
     except Exception as e:
+        _finish_power_action(task, new_state, target_state, e)
+        raise
+    else:
+        if power_waiter.defer_completion(
+                task, functools.partial(_finish_power_action, task,
+                                        new_state, target_state)):
+            return
+        _finish_power_action(task, new_state, target_state)
+
+
+def _finish_power_action(task, new_state, target_state, error=None):
+    """Record the result of a power action.
+
+    :param task: a TaskManager instance containing the node to act on.
+    :param new_state: the requested power state.
+    :param target_state: the power state the node was expected to reach.
+    :param error: the exception raised by the power action, if any.
+    """
+    node = task.node
+    if error is not None:
         node['target_power_state'] = states.NOSTATE
         error = _(
             "Failed to change power state to '%(target_state)s' "
             "by '%(new_state)s': %(error)s") % {
                 'target_state': target_state,
                 'new_state': new_state,
-                'error': e}
+                'error': error}
         node_history_record(node, event=error, error=True)
         node.save()
         notify_utils.emit_power_set_notification(
             task, fields.NotificationLevel.ERROR,
             fields.NotificationStatus.ERROR, new_state)
-        raise
-    else:
-        # success!
-        node['power_state'] = target_state
-        node['target_power_state'] = states.NOSTATE
-        node.save()
-        if node.instance_uuid:
-            nova.power_update(
-                task.context, node.instance_uuid, target_state)
-        notify_utils.emit_power_set_notification(
-            task, fields.NotificationLevel.INFO, fields.NotificationStatus.END,
-            new_state)
-        LOG.info('Successfully set node %(node)s power state to '
-                 '%(target_state)s by %(new_state)s.',
-                 {'node': node.uuid,
-                  'target_state': target_state,
-                  'new_state': new_state})
-        # NOTE(TheJulia): Similarly to power-on, when we power-off
-        # a node, we should detach any volume attachments.
-        if (target_state == states.POWER_OFF
-                and node.provision_state == states.ACTIVE):
-            try:
-                task.driver.storage.detach_volumes(task)
-            except exception.StorageError as e:
-                LOG.warning("Volume detachment for node %(node)s "
-                            "failed: %(error)s",
-                            {'node': node.uuid, 'error': e})
+        return
+
+    node['power_state'] = target_state
+    node['target_power_state'] = states.NOSTATE
+    node.save()
+    if node.instance_uuid:
+        nova.power_update(
+            task.context, node.instance_uuid, target_state)
+    notify_utils.emit_power_set_notification(
+        task, fields.NotificationLevel.INFO, fields.NotificationStatus.END,
+        new_state)
+    LOG.info('Successfully set node %(node)s power state to '
+             '%(target_state)s by %(new_state)s.',
+             {'node': node.uuid,
+              'target_state': target_state,
+              'new_state': new_state})
+    # NOTE(TheJulia): Similarly to power-on, when we power-off
+    # a node, we should detach any volume attachments.
+    if (target_state == states.POWER_OFF
+            and node.provision_state == states.ACTIVE):
+        try:
+            task.driver.storage.detach_volumes(task)
+        except exception.StorageError as e:
+            LOG.warning("Volume detachment for node %(node)s "
+                        "failed: %(error)s",
+                        {'node': node.uuid, 'error': e})
 
 
 def _handle_child_power_on(task, target_state, timeout):
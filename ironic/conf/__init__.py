@@ -50,6 +50,7 @@ from ironic.conf import nova
 from ironic.conf import oci
 from ironic.conf import pxe
 from ironic.conf import redfish
+from ironic.conf import redfish_events
 from ironic.conf import sensor_data
 from ironic.conf import service_catalog
 from ironic.conf import swift
@@ -94,6 +95,7 @@ nova.register_opts(CONF)
 oci.register_opts(CONF)
 pxe.register_opts(CONF)
 redfish.register_opts(CONF)
+redfish_events.register_opts(CONF)
 sensor_data.register_opts(CONF)
 service_catalog.register_opts(CONF)
 swift.register_opts(CONF)
@@ -112,6 +112,18 @@ opts = [
                       'to use the image source directly or if ironic should '
                       'cache the image on the conductor and serve it from '
                       'ironic\'s own http server.')),
+    cfg.BoolOpt('image_prefetch',
+                default=False,
+                mutable=True,
+                help=_('Whether the direct deploy interface prepares the '
+                       'instance image in the background, starting when the '
+                       'deployment is prepared, while the node boots the '
+                       'agent and executes the deploy steps preceding '
+                       'write_image. This saves time when the image is '
+                       'downloaded, cached or converted on the conductor. '
+                       'Errors with the image are then only reported by the '
+                       'write_image deploy step. Only applies to nodes '
+                       'with the local boot option.')),
     cfg.IntOpt('command_timeout',
                default=60,
                mutable=True,
@@ -232,6 +232,22 @@ opts = [
                        "Applies to user-requested (manual) steps, "
                        "automated cleaning steps, and runbook steps "
                        "alike.")),
+    cfg.IntOpt('provision_job_max_nodes',
+               default=1000,
+               min=1,
+               mutable=True,
+               help=_('Maximum number of nodes which can be requested in '
+                      'a single bulk provisioning job.')),
+    cfg.IntOpt('provision_job_batch_size',
+               default=100,
+               min=1,
+               mutable=True,
+               help=_('Maximum number of nodes in a single batch of a bulk '
+                      'provisioning job. Nodes of a job are grouped by the '
+                      'conductor managing them, and each group is split '
+                      'into batches of at most this size. Every batch is '
+                      'sent to its conductor as one RPC and is subject to '
+                      'a single concurrent action limit check.')),
 ]
 
 
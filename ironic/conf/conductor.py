@@ -70,6 +70,14 @@ opts = [
                min=0,
                help=_('Interval between checks of orphaned allocations, '
                       'in seconds. Set to 0 to disable checks.')),
+    cfg.IntOpt('allocation_candidate_limit',
+               default=100,
+               min=0,
+               mutable=True,
+               help=_('Maximum number of randomly picked suitable nodes '
+                      'that an allocation tries to reserve. A smaller value '
+                      'makes allocations in large pools of nodes cheaper. '
+                      'Set to 0 to try all suitable nodes.')),
     cfg.IntOpt('cache_clean_up_interval',
                default=3600, min=0,
                help=_('Interval between cleaning up image caches, in seconds. '
@@ -112,6 +120,37 @@ opts = [
                help=_('Maximum number of worker threads that can be started '
                       'simultaneously by a periodic task. Should be less '
                       'than RPC thread pool size.')),
+    cfg.IntOpt('periodic_prefetch_page_size',
+               default=50,
+               min=0,
+               mutable=True,
+               help=_('Number of nodes for which periodic tasks load ports '
+                      'and port groups with one database query before '
+                      'processing these nodes. Larger values mean fewer '
+                      'queries, but the loaded data may be more outdated '
+                      'when a node is processed. Set to 0 to load them '
+                      'separately for each node.')),
+    cfg.IntOpt('node_cache_size',
+               default=0,
+               min=0,
+               mutable=True,
+               help=_('Maximum number of nodes that the conductor keeps in '
+                      'memory for tasks with a shared lock. A cached node '
+                      'is reused after checking with one small database '
+                      'query that it has not changed. Set to 0 to disable '
+                      'the cache and always load nodes from the '
+                      'database.')),
+    cfg.IntOpt('step_cache_size',
+               default=1000,
+               min=0,
+               mutable=True,
+               help=_('Maximum number of nodes for which the conductor '
+                      'keeps the clean, deploy, verify and service steps '
+                      'reported by their interfaces, so that they are not '
+                      'computed again when the steps are validated, set '
+                      'or resumed. The steps of a node are computed again '
+                      'when its interfaces or the steps cached from its '
+                      'agent change. Set to 0 to disable the cache.')),
     cfg.IntOpt('node_locked_retry_attempts',
                default=3,
                help=_('Number of attempts to grab a node lock.')),
@@ -268,6 +307,18 @@ opts = [
                       'complete, i.e., so that a baremetal node is in the '
                       'desired power state. If timed out, the power operation '
                       'is considered a failure.')),
+    cfg.BoolOpt('background_power_state_wait',
+                default=True,
+                mutable=True,
+                help=_('If True, power on and power off actions requested '
+                       'through the API release their conductor worker '
+                       'while waiting for the node to reach the requested '
+                       'power state. The pending transitions of all nodes '
+                       'are polled by a single waiter in batches, and the '
+                       'node stays locked until the power action is '
+                       'finished. Only applies to power interfaces waiting '
+                       'for the power state through the common conductor '
+                       'code, such as ipmi and redfish.')),
     cfg.IntOpt('power_failure_recovery_interval',
                min=0, default=300,
                help=_('Interval (in seconds) between checking the power '
@@ -435,6 +486,27 @@ opts = [
                mutable=True,
                help=_('The maximum number of stale conductor records to clean '
                       'up from the database in a single cleanup operation.')),
+    cfg.IntOpt('provision_job_cleanup_interval',
+               min=0,
+               default=86400,
+               mutable=False,
+               help=_('Interval in seconds at which finished bulk '
+                      'provisioning jobs can be cleaned up from the '
+                      'database. Setting to 0 disables the periodic task.')),
+    cfg.IntOpt('provision_job_max_age',
+               min=60,
+               default=604800,
+               mutable=True,
+               help=_('Time in seconds after which finished bulk '
+                      'provisioning jobs are deleted from the database, '
+                      'see [conductor]provision_job_cleanup_interval.')),
+    cfg.IntOpt('provision_job_cleanup_batch_size',
+               min=1,
+               default=100,
+               mutable=True,
+               help=_('The maximum number of bulk provisioning jobs to '
+                      'delete from the database in a single cleanup '
+                      'operation.')),
     cfg.MultiOpt('verify_step_priority_override',
                  item_type=types.Dict(),
                  default={},
@@ -512,6 +584,52 @@ opts = [
                        'independent concurrency limits. When False '
                        '(the default), the limits apply to all nodes '
                        'across the entire Ironic deployment.')),
+    cfg.IntOpt('concurrent_action_count_interval',
+               default=10,
+               min=0,
+               mutable=True,
+               help=_('Interval (in seconds) during which the number of '
+                      'nodes being deployed or cleaned, as counted for the '
+                      'max_concurrent_deploy and max_concurrent_clean '
+                      'limits, is cached by the conductor instead of being '
+                      'counted in the database on every request. Actions '
+                      'started by the conductor are added to the cached '
+                      'values, multiplied by the number of online '
+                      'conductors sharing the limit. Set to 0 to count on '
+                      'every request.')),
+    cfg.IntOpt('concurrent_action_count_margin',
+               default=10,
+               min=0,
+               mutable=True,
+               help=_('When fewer than this number of deployments or '
+                      'cleanings may still start before reaching '
+                      'max_concurrent_deploy or max_concurrent_clean, the '
+                      'conductor ignores the cached counts and counts the '
+                      'nodes in the database, so that requests are not '
+                      'rejected based on outdated information.')),
+    cfg.BoolOpt('heartbeat_fast_path',
+                default=True,
+                mutable=True,
+                help=_('Whether to record agent heartbeats which do not '
+                       'require any action without acquiring a task for '
+                       'the node. This applies to heartbeats with an '
+                       'unchanged agent URL and version for nodes that '
+                       'are not locked and either in a state where '
+                       'heartbeats are only recorded, or waiting for an '
+                       'in-band step polled by the driver.')),
+    cfg.IntOpt('heartbeat_coalesce_window',
+               default=0,
+               min=0,
+               mutable=True,
+               help=_('Number of seconds after fully processing a heartbeat '
+                      'for a node running an in-band step during which '
+                      'further heartbeats from the node are only recorded. '
+                      'This reduces the load of heartbeats during long '
+                      'steps, but may delay noticing that a step has '
+                      'finished by up to this number of seconds. Only used '
+                      'when heartbeat_fast_path is True. Set to 0 to '
+                      'process every heartbeat that may require an action.'
+                      )),
     cfg.BoolOpt('poweroff_in_cleanfail',
                 default=False,
                 help=_('If True power off nodes in the ``clean failed`` '
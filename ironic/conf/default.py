@@ -440,6 +440,16 @@ service_opts = [
                       'triggered by sending the signal SIGUSR2. '
                       'Zero value means shutdown will never be triggered by '
                       'a timeout.')),
+    cfg.IntOpt('template_cache_size',
+               mutable=True,
+               default=1000,
+               min=0,
+               help=_('Maximum number of deploy templates, and of runbooks, '
+                      'that the API and conductor services keep in memory. '
+                      'The cached records are loaded again whenever one of '
+                      'them is created, updated or deleted. If there are '
+                      'more, they are always loaded from the database. Set '
+                      'to 0 to disable the cache.')),
 ]
 
 utils_opts = [
@@ -28,6 +28,24 @@ opts = [
                default='introspection_data_container',
                help=_('The Swift container prefix to store the inspection '
                       'data (separately inventory and plugin data).')),
+    cfg.StrOpt('data_compression',
+               help=_('How to compress the inspection data stored in the '
+                      'database. Data stored before changing this option '
+                      'can still be read. Compression is disabled while '
+                      '[DEFAULT]pin_release_version is set, since services '
+                      'of the previous release cannot read compressed '
+                      'data.'),
+               choices=[
+                   ('none', _('store the data as plain JSON')),
+                   ('zlib', _('store the data compressed with zlib')),
+               ],
+               default='zlib'),
+    cfg.BoolOpt('skip_unchanged_data',
+                default=True,
+                help=_('Whether to compare the digest of the inspection data '
+                       'stored in the database with the digest of the new '
+                       'data and skip writing it if they match, e.g. when a '
+                       'node is re-inspected without any hardware change.')),
 ]
 
 
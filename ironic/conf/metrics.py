@@ -15,6 +15,7 @@
 # limitations under the License.
 
 from oslo_config import cfg
+from oslo_config import types as cfg_types
 
 from ironic.common.i18n import _
 
@@ -27,6 +28,9 @@ opts = [
                    ('statsd', 'Transmits metrics data to a statsd backend.'),
                    ('collector', 'Collects metrics data and saves it in '
                                  'memory for use by the running application.'),
+                   ('aggregator', 'Aggregates metrics data in memory, '
+                                  'recording timers as histograms, for use '
+                                  'by the running application.'),
                ],
                help='Backend to use for the metrics system.'),
     cfg.BoolOpt('prepend_host',
@@ -44,6 +48,18 @@ opts = [
                     'By default, there is no global prefix. '
                     'The format of metric names is '
                     '[global_prefix.][host_name.]prefix.metric_name.'),
+    cfg.ListOpt('aggregator_buckets',
+                item_type=cfg_types.Float(min=0),
+                default=[5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+                         10000, 30000, 60000],
+                help=_('Upper bounds (in milliseconds) of the histogram '
+                       'buckets used by the aggregator backend for timers.')),
+    cfg.ListOpt('aggregator_quantiles',
+                item_type=cfg_types.Float(min=0, max=1),
+                default=[0.5, 0.9, 0.99],
+                mutable=True,
+                help=_('Quantiles of timers estimated by the aggregator '
+                       'backend.')),
     # IPA config options: used by IPA to configure how it reports metric data
     cfg.StrOpt('agent_backend',
                default='noop',
@@ -82,6 +98,22 @@ statsd_opts = [
     cfg.PortOpt('statsd_port',
                 default=8125,
                 help='Port to use with the statsd backend.'),
+    cfg.FloatOpt('statsd_flush_interval',
+                 default=0,
+                 min=0,
+                 help=_('Interval (in seconds) at which buffered metrics are '
+                        'sent to statsd. Metrics are sent together in as few '
+                        'packets as possible, which reduces the overhead of '
+                        'frequently emitted metrics. Set to 0 (the default) '
+                        'to send every metric immediately in its own '
+                        'packet.')),
+    cfg.IntOpt('statsd_max_packet_size',
+               default=1432,
+               min=64,
+               help=_('Maximum size (in bytes) of a packet of buffered '
+                      'metrics sent to statsd. Only used when '
+                      'statsd_flush_interval is set. The default fits '
+                      'into a single Ethernet frame.')),
     cfg.StrOpt('agent_statsd_host',
                default='localhost',
                help=_('Host for the agent ramdisk to use with the statsd '
@@ -55,6 +55,7 @@ _opts = [
     ('pxe', ironic.conf.pxe.opts),
     ('pxe_filter', ironic.conf.inspector.pxe_filter_opts),
     ('redfish', ironic.conf.redfish.opts),
+    ('redfish_events', ironic.conf.redfish_events.opts),
     ('sensor_data', ironic.conf.sensor_data.opts),
     ('service_catalog', ironic.conf.service_catalog.list_opts()),
     ('swift', ironic.conf.swift.list_opts()),
@@ -57,6 +57,16 @@ opts = [
                       'Service). This option caps the maximum number of '
                       'connections to maintain. The value of `0` disables '
                       'client connection caching completely.')),
+    cfg.BoolOpt('task_system_snapshot',
+                default=True,
+                mutable=True,
+                help=_('Whether to fetch the Redfish System of a node, and '
+                       'the resources linked from it such as its managers, '
+                       'chassis, BIOS and storage, once per task and reuse '
+                       'them in all interfaces. The System is fetched again '
+                       'after any change is made through it, and whenever '
+                       'a fresh state is needed, e.g. to poll the power '
+                       'state.')),
     cfg.StrOpt('auth_type',
                choices=[('basic', _('Use HTTP basic authentication')),
                         ('session', _('Use HTTP session authentication')),
@@ -199,6 +209,15 @@ opts = [
                default=60,
                help=_('Number of seconds to wait between checking for '
                       'failed raid config tasks')),
+    cfg.IntOpt('raid_config_search_limit',
+               min=0,
+               default=100000,
+               mutable=True,
+               help=_('Maximum number of candidate volumes tried when '
+                      'matching physical disks to the logical disks of the '
+                      'target RAID configuration which do not list their '
+                      'physical disks. The create_configuration step fails '
+                      'when it is reached. Set to 0 for no limit.')),
     cfg.IntOpt('boot_mode_config_timeout',
                min=0,
                default=900,
@@ -289,6 +308,22 @@ opts = [
                help=_('Number of seconds to wait between power-on retries '
                       'triggered by an HTTP 409 '
                       '"ActionParameterValueConflict" from the BMC.')),
+    cfg.IntOpt('sensor_data_concurrency',
+               min=0,
+               default=32,
+               help=_('Maximum number of Redfish requests issued '
+                      'concurrently by the conductor when collecting sensor '
+                      'data, across all nodes. The chassis, storage and '
+                      'drives of a node are then read in parallel. Set to 0 '
+                      'to read them sequentially in the sensor data '
+                      'workers.')),
+    cfg.IntOpt('sensor_data_bmc_concurrency',
+               min=1,
+               default=4,
+               help=_('Maximum number of Redfish requests issued '
+                      'concurrently to a single BMC when collecting sensor '
+                      'data. Only used if '
+                      '[redfish]sensor_data_concurrency is not 0.')),
 ]
 
 
@@ -0,0 +1,89 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from ironic.common.i18n import _
+from ironic.conf.api import Octal
+
+opts = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help=_('Whether the conductor subscribes to the events of '
+                       'the BMCs of the nodes with the redfish management '
+                       'interface and listens for them. Events wake up the '
+                       'tasks waiting for power state changes and the '
+                       'periodic tasks checking power states and '
+                       'asynchronous BMC tasks, which then only poll the '
+                       'BMCs of subscribed nodes every '
+                       '[redfish_events]safety_poll_interval seconds. '
+                       'Requires [redfish_events]destination_url.')),
+    cfg.URIOpt('destination_url',
+               schemes=('http', 'https'),
+               help=_('The URL on which the BMCs can reach the event '
+                      'listener of this conductor, for example '
+                      'https://conductor1.example.com:8091. The UUID of a '
+                      'node is appended to it for the subscription of the '
+                      'node\'s BMC.')),
+    cfg.HostAddressOpt('host_ip',
+                       default='::',
+                       help=_('The IP address or hostname on which the event '
+                              'listener listens.')),
+    cfg.PortOpt('port',
+                default=8091,
+                help=_('The port on which the event listener listens.')),
+    cfg.BoolOpt('use_ssl',
+                default=False,
+                help=_('Whether to use TLS for the event listener.')),
+    cfg.StrOpt('cert_file',
+               help=_('Certificate file the event listener presents to the '
+                      'BMCs when [redfish_events]use_ssl=True.')),
+    cfg.StrOpt('key_file',
+               help=_('Private key file matching cert_file.')),
+    cfg.StrOpt('tls_minimum_version',
+               default='1.2',
+               choices=[('1.2', _('Require TLS 1.2 as the minimum version.')),
+                        ('1.3', _('Require TLS 1.3 as the minimum version.'))],
+               help=_('The minimum TLS protocol version of the event '
+                      'listener when [redfish_events]use_ssl is True. '
+                      'Defaults to TLS 1.2 since many BMCs do not support '
+                      'TLS 1.3.')),
+    cfg.StrOpt('tls_ciphers',
+               help=_('The list of available ciphers for the event listener '
+                      'in the OpenSSL cipher list format. Has no effect when '
+                      '[redfish_events]use_ssl is False.')),
+    cfg.StrOpt('unix_socket',
+               help=_('Unix socket to listen on, for example behind a '
+                      'reverse proxy. Disables host_ip and port.')),
+    cfg.Opt('unix_socket_mode', type=Octal(),
+            help=_('File mode (an octal number) of the unix socket to '
+                   'listen on. Ignored if unix_socket is not set.')),
+    cfg.IntOpt('subscription_interval',
+               default=300,
+               min=0,
+               help=_('Interval (in seconds) between checks that the BMCs '
+                      'of the nodes managed by this conductor have an event '
+                      'subscription, creating the missing ones. Set to 0 '
+                      'to disable the check.')),
+    cfg.IntOpt('safety_poll_interval',
+               default=600,
+               min=0,
+               mutable=True,
+               help=_('Interval (in seconds) between polls of the BMC of a '
+                      'subscribed node by the periodic tasks if no event '
+                      'is received, in case an event is lost. Set to 0 to '
+                      'poll on every run of the periodic tasks.')),
+]
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group='redfish_events')
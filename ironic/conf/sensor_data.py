@@ -82,6 +82,42 @@ opts = [
                        'this conductor\'s management. This option supersedes '
                        'the ``send_sensor_data_for_undeployed_nodes`` '
                        'setting.')),
+    cfg.IntOpt('batch_size',
+               default=1,
+               min=1,
+               mutable=True,
+               help=_('Number of nodes whose sensor data messages are '
+                      'aggregated into a single notification. With the '
+                      'default of 1, one notification is sent per node. '
+                      'With a greater value, notifications of the '
+                      '``hardware.metrics.batch`` event type are sent, '
+                      'with the messages of the nodes in their payload. '
+                      'Consumers of the sensor data must support this '
+                      'format.')),
+    cfg.BoolOpt('send_changes_only',
+                default=False,
+                mutable=True,
+                help=_('If to only send the sensors of a node whose readings '
+                       'changed since they were last sent, see '
+                       '``change_threshold``. A full snapshot of the sensors '
+                       'is still sent every ``full_snapshot_interval`` '
+                       'seconds. Messages carry a ``payload_type`` field '
+                       'set to ``full`` or ``delta``.')),
+    cfg.FloatOpt('change_threshold',
+                 default=0.0,
+                 min=0.0,
+                 mutable=True,
+                 help=_('Relative change of a numeric sensor reading, e.g. '
+                        '0.05 for 5%, below which the sensor is considered '
+                        'unchanged when ``send_changes_only`` is enabled. '
+                        'The default of 0 sends any change.')),
+    cfg.IntOpt('full_snapshot_interval',
+               default=3600,
+               min=0,
+               mutable=True,
+               help=_('Seconds between full snapshots of the sensors of a '
+                      'node when ``send_changes_only`` is enabled. Set to 0 '
+                      'to always send full snapshots.')),
 ]
 
 
@@ -52,6 +52,8 @@ class Connection(object, metaclass=abc.ABCMeta):
         :param filters: Filters to apply. Defaults to None.
 
                         :associated: True | False
+                        :async_operation: nodes with the given asynchronous
+                            operation pending
                         :chassis_uuid: uuid of chassis
                         :conductor_group: conductor group name
                         :console_enabled: True | False
@@ -82,6 +84,7 @@ class Connection(object, metaclass=abc.ABCMeta):
                         :uuid: uuid of node
                         :uuid_in: uuid of node (multiple possibilities)
                         :with_power_state: True | False
+                        :with_traits: nodes with all of the given traits
         :param limit: Maximum number of nodes to return.
         :param marker: the last item of the previous page; we return the next
                        result set.
@@ -108,6 +111,11 @@ class Connection(object, metaclass=abc.ABCMeta):
                             nodes with provision_updated_at field before this
                             interval in seconds
                         :shard: nodes with the given shard
+                        :lookup_address_in: nodes with any of the given
+                            inspection lookup addresses
+                        :with_traits: nodes with all of the given traits
+                        :async_operation: nodes with the given asynchronous
+                            operation pending
         :param limit: Maximum number of nodes to return.
         :param marker: the last item of the previous page; we return the next
                        result set.
@@ -200,6 +208,17 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: A node.
         """
 
+    @abc.abstractmethod
+    def get_node_generation(self, node_id):
+        """Return the generation of a node.
+
+        :param node_id: The id or uuid of a node.
+        :returns: A tuple with the time of the last update of the node,
+                  a frozenset of its traits and the current UTC time of
+                  the database.
+        :raises: NodeNotFound if the node does not exist.
+        """
+
     @abc.abstractmethod
     def get_node_by_name(self, node_name):
         """Return a node.
@@ -229,7 +248,8 @@ class Connection(object, metaclass=abc.ABCMeta):
         """
 
     @abc.abstractmethod
-    def update_node(self, node_id, values):
+    def update_node(self, node_id, values, load_relationships=True,
+                    add_async_operations=(), remove_async_operations=()):
         """Update properties of a node.
 
         :param node_id: The id or uuid of a node.
@@ -246,6 +266,17 @@ class Connection(object, metaclass=abc.ABCMeta):
                               'my-field-2': val2,
                              }
                         }
+        :param load_relationships: Whether to load the tags and traits of
+                                   the returned node. If False, they are
+                                   not loaded, saving database round trips.
+        :param add_async_operations: An iterable of kinds of asynchronous
+                                     operations to record as pending on the
+                                     node in the same transaction, see
+                                     :meth:`add_node_async_operations`.
+        :param remove_async_operations: An iterable of kinds of asynchronous
+                                        operations to record as no longer
+                                        pending on the node in the same
+                                        transaction.
         :returns: A node.
         :raises: NodeAssociated
         :raises: NodeNotFound
@@ -333,6 +364,14 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: A list of ports.
         """
 
+    @abc.abstractmethod
+    def get_ports_by_node_uuids(self, node_uuids):
+        """List all the ports of several nodes.
+
+        :param node_uuids: A list of node UUIDs.
+        :returns: A list of ports.
+        """
+
     @abc.abstractmethod
     def get_ports_by_portgroup_id(self, portgroup_id, limit=None, marker=None,
                                   sort_key=None, sort_dir=None, filters=None):
@@ -446,6 +485,14 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: A list of portgroups.
         """
 
+    @abc.abstractmethod
+    def get_portgroups_by_node_uuids(self, node_uuids):
+        """List all the portgroups of several nodes.
+
+        :param node_uuids: A list of node UUIDs.
+        :returns: A list of portgroups.
+        """
+
     @abc.abstractmethod
     def get_portgroups_by_shards(self, shards, limit=None, marker=None,
                                  sort_key=None, sort_dir=None, project=None):
@@ -664,9 +711,12 @@ class Connection(object, metaclass=abc.ABCMeta):
         """
 
     @abc.abstractmethod
-    def get_online_conductors(self):
+    def get_online_conductors(self, conductor_group=None):
         """Get a list conductor hostnames that are online and active.
 
+        :param conductor_group: If provided, only the conductors of this
+                                conductor group are returned.
+
         :returns: A list of conductor hostnames.
         """
 
@@ -722,6 +772,59 @@ class Connection(object, metaclass=abc.ABCMeta):
         :raises: NodeNotFound
         """
 
+    @abc.abstractmethod
+    def record_node_heartbeat(self, node_id, provision_state,
+                              driver_internal_info, touch_provisioning=False):
+        """Record an agent heartbeat on a node which is not reserved.
+
+        The node is updated in a single transaction, without reserving it,
+        only if it is not reserved and still in the expected provision state.
+
+        :param node_id: The id of a node.
+        :param provision_state: The expected provision state of the node.
+        :param driver_internal_info: A dictionary of values to merge into
+                                     the node's driver_internal_info.
+        :param touch_provisioning: Whether to also update the node's
+                                   'provision_updated_at' property.
+        :returns: True if the heartbeat was recorded, False if the node is
+                  reserved or its provision state has changed.
+        :raises: NodeNotFound
+        """
+
+    @abc.abstractmethod
+    def set_node_lookup_addresses(self, node_id, addresses):
+        """Replace the addresses used to look up a node during inspection.
+
+        Nodes can then be found with the ``lookup_address_in`` filter of
+        :meth:`get_node_list`.
+
+        :param node_id: The id of a node.
+        :param addresses: A list of addresses, an empty list removes all
+                          addresses of the node.
+        """
+
+    @abc.abstractmethod
+    def add_node_async_operations(self, node_id, kinds):
+        """Record asynchronous operations as pending on a node.
+
+        Nodes can then be found with the ``async_operation`` filter of
+        :meth:`get_node_list`.
+
+        :param node_id: The id of a node.
+        :param kinds: An iterable of kinds of operations, see
+                      :mod:`ironic.common.async_operations`. Operations
+                      already recorded are ignored.
+        """
+
+    @abc.abstractmethod
+    def remove_node_async_operations(self, node_id, kinds):
+        """Record asynchronous operations as no longer pending on a node.
+
+        :param node_id: The id of a node.
+        :param kinds: An iterable of kinds of operations. Operations not
+                      recorded are ignored.
+        """
+
     @abc.abstractmethod
     def set_node_tags(self, node_id, tags):
         """Replace all of the node tags with specified list of tags.
@@ -1270,6 +1373,27 @@ class Connection(object, metaclass=abc.ABCMeta):
         :raises: NodeAssociated
         """
 
+    @abc.abstractmethod
+    def claim_node_for_allocation(self, allocation_id, node_uuids, filters):
+        """Reserve one of the given nodes for an allocation.
+
+        The first node that matches the filters and is neither locked nor
+        associated is updated with the instance_uuid and traits from the
+        allocation, and the allocation becomes active, in one transaction.
+        Nodes locked by other transactions are skipped with
+        ``SELECT ... FOR UPDATE SKIP LOCKED`` on MySQL 8.0, MariaDB 10.6,
+        PostgreSQL 9.5 and newer. On older versions the nodes are not locked
+        before being claimed, and None is returned if another transaction
+        claims the same node first.
+
+        :param allocation_id: Allocation ID
+        :param node_uuids: A list of UUIDs of candidate nodes.
+        :param filters: Node filters as accepted by :meth:`get_node_list`.
+        :returns: The updated allocation or None if no node could be claimed.
+        :raises: AllocationNotFound
+        :raises: InstanceAssociated
+        """
+
     @abc.abstractmethod
     def take_over_allocation(self, allocation_id, old_conductor_id,
                              new_conductor_id):
@@ -1390,6 +1514,15 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: A list of deploy templates.
         """
 
+    @abc.abstractmethod
+    def get_deploy_templates_generation(self):
+        """Retrieve the generation of the deploy templates.
+
+        :returns: A revision number which is incremented whenever a deploy
+                  template or one of its steps is created, updated or
+                  destroyed.
+        """
+
     @abc.abstractmethod
     def create_runbook(self, values):
         """Create a runbook.
@@ -1485,6 +1618,15 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: A list of runbooks.
         """
 
+    @abc.abstractmethod
+    def get_runbooks_generation(self):
+        """Retrieve the generation of the runbooks.
+
+        :returns: A revision number which is incremented whenever a runbook
+                  or one of its steps or traits is created, updated or
+                  destroyed.
+        """
+
     @abc.abstractmethod
     def set_runbook_traits(self, runbook_id, traits, version):
         """Replace all of the runbook traits with the specified list.
@@ -1639,7 +1781,12 @@ class Connection(object, metaclass=abc.ABCMeta):
     def create_node_inventory(self, values):
         """Create a new inventory record.
 
+        Any existing inventory record of the node is replaced, unless
+        ``[inventory]skip_unchanged_data`` is enabled and it contains the same
+        data, in which case only its update time is changed.
+
         :param values: Dict of values.
+        :returns: A node inventory.
         """
 
     @abc.abstractmethod
@@ -1657,6 +1804,62 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: An inventory of a node.
         """
 
+    @abc.abstractmethod
+    def create_provision_job_batch(self, values):
+        """Create a new batch record of a bulk provisioning job.
+
+        :param values: Dict of values.
+        :returns: A provision job batch.
+        """
+
+    @abc.abstractmethod
+    def update_provision_job_batch(self, batch_uuid, values):
+        """Update a batch record of a bulk provisioning job.
+
+        :param batch_uuid: The uuid of a provision job batch.
+        :param values: Dict of values to update.
+        :raises: ProvisionJobNotFound if the batch does not exist.
+        :returns: A provision job batch.
+        """
+
+    @abc.abstractmethod
+    def get_provision_job_batch_by_uuid(self, batch_uuid):
+        """Return a batch record of a bulk provisioning job.
+
+        :param batch_uuid: The uuid of a provision job batch.
+        :raises: ProvisionJobNotFound if the batch does not exist.
+        :returns: A provision job batch.
+        """
+
+    @abc.abstractmethod
+    def get_provision_job_batches(self, job_uuid):
+        """Return all batch records of a bulk provisioning job.
+
+        :param job_uuid: The uuid of a provision job.
+        :raises: ProvisionJobNotFound if the job has no batches.
+        :returns: A list of provision job batches.
+        """
+
+    @abc.abstractmethod
+    def get_unfinished_provision_job_batches(self, conductors):
+        """Return pending and running batches of the given conductors.
+
+        :param conductors: A list of conductor hostnames.
+        :returns: A list of provision job batches.
+        """
+
+    @abc.abstractmethod
+    def destroy_finished_provision_jobs(self, older_than, limit):
+        """Delete bulk provisioning jobs which finished long ago.
+
+        A job is deleted with all its batches once all of them are finished
+        and none of them was updated after ``older_than``.
+
+        :param older_than: A datetime.
+        :param limit: The maximum number of jobs to delete.
+        :returns: The number of deleted jobs.
+        """
+
     @abc.abstractmethod
     def get_shard_list(self):
         """Retrieve a list of shards.
@@ -1795,6 +1998,14 @@ class Connection(object, metaclass=abc.ABCMeta):
         :returns: A list of inspection rules.
         """
 
+    @abc.abstractmethod
+    def get_inspection_rules_generation(self):
+        """Retrieve the generation of the inspection rules.
+
+        :returns: A revision number which is incremented whenever an
+                  inspection rule is created, updated or destroyed.
+        """
+
     @abc.abstractmethod
     def destroy_inspection_rule(self, inspection_rule_id):
         """Destroy an inspection rule.
@@ -0,0 +1,72 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""add node async operations table
+
+Revision ID: 3a8c5e1f9b27
+Revises: b2908b37e4a0
+Create Date: 2026-10-19 17:02:11.508316
+
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import column, table
+
+# revision identifiers, used by Alembic.
+revision = '3a8c5e1f9b27'
+down_revision = 'b2908b37e4a0'
+
+# Keys of driver_internal_info of the operations known at the time of this
+# migration, later additions are recorded when the nodes are saved.
+_KINDS = ('firmware_updates', 'raid_configs', 'raid_task_monitor_uris',
+          'redfish_bios_state', 'redfish_fw_updates')
+
+node = table('nodes',
+             column('id', sa.Integer),
+             column('driver_internal_info', sa.Text))
+
+
+def upgrade():
+    operations = op.create_table(
+        'node_async_operations',
+        sa.Column('version', sa.String(length=15), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('node_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['node_id'], ['nodes.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'node_id', 'kind',
+            name='uniq_node_async_operations0node_id0kind'),
+        sa.Index('node_async_operations_kind_idx', 'kind'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8mb4')
+
+    connection = op.get_bind()
+    rows = []
+    for node_id, info in connection.execute(
+            sa.select(node.c.id, node.c.driver_internal_info)):
+        try:
+            info = json.loads(info) if info else {}
+        except ValueError:
+            continue
+        if not isinstance(info, dict):
+            continue
+        rows.extend({'node_id': node_id, 'kind': kind}
+                    for kind in _KINDS if info.get(kind))
+    if rows:
+        op.bulk_insert(operations, rows)
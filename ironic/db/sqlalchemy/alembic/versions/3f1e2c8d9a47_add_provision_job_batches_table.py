@@ -0,0 +1,53 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""add provision job batches table
+
+Revision ID: 3f1e2c8d9a47
+Revises: 9fb44677ef15
+Create Date: 2026-10-19 09:12:41.371925
+
+"""
+
+from alembic import op
+from oslo_db.sqlalchemy import types as db_types
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f1e2c8d9a47'
+down_revision = '9fb44677ef15'
+
+
+def upgrade():
+    op.create_table(
+        'provision_job_batches',
+        sa.Column('version', sa.String(length=15), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('uuid', sa.String(length=36), nullable=False),
+        sa.Column('job_uuid', sa.String(length=36), nullable=False),
+        sa.Column('conductor', sa.String(length=255), nullable=True),
+        sa.Column('target', sa.String(length=15), nullable=False),
+        sa.Column('state', sa.String(length=15), nullable=False),
+        sa.Column('project', sa.String(length=255), nullable=True),
+        sa.Column('nodes', db_types.JsonEncodedList(
+            mysql_as_long=True).impl, nullable=True),
+        sa.Column('params', db_types.JsonEncodedDict(
+            mysql_as_long=True).impl, nullable=True),
+        sa.Column('results', db_types.JsonEncodedDict(
+            mysql_as_long=True).impl, nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid', name='uniq_provision_job_batches0uuid'),
+        sa.Index('provision_job_batches_job_uuid_idx', 'job_uuid'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8mb4')
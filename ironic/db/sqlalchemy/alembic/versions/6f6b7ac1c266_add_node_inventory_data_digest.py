@@ -0,0 +1,32 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""add node inventory data digest
+
+Revision ID: 6f6b7ac1c266
+Revises: 3f1e2c8d9a47
+Create Date: 2026-10-19 14:05:17.402613
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '6f6b7ac1c266'
+down_revision = '3f1e2c8d9a47'
+
+
+def upgrade():
+    op.add_column('node_inventory',
+                  sa.Column('data_digest', sa.String(length=64),
+                            nullable=True))
@@ -0,0 +1,45 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""add node lookup addresses table
+
+Revision ID: b2908b37e4a0
+Revises: 6f6b7ac1c266
+Create Date: 2026-10-19 15:31:48.119274
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b2908b37e4a0'
+down_revision = '6f6b7ac1c266'
+
+
+def upgrade():
+    op.create_table(
+        'node_lookup_addresses',
+        sa.Column('version', sa.String(length=15), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('node_id', sa.Integer(), nullable=False),
+        sa.Column('address', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['node_id'], ['nodes.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'node_id', 'address',
+            name='uniq_node_lookup_addresses0node_id0address'),
+        sa.Index('node_lookup_addresses_address_idx', 'address'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8mb4')
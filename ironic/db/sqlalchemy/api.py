@@ -17,6 +17,7 @@
 import collections
 import datetime
 import functools
+import hashlib
 import json
 import logging
 import threading
@@ -28,6 +29,7 @@ from oslo_db.sqlalchemy import enginefacade
 from oslo_db.sqlalchemy import orm as sa_orm
 from oslo_db.sqlalchemy import utils as db_utils
 from oslo_log import log
+from oslo_serialization import jsonutils
 from oslo_utils import netutils
 from oslo_utils import strutils
 from oslo_utils import timeutils
@@ -36,6 +38,7 @@ from osprofiler import sqlalchemy as osp_sqlalchemy
 import sqlalchemy as sa
 from sqlalchemy import or_
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Load
 from sqlalchemy.orm import selectinload
 from sqlalchemy import sql
@@ -65,6 +68,19 @@ synchronized = lockutils.synchronized_with_prefix('ironic-')
 # maximum number of traits per resource provider allowed in placement.
 MAX_TRAITS_PER_NODE = 50
 
+# Kinds of asynchronous operations which conductors of the previous release
+# start without recording them, see backfill_node_async_operations.
+_PREVIOUS_ASYNC_OPERATIONS = ('firmware_updates', 'raid_configs',
+                              'raid_task_monitor_uris', 'redfish_bios_state',
+                              'redfish_fw_updates')
+# JSON encodings of the values which do not denote a pending operation.
+_EMPTY_JSON_VALUES = ('{}', '[]', '""', 'null', 'false')
+
+# Names of the revision counters incremented on each change of some records.
+_DEPLOY_TEMPLATES_REVISION = 'deploy_templates'
+_INSPECTION_RULES_REVISION = 'inspection_rules'
+_RUNBOOKS_REVISION = 'runbooks'
+
 
 def wrap_sqlite_retry(f):
 
@@ -130,6 +146,22 @@ def _wrap_session(session):
     return session
 
 
+def _supports_skip_locked(dialect):
+    """Whether SELECT ... FOR UPDATE SKIP LOCKED can be used.
+
+    SKIP LOCKED requires MySQL 8.0, MariaDB 10.6 or PostgreSQL 9.5. SQLite
+    does not lock rows and ignores FOR UPDATE.
+    """
+    version = dialect.server_version_info or ()
+    if dialect.name == 'mysql':
+        if getattr(dialect, 'is_mariadb', False):
+            return version >= (10, 6)
+        return version >= (8, 0)
+    if dialect.name == 'postgresql':
+        return version >= (9, 5)
+    return True
+
+
 def _get_node_select():
     """Returns a SQLAlchemy Select Object for Nodes.
 
@@ -180,6 +212,59 @@ def _get_runbook_select_with_steps():
               selectinload(models.Runbook.traits))
 
 
+class _utcnow(sql.expression.FunctionElement):
+    """The current UTC time of the database, as a naive datetime."""
+    type = sa.DateTime()
+    inherit_cache = True
+
+
+@compiles(_utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # NOTE: SQLite returns the current time in UTC.
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(_utcnow, 'mysql')
+def _utcnow_mysql(element, compiler, **kw):
+    return 'UTC_TIMESTAMP()'
+
+
+@compiles(_utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+def _bump_revision(session, name):
+    """Increment a revision counter in the transaction of a change.
+
+    :param session: the session of the write transaction.
+    :param name: the name of the revision counter.
+    """
+    query = sa.update(models.Revision).where(
+        models.Revision.name == name).values(
+            revision=models.Revision.revision + 1)
+    if session.execute(query).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.add(models.Revision(name=name, revision=1))
+    except db_exc.DBDuplicateEntry:
+        # created by a concurrent transaction in the meantime
+        session.execute(query)
+
+
+def _get_revision(name):
+    """Return the current value of a revision counter.
+
+    :param name: the name of the revision counter.
+    :returns: an integer, 0 if the counter has never been incremented.
+    """
+    query = sa.select(models.Revision.revision).where(
+        models.Revision.name == name)
+    with _session_for_read() as session:
+        return session.execute(query).scalar() or 0
+
+
 def model_query(model, *args, **kwargs):
     """Query helper for simpler session usage.
 
@@ -491,7 +576,8 @@ class Connection(api.Connection):
     _NODE_FILTERS = ({'chassis_uuid', 'reserved_by_any_of',
                       'provisioned_before', 'inspection_started_before',
                       'description_contains', 'project', 'include_children',
-                      'parent_node'}
+                      'parent_node', 'lookup_address_in', 'with_traits',
+                      'async_operation'}
                      | _NODE_QUERY_FIELDS
                      | set(_NODE_IN_QUERY_FIELDS)
                      | set(_NODE_NON_NULL_FILTERS))
@@ -560,6 +646,24 @@ class Connection(api.Connection):
             project = filters['project']
             query = query.filter((models.Node.owner == project)
                                  | (models.Node.lessee == project))
+        if 'lookup_address_in' in filters:
+            query = query.filter(models.Node.id.in_(
+                sa.select(models.NodeLookupAddress.node_id).where(
+                    models.NodeLookupAddress.address.in_(
+                        filters['lookup_address_in']))))
+        if 'async_operation' in filters:
+            query = query.filter(models.Node.id.in_(
+                sa.select(models.NodeAsyncOperation.node_id).where(
+                    models.NodeAsyncOperation.kind
+                    == filters['async_operation'])))
+        if filters.get('with_traits'):
+            traits = set(filters['with_traits'])
+            query = query.filter(models.Node.id.in_(
+                sa.select(models.NodeTrait.node_id)
+                .where(models.NodeTrait.trait.in_(traits))
+                .group_by(models.NodeTrait.node_id)
+                .having(sa.func.count(models.NodeTrait.trait)
+                        == len(traits))))
         # Determine parent/child node handling
         if not filters.get('include_children', False):
             if 'parent_node' in filters:
@@ -907,6 +1011,23 @@ class Connection(api.Connection):
             raise exception.NodeNotFound(node=node_name)
         return res
 
+    def get_node_generation(self, node_id):
+        query = sa.select(
+            models.Node.updated_at, models.NodeTrait.trait, _utcnow()
+        ).outerjoin(
+            models.NodeTrait, models.NodeTrait.node_id == models.Node.id)
+        if strutils.is_int_like(node_id):
+            query = query.where(models.Node.id == int(node_id))
+        else:
+            query = query.where(models.Node.uuid == node_id)
+        with _session_for_read() as session:
+            rows = session.execute(query).all()
+        if not rows:
+            raise exception.NodeNotFound(node=node_id)
+        return (rows[0][0],
+                frozenset(trait for _, trait, _ in rows if trait is not None),
+                rows[0][2])
+
     def get_node_by_instance(self, instance):
         if not uuidutils.is_uuid_like(instance):
             raise exception.InvalidUUID(uuid=instance)
@@ -990,6 +1111,16 @@ class Connection(api.Connection):
                 models.NodeInventory).filter_by(node_id=node_id)
             inventory_query.delete()
 
+            # delete all lookup addresses for this node
+            lookup_query = session.query(
+                models.NodeLookupAddress).filter_by(node_id=node_id)
+            lookup_query.delete()
+
+            # delete all pending asynchronous operations of the node
+            async_operation_query = session.query(
+                models.NodeAsyncOperation).filter_by(node_id=node_id)
+            async_operation_query.delete()
+
             # delete all firmware components attached to the node
             firmware_component_query = session.query(
                 models.FirmwareComponent).filter_by(node_id=node_id)
@@ -998,14 +1129,18 @@ class Connection(api.Connection):
             query.delete()
 
     @wrap_sqlite_retry
-    def update_node(self, node_id, values):
+    def update_node(self, node_id, values, load_relationships=True,
+                    add_async_operations=(), remove_async_operations=()):
         # NOTE(dtantsur): this can lead to very strange errors
         if 'uuid' in values:
             msg = _("Cannot overwrite UUID for an existing Node.")
             raise exception.InvalidParameterValue(err=msg)
 
         try:
-            return self._do_update_node(node_id, values)
+            return self._do_update_node(
+                node_id, values, load_relationships=load_relationships,
+                add_async_operations=add_async_operations,
+                remove_async_operations=remove_async_operations)
         except db_exc.DBDuplicateEntry as e:
             if 'name' in e.columns:
                 raise exception.DuplicateName(name=values['name'])
@@ -1018,41 +1153,81 @@ class Connection(api.Connection):
             else:
                 raise
 
+    @staticmethod
+    def _node_update_values(values):
+        """Build the ordered SET clause of a node update.
+
+        The provision and inspection timestamps are derived from the new
+        and the current provision state in SQL, so that no prior SELECT is
+        needed.
+        """
+        derived = {}
+        if 'provision_state' in values:
+            now = timeutils.utcnow()
+            new_state = values['provision_state']
+            was_inspecting = models.Node.provision_state.in_(
+                [states.INSPECTING, states.INSPECTWAIT])
+            derived['provision_updated_at'] = now
+            if new_state == states.INSPECTING:
+                derived['inspection_started_at'] = now
+                derived['inspection_finished_at'] = None
+            elif new_state == states.MANAGEABLE:
+                derived['inspection_finished_at'] = sa.case(
+                    (was_inspecting, now),
+                    else_=models.Node.inspection_finished_at)
+                derived['inspection_started_at'] = sa.case(
+                    (was_inspecting, sa.null()),
+                    else_=models.Node.inspection_started_at)
+            elif new_state == states.INSPECTFAIL:
+                derived['inspection_started_at'] = sa.case(
+                    (was_inspecting, sa.null()),
+                    else_=models.Node.inspection_started_at)
+
+        # MySQL evaluates the assignments from left to right,
+        # so the derived values referring to the current provision state must
+        # come before the provision state itself.
+        ordered = [(getattr(models.Node, key), value)
+                   for key, value in derived.items()]
+        ordered.extend((getattr(models.Node, key), value)
+                       for key, value in values.items()
+                       if key not in derived)
+        return ordered
+
     @oslo_db_api.retry_on_deadlock
-    def _do_update_node(self, node_id, values):
+    def _do_update_node(self, node_id, values, load_relationships=True,
+                        add_async_operations=(),
+                        remove_async_operations=()):
+        columns = models.Node.__table__.columns
+        select = add_identity_where(sa.select(*columns), models.Node, node_id)
+        query = add_identity_where(sa.update(models.Node), models.Node,
+                                   node_id)
         with _session_for_write() as session:
-            # NOTE(mgoddard): Don't issue a joined query for the update as this
-            # does not work with PostgreSQL.
-            query = session.query(models.Node)
-            query = add_identity_filter(query, node_id)
-            try:
-                ref = query.with_for_update().one()
-            except NoResultFound:
+            if not values:
+                # Nothing to update, only fetch the current values.
+                row = session.execute(select).one_or_none()
+            else:
+                query = query.ordered_values(
+                    *self._node_update_values(values))
+                if session.get_bind().dialect.update_returning:
+                    row = session.execute(
+                        query.returning(*columns)).one_or_none()
+                else:
+                    row = None
+                    if session.execute(query).rowcount:
+                        row = session.execute(select).one()
+            if row is None:
                 raise exception.NodeNotFound(node=node_id)
+            self._add_node_async_operations(session, row.id,
+                                            add_async_operations)
+            self._remove_node_async_operations(session, row.id,
+                                               remove_async_operations)
 
-            if 'provision_state' in values:
-                values['provision_updated_at'] = timeutils.utcnow()
-                if values['provision_state'] == states.INSPECTING:
-                    values['inspection_started_at'] = timeutils.utcnow()
-                    values['inspection_finished_at'] = None
-                elif ((ref.provision_state == states.INSPECTING
-                       or ref.provision_state == states.INSPECTWAIT)
-                      and values['provision_state'] == states.MANAGEABLE):
-                    values['inspection_finished_at'] = timeutils.utcnow()
-                    values['inspection_started_at'] = None
-                elif ((ref.provision_state == states.INSPECTING
-                       or ref.provision_state == states.INSPECTWAIT)
-                      and values['provision_state'] == states.INSPECTFAIL):
-                    values['inspection_started_at'] = None
-
-            ref.update(values)
+        if not load_relationships:
+            # A transient model, its tags and traits are not loaded.
+            return models.Node(**row._mapping)
 
-        # Return the updated node model joined with all relevant fields.
         query = _get_node_select()
         query = add_identity_filter(query, node_id)
-        # FIXME(TheJulia): This entire method needs to be re-written to
-        # use the proper execution format for SQLAlchemy 2.0. Likely
-        # A query, independent update, and a re-query on the transaction.
         with _session_for_read() as session:
             res = session.execute(query).one()[0]
         return res
@@ -1139,6 +1314,14 @@ class Connection(api.Connection):
         return _paginate_query(models.Port, limit, marker,
                                sort_key, sort_dir, query)
 
+    def get_ports_by_node_uuids(self, node_uuids):
+        node_ids = sa.select(models.Node) \
+            .where(models.Node.uuid.in_(node_uuids)) \
+            .with_only_columns(models.Node.id)
+        query = sa.select(models.Port) \
+            .where(models.Port.node_id.in_(node_ids))
+        return _paginate_query(models.Port, query=query)
+
     def get_ports_by_portgroup_id(self, portgroup_id, limit=None, marker=None,
                                   sort_key=None, sort_dir=None, owner=None,
                                   project=None, filters=None):
@@ -1268,6 +1451,14 @@ class Connection(api.Connection):
         return _paginate_query(models.Portgroup, limit, marker,
                                sort_key, sort_dir, query)
 
+    def get_portgroups_by_node_uuids(self, node_uuids):
+        node_ids = sa.select(models.Node) \
+            .where(models.Node.uuid.in_(node_uuids)) \
+            .with_only_columns(models.Node.id)
+        query = sa.select(models.Portgroup) \
+            .where(models.Portgroup.node_id.in_(node_ids))
+        return _paginate_query(models.Portgroup, query=query)
+
     def get_portgroups_by_shards(self, shards, limit=None, marker=None,
                                  sort_key=None, sort_dir=None, project=None):
         shard_node_ids = sa.select(models.Node) \
@@ -1609,10 +1800,13 @@ class Connection(api.Connection):
             result = [row[0] for row in result]
         return result
 
-    def get_online_conductors(self):
+    def get_online_conductors(self, conductor_group=None):
         with _session_for_read() as session:
             query = session.query(models.Conductor.hostname)
             query = _filter_active_conductors(query)
+            if conductor_group is not None:
+                query = query.filter(
+                    models.Conductor.conductor_group == conductor_group)
             return [row[0] for row in query]
 
     def list_conductor_hardware_interfaces(self, conductor_id):
@@ -1668,6 +1862,81 @@ class Connection(api.Connection):
             if count == 0:
                 raise exception.NodeNotFound(node=node_id)
 
+    @wrap_sqlite_retry
+    @oslo_db_api.retry_on_deadlock
+    def record_node_heartbeat(self, node_id, provision_state,
+                              driver_internal_info, touch_provisioning=False):
+        with _session_for_write() as session:
+            query = session.query(models.Node)
+            query = add_identity_filter(query, node_id)
+            try:
+                ref = query.with_for_update().one()
+            except NoResultFound:
+                raise exception.NodeNotFound(node=node_id)
+
+            if ref.reservation or ref.provision_state != provision_state:
+                return False
+
+            info = dict(ref.driver_internal_info or {})
+            info.update(driver_internal_info)
+            values = {'driver_internal_info': info}
+            if touch_provisioning:
+                values['provision_updated_at'] = timeutils.utcnow()
+            session.execute(
+                sa.update(models.Node).
+                where(models.Node.id == ref.id).
+                values(**values).
+                execution_options(synchronize_session=False)
+            )
+        return True
+
+    @oslo_db_api.retry_on_deadlock
+    def set_node_lookup_addresses(self, node_id, addresses):
+        with _session_for_write() as session:
+            session.execute(
+                sa.delete(models.NodeLookupAddress)
+                .where(models.NodeLookupAddress.node_id == node_id))
+            if addresses:
+                session.execute(
+                    sa.insert(models.NodeLookupAddress),
+                    [{'node_id': node_id, 'address': address}
+                     for address in sorted(set(addresses))])
+
+    @oslo_db_api.retry_on_deadlock
+    def add_node_async_operations(self, node_id, kinds):
+        with _session_for_write() as session:
+            self._add_node_async_operations(session, node_id, kinds)
+
+    @staticmethod
+    def _add_node_async_operations(session, node_id, kinds):
+        kinds = set(kinds)
+        if not kinds:
+            return
+        existing = set(session.execute(
+            sa.select(models.NodeAsyncOperation.kind).where(
+                models.NodeAsyncOperation.node_id == node_id,
+                models.NodeAsyncOperation.kind.in_(kinds))).scalars())
+        if kinds - existing:
+            session.execute(
+                sa.insert(models.NodeAsyncOperation),
+                [{'node_id': node_id, 'kind': kind}
+                 for kind in sorted(kinds - existing)])
+
+    @oslo_db_api.retry_on_deadlock
+    def remove_node_async_operations(self, node_id, kinds):
+        with _session_for_write() as session:
+            self._remove_node_async_operations(session, node_id, kinds)
+
+    @staticmethod
+    def _remove_node_async_operations(session, node_id, kinds):
+        kinds = set(kinds)
+        if not kinds:
+            return
+        session.execute(
+            sa.delete(models.NodeAsyncOperation).where(
+                models.NodeAsyncOperation.node_id == node_id,
+                models.NodeAsyncOperation.kind.in_(kinds)))
+
     def _check_node_exists(self, session, node_id):
         if not session.query(models.Node).where(
                 models.Node.id == node_id).scalar():
@@ -2232,6 +2501,63 @@ class Connection(api.Connection):
 
         return total_to_migrate, num_migrated
 
+    def backfill_node_async_operations(self, context, max_count):
+        """Record the asynchronous operations pending on nodes.
+
+        Conductors of the previous release start asynchronous operations
+        without recording them in the node_async_operations table. The
+        periodic tasks polling these operations would not find such nodes
+        once the release version is no longer pinned.
+
+        :param context: the admin context
+        :param max_count: The maximum number of objects to migrate. Must be
+                          >= 0. If zero, all the objects will be migrated.
+        :returns: A 2-tuple, 1. the total number of objects that need to be
+                  migrated (at the beginning of this call) and 2. the number
+                  of migrated objects.
+        """
+        def _candidates(session, kind):
+            # NOTE: driver_internal_info is stored as JSON text, so the nodes
+            # holding a non-empty value under the key can be picked without
+            # loading and decoding the field of every node.
+            info = sa.type_coerce(models.Node.driver_internal_info, sa.Text)
+            key = '%%"%s": ' % kind
+            return session.query(models.Node.id).outerjoin(
+                models.NodeAsyncOperation,
+                sql.and_(models.NodeAsyncOperation.node_id == models.Node.id,
+                         models.NodeAsyncOperation.kind == kind)
+            ).filter(
+                models.NodeAsyncOperation.id.is_(None),
+                info.like(key + '%'),
+                *(info.not_like(key + empty + '%')
+                  for empty in _EMPTY_JSON_VALUES)
+            )
+
+        with _session_for_read() as session:
+            total_to_migrate = sum(
+                _candidates(session, kind).count()
+                for kind in _PREVIOUS_ASYNC_OPERATIONS)
+
+        if not total_to_migrate:
+            return 0, 0
+
+        num_migrated = 0
+        with _session_for_write() as session:
+            for kind in _PREVIOUS_ASYNC_OPERATIONS:
+                query = _candidates(session, kind).order_by(models.Node.id)
+                if max_count:
+                    if num_migrated >= max_count:
+                        break
+                    query = query.limit(max_count - num_migrated)
+                rows = [{'node_id': node_id, 'kind': kind}
+                        for (node_id,) in query]
+                if rows:
+                    session.execute(sa.insert(models.NodeAsyncOperation),
+                                    rows)
+                    num_migrated += len(rows)
+
+        return total_to_migrate, num_migrated
+
     @staticmethod
     def _verify_max_traits_per_node(node_id, num_traits):
         """Verify that an operation would not exceed the per-node trait limit.
@@ -2580,6 +2906,57 @@ class Connection(api.Connection):
                 raise
         return ref
 
+    @oslo_db_api.retry_on_deadlock
+    def claim_node_for_allocation(self, allocation_id, node_uuids, filters):
+        filters = dict(filters, uuid_in=node_uuids, associated=False,
+                       reserved=False)
+        # These values are used in exception handling.
+        instance_uuid = node_uuid = None
+        try:
+            with _session_for_write() as session:
+                query = session.query(models.Allocation)
+                query = add_identity_filter(query, allocation_id)
+                ref = query.one()
+                instance_uuid = ref.uuid
+
+                query = sa.select(models.Node.id, models.Node.uuid,
+                                  models.Node.instance_info)
+                query = self._add_nodes_filters(query, filters)
+                query = query.where(models.Node.allocation_id == sql.null())
+                query = query.limit(1)
+                if _supports_skip_locked(session.get_bind().dialect):
+                    query = query.with_for_update(skip_locked=True)
+                node = session.execute(query).first()
+                if node is None:
+                    return None
+                node_uuid = node.uuid
+
+                iinfo = dict(node.instance_info or {})
+                iinfo['traits'] = ref.traits or []
+                # Guard against backends without row locking or without
+                # SKIP LOCKED support, see _supports_skip_locked.
+                query = sa.update(models.Node).where(
+                    models.Node.id == node.id,
+                    models.Node.instance_uuid == sql.null(),
+                    models.Node.reservation == sql.null()).values(
+                        allocation_id=ref.id,
+                        instance_uuid=instance_uuid,
+                        instance_info=iinfo)
+                if session.execute(query).rowcount != 1:
+                    return None
+
+                ref.update({'node_id': node.id, 'state': states.ACTIVE,
+                            'last_error': None})
+                session.flush()
+        except NoResultFound:
+            raise exception.AllocationNotFound(allocation=allocation_id)
+        except db_exc.DBDuplicateEntry:
+            # The allocation UUID is already used on some node as
+            # instance_uuid.
+            raise exception.InstanceAssociated(
+                instance_uuid=instance_uuid, node=node_uuid)
+        return ref
+
     @oslo_db_api.retry_on_deadlock
     def take_over_allocation(self, allocation_id, old_conductor_id,
                              new_conductor_id):
@@ -2669,6 +3046,7 @@ class Connection(api.Connection):
                         name=values['name'])
                 raise exception.DeployTemplateAlreadyExists(
                     uuid=values['uuid'])
+            _bump_revision(session, _DEPLOY_TEMPLATES_REVISION)
         return template
 
     def _update_deploy_template_steps(self, session, template_id, steps):
@@ -2738,6 +3116,7 @@ class Connection(api.Connection):
                 if steps is not None:
                     self._update_deploy_template_steps(session, ref.id, steps)
                 session.flush()
+                _bump_revision(session, _DEPLOY_TEMPLATES_REVISION)
 
             with _session_for_read() as session:
                 # Return the updated template joined with all relevant fields.
@@ -2764,6 +3143,7 @@ class Connection(api.Connection):
                 id=template_id).delete()
             if count == 0:
                 raise exception.DeployTemplateNotFound(template=template_id)
+            _bump_revision(session, _DEPLOY_TEMPLATES_REVISION)
 
     def _get_deploy_template(self, field, value):
         """Helper method for retrieving a deploy template."""
@@ -2805,6 +3185,9 @@ class Connection(api.Connection):
             ).all()
             return [r[0] for r in res]
 
+    def get_deploy_templates_generation(self):
+        return _get_revision(_DEPLOY_TEMPLATES_REVISION)
+
     @staticmethod
     def _get_runbook_steps(steps, runbook_id=None):
         results = []
@@ -2849,6 +3232,7 @@ class Connection(api.Connection):
                     raise exception.RunbookAlreadyExists(
                         uuid=values['uuid'])
                 raise
+            _bump_revision(session, _RUNBOOKS_REVISION)
         # Re-fetch so that the traits relationship is eagerly loaded within
         # a fresh read session (the write session above is now closed).
         return self.get_runbook_by_uuid(runbook.uuid)
@@ -2920,6 +3304,7 @@ class Connection(api.Connection):
                 if steps is not None:
                     self._update_runbook_steps(session, ref.id, steps)
                 session.flush()
+                _bump_revision(session, _RUNBOOKS_REVISION)
 
             with _session_for_read() as session:
                 # Return the updated runbook joined with all relevant fields.
@@ -2948,6 +3333,7 @@ class Connection(api.Connection):
                 id=runbook_id).delete()
             if count == 0:
                 raise exception.RunbookNotFound(runbook=runbook_id)
+            _bump_revision(session, _RUNBOOKS_REVISION)
 
     def _get_runbook(self, field, value):
         """Helper method for retrieving a runbook."""
@@ -2991,6 +3377,9 @@ class Connection(api.Connection):
             ).all()
             return [r[0] for r in res]
 
+    def get_runbooks_generation(self):
+        return _get_revision(_RUNBOOKS_REVISION)
+
     def _check_runbook_exists(self, session, runbook_id):
         if not session.query(models.Runbook).where(
                 models.Runbook.id == runbook_id).scalar():
@@ -3020,6 +3409,7 @@ class Connection(api.Connection):
                 runbook_id=runbook_id).delete()
             for runbook_trait in runbook_traits:
                 session.add(runbook_trait)
+            _bump_revision(session, _RUNBOOKS_REVISION)
 
         return runbook_traits
 
@@ -3029,6 +3419,7 @@ class Connection(api.Connection):
             self._check_runbook_exists(session, runbook_id)
             session.query(models.RunbookTrait).filter_by(
                 runbook_id=runbook_id).delete()
+            _bump_revision(session, _RUNBOOKS_REVISION)
 
     def get_runbook_traits_by_runbook_id(self, runbook_id):
         with _session_for_read() as session:
@@ -3048,6 +3439,7 @@ class Connection(api.Connection):
                 self._check_runbook_exists(session, runbook_id)
                 session.add(runbook_trait)
                 session.flush()
+                _bump_revision(session, _RUNBOOKS_REVISION)
         except db_exc.DBDuplicateEntry:
             # Ignore duplicate traits
             pass
@@ -3060,6 +3452,8 @@ class Connection(api.Connection):
             self._check_runbook_exists(session, runbook_id)
             result = session.query(models.RunbookTrait).filter_by(
                 runbook_id=runbook_id, trait=trait).delete()
+            if result:
+                _bump_revision(session, _RUNBOOKS_REVISION)
 
         if not result:
             raise exception.RunbookTraitNotFound(
@@ -3232,12 +3626,37 @@ class Connection(api.Connection):
     def create_node_inventory(self, values):
         inventory = models.NodeInventory()
         inventory.update(values)
+        if CONF.inventory.skip_unchanged_data:
+            data = jsonutils.dumps([values.get('inventory_data'),
+                                    values.get('plugin_data')],
+                                   sort_keys=True)
+            inventory.data_digest = hashlib.sha256(
+                data.encode('utf-8')).hexdigest()
         with _session_for_write() as session:
-            session.query(
-                models.NodeInventory
-            ).filter(
-                models.NodeInventory.node_id == values['node_id']
-            ).delete()
+            existing = session.execute(
+                sa.select(models.NodeInventory.id,
+                          models.NodeInventory.created_at,
+                          models.NodeInventory.data_digest)
+                .where(models.NodeInventory.node_id == values['node_id'])
+            ).all()
+            if (len(existing) == 1 and inventory.data_digest is not None
+                    and existing[0].data_digest == inventory.data_digest):
+                # The same data is already stored, avoid rewriting it.
+                inventory.id = existing[0].id
+                inventory.created_at = existing[0].created_at
+                inventory.updated_at = timeutils.utcnow()
+                session.execute(
+                    sa.update(models.NodeInventory)
+                    .where(models.NodeInventory.id == inventory.id)
+                    .values(updated_at=inventory.updated_at))
+                return inventory
+
+            if existing:
+                session.query(
+                    models.NodeInventory
+                ).filter(
+                    models.NodeInventory.node_id == values['node_id']
+                ).delete()
             session.add(inventory)
             session.flush()
         return inventory
@@ -3277,6 +3696,81 @@ class Connection(api.Connection):
             raise exception.NodeInventoryNotFound(node=node_id)
         return res
 
+    @oslo_db_api.retry_on_deadlock
+    def create_provision_job_batch(self, values):
+        if not values.get('uuid'):
+            values['uuid'] = uuidutils.generate_uuid()
+        batch = models.ProvisionJobBatch()
+        batch.update(values)
+        with _session_for_write() as session:
+            session.add(batch)
+            session.flush()
+        return batch
+
+    @oslo_db_api.retry_on_deadlock
+    def update_provision_job_batch(self, batch_uuid, values):
+        with _session_for_write() as session:
+            query = session.query(models.ProvisionJobBatch).filter_by(
+                uuid=batch_uuid)
+            try:
+                ref = query.with_for_update().one()
+            except NoResultFound:
+                raise exception.ProvisionJobNotFound(job=batch_uuid)
+            ref.update(values)
+        return ref
+
+    def get_provision_job_batch_by_uuid(self, batch_uuid):
+        query = sa.select(models.ProvisionJobBatch).where(
+            models.ProvisionJobBatch.uuid == batch_uuid)
+        try:
+            with _session_for_read() as session:
+                return session.execute(query).one()[0]
+        except NoResultFound:
+            raise exception.ProvisionJobNotFound(job=batch_uuid)
+
+    def get_provision_job_batches(self, job_uuid):
+        query = sa.select(models.ProvisionJobBatch).where(
+            models.ProvisionJobBatch.job_uuid == job_uuid
+        ).order_by(models.ProvisionJobBatch.id)
+        with _session_for_read() as session:
+            res = [r[0] for r in session.execute(query).all()]
+        if not res:
+            raise exception.ProvisionJobNotFound(job=job_uuid)
+        return res
+
+    def get_unfinished_provision_job_batches(self, conductors):
+        query = sa.select(models.ProvisionJobBatch).where(
+            models.ProvisionJobBatch.conductor.in_(conductors),
+            models.ProvisionJobBatch.state.in_(
+                [states.PROVISION_JOB_PENDING, states.PROVISION_JOB_RUNNING])
+        ).order_by(models.ProvisionJobBatch.id)
+        with _session_for_read() as session:
+            return [r[0] for r in session.execute(query).all()]
+
+    @oslo_db_api.retry_on_deadlock
+    def destroy_finished_provision_jobs(self, older_than, limit):
+        model = models.ProvisionJobBatch
+        changed_at = sa.func.coalesce(model.updated_at, model.created_at)
+        with _session_for_write() as session:
+            candidates = set(session.execute(
+                sa.select(model.job_uuid).where(
+                    model.state == states.PROVISION_JOB_FINISHED,
+                    changed_at < older_than,
+                ).distinct().limit(limit)).scalars())
+            if not candidates:
+                return 0
+            # Jobs with a batch still running or recently finished are kept.
+            candidates -= set(session.execute(
+                sa.select(model.job_uuid).where(
+                    model.job_uuid.in_(candidates),
+                    sa.or_(model.state != states.PROVISION_JOB_FINISHED,
+                           changed_at >= older_than),
+                ).distinct()).scalars())
+            if candidates:
+                session.execute(sa.delete(model).where(
+                    model.job_uuid.in_(candidates)))
+        return len(candidates)
+
     def get_shard_list(self):
         """Return a list of shards.
 
@@ -3440,6 +3934,7 @@ class Connection(api.Connection):
             except db_exc.DBDuplicateEntry:
                 raise exception.InspectionRuleAlreadyExists(
                     uuid=values['uuid'])
+            _bump_revision(session, _INSPECTION_RULES_REVISION)
         return inspection_rule
 
     def update_inspection_rule(self, rule_uuid, values):
@@ -3457,6 +3952,7 @@ class Connection(api.Connection):
                 raise exception.InspectionRuleNotFound(
                     rule=rule_uuid)
             ref.update(values)
+            _bump_revision(session, _INSPECTION_RULES_REVISION)
         return ref
 
     def _get_inspection_rule(self, field, value):
@@ -3493,6 +3989,9 @@ class Connection(api.Connection):
         return _paginate_query(models.InspectionRule, limit, marker,
                                sort_key, sort_dir, query)
 
+    def get_inspection_rules_generation(self):
+        return _get_revision(_INSPECTION_RULES_REVISION)
+
     def destroy_inspection_rule(self, inspection_rule_id):
         with _session_for_write() as session:
             count = session.query(models.InspectionRule).filter_by(
@@ -3500,3 +3999,4 @@ class Connection(api.Connection):
             if count == 0:
                 raise exception.InspectionRuleNotFound(
                     rule=inspection_rule_id)
+            _bump_revision(session, _INSPECTION_RULES_REVISION)
@@ -17,9 +17,11 @@
 SQLAlchemy models for baremetal data.
 """
 
+import base64
 from os import path
 from typing import List
 from urllib import parse as urlparse
+import zlib
 
 from oslo_db import options as db_options
 from oslo_db.sqlalchemy import models
@@ -80,6 +82,7 @@ def _truncate_event(event, max_bytes):
         + encoded[-tail_limit:].decode("utf-8", errors="ignore")
     )
 
+
 class TruncatedText(types.TypeDecorator):
     """Custom type to truncate text to MySQL's 64k limit."""
 
@@ -94,6 +97,42 @@ class TruncatedText(types.TypeDecorator):
             return _truncate_event(value, max_bytes=MAX_EVENT_BYTES)
         return value
 
+
+# Header of compressed JSON values: the algorithm and the format version.
+COMPRESSED_JSON_HEADER = 'zlib1:'
+
+
+class CompressedJsonEncodedDict(db_types.JsonEncodedDict):
+    """JSON-encoded dict stored compressed when configured.
+
+    Compressed values are stored as base64 text prefixed with
+    ``COMPRESSED_JSON_HEADER``, values without it are plain JSON. Both are
+    accepted when reading, so that the compression can be enabled or
+    disabled at any time.
+    """
+
+    cache_ok = True
+    """Indicates this custom type is safe to cache in SQLAlchemy."""
+
+    def process_bind_param(self, value, dialect):
+        """Serialize the value and compress it if configured."""
+        value = super().process_bind_param(value, dialect)
+        # Services of the previous release cannot read compressed values.
+        if (CONF.inventory.data_compression == 'none'
+                or CONF.pin_release_version):
+            return value
+        compressed = zlib.compress(value.encode('utf-8'))
+        return (COMPRESSED_JSON_HEADER
+                + base64.b64encode(compressed).decode('ascii'))
+
+    def process_result_value(self, value, dialect):
+        """Decompress the value if needed and deserialize it."""
+        if value is not None and value.startswith(COMPRESSED_JSON_HEADER):
+            value = zlib.decompress(base64.b64decode(
+                value[len(COMPRESSED_JSON_HEADER):])).decode('utf-8')
+        return super().process_result_value(value, dialect)
+
+
 class IronicBase(models.TimestampMixin,
                  models.ModelBase):
 
@@ -554,9 +593,49 @@ class NodeInventory(Base):
         Index('inventory_node_id_idx', 'node_id'),
         table_args())
     id = Column(Integer, primary_key=True)
-    inventory_data = Column(db_types.JsonEncodedDict(mysql_as_long=True))
-    plugin_data = Column(db_types.JsonEncodedDict(mysql_as_long=True))
+    inventory_data = Column(CompressedJsonEncodedDict(mysql_as_long=True))
+    plugin_data = Column(CompressedJsonEncodedDict(mysql_as_long=True))
     node_id = Column(Integer, ForeignKey('nodes.id'), nullable=True)
+    data_digest = Column(String(64), nullable=True)
+
+
+class NodeLookupAddress(Base):
+    """Represents an address used to look up a node during inspection."""
+    __tablename__ = 'node_lookup_addresses'
+    __table_args__ = (
+        schema.UniqueConstraint(
+            'node_id', 'address',
+            name='uniq_node_lookup_addresses0node_id0address'),
+        Index('node_lookup_addresses_address_idx', 'address'),
+        table_args())
+    id = Column(Integer, primary_key=True)
+    node_id = Column(Integer, ForeignKey('nodes.id'), nullable=False)
+    address = Column(String(255), nullable=False)
+
+
+class NodeAsyncOperation(Base):
+    """Represents an asynchronous operation pending on a node."""
+    __tablename__ = 'node_async_operations'
+    __table_args__ = (
+        schema.UniqueConstraint(
+            'node_id', 'kind',
+            name='uniq_node_async_operations0node_id0kind'),
+        Index('node_async_operations_kind_idx', 'kind'),
+        table_args())
+    id = Column(Integer, primary_key=True)
+    node_id = Column(Integer, ForeignKey('nodes.id'), nullable=False)
+    kind = Column(String(255), nullable=False)
+
+
+class Revision(Base):
+    """Represents a counter incremented on each change of some records."""
+    __tablename__ = 'revisions'
+    __table_args__ = (
+        schema.UniqueConstraint('name', name='uniq_revisions0name'),
+        table_args())
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    revision = Column(BigInteger, nullable=False, default=0)
 
 
 class FirmwareComponent(Base):
@@ -666,6 +745,27 @@ class InspectionRule(Base):
                      nullable=False)
 
 
+class ProvisionJobBatch(Base):
+    """Represents one conductor batch of a bulk provisioning job."""
+
+    __tablename__ = 'provision_job_batches'
+    __table_args__ = (
+        schema.UniqueConstraint('uuid',
+                                name='uniq_provision_job_batches0uuid'),
+        Index('provision_job_batches_job_uuid_idx', 'job_uuid'),
+        table_args())
+    id = Column(Integer, primary_key=True)
+    uuid = Column(String(36), nullable=False)
+    job_uuid = Column(String(36), nullable=False)
+    conductor = Column(String(255), nullable=True)
+    target = Column(String(15), nullable=False)
+    state = Column(String(15), nullable=False)
+    project = Column(String(255), nullable=True)
+    nodes = Column(db_types.JsonEncodedList(mysql_as_long=True))
+    params = Column(db_types.JsonEncodedDict(mysql_as_long=True))
+    results = Column(db_types.JsonEncodedDict(mysql_as_long=True))
+
+
 def get_class(model_name):
     """Returns the model class with the specified name.
 
@@ -497,6 +497,25 @@ class BaseInterface(abc.ABC):
         """
         return self.service_steps
 
+    def get_steps_cache_key(self, task: TaskManager, step_type: str):
+        """Get the key of the steps of the interface for a node.
+
+        The conductor caches the steps returned by ``get_<step_type>_steps``
+        for a node as long as this key does not change. By default, only the
+        steps declared with decorators, which do not depend on the node, are
+        cached. Interfaces overriding ``get_<step_type>_steps`` may override
+        this method to allow caching of their steps.
+
+        :param task: A TaskManager object
+        :param step_type: 'clean', 'deploy', 'verify' or 'service'.
+        :returns: A hashable key, an empty tuple if the steps are the same
+            for all nodes, or None if the steps must not be cached.
+        """
+        method = 'get_%s_steps' % step_type
+        if getattr(type(self), method) is getattr(BaseInterface, method):
+            return ()
+        return None
+
     def execute_service_step(self, task: TaskManager, step: ServiceStep):
         """Execute the service step on task.node.
 
@@ -863,6 +882,20 @@ class PowerInterface(BaseInterface):
         """
         return True
 
+    def get_power_states(self, tasks):
+        """Return the power states of several nodes.
+
+        Used to poll the nodes waiting for a power state transition in
+        batches. Interfaces able to query several nodes at once may
+        override it, the default implementation calls ``get_power_state``
+        for each node.
+
+        :param tasks: a list of TaskManager instances with nodes using this
+            interface.
+        :returns: a list of power states, in the order of the tasks.
+        """
+        return [self.get_power_state(task) for task in tasks]
+
 
 class ConsoleInterface(BaseInterface):
     """Interface for console-related actions."""
@@ -43,6 +43,7 @@ from ironic.drivers.modules import agent_base
 from ironic.drivers.modules import agent_client
 from ironic.drivers.modules import boot_mode_utils
 from ironic.drivers.modules import deploy_utils
+from ironic.drivers.modules import image_prefetch
 from ironic.drivers import utils as driver_utils
 
 
@@ -317,6 +318,17 @@ class CustomAgentDeploy(agent_base.AgentBaseMixin,
                   if not conductor_steps.find_step(steps, step)]
         return steps
 
+    def get_steps_cache_key(self, task, step_type):
+        """Get the key of the steps of the interface for a node.
+
+        The deploy steps are keyed on the steps cached from the agent.
+        """
+        if (step_type == 'deploy'
+                and type(self).get_deploy_steps
+                is CustomAgentDeploy.get_deploy_steps):
+            return agent_base.get_steps_cache_key(task, step_type)
+        return super().get_steps_cache_key(task, step_type)
+
     @METRICS.timer('CustomAgentDeploy.execute_deploy_step')
     def execute_deploy_step(self, task, step):
         """Execute a deploy step.
@@ -558,6 +570,7 @@ class CustomAgentDeploy(agent_base.AgentBaseMixin,
         :param task: a TaskManager instance.
         """
         super().clean_up(task)
+        image_prefetch.discard(task.node.uuid)
         deploy_utils.destroy_http_instance_images(task.node)
 
 
@@ -565,10 +578,21 @@ class AgentDeploy(CustomAgentDeploy):
     """Interface for deploy-related actions."""
 
     def _update_instance_info(self, task):
-        """Update instance information with extra data for deploy."""
-        task.node.instance_info = (
-            deploy_utils.build_instance_info_for_deploy(task))
-        task.node.save()
+        """Update instance information with extra data for deploy.
+
+        With ``[agent]image_prefetch``, the instance information of a
+        deployment is built in the background and applied by the
+        ``write_image`` deploy step.
+        """
+        node = task.node
+        if (CONF.agent.image_prefetch
+                and node.provision_state == states.DEPLOYING
+                and deploy_utils.get_boot_option(node) == 'local'):
+            image_prefetch.start(task,
+                                 deploy_utils.build_instance_info_for_deploy)
+            return
+        node.instance_info = deploy_utils.build_instance_info_for_deploy(task)
+        node.save()
 
     @METRICS.timer('AgentDeploy.validate')
     def validate(self, task):
@@ -654,6 +678,7 @@ class AgentDeploy(CustomAgentDeploy):
     def write_image(self, task):
         if not task.driver.storage.should_write_image(task):
             return
+        image_prefetch.apply(task, deploy_utils.build_instance_info_for_deploy)
         node = task.node
         image_source = node.instance_info.get('image_source')
         LOG.debug('Continuing deploy for node %(node)s with image %(img)s',
@@ -1079,6 +1104,24 @@ class AgentRAID(base.RAIDInterface):
         """
         return agent_base.get_steps(task, 'deploy', interface='raid')
 
+    def get_steps_cache_key(self, task, step_type):
+        """Get the key of the steps of the interface for a node.
+
+        The clean and deploy steps are keyed on the steps cached from the
+        agent.
+        """
+        method = 'get_%s_steps' % step_type
+        if (step_type in ('clean', 'deploy')
+                and getattr(type(self), method)
+                is getattr(AgentRAID, method)):
+            priorities = ()
+            if step_type == 'clean':
+                priorities = (CONF.deploy.delete_configuration_priority,
+                              CONF.deploy.create_configuration_priority)
+            return agent_base.get_steps_cache_key(task, step_type,
+                                                  *priorities)
+        return super().get_steps_cache_key(task, step_type)
+
     @METRICS.timer('AgentRAID.apply_configuration')
     @base.service_step(priority=0,
                        argsinfo=_RAID_APPLY_CONFIGURATION_ARGSINFO)
@@ -349,6 +349,27 @@ def get_steps(task, step_type, interface=None, override_priorities=None):
     return steps
 
 
+def get_steps_cache_key(task, step_type, *priorities):
+    """Get the key of the steps cached from the agent of a node.
+
+    See :meth:`ironic.drivers.base.BaseInterface.get_steps_cache_key`.
+
+    :param task: a TaskManager object containing the node
+    :param step_type: 'clean', 'deploy' or 'service'
+    :param priorities: the configured priorities overriding the ones
+        reported by the agent.
+    :returns: A key changing with every refresh of the cached steps, or
+        None if the cached steps were not stored by :meth:`refresh_steps`.
+    """
+    info = task.node.driver_internal_info
+    if 'agent_cached_%s_steps' % step_type not in info:
+        return (False,) + priorities
+    refreshed = info.get('agent_cached_%s_steps_refreshed' % step_type)
+    if refreshed is None:
+        return None
+    return (True, refreshed, info.get('hardware_manager_version')) + priorities
+
+
 def find_step(task, step_type, interface, name):
     """Find the given in-band step."""
     steps = get_steps(task, step_type, interface)
@@ -913,6 +934,23 @@ class AgentBaseMixin(object):
         """
         return get_steps(task, 'service')
 
+    def get_steps_cache_key(self, task, step_type):
+        """Get the key of the steps of the interface for a node.
+
+        The clean and service steps are keyed on the steps cached from the
+        agent.
+        """
+        method = 'get_%s_steps' % step_type
+        if (step_type in ('clean', 'service')
+                and getattr(type(self), method)
+                is getattr(AgentBaseMixin, method)):
+            priorities = ()
+            if step_type == 'clean':
+                priorities = (CONF.deploy.erase_devices_priority,
+                              CONF.deploy.erase_devices_metadata_priority)
+            return get_steps_cache_key(task, step_type, *priorities)
+        return super().get_steps_cache_key(task, step_type)
+
     @METRICS.timer('AgentBaseMixin.refresh_steps')
     def refresh_steps(self, task, step_type):
         """Refresh the node's cached clean/deploy steps from the booted agent.
@@ -983,6 +1021,7 @@ class AgentBaseMixin(object):
         node.timestamp_driver_internal_info(
             'agent_cached_%s_steps_refreshed' % step_type)
         node.save()
+        conductor_steps.forget_node_steps(node.uuid)
         LOG.debug('Refreshed agent %(type)s step cache for node %(node)s: '
                   '%(steps)s', {'node': node.uuid, 'steps': steps,
                                 'type': step_type})
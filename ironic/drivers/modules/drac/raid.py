@@ -23,6 +23,7 @@ from ironic.common import exception
 from ironic.common.i18n import _
 from ironic.common import metrics_utils
 from ironic.common import states
+from ironic.conductor import bmc_events
 from ironic.conductor import periodics
 from ironic.conductor import utils as manager_utils
 from ironic.conf import CONF
@@ -445,6 +446,8 @@ class DracRedfishRAID(redfish_raid.RedfishRAID):
         predicate=lambda n: (
             n.driver_internal_info.get('raid_task_monitor_uris')
         ),
+        async_operation='raid_task_monitor_uris',
+        poll_event=bmc_events.TASK,
     )
     def _query_raid_tasks_status(self, task, manager, context):
         """Periodic task to check the progress of running RAID tasks"""
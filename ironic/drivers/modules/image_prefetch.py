@@ -0,0 +1,169 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Preparation of instance images in the background of a deployment.
+
+Building the instance information for a deployment may download, cache,
+convert and checksum the instance image on the conductor, which takes long
+for large images. With ``[agent]image_prefetch`` enabled, this starts when
+the deployment is prepared and runs while the node boots the agent and
+executes the deploy steps which do not need the image. The deploy step
+writing the image waits for it.
+
+The prepared information is only kept in memory. If the deployment is
+continued by another conductor, or if the instance info was changed while it
+was prepared, it is built again by the step which needs it.
+"""
+
+import copy
+import threading
+
+import futurist
+from oslo_log import log
+
+from ironic.conductor import task_manager
+from ironic.conf import CONF
+
+LOG = log.getLogger(__name__)
+
+PREFETCH_FLAG = 'image_prefetch'
+"""driver_internal_info flag marking that the instance info is prepared in
+the background."""
+
+# driver_internal_info fields which may be changed when building the
+# instance info.
+_INTERNAL_FIELDS = ('image_source', 'container_image_type')
+
+_lock = threading.Lock()
+
+_executor = None
+
+# node UUID -> future with (original instance_info, new instance_info,
+# internal fields)
+_prefetches = {}
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = futurist.DynamicThreadPoolExecutor(
+                max_workers=CONF.image_download_concurrency)
+        return _executor
+
+
+def _build(context, node_uuid, build_instance_info):
+    # The node is locked by the deployment, the task only reads it.
+    with task_manager.acquire(context, node_uuid, shared=True,
+                              purpose='image prefetch') as task:
+        original = copy.deepcopy(task.node.instance_info)
+        instance_info = build_instance_info(task)
+        internal_info = task.node.driver_internal_info
+        return original, instance_info, {field: internal_info.get(field)
+                                         for field in _INTERNAL_FIELDS}
+
+
+def start(task, build_instance_info):
+    """Start building the instance info of a node in the background.
+
+    The node is flagged so that :func:`apply` knows to wait for the result.
+
+    :param task: a TaskManager instance with an exclusive lock.
+    :param build_instance_info: a function building the instance info,
+        called with a task with a shared lock and returning the new
+        instance info. It may also change the fields of driver_internal_info
+        listed in ``_INTERNAL_FIELDS``.
+    """
+    node = task.node
+    discard(node.uuid)
+    LOG.debug('Preparing the instance image of node %s in the background',
+              node.uuid)
+    node.set_driver_internal_info(PREFETCH_FLAG, True)
+    node.save()
+    future = _get_executor().submit(_build, task.context, node.uuid,
+                                    build_instance_info)
+    with _lock:
+        _prefetches[node.uuid] = future
+
+
+def apply(task, build_instance_info):
+    """Update the instance info of a node if it is prepared in background.
+
+    Waits for the preparation started by :func:`start`. If it was started
+    by another conductor, or before a restart, or if the instance info of
+    the node changed since, the instance info is built again with
+    build_instance_info.
+
+    :param task: a TaskManager instance with an exclusive lock.
+    :param build_instance_info: the function passed to :func:`start`.
+    :raises: any exception raised by build_instance_info.
+    """
+    node = task.node
+    if not node.del_driver_internal_info(PREFETCH_FLAG):
+        return
+
+    with _lock:
+        future = _prefetches.pop(node.uuid, None)
+    if future is None:
+        LOG.debug('The instance image of node %s was not prepared by this '
+                  'conductor, preparing it now', node.uuid)
+        node.instance_info = build_instance_info(task)
+    else:
+        if not future.done():
+            LOG.info('Waiting for the instance image of node %s to be '
+                     'prepared', node.uuid)
+        try:
+            original, instance_info, internal_fields = future.result()
+        except Exception:
+            node.save()
+            raise
+        if node.instance_info != original:
+            LOG.info('The instance info of node %s changed while its '
+                     'instance image was prepared, preparing it again',
+                     node.uuid)
+            node.instance_info = build_instance_info(task)
+        else:
+            node.instance_info = instance_info
+            for field, value in internal_fields.items():
+                if value is None:
+                    node.del_driver_internal_info(field)
+                else:
+                    node.set_driver_internal_info(field, value)
+    node.save()
+
+
+def discard(node_uuid):
+    """Drop the preparation of the instance image of a node.
+
+    A preparation in progress is waited for, so that it does not create
+    files after the caller removed them.
+
+    :param node_uuid: the UUID of the node.
+    """
+    with _lock:
+        future = _prefetches.pop(node_uuid, None)
+    if future is None or future.cancel():
+        return
+    try:
+        future.result()
+    except Exception as e:
+        LOG.debug('Discarded preparation of the instance image of node '
+                  '%(node)s failed: %(error)s',
+                  {'node': node_uuid, 'error': e})
+
+
+def reset_image_prefetch():
+    """Drop all preparations in progress without waiting for them."""
+    with _lock:
+        for future in _prefetches.values():
+            future.cancel()
+        _prefetches.clear()
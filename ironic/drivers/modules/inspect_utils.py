@@ -293,16 +293,27 @@ def _lookup_by_bmc(context, bmc_addresses, mac_addresses, known_node=None):
     """
     # NOTE(dtantsur): the same BMC hostname can be used by several nodes,
     # e.g. in case of Redfish. Find all suitable nodes first.
-    nodes_by_bmc = set()
-    for candidate in objects.Node.list(
-            context,
-            filters={'provision_state': states.INSPECTWAIT},
-            fields=['uuid', 'driver_internal_info']):
-        # This field has to be populated on inspection start
-        for addr in candidate.driver_internal_info.get(
-                LOOKUP_CACHE_FIELD) or ():
-            if addr in bmc_addresses:
-                nodes_by_bmc.add(candidate.uuid)
+    if CONF.pin_release_version:
+        # Conductors of the previous release only cache the addresses in
+        # driver_internal_info.
+        nodes_by_bmc = set()
+        for candidate in objects.Node.list(
+                context,
+                filters={'provision_state': states.INSPECTWAIT},
+                fields=['uuid', 'driver_internal_info']):
+            # This field has to be populated on inspection start
+            for addr in candidate.driver_internal_info.get(
+                    LOOKUP_CACHE_FIELD) or ():
+                if addr in bmc_addresses:
+                    nodes_by_bmc.add(candidate.uuid)
+    else:
+        nodes_by_bmc = {
+            candidate.uuid for candidate in objects.Node.list(
+                context,
+                filters={'provision_state': states.INSPECTWAIT,
+                         'lookup_address_in': list(bmc_addresses)},
+                fields=['uuid'])
+        }
 
     # NOTE(dtantsur): if none of the nodes found by the BMC match the one
     # found by the MACs, something is definitely wrong.
@@ -458,8 +469,15 @@ def _get_bmc_addresses(node):
 
 
 def cache_lookup_addresses(node):
-    """Cache lookup addresses for a quick access."""
+    """Cache lookup addresses for a quick access.
+
+    The addresses are stored in an indexed table, as well as in the node's
+    driver_internal_info for services of the previous release.
+    """
     addresses = _get_bmc_addresses(node)
+    # Replace the addresses in all cases, so that no stale address is left
+    # when the node has no BMC address any more.
+    node.set_lookup_addresses(list(addresses))
     if addresses:
         LOG.debug('Will use the following BMC addresses for inspection lookup '
                   'of node %(node)s: %(addr)s',
@@ -468,11 +486,12 @@ def cache_lookup_addresses(node):
     else:
         LOG.debug('No BMC addresses to use for inspection lookup of node %s',
                   node.uuid)
-        clear_lookup_addresses(node)
+        node.del_driver_internal_info(LOOKUP_CACHE_FIELD)
 
 
 def clear_lookup_addresses(node):
     """Remove lookup addresses cached on the node."""
+    node.set_lookup_addresses([])
     return node.del_driver_internal_info(LOOKUP_CACHE_FIELD)
 
 
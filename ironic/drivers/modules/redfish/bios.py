@@ -19,6 +19,7 @@ from ironic.common import exception
 from ironic.common.i18n import _
 from ironic.common import metrics_utils
 from ironic.common import states
+from ironic.conductor import bmc_events
 from ironic.conductor import periodics
 from ironic.conductor import utils as manager_utils
 from ironic.conf import CONF
@@ -508,6 +509,8 @@ class RedfishBIOS(base.BIOSInterface):
                                         states.DEPLOYWAIT}},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get(_DII_STATE),
+        async_operation=_DII_STATE,
+        poll_event=bmc_events.RESOURCE,
     )
     def _query_bios_apply_status(self, task, manager, context):
         self._check_node_redfish_bios_apply(task)
@@ -0,0 +1,183 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Subscription to and ingest of Redfish events."""
+
+import json
+
+from oslo_log import log
+import sushy
+import webob
+
+from ironic.api.middleware import json_depth
+from ironic.common import exception
+from ironic.common.i18n import _
+from ironic.common import wsgi_service
+from ironic.conductor import bmc_events
+from ironic.conf import CONF
+from ironic.drivers.modules.redfish import utils as redfish_utils
+
+LOG = log.getLogger(__name__)
+
+SUBSCRIPTION_INFO = 'redfish_event_subscription'
+"""Key of driver_internal_info holding the subscription of a node."""
+
+# Event types to subscribe to, if the BMC supports choosing them
+_EVENT_TYPES = frozenset(['StatusChange', 'ResourceUpdated', 'ResourceAdded',
+                          'ResourceRemoved', 'Alert'])
+
+_MAX_BODY_SIZE = 1024 * 1024
+
+
+def event_kinds(record):
+    """Get the kinds of an event record, see :mod:`bmc_events`.
+
+    :param record: an event record from the ``Events`` of a Redfish event.
+    :returns: a frozenset of kinds. Events which are not recognized wake up
+        all consumers.
+    """
+    message_id = record.get('MessageId') or ''
+    if not isinstance(message_id, str):
+        return bmc_events.ALL
+    registry = message_id.split('.', 1)[0]
+    message = message_id.rsplit('.', 1)[-1]
+    if registry == 'TaskEvent':
+        return frozenset([bmc_events.TASK])
+    if 'Power' in message:
+        return frozenset([bmc_events.POWER, bmc_events.RESOURCE])
+    return bmc_events.ALL
+
+
+def needs_subscription(node, manager):
+    """Check if the BMC of a node needs a subscription to this conductor.
+
+    :param node: a node tuple with the ``uuid`` and ``driver_internal_info``
+        fields.
+    :param manager: the conductor manager.
+    """
+    info = node.driver_internal_info.get(SUBSCRIPTION_INFO) or {}
+    return not (bmc_events.is_subscribed(node.uuid)
+                and info.get('host') == manager.host)
+
+
+def subscribe(task, host):
+    """Subscribe to the events of the BMC of a node.
+
+    Replaces the previous subscription of the node, if any. Failures are
+    logged, the BMC of the node is then polled until the next attempt.
+
+    :param task: a TaskManager instance with an exclusive lock.
+    :param host: the host name of this conductor.
+    :returns: True if the subscription was created, otherwise False.
+    """
+    node = task.node
+    try:
+        event_service = redfish_utils.get_event_service(node)
+        _delete_subscription(node, event_service)
+        payload = {
+            'Destination': '%s/%s' % (
+                CONF.redfish_events.destination_url.rstrip('/'), node.uuid),
+            'Protocol': 'Redfish',
+            'Context': bmc_events.subscribe(node.uuid),
+        }
+        event_types = _EVENT_TYPES.intersection(
+            event_type.value for event_type
+            in event_service.get_event_types_for_subscription())
+        if event_types:
+            payload['EventTypes'] = sorted(event_types)
+        subscription = event_service.subscriptions.create(payload)
+    except (exception.RedfishError, exception.RedfishConnectionError,
+            sushy.exceptions.SushyError) as e:
+        bmc_events.unsubscribe(node.uuid)
+        LOG.warning('Unable to subscribe to the Redfish events of node '
+                    '%(node)s, its BMC will be polled. Error: %(error)s',
+                    {'node': node.uuid, 'error': e})
+        return False
+
+    node.set_driver_internal_info(
+        SUBSCRIPTION_INFO,
+        {'host': host,
+         'path': subscription.path if subscription is not None else None})
+    node.save()
+    LOG.info('Subscribed to the Redfish events of node %s', node.uuid)
+    return True
+
+
+def _delete_subscription(node, event_service):
+    """Delete the previous subscription of a node, ignoring failures."""
+    info = node.driver_internal_info.get(SUBSCRIPTION_INFO) or {}
+    if not info.get('path'):
+        return
+    try:
+        event_service.subscriptions.get_member(info['path']).delete()
+    except sushy.exceptions.SushyError as e:
+        LOG.debug('Unable to delete the previous Redfish event subscription '
+                  '%(path)s of node %(node)s: %(error)s',
+                  {'path': info['path'], 'node': node.uuid, 'error': e})
+
+
+class EventListener(wsgi_service.BaseWSGIService):
+    """Receives the Redfish events of the subscribed nodes.
+
+    The BMCs post the events to the destination URL of their subscription,
+    which ends with the UUID of the node. The events of a node are only
+    accepted if they carry the secret token of its subscription in the
+    ``Context`` field.
+    """
+
+    def __init__(self):
+        if not CONF.redfish_events.destination_url:
+            raise exception.ConfigInvalid(
+                error_msg=_('[redfish_events]destination_url is required '
+                            'when [redfish_events]enabled is True'))
+        app = json_depth.JsonDepthMiddleware(
+            self._application,
+            max_depth=CONF.api.max_json_body_depth,
+            max_body_size=_MAX_BODY_SIZE)
+        super().__init__('ironic-redfish-events', app, CONF.redfish_events)
+
+    def _application(self, environment, start_response):
+        """WSGI application receiving Redfish events."""
+        request = webob.Request(environment)
+        response = self._handle(request)
+        return response(environment, start_response)
+
+    def _handle(self, request):
+        if request.method != 'POST':
+            return webob.Response(status_code=405)
+        if (request.content_length or 0) > _MAX_BODY_SIZE:
+            return webob.Response(status_code=413)
+        # Chunked bodies have no content length, limit what is read.
+        body = request.body_file_raw.read(_MAX_BODY_SIZE + 1)
+        if len(body) > _MAX_BODY_SIZE:
+            return webob.Response(status_code=413)
+
+        node_uuid = request.path_info.rstrip('/').rsplit('/', 1)[-1]
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return webob.Response(status_code=400)
+        if (not isinstance(body, dict)
+                or not bmc_events.check_token(node_uuid, body.get('Context'))):
+            LOG.debug('Rejecting Redfish event for unknown node or '
+                      'subscription %s', node_uuid)
+            return webob.Response(status_code=403)
+
+        kinds = set()
+        for record in body.get('Events') or ():
+            if isinstance(record, dict):
+                kinds.update(event_kinds(record))
+        LOG.debug('Received Redfish events %(kinds)s for node %(node)s',
+                  {'kinds': sorted(kinds), 'node': node_uuid})
+        if kinds:
+            bmc_events.notify(node_uuid, kinds)
+        return webob.Response(status_code=204)
@@ -448,7 +448,7 @@ class RedfishFirmware(base.FirmwareInterface):
                   is unresponsive/inaccessible
         """
         try:
-            system = redfish_utils.get_system(node)
+            system = redfish_utils.get_system(node, refresh=True)
             manager = redfish_utils.get_manager(node, system)
             return manager.firmware_version
         except (exception.RedfishError,
@@ -763,7 +763,7 @@ class RedfishFirmware(base.FirmwareInterface):
         while time.time() < end_time:
             try:
                 # Test System resource
-                system = redfish_utils.get_system(node)
+                system = redfish_utils.get_system(node, refresh=True)
 
                 # Test Manager resource
                 redfish_utils.get_manager(node, system)
@@ -945,6 +945,7 @@ class RedfishFirmware(base.FirmwareInterface):
                  states.DEPLOYFAIL, states.SERVICEFAIL], 'maintenance': True},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get('redfish_fw_updates'),
+        async_operation='redfish_fw_updates',
     )
     def _query_update_failed(self, task, manager, context):
 
@@ -968,6 +969,7 @@ class RedfishFirmware(base.FirmwareInterface):
                  states.DEPLOYWAIT, states.SERVICEWAIT]},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get('redfish_fw_updates'),
+        async_operation='redfish_fw_updates',
     )
     def _query_update_status(self, task, manager, context):
         """Periodic job to check firmware update tasks."""
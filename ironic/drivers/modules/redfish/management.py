@@ -34,6 +34,7 @@ from ironic.common import indicator_states
 from ironic.common import metrics_utils
 from ironic.common import states
 from ironic.common import utils
+from ironic.conductor import bmc_events
 from ironic.conductor import periodics
 from ironic.conductor import task_manager
 from ironic.conductor import utils as manager_utils
@@ -42,7 +43,9 @@ from ironic.drivers import base
 from ironic.drivers.modules import boot_mode_utils
 from ironic.drivers.modules import deploy_utils
 from ironic.drivers.modules.redfish import boot as redfish_boot
+from ironic.drivers.modules.redfish import events as redfish_events
 from ironic.drivers.modules.redfish import firmware_utils
+from ironic.drivers.modules.redfish import sensor_utils
 from ironic.drivers.modules.redfish import utils as redfish_utils
 
 LOG = log.getLogger(__name__)
@@ -531,6 +534,7 @@ class RedfishManagement(base.ManagementInterface):
 
         if CONF.redfish.boot_mode_config_timeout:
             threshold = time.time() + CONF.redfish.boot_mode_config_timeout
+            checked_at = time.monotonic()
             while (time.time() <= threshold
                    and system.boot.get('mode') != BOOT_MODE_MAP_REV[mode]):
                 LOG.debug('Still waiting for boot mode of node %(node)s '
@@ -538,7 +542,10 @@ class RedfishManagement(base.ManagementInterface):
                           {'node': task.node.uuid,
                            'value': BOOT_MODE_MAP_REV[mode],
                            'current': system.boot.get('mode')})
-                time.sleep(BOOT_MODE_CONFIG_INTERVAL)
+                # Wakes up early if the BMC reports a change
+                bmc_events.wait(task.node.uuid, [bmc_events.RESOURCE],
+                                BOOT_MODE_CONFIG_INTERVAL, since=checked_at)
+                checked_at = time.monotonic()
                 system.refresh(force=True)
 
             if system.boot.get('mode') != BOOT_MODE_MAP_REV[mode]:
@@ -781,7 +788,9 @@ class RedfishManagement(base.ManagementInterface):
         """Get sensors data.
 
         Collects sensor data from chassis (fans, temperature, power) and
-        storage (drives) with minimal redfish API calls.
+        storage (drives) with minimal redfish API calls. The chassis and the
+        drives are read concurrently, see
+        :mod:`ironic.drivers.modules.redfish.sensor_utils`.
 
         :param task: a TaskManager instance.
         :returns: returns a dict of sensor data grouped by sensor type.
@@ -808,11 +817,10 @@ class RedfishManagement(base.ManagementInterface):
         }
         sensors['Extra'] = baremetal_fields
 
-        # Get chassis with expanded data and process sensors
-        chassis_data = self._process_chassis_sensors(node, system)
-        sensors['Fan'].update(chassis_data['Fan'])
-        sensors['Temperature'].update(chassis_data['Temperature'])
-        sensors['Power'].update(chassis_data['Power'])
+        # Get chassis with expanded data and process sensors, concurrently
+        # with the storage below
+        chassis_future = sensor_utils.submit(
+            node, self._process_chassis_sensors, node, system)
 
         # Process storage sensors (drives)
         # Prioritize SimpleStorage as it requires fewer API calls
@@ -837,6 +845,11 @@ class RedfishManagement(base.ManagementInterface):
 
         sensors['Drive'].update(drive_data.get('Drive', {}))
 
+        chassis_data = chassis_future.result()
+        sensors['Fan'].update(chassis_data['Fan'])
+        sensors['Temperature'].update(chassis_data['Temperature'])
+        sensors['Power'].update(chassis_data['Power'])
+
         return sensors
 
     def _process_chassis_sensors(self, node, system):
@@ -916,21 +929,29 @@ class RedfishManagement(base.ManagementInterface):
             storage_collection_expanded = system.storage_expanded
 
             # Process drives from all storage controllers
-            # M API calls (M is the number of drives)
+            # M API calls (M is the number of drives), issued concurrently
+            drive_futures = []
             for storage in storage_collection_expanded.get_members():
                 try:
-                    if storage.drives_identities:
-                        # Process drives from Storage
-                        for drive in storage.drives:
-                            unique_name, sensor = self._get_sensor_drive(
-                                drive, storage.identity, system_identity)
-                            drives[unique_name] = sensor
+                    for drive_identity in storage.drives_identities or ():
+                        drive_futures.append((storage, sensor_utils.submit(
+                            node, storage.get_drive, drive_identity)))
 
                 except Exception as drive_exc:
                     LOG.debug("Failed to process drives from storage %s: %s",
                               storage.identity, drive_exc)
                     continue
 
+            for storage, future in drive_futures:
+                try:
+                    unique_name, sensor = self._get_sensor_drive(
+                        future.result(), storage.identity, system_identity)
+                    drives[unique_name] = sensor
+
+                except Exception as drive_exc:
+                    LOG.debug("Failed to process drives from storage %s: %s",
+                              storage.identity, drive_exc)
+
             storage_sensors['Drive'].update(drives)
 
         except sushy.exceptions.SushyError as exc:
@@ -1411,6 +1432,20 @@ class RedfishManagement(base.ManagementInterface):
         node.del_driver_internal_info('firmware_cleanup')
         node.save()
 
+    @METRICS.timer('RedfishManagement._subscribe_to_events')
+    @periodics.node_periodic(
+        purpose='subscribing to Redfish events',
+        spacing=lambda: CONF.redfish_events.subscription_interval,
+        enabled=lambda: CONF.redfish_events.enabled,
+        filters={'reserved': False, 'maintenance': False},
+        predicate_extra_fields=['driver_internal_info'],
+        predicate=redfish_events.needs_subscription,
+    )
+    def _subscribe_to_events(self, task, manager, context):
+        """Periodic job to subscribe to the events of the BMCs."""
+        task.upgrade_lock()
+        redfish_events.subscribe(task, manager.host)
+
     @METRICS.timer('RedfishManagement._query_firmware_update_failed')
     @periodics.node_periodic(
         purpose='checking if async firmware update failed',
@@ -1422,6 +1457,7 @@ class RedfishManagement(base.ManagementInterface):
                  'maintenance': True},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get('firmware_updates'),
+        async_operation='firmware_updates',
     )
     def _query_firmware_update_failed(self, task, manager, context):
         """Periodic job to check for failed firmware updates."""
@@ -1446,6 +1482,7 @@ class RedfishManagement(base.ManagementInterface):
                                         states.DEPLOYWAIT}},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get('firmware_updates'),
+        async_operation='firmware_updates',
     )
     def _query_firmware_update_status(self, task, manager, context):
         """Periodic job to check firmware update tasks."""
@@ -1708,13 +1745,16 @@ class RedfishManagement(base.ManagementInterface):
 
         if CONF.redfish.boot_mode_config_timeout:
             threshold = time.time() + CONF.redfish.boot_mode_config_timeout
+            checked_at = time.monotonic()
             while time.time() <= threshold and sb.enabled != state:
                 LOG.debug(
                     'Still waiting for secure boot state of node %(node)s '
                     'to become %(value)s, current is %(current)s',
                     {'node': task.node.uuid, 'value': state,
                      'current': sb.enabled})
-                time.sleep(BOOT_MODE_CONFIG_INTERVAL)
+                bmc_events.wait(task.node.uuid, [bmc_events.RESOURCE],
+                                BOOT_MODE_CONFIG_INTERVAL, since=checked_at)
+                checked_at = time.monotonic()
                 _try_refresh()
 
             if sb.enabled != state:
@@ -125,7 +125,8 @@ class RedfishPower(base.PowerInterface):
         :raises: RedfishConnectionError when it fails to connect to Redfish
         :raises: RedfishError on an error from the Sushy library
         """
-        system = redfish_utils.get_system(task.node)
+        # The power state changes without any request through the System
+        system = redfish_utils.get_system(task.node, refresh=True)
         return GET_POWER_STATE_MAP.get(system.power_state)
 
     @task_manager.require_exclusive_lock
@@ -207,7 +208,7 @@ class RedfishPower(base.PowerInterface):
         :raises: RedfishConnectionError when it fails to connect to Redfish
         :raises: RedfishError on an error from the Sushy library
         """
-        system = redfish_utils.get_system(task.node)
+        system = redfish_utils.get_system(task.node, refresh=True)
         current_power_state = GET_POWER_STATE_MAP.get(system.power_state)
 
         try:
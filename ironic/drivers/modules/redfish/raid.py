@@ -25,6 +25,7 @@ from ironic.common.i18n import _
 from ironic.common import metrics_utils
 from ironic.common import raid
 from ironic.common import states
+from ironic.conductor import bmc_events
 from ironic.conductor import periodics
 from ironic.conductor import utils as manager_utils
 from ironic.conf import CONF
@@ -257,8 +258,9 @@ def _calculate_volume_props(logical_disk, physical_disks, free_space_bytes,
     :raises: RedfishError if physical drives cannot fulfill the logical disk.
     """
     # TODO(billdodd): match e.g. {'size': '> 100'} -> oslo_utils.specs_matcher
+    identities = set(logical_disk['physical_disks'])
     selected_disks = [disk for disk in physical_disks
-                      if disk.identity in logical_disk['physical_disks']]
+                      if disk.identity in identities]
 
     spans_count = _calculate_spans(
         logical_disk['raid_level'], len(selected_disks))
@@ -380,94 +382,335 @@ def _usable_disks_count(raid_level, disks_count):
         _raise_raid_level_not_supported(raid_level)
 
 
-def _assign_disks_to_volume(logical_disks, physical_disks_by_type,
-                            free_space_bytes, disk_to_storage):
-    logical_disk = logical_disks.pop(0)
-    raid_level = logical_disk['raid_level']
+def _volume_disks_range(raid_level, disks_count):
+    """Calculate the range of physical disk counts of a volume
+
+    :param raid_level: RAID level of the virtual disk.
+    :param disks_count: number of physical disks available for the volume.
+    :returns: a tuple with the minimum and the maximum number of disks.
+    :raises: RedfishError if the RAID level is not supported or the disks
+        are too few for a spanned RAID level.
+    """
+    max_spans = _calculate_spans(raid_level, disks_count)
+    min_spans = min([2, max_spans])
+    return (_raid_level_min_disks(raid_level, spans_count=min_spans),
+            _raid_level_max_disks(raid_level, spans_count=max_spans))
+
+
+def _disk_group(disk, disk_to_storage):
+    """Get the group of a physical disk
+
+    Logical disks are only built from disks of the same group, which have the
+    same type, protocol and capacity and are attached to the same storage.
+    """
+    storage = disk_to_storage.get(disk)
+    return (disk.media_type, disk.protocol, disk.capacity_bytes,
+            storage.identity if storage else None)
+
 
-    # iterate over all possible configurations
-    for (disk_type,
-         protocol, size_bytes), disks in physical_disks_by_type.items():
-        if ('disk_type' in logical_disk
-                and logical_disk['disk_type'].lower() != disk_type.lower()):
+def _min_disks_count(logical_disk, group, disks):
+    """Calculate the minimum number of disks of a group for a logical disk
+
+    Only the capacity of the disks is considered, so this is a lower bound
+    of the number of disks which may hold the logical disk.
+
+    :param logical_disk: properties of the logical disk.
+    :param group: the group of the disks, see _disk_group().
+    :param disks: the disks of the group.
+    :returns: the number of disks, or None if the disks cannot hold the
+        logical disk.
+    """
+    disk_type, protocol, _capacity, _storage = group
+    if ('disk_type' in logical_disk
+            and logical_disk['disk_type'].lower() != disk_type.lower()):
+        return None
+    if ('interface_type' in logical_disk
+            and logical_disk['interface_type'].lower()
+            != PROTOCOL_MAP[protocol].lower()):
+        return None
+
+    raid_level = logical_disk['raid_level']
+    try:
+        min_disks, max_disks = _volume_disks_range(raid_level, len(disks))
+    except exception.RedfishError:
+        return None
+
+    disk = disks[0]
+    for disks_count in range(min_disks, min([max_disks, len(disks)]) + 1):
+        if ('number_of_physical_disks' in logical_disk
+                and logical_disk['number_of_physical_disks'] != disks_count):
             continue
-        if ('interface_type' in logical_disk
-                and logical_disk['interface_type'].lower()
-                != PROTOCOL_MAP[protocol].lower()):
+        if disks_count != _usable_disks_count(raid_level, disks_count):
             continue
+        spans_count = _calculate_spans(raid_level, disks_count)
+        if spans_count == 0 or disks_count % spans_count != 0:
+            continue
+        try:
+            max_volume_size_bytes = _max_volume_size_bytes(
+                raid_level, [disk] * disks_count,
+                {disk: disk.capacity_bytes}, spans_count=spans_count)
+        except exception.RedfishError:
+            continue
+        if logical_disk['size_bytes'] == 'MAX':
+            if max_volume_size_bytes > 0:
+                return disks_count
+        elif max_volume_size_bytes >= logical_disk['size_bytes']:
+            return disks_count
+    return None
+
+
+class _DiskAssignment(object):
+    """Search of physical disks for a list of logical disks
+
+    Logical disks are matched in order, trying the disks of each group from
+    the smallest to the largest count, and backtracking when the following
+    logical disks cannot be matched. To keep the search short on servers
+    with many disks:
+
+    * the minimum number of disks of each group needed by each logical disk
+      is calculated once, from the capacity of the disks;
+    * the search backtracks as soon as the remaining free space or disks
+      cannot hold the remaining logical disks;
+    * the states which failed are remembered. Disks of the same group are
+      interchangeable, so a state is the free space of the disks of each
+      group, regardless of which disk has which free space. When none of
+      the remaining logical disks share physical disks, only the number of
+      unused disks of each group matters;
+    * when the remaining logical disks do not share physical disks and
+      cannot be matched after a logical disk, they cannot be matched after
+      the same logical disk using more disks of the same group either.
+
+    None of these change the result of the search, only the time it takes.
+    The number of candidates tried is limited by
+    ``[redfish]raid_config_search_limit``.
+
+    Logical disks sharing physical disks are given the disks with the least
+    free space first. With skip_filled_disks, the disks without enough free
+    space left for the logical disk are skipped instead of failing the
+    candidate. This finds more configurations, but not always the one found
+    without it.
+    """
 
-        # filter out disks without free disk space
-        disks = [disk for disk in disks if free_space_bytes[disk] > 0]
-
-        # sort disks by free size which is important if we have max disks limit
-        # on a volume
-        disks = sorted(
-            disks,
-            key=lambda disk: free_space_bytes[disk])
-
-        # filter out disks already in use if sharing is disabled
-        if ('share_physical_disks' not in logical_disk
-                or not logical_disk['share_physical_disks']):
-            disks = [disk for disk in disks
-                     if disk.capacity_bytes == free_space_bytes[disk]]
-
-        max_spans = _calculate_spans(raid_level, len(disks))
-        min_spans = min([2, max_spans])
-        min_disks = _raid_level_min_disks(raid_level,
-                                          spans_count=min_spans)
-        max_disks = _raid_level_max_disks(raid_level,
-                                          spans_count=max_spans)
-        candidate_max_disks = min([max_disks, len(disks)])
-
-        for disks_count in range(min_disks, candidate_max_disks + 1):
-            if ('number_of_physical_disks' in logical_disk
-                    and logical_disk[
-                        'number_of_physical_disks'] != disks_count):
-                continue
+    def __init__(self, logical_disks, physical_disks_by_type,
+                 disk_to_storage, skip_filled_disks=False):
+        self._groups = [(group, disks)
+                        for group, disks in physical_disks_by_type.items()
+                        if disks]
+        self._disk_to_storage = disk_to_storage
+        self._skip_filled_disks = skip_filled_disks
+        self._count = len(logical_disks)
+        self._needed_disks = [
+            [_min_disks_count(logical_disk, group, disks)
+             for group, disks in self._groups]
+            for logical_disk in logical_disks]
+        self._shared = [bool(logical_disk.get('share_physical_disks'))
+                        for logical_disk in logical_disks]
+        # whether any logical disk from an index on shares physical disks
+        self._shared_from = [any(self._shared[index:])
+                             for index in range(self._count)]
+        # space used by a logical disk is at least its size
+        self._min_sizes = [
+            0 if logical_disk['size_bytes'] == 'MAX'
+            else logical_disk['size_bytes'] // units.Ki * units.Ki
+            for logical_disk in logical_disks]
+        self._failed_states = set()
+        self._candidates_count = 0
+
+    def _state(self, index, free_space_bytes):
+        if self._shared_from[index]:
+            return (index, tuple(
+                tuple(sorted(free_space_bytes[disk] for disk in disks))
+                for _group, disks in self._groups))
+        return (index, tuple(
+            sum(1 for disk in disks
+                if 0 < free_space_bytes[disk] == disk.capacity_bytes)
+            for _group, disks in self._groups))
+
+    def _may_fit(self, index, free_space_bytes):
+        """Check if the free disks may hold the remaining logical disks."""
+        shared = self._shared_from[index]
+        total_free_space = 0
+        usable = []
+        unused = []
+        for _group, disks in self._groups:
+            free_spaces = [free_space_bytes[disk] for disk in disks]
+            unused_free_spaces = [
+                free_space for disk, free_space in zip(disks, free_spaces)
+                if 0 < free_space == disk.capacity_bytes]
+            # only unused disks are left for logical disks not sharing them
+            total_free_space += sum(free_spaces if shared
+                                    else unused_free_spaces)
+            usable.append(sum(1 for free_space in free_spaces
+                              if free_space > 0))
+            unused.append(len(unused_free_spaces))
+
+        if sum(self._min_sizes[index:]) > total_free_space:
+            return False
 
-            # skip invalid disks_count
-            if disks_count != _usable_disks_count(logical_disk['raid_level'],
-                                                  disks_count):
+        needed_unused = 0
+        for volume in range(index, self._count):
+            available = usable if self._shared[volume] else unused
+            counts = [needed for needed, count
+                      in zip(self._needed_disks[volume], available)
+                      if needed is not None and needed <= count]
+            if not counts:
+                return False
+            if not self._shared[volume]:
+                needed_unused += min(counts)
+        return needed_unused <= sum(unused)
+
+    def _select_disks(self, logical_disk, disks, disks_count,
+                      free_space_bytes):
+        """Select the first disks with enough free space for a volume."""
+        if logical_disk['size_bytes'] == 'MAX':
+            # any free space may be used
+            return disks[0:disks_count]
+        raid_level = logical_disk['raid_level']
+        try:
+            disk_usage = _volume_usage_per_disk_bytes(
+                logical_disk, disks[0:disks_count],
+                spans_count=_calculate_spans(raid_level, disks_count))
+        except exception.RedfishError:
+            return None
+        selected_disks = [disk for disk in disks
+                          if free_space_bytes[disk] >= disk_usage]
+        if len(selected_disks) < disks_count:
+            return None
+        return selected_disks[0:disks_count]
+
+    def assign(self, logical_disks, free_space_bytes):
+        """Match physical disks to logical disks, see _assign_disks_to_volume.
+
+        :returns: a tuple with a boolean telling whether all logical disks
+            were matched, and the free space of the drives after the
+            matching.
+        """
+        index = self._count - len(logical_disks)
+        state = self._state(index, free_space_bytes)
+        if (state in self._failed_states
+                or not self._may_fit(index, free_space_bytes)):
+            return False, free_space_bytes
+
+        logical_disk = logical_disks.pop(0)
+        raid_level = logical_disk['raid_level']
+
+        # iterate over all possible configurations
+        for (_group, disks), needed in zip(self._groups,
+                                           self._needed_disks[index]):
+            if needed is None:
                 continue
 
-            selected_disks = disks[0:disks_count]
+            # filter out disks without free disk space
+            disks = [disk for disk in disks if free_space_bytes[disk] > 0]
+
+            # sort disks by free size which is important if we have max
+            # disks limit on a volume
+            disks = sorted(
+                disks,
+                key=lambda disk: free_space_bytes[disk])
+
+            # filter out disks already in use if sharing is disabled
+            if not self._shared[index]:
+                disks = [disk for disk in disks
+                         if disk.capacity_bytes == free_space_bytes[disk]]
 
-            candidate_volume = logical_disk.copy()
-            candidate_free_space_bytes = free_space_bytes.copy()
-            candidate_volume['physical_disks'] = [disk.identity for disk
-                                                  in selected_disks]
             try:
-                _calculate_volume_props(candidate_volume, selected_disks,
-                                        candidate_free_space_bytes,
-                                        disk_to_storage)
+                min_disks, max_disks = _volume_disks_range(raid_level,
+                                                           len(disks))
             except exception.RedfishError as exc:
-                LOG.debug('Caught RedfishError in _calculate_volume_props(). '
-                          'Reason: %s', exc)
+                LOG.debug('Not enough physical disks for RAID level %s. '
+                          'Reason: %s', raid_level, exc)
                 continue
+            candidate_max_disks = min([max_disks, len(disks)])
+
+            # fewer disks than needed cannot hold the volume
+            for disks_count in range(max([min_disks, needed]),
+                                     candidate_max_disks + 1):
+                if ('number_of_physical_disks' in logical_disk
+                        and logical_disk[
+                            'number_of_physical_disks'] != disks_count):
+                    continue
 
-            if len(logical_disks) > 0:
+                # skip invalid disks_count
+                if disks_count != _usable_disks_count(raid_level,
+                                                      disks_count):
+                    continue
+
+                selected_disks = disks[0:disks_count]
+                if self._skip_filled_disks and self._shared[index]:
+                    selected_disks = self._select_disks(
+                        logical_disk, disks, disks_count, free_space_bytes)
+                    if not selected_disks:
+                        continue
+
+                self._candidates_count += 1
+                limit = CONF.redfish.raid_config_search_limit
+                if limit and self._candidates_count > limit:
+                    error_msg = (_('Stopped searching physical disks for the '
+                                   'logical disks after %d candidates, see '
+                                   'the [redfish]raid_config_search_limit '
+                                   'option. Listing the physical disks of '
+                                   'logical disks shortens the search.')
+                                 % limit)
+                    raise exception.RedfishError(error=error_msg)
+
+                candidate_volume = logical_disk.copy()
+                candidate_free_space_bytes = free_space_bytes.copy()
+                candidate_volume['physical_disks'] = [disk.identity for disk
+                                                      in selected_disks]
                 try:
-                    result, candidate_free_space_bytes = (
-                        _assign_disks_to_volume(logical_disks,
-                                                physical_disks_by_type,
-                                                candidate_free_space_bytes,
-                                                disk_to_storage))
+                    _calculate_volume_props(candidate_volume, selected_disks,
+                                            candidate_free_space_bytes,
+                                            self._disk_to_storage)
                 except exception.RedfishError as exc:
                     LOG.debug('Caught RedfishError in '
-                              '_assign_disks_to_volume(). Reason: %s', exc)
+                              '_calculate_volume_props(). Reason: %s', exc)
                     continue
-                if result:
-                    logical_disks.append(candidate_volume)
-                    return True, candidate_free_space_bytes
-            else:
+
+                if logical_disks:
+                    result, candidate_free_space_bytes = self.assign(
+                        logical_disks, candidate_free_space_bytes)
+                    if not result and not self._shared_from[index]:
+                        # more disks only leave fewer unused disks
+                        break
+                    if not result:
+                        continue
                 logical_disks.append(candidate_volume)
                 return True, candidate_free_space_bytes
-    else:
+
         # put back the logical_disk to queue
         logical_disks.insert(0, logical_disk)
+        self._failed_states.add(state)
         return False, free_space_bytes
 
 
+def _assign_disks_to_volume(logical_disks, physical_disks_by_type,
+                            free_space_bytes, disk_to_storage):
+    """Match physical disks to logical disks
+
+    :param logical_disks: the logical disks without physical disks. On
+        success, the list is replaced by the logical disks with their
+        physical disks and properties, in the reverse order.
+    :param physical_disks_by_type: dict mapping groups of drives, see
+        _disk_group(), to lists of the drives.
+    :param free_space_bytes: dict mapping drives to their available space.
+    :param disk_to_storage: dict mapping drives to their storage.
+    :returns: a tuple with a boolean telling whether all logical disks were
+        matched, and the free space of the drives after the matching.
+    """
+    result, new_free_space_bytes = _DiskAssignment(
+        logical_disks, physical_disks_by_type,
+        disk_to_storage).assign(logical_disks, free_space_bytes)
+    if not result and any(logical_disk.get('share_physical_disks')
+                          for logical_disk in logical_disks):
+        LOG.debug('Searching physical disks for logical disks again, '
+                  'skipping the shared disks without enough free space')
+        result, new_free_space_bytes = _DiskAssignment(
+            logical_disks, physical_disks_by_type, disk_to_storage,
+            skip_filled_disks=True).assign(logical_disks, free_space_bytes)
+    return result, new_free_space_bytes
+
+
 def _find_configuration(logical_disks, physical_disks, disk_to_storage):
     """Find RAID configuration.
 
@@ -489,8 +732,8 @@ def _find_configuration(logical_disks, physical_disks, disk_to_storage):
         for volume in volumes_with_reserved_physical_disks
         if disk.identity in volume['physical_disks']]
 
-    # we require each logical disk contain only homogeneous physical disks, so
-    # sort them by type
+    # we require each logical disk contain only homogeneous physical disks of
+    # one storage, so sort them by type and storage
     physical_disks_by_type = {}
     reserved_physical_disks_by_type = {}
     free_space_bytes = {}
@@ -501,7 +744,7 @@ def _find_configuration(logical_disks, physical_disks, disk_to_storage):
         #     Volumes. Redfish and/or SNIA may address this case in future.
         free_space_bytes[disk] = disk.capacity_bytes
 
-        disk_type = (disk.media_type, disk.protocol, disk.capacity_bytes)
+        disk_type = _disk_group(disk, disk_to_storage)
         if disk_type not in physical_disks_by_type:
             physical_disks_by_type[disk_type] = []
             reserved_physical_disks_by_type[disk_type] = []
@@ -519,8 +762,7 @@ def _find_configuration(logical_disks, physical_disks, disk_to_storage):
                 and not volume.get('share_physical_disks', False)):
             for disk in physical_disks:
                 if disk.identity in volume['physical_disks']:
-                    disk_type = (disk.media_type, disk.protocol,
-                                 disk.capacity_bytes)
+                    disk_type = _disk_group(disk, disk_to_storage)
                     if disk in physical_disks_by_type[disk_type]:
                         physical_disks_by_type[disk_type].remove(disk)
 
@@ -972,6 +1214,7 @@ class RedfishRAID(base.RAIDInterface):
             states.CLEANFAIL, states.DEPLOYFAIL}, 'maintenance': True},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get('raid_configs'),
+        async_operation='raid_configs',
     )
     def _query_raid_config_failed(self, task, manager, context):
         """Periodic job to check for failed RAID configuration."""
@@ -995,6 +1238,8 @@ class RedfishRAID(base.RAIDInterface):
             states.CLEANWAIT, states.DEPLOYWAIT}},
         predicate_extra_fields=['driver_internal_info'],
         predicate=lambda n: n.driver_internal_info.get('raid_configs'),
+        async_operation='raid_configs',
+        poll_event=bmc_events.TASK,
     )
     def _query_raid_config_status(self, task, manager, context):
         """Periodic job to check RAID config tasks."""
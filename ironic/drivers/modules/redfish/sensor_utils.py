@@ -0,0 +1,94 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Concurrent Redfish reads for the collection of sensor data.
+
+Reading the sensors of a node takes requests for its chassis, storage and
+drives. The reads which do not depend on each other are submitted to a
+thread pool shared by all nodes of the conductor:
+
+* ``[redfish]sensor_data_concurrency`` caps the reads in flight across all
+  nodes.
+* ``[redfish]sensor_data_bmc_concurrency`` caps the reads in flight to a
+  single BMC. The thread submitting a read waits for a free slot of its BMC,
+  so that reads waiting for a busy BMC do not take up the shared threads.
+"""
+
+import functools
+import threading
+import weakref
+
+import futurist
+
+from ironic.conf import CONF
+
+_lock = threading.Lock()
+
+_executor = None
+
+# BMC address -> semaphore limiting the reads in flight to it. A semaphore
+# is dropped once no read of its BMC is in flight.
+_bmc_slots = weakref.WeakValueDictionary()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = futurist.DynamicThreadPoolExecutor(
+                max_workers=CONF.redfish.sensor_data_concurrency)
+        return _executor
+
+
+def _get_bmc_slots(node):
+    address = node.driver_info.get('redfish_address')
+    with _lock:
+        slots = _bmc_slots.get(address)
+        if slots is None:
+            slots = threading.BoundedSemaphore(
+                CONF.redfish.sensor_data_bmc_concurrency)
+            _bmc_slots[address] = slots
+        return slots
+
+
+def _release(slots, future):
+    slots.release()
+
+
+def submit(node, func, *args, **kwargs):
+    """Submit a Redfish read for the sensor data of a node.
+
+    Must only be called by the thread collecting the sensor data of the
+    node, never by a submitted read.
+
+    :param node: an Ironic node object.
+    :param func: the read, called as ``func(*args, **kwargs)``.
+    :returns: a future with the result of the read. If concurrent reads are
+        disabled, the read is done before returning.
+    """
+    if not CONF.redfish.sensor_data_concurrency:
+        future = futurist.Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    slots = _get_bmc_slots(node)
+    slots.acquire()
+    try:
+        future = _get_executor().submit(func, *args, **kwargs)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(functools.partial(_release, slots))
+    return future
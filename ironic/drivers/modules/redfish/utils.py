@@ -15,9 +15,13 @@
 #    under the License.
 
 import collections
+import copy
+import functools
 import hashlib
 import os
+import threading
 from urllib import parse as urlparse
+import weakref
 
 from oslo_log import log
 from oslo_utils import netutils
@@ -437,18 +441,108 @@ def get_first_controller(storage):
         return controllers[0] if controllers else None
 
 
-def get_system(node):
+class _Snapshot(object):
+    """A Redfish System fetched for a node object."""
+
+    def __init__(self, system, driver_info):
+        self.system = system
+        # The System is fetched again if the node is updated, e.g. with new
+        # credentials.
+        self.driver_info = copy.deepcopy(driver_info)
+        self.stale = False
+
+
+class _MutationTracker(object):
+    """Wraps the connector of a System to detect changes made through it.
+
+    The resources linked from the System share its connector, so any
+    request changing the System or one of them marks the snapshot of the
+    node stale.
+    """
+
+    _MUTATING = frozenset(['post', 'patch', 'put', 'delete'])
+
+    def __init__(self, connector, invalidate):
+        object.__setattr__(self, '_connector', connector)
+        object.__setattr__(self, '_invalidate', invalidate)
+
+    def __getattr__(self, name):
+        if name in self._MUTATING:
+            self._invalidate()
+        return getattr(self._connector, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connector, name, value)
+
+
+class _SystemSnapshots(object):
+    """Systems fetched for node objects.
+
+    A node object lives as long as the task it was loaded for, so the
+    snapshots are dropped together with their node objects.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # id of the node object -> _Snapshot
+        self._snapshots = {}
+
+    def get(self, node):
+        with self._lock:
+            snapshot = self._snapshots.get(id(node))
+        if (snapshot is not None and not snapshot.stale
+                and snapshot.driver_info == node.driver_info):
+            return snapshot.system
+
+    def put(self, node, system):
+        key = id(node)
+        system._conn = _MutationTracker(
+            system._conn, functools.partial(self._invalidate, key))
+        with self._lock:
+            new = key not in self._snapshots
+            self._snapshots[key] = _Snapshot(system, node.driver_info)
+        if new:
+            weakref.finalize(node, self._forget, key)
+
+    def _invalidate(self, key):
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                snapshot.stale = True
+
+    def _forget(self, key):
+        with self._lock:
+            self._snapshots.pop(key, None)
+
+
+_SNAPSHOTS = _SystemSnapshots()
+
+
+def get_system(node, refresh=False):
     """Get a Redfish System that represents a node.
 
+    If ``[redfish]task_system_snapshot`` is enabled, the System is fetched
+    once for the node object of a task, and reused together with the
+    resources linked from it until a change is made through them.
+
     :param node: an Ironic node object
+    :param refresh: whether to fetch the System even if it was already
+        fetched for the node, e.g. when polling for a change.
     :raises: RedfishConnectionError when it fails to connect to Redfish
     :raises: RedfishError if the System is not registered in Redfish
     """
+    use_snapshot = CONF.redfish.task_system_snapshot
+    if use_snapshot and not refresh:
+        system = _SNAPSHOTS.get(node)
+        if system is not None:
+            return system
+
     driver_info = parse_driver_info(node)
     system_id = driver_info['system_id']
 
     try:
-        return _get_connection(
+        system = _get_connection(
             node,
             lambda conn, system_id: conn.get_system(system_id),
             system_id)
@@ -459,6 +553,10 @@ def get_system(node):
                    'node': node.uuid, 'error': e})
         raise exception.RedfishError(error=e)
 
+    if use_snapshot:
+        _SNAPSHOTS.put(node, system)
+    return system
+
 
 def get_root_vendor(node):
     """Get the BMC vendor from the Redfish Service Root.
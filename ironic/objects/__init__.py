@@ -37,6 +37,7 @@ def register_all():
     __import__('ironic.objects.node_inventory')
     __import__('ironic.objects.port')
     __import__('ironic.objects.portgroup')
+    __import__('ironic.objects.provision_job')
     __import__('ironic.objects.runbook')
     __import__('ironic.objects.trait')
     __import__('ironic.objects.volume_connector')
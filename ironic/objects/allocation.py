@@ -226,6 +226,24 @@ class Allocation(base.IronicObject, object_base.VersionedObjectDictCompat):
         updated_allocation = self.dbapi.update_allocation(self.uuid, updates)
         self._from_db_object(self._context, self, updated_allocation)
 
+    def claim_node(self, node_uuids, filters):
+        """Reserve one of the given nodes for this Allocation.
+
+        On success, the allocation becomes active and its ``node_id`` is
+        set to the claimed node.
+
+        :param node_uuids: a list of UUIDs of candidate nodes.
+        :param filters: node filters the claimed node must match.
+        :raises: AllocationNotFound, InstanceAssociated
+        :returns: True if a node has been claimed, otherwise False.
+        """
+        db_allocation = self.dbapi.claim_node_for_allocation(
+            self.id, node_uuids, filters)
+        if db_allocation is None:
+            return False
+        self._from_db_object(self._context, self, db_allocation)
+        return True
+
     @object_base.remotable
     def refresh(self, context=None):
         """Loads updates for this Allocation.
@@ -190,6 +190,17 @@ class DeployTemplate(base.IronicObject, object_base.VersionedObjectDictCompat):
         db_templates = cls.dbapi.get_deploy_template_list_by_names(names)
         return cls._from_db_object_list(context, db_templates)
 
+    @classmethod
+    def get_generation(cls, context):
+        """Return the generation of the deploy templates.
+
+        :param context: security context.
+        :returns: a revision number which is incremented whenever a
+                  deploy template or one of its steps is created, updated
+                  or destroyed.
+        """
+        return cls.dbapi.get_deploy_templates_generation()
+
     @object_base.remotable
     def refresh(self, context=None):
         """Loads updates for this deploy template.
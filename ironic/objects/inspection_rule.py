@@ -134,6 +134,16 @@ class InspectionRule(base.IronicObject, object_base.VersionedObjectDictCompat):
             filters=filters)
         return cls._from_db_object_list(context, db_rules)
 
+    @classmethod
+    def get_generation(cls, context):
+        """Return the generation of the inspection rules.
+
+        :param context: security context.
+        :returns: a revision number which is incremented whenever an
+                  inspection rule is created, updated or destroyed.
+        """
+        return cls.dbapi.get_inspection_rules_generation()
+
     @object_base.remotable
     def refresh(self, context=None):
         """Loads updates for this inspection rule.
@@ -12,14 +12,18 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import hashlib
+
 from oslo_config import cfg
 from oslo_log import log
+from oslo_serialization import jsonutils
 from oslo_utils import strutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from oslo_utils import versionutils
 from oslo_versionedobjects import base as object_base
 
+from ironic.common import async_operations
 from ironic.common import exception
 from ironic.common.i18n import _
 from ironic.common import utils
@@ -35,6 +39,16 @@ CONF = cfg.CONF
 LOG = log.getLogger(__name__)
 
 
+# Fields stored as JSON which are not written if they have not changed.
+_JSON_FIELDS = ('driver_internal_info', 'instance_info', 'properties')
+
+
+def _json_digest(value):
+    """Calculate a digest of a JSON field value independent of key order."""
+    return hashlib.sha256(
+        jsonutils.dump_as_bytes(value, sort_keys=True)).digest()
+
+
 @base.IronicObjectRegistry.register
 class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
     # Version 1.0: Initial version
@@ -273,7 +287,7 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         db_node = cls.dbapi.get_node_by_id(node_id)
         node = cls._from_db_object(context, cls(), db_node)
-        return node
+        return node._remember_json_fields()
 
     @classmethod
     @object_base.remotable
@@ -287,7 +301,7 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         db_node = cls.dbapi.get_node_by_uuid(uuid)
         node = cls._from_db_object(context, cls(), db_node)
-        return node
+        return node._remember_json_fields()
 
     @classmethod
     @object_base.remotable
@@ -301,7 +315,20 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         db_node = cls.dbapi.get_node_by_name(name)
         node = cls._from_db_object(context, cls(), db_node)
-        return node
+        return node._remember_json_fields()
+
+    @classmethod
+    def get_generation(cls, context, node_id):
+        """Return the generation of a node.
+
+        :param context: Security context
+        :param node_id: the id *or* uuid of a node.
+        :returns: a tuple with the time of the last update of the node,
+                  a frozenset of its traits and the current time of the
+                  database. Note that the times may only have a precision
+                  of one second.
+        """
+        return cls.dbapi.get_node_generation(node_id)
 
     @classmethod
     @object_base.remotable
@@ -315,7 +342,7 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         db_node = cls.dbapi.get_node_by_instance(instance_uuid)
         node = cls._from_db_object(context, cls(), db_node)
-        return node
+        return node._remember_json_fields()
 
     @classmethod
     @object_base.remotable
@@ -374,7 +401,7 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         db_node = cls.dbapi.reserve_node(tag, node_id)
         node = cls._from_db_object(context, cls(), db_node)
-        return node
+        return node._remember_json_fields()
 
     # NOTE(TheJulia): The choice to not make this a remotable method is
     # explicit in that locks are intended only for a conductor. If we choose
@@ -414,6 +441,10 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         self._validate_and_format_conductor_group(values)
         db_node = self.dbapi.create_node(values)
         self._from_db_object(self._context, self, db_node)
+        operations = async_operations.pending(self.driver_internal_info)
+        if operations:
+            self.dbapi.add_node_async_operations(self.id, operations)
+        self._async_operations = operations
 
     @object_base.remotable
     def destroy(self, context=None):
@@ -457,11 +488,86 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
                         attr_value[0:CONF.log_in_db_max_size])
 
         updates = self.do_version_changes_for_db()
+        self._remove_unchanged_json_fields(updates)
         self._validate_property_values(updates.get('properties'))
         self._validate_and_remove_traits(updates)
         self._validate_and_format_conductor_group(updates)
-        db_node = self.dbapi.update_node(self.uuid, updates)
-        self._from_db_object(self._context, self, db_node)
+        kwargs = {}
+        if 'driver_internal_info' in updates:
+            operations = async_operations.pending(
+                updates['driver_internal_info'])
+            started, finished = self._async_operations_changes(operations)
+            # Recorded in the same transaction as the node update.
+            if started or finished:
+                kwargs = {'add_async_operations': started,
+                          'remove_async_operations': finished}
+        # Traits are not updated here, only load them if they are missing.
+        load_traits = not self.obj_attr_is_set('traits')
+        db_node = self.dbapi.update_node(self.uuid, updates,
+                                         load_relationships=load_traits,
+                                         **kwargs)
+        fields = None if load_traits else set(self.fields) - {'traits'}
+        self._from_db_object(self._context, self, db_node, fields=fields)
+        # The stored values may differ from the saved ones if the node was
+        # updated concurrently.
+        self._remember_json_fields()
+
+    def _async_operations_changes(self, operations):
+        """Compare the pending operations with the recorded ones.
+
+        The recorded operations are derived from the loaded
+        ``driver_internal_info``. Operations started by services of
+        a previous release are recorded by the
+        ``backfill_node_async_operations`` online data migration.
+
+        :param operations: the kinds of operations pending after an update.
+        :returns: a tuple with the kinds of operations to record and to
+            forget. If the recorded operations are not known, all
+            registered operations are synchronized.
+        """
+        recorded = self.__dict__.get('_async_operations')
+        if recorded is None:
+            return operations, async_operations.registered() - operations
+        return operations - recorded, recorded - operations
+
+    def _remember_json_fields(self):
+        """Remember the digests of the JSON fields as stored in the database.
+
+        Must only be called on a node freshly loaded from the database.
+        """
+        self._json_digests = {field: _json_digest(getattr(self, field))
+                              for field in _JSON_FIELDS
+                              if self.obj_attr_is_set(field)}
+        if self.obj_attr_is_set('driver_internal_info'):
+            self._async_operations = async_operations.pending(
+                self.driver_internal_info)
+        return self
+
+    def _remove_unchanged_json_fields(self, updates):
+        """Remove JSON fields which are identical to the stored ones.
+
+        Changing a single key of a JSON field marks the whole field as
+        changed, so that it is serialized and written to the database
+        even if the resulting value is the same as the stored one.
+
+        :param updates: a dict of Node fields to update.
+        """
+        digests = self.__dict__.get('_json_digests') or {}
+        for field, digest in digests.items():
+            if (field in updates
+                    and _json_digest(updates[field]) == digest):
+                del updates[field]
+
+    def obj_reset_changes(self, fields=None, recursive=False):
+        super(Node, self).obj_reset_changes(fields=fields,
+                                            recursive=recursive)
+        # The values are no longer known to match the stored ones.
+        digests = self.__dict__.get('_json_digests')
+        if digests:
+            for field in (fields or list(digests)):
+                digests.pop(field, None)
+        if fields is None or 'driver_internal_info' in fields:
+            self.__dict__.pop('_async_operations', None)
 
     @staticmethod
     def _validate_and_remove_traits(fields):
@@ -509,11 +615,39 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         current = self.get_by_uuid(self._context, self.uuid)
         self.obj_refresh(current)
         self.obj_reset_changes()
+        self._json_digests = current._json_digests
 
     def touch_provisioning(self, context=None):
         """Touch the database record to mark the provisioning as alive."""
         self.dbapi.touch_node_provisioning(self.id)
 
+    def record_heartbeat(self, driver_internal_info,
+                         touch_provisioning=False):
+        """Record an agent heartbeat without reserving the node.
+
+        The database record is only updated if the node is not reserved and
+        is still in the provision state of this object.
+
+        :param driver_internal_info: a dictionary of values to merge into
+            the node's driver_internal_info.
+        :param touch_provisioning: whether to also mark the provisioning
+            as alive.
+        :returns: True if the heartbeat was recorded, False otherwise.
+        """
+        return self.dbapi.record_node_heartbeat(
+            self.id, self.provision_state, driver_internal_info,
+            touch_provisioning=touch_provisioning)
+
+    def set_lookup_addresses(self, addresses):
+        """Replace the addresses used to look up the node on inspection.
+
+        The node can then be found using the ``lookup_address_in`` filter.
+
+        :param addresses: a list of addresses, an empty list removes all
+            addresses of the node.
+        """
+        self.dbapi.set_node_lookup_addresses(self.id, addresses)
+
     @classmethod
     @object_base.remotable
     def get_by_port_addresses(cls, context, addresses):
@@ -527,7 +661,7 @@ class Node(base.IronicObject, object_base.VersionedObjectDictCompat):
         """
         db_node = cls.dbapi.get_node_by_port_addresses(addresses)
         node = cls._from_db_object(context, cls(), db_node)
-        return node
+        return node._remember_json_fields()
 
     def get_interface(self, iface):
         iface_name = '%s_interface' % iface
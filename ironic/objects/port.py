@@ -332,6 +332,18 @@ class Port(base.IronicObject, object_base.VersionedObjectDictCompat):
                                                  filters=filters)
         return cls._from_db_object_list(context, db_ports)
 
+    @classmethod
+    def list_by_node_uuids(cls, context, node_uuids):
+        """Return a list of Port objects associated with several nodes.
+
+        :param context: Security context.
+        :param node_uuids: a list of node UUIDs.
+        :returns: a list of :class:`Port` object.
+
+        """
+        db_ports = cls.dbapi.get_ports_by_node_uuids(node_uuids)
+        return cls._from_db_object_list(context, db_ports)
+
     @classmethod
     @object_base.remotable
     def list_by_node_id(cls, context, node_id, limit=None, marker=None,
@@ -298,6 +298,19 @@ class Portgroup(base.IronicObject, object_base.VersionedObjectDictCompat):
                                                             project=project)
         return cls._from_db_object_list(context, db_portgroups)
 
+    @classmethod
+    def list_by_node_uuids(cls, context, node_uuids):
+        """Return a list of Portgroup objects associated with several nodes.
+
+        :param cls: the :class:`Portgroup`
+        :param context: Security context.
+        :param node_uuids: A list of node UUIDs.
+        :returns: A list of :class:`Portgroup` object.
+
+        """
+        db_portgroups = cls.dbapi.get_portgroups_by_node_uuids(node_uuids)
+        return cls._from_db_object_list(context, db_portgroups)
+
     @classmethod
     def list_by_node_shards(cls, context, shards, limit=None, marker=None,
                             sort_key=None, sort_dir=None, project=None):
@@ -0,0 +1,135 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_utils import uuidutils
+from oslo_versionedobjects import base as object_base
+
+from ironic.common import states
+from ironic.db import api as db_api
+from ironic.objects import base
+from ironic.objects import fields as object_fields
+
+
+@base.IronicObjectRegistry.register
+class ProvisionJobBatch(base.IronicObject,
+                        object_base.VersionedObjectDictCompat):
+    """One conductor batch of a bulk provisioning job.
+
+    A job is split into batches, one or more per conductor. Every batch is
+    only ever updated by the conductor processing it.
+    """
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+
+    dbapi = db_api.get_instance()
+
+    fields = {
+        'id': object_fields.IntegerField(),
+        'uuid': object_fields.UUIDField(),
+        'job_uuid': object_fields.UUIDField(),
+        'conductor': object_fields.StringField(nullable=True),
+        'target': object_fields.StringField(),
+        'state': object_fields.StringField(),
+        'project': object_fields.StringField(nullable=True),
+        'nodes': object_fields.ListOfStringsField(),
+        'params': object_fields.FlexibleDictField(nullable=True),
+        'results': object_fields.FlexibleDictField(nullable=True),
+    }
+
+    @object_base.remotable
+    def create(self, context=None):
+        """Create a ProvisionJobBatch record in the DB.
+
+        :param context: security context. NOTE: This should only
+                        be used internally by the indirection_api.
+                        Unfortunately, RPC requires context as the first
+                        argument, even though we don't use it.
+                        A context should be set when instantiating the
+                        object, e.g.: ProvisionJobBatch(context).
+        """
+        if not self.obj_attr_is_set('uuid'):
+            self.uuid = uuidutils.generate_uuid()
+        values = self.do_version_changes_for_db()
+        db_batch = self.dbapi.create_provision_job_batch(values)
+        self._from_db_object(self._context, self, db_batch)
+
+    @object_base.remotable
+    def save(self, context=None):
+        """Save updates to this ProvisionJobBatch.
+
+        :param context: security context. NOTE: This should only
+                        be used internally by the indirection_api.
+                        Unfortunately, RPC requires context as the first
+                        argument, even though we don't use it.
+                        A context should be set when instantiating the
+                        object, e.g.: ProvisionJobBatch(context).
+        :raises: ProvisionJobNotFound if the batch no longer appears in the
+            database.
+        """
+        updates = self.do_version_changes_for_db()
+        db_batch = self.dbapi.update_provision_job_batch(self.uuid, updates)
+        self._from_db_object(self._context, self, db_batch)
+
+    @classmethod
+    @object_base.remotable
+    def get_by_uuid(cls, context, uuid):
+        """Find a provision job batch based on its UUID.
+
+        :param context: security context.
+        :param uuid: The UUID of a provision job batch.
+        :raises: ProvisionJobNotFound if the batch does not exist.
+        :returns: a :class:`ProvisionJobBatch` object.
+        """
+        db_batch = cls.dbapi.get_provision_job_batch_by_uuid(uuid)
+        return cls._from_db_object(context, cls(), db_batch)
+
+    @classmethod
+    @object_base.remotable
+    def list_by_job_uuid(cls, context, job_uuid):
+        """Return all batches of a provision job.
+
+        :param context: security context.
+        :param job_uuid: The UUID of a provision job.
+        :raises: ProvisionJobNotFound if the job does not exist.
+        :returns: a list of :class:`ProvisionJobBatch` objects.
+        """
+        db_batches = cls.dbapi.get_provision_job_batches(job_uuid)
+        return cls._from_db_object_list(context, db_batches)
+
+    @classmethod
+    @object_base.remotable
+    def list_unfinished(cls, context, conductors):
+        """Return pending and running batches of the given conductors.
+
+        :param context: security context.
+        :param conductors: a list of conductor hostnames.
+        :returns: a list of :class:`ProvisionJobBatch` objects.
+        """
+        db_batches = cls.dbapi.get_unfinished_provision_job_batches(
+            conductors)
+        return cls._from_db_object_list(context, db_batches)
+
+    def reject_unprocessed(self, error):
+        """Finish the batch, rejecting the nodes without an outcome.
+
+        Used when the batch cannot be processed any more, e.g. because it
+        could not be sent to its conductor or the conductor went away.
+
+        :param error: the error message recorded for the rejected nodes.
+        """
+        results = dict(self.results or {})
+        for node in self.nodes:
+            results.setdefault(node, {'status': states.PROVISION_JOB_REJECTED,
+                                      'error': error})
+        self.results = results
+        self.state = states.PROVISION_JOB_FINISHED
+        self.save()
@@ -226,6 +226,17 @@ class Runbook(base.IronicObject, object_base.VersionedObjectDictCompat):
         db_templates = cls.dbapi.get_runbook_list_by_names(names)
         return cls._from_db_object_list(context, db_templates)
 
+    @classmethod
+    def get_generation(cls, context):
+        """Return the generation of the runbooks.
+
+        :param context: security context.
+        :returns: a revision number which is incremented whenever a
+                  runbook or one of its steps or traits is created,
+                  updated or destroyed.
+        """
+        return cls.dbapi.get_runbooks_generation()
+
     @object_base.remotable
     def refresh(self, context=None):
         """Loads updates for this runbook.
@@ -41,10 +41,18 @@ from ironic.common import config as ironic_config
 from ironic.common import context as ironic_context
 from ironic.common import driver_factory
 from ironic.common import hash_ring
+from ironic.common.inspection_rules import engine as inspection_rules_engine
 from ironic.common import rpc
+from ironic.common import template_catalogue
 from ironic.common import utils
+from ironic.conductor import bmc_events
+from ironic.conductor import node_cache
+from ironic.conductor import power_waiter
+from ironic.conductor import sensor_publisher
+from ironic.conductor import steps as conductor_steps
 from ironic.conf import CONF
 from ironic.drivers import base as drivers_base
+from ironic.drivers.modules import image_prefetch
 from ironic.objects import base as objects_base
 from ironic.tests.unit import policy_fixture
 
@@ -161,6 +169,7 @@ class TestCase(oslo_test_base.BaseTestCase):
 
         self.addCleanup(self._clear_attrs)
         self.addCleanup(hash_ring.HashRingManager().reset)
+        self.addCleanup(inspection_rules_engine.reset_rules_cache)
         self.useFixture(fixtures.EnvironmentVariable('http_proxy'))
         self.policy = self.useFixture(policy_fixture.PolicyFixture())
         self.useFixture(WarningsFixture())
@@ -171,6 +180,14 @@ class TestCase(oslo_test_base.BaseTestCase):
         driver_factory.HardwareTypesFactory._extension_manager = None
         for factory in driver_factory._INTERFACE_LOADERS.values():
             factory._extension_manager = None
+        driver_factory.reset_composition_cache()
+        node_cache.reset_node_cache()
+        bmc_events.reset_event_hub()
+        power_waiter.reset_power_waiter()
+        sensor_publisher.reset_sensor_deltas()
+        conductor_steps.reset_step_cache()
+        template_catalogue.reset_template_catalogue()
+        image_prefetch.reset_image_prefetch()
 
         rpc.set_global_manager(None)
 
@@ -0,0 +1,258 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests for the API /provision_jobs/ methods.
+"""
+
+from http import client as http_client
+from unittest import mock
+
+import fixtures
+from oslo_config import cfg
+from oslo_utils import uuidutils
+
+from ironic.api.controllers import base as api_base
+from ironic.api.controllers import v1 as api_v1
+from ironic.common import exception
+from ironic.common import policy
+from ironic.common import states
+from ironic.conductor import rpcapi
+from ironic import objects
+from ironic.tests.unit.api import base as test_api_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+
+class TestProvisionJobs(test_api_base.BaseApiTest):
+    headers = {api_base.Version.string: str(api_v1.max_version())}
+
+    def setUp(self):
+        super(TestProvisionJobs, self).setUp()
+        self.nodes = [
+            obj_utils.create_test_node(
+                self.context, uuid=uuidutils.generate_uuid(),
+                name='node-%d' % i, provision_state=states.AVAILABLE)
+            for i in range(3)
+        ]
+        self.mock_get_conductor_for = self.useFixture(
+            fixtures.MockPatchObject(rpcapi.ConductorAPI, 'get_conductor_for',
+                                     autospec=True)).mock
+        self.mock_get_conductor_for.return_value = 'fake.conductor'
+        self.mock_bulk = self.useFixture(
+            fixtures.MockPatchObject(rpcapi.ConductorAPI,
+                                     'do_bulk_provisioning',
+                                     autospec=True)).mock
+
+    def _post(self, body, **kwargs):
+        return self.post_json('/provision_jobs', body,
+                              headers=kwargs.pop('headers', self.headers),
+                              **kwargs)
+
+    def test_create(self):
+        body = {'nodes': [node.uuid for node in self.nodes],
+                'target': states.ACTIVE}
+        response = self._post(body)
+        self.assertEqual(http_client.ACCEPTED, response.status_int)
+        job = response.json
+        self.assertEqual(states.ACTIVE, job['target'])
+        self.assertEqual(states.PROVISION_JOB_PENDING, job['state'])
+        self.assertEqual(
+            [(node.uuid, states.PROVISION_JOB_PENDING) for node in self.nodes],
+            [(item['node'], item['status']) for item in job['nodes']])
+        self.assertEqual(states.AVAILABLE, job['nodes'][0]['provision_state'])
+        self.assertTrue(response.location.endswith(
+            '/v1/provision_jobs/%s' % job['uuid']))
+
+        batches = objects.ProvisionJobBatch.list_by_job_uuid(self.context,
+                                                             job['uuid'])
+        self.assertEqual(1, len(batches))
+        self.assertEqual('fake.conductor', batches[0].conductor)
+        self.mock_bulk.assert_called_once_with(
+            mock.ANY, mock.ANY, batches[0].uuid,
+            topic='ironic.conductor_manager.fake.conductor')
+
+    def test_create_batches(self):
+        cfg.CONF.set_override('provision_job_batch_size', 2, group='api')
+        self.mock_get_conductor_for.side_effect = ['c1', 'c2', 'c1']
+        body = {'nodes': [node.name for node in self.nodes],
+                'target': states.ACTIVE}
+        job = self._post(body).json
+
+        batches = objects.ProvisionJobBatch.list_by_job_uuid(self.context,
+                                                             job['uuid'])
+        self.assertEqual(
+            [('c1', [self.nodes[0].uuid, self.nodes[2].uuid]),
+             ('c2', [self.nodes[1].uuid])],
+            [(batch.conductor, batch.nodes) for batch in batches])
+        self.assertEqual(2, self.mock_bulk.call_count)
+
+        cfg.CONF.set_override('provision_job_batch_size', 1, group='api')
+        self.mock_get_conductor_for.side_effect = None
+        self._post(body)
+        self.assertEqual(5, self.mock_bulk.call_count)
+
+    def test_create_rejects_nodes_upfront(self):
+        self.nodes[1].provision_state = states.ACTIVE
+        self.nodes[1].save()
+        body = {'nodes': [node.uuid for node in self.nodes]
+                + ['does-not-exist'],
+                'target': states.VERBS['manage']}
+        job = self._post(body).json
+
+        results = {item['node']: item for item in job['nodes']}
+        self.assertEqual(states.PROVISION_JOB_REJECTED,
+                         results[self.nodes[1].uuid]['status'])
+        self.assertIn('manage', results[self.nodes[1].uuid]['error'])
+        self.assertEqual(states.PROVISION_JOB_REJECTED,
+                         results['does-not-exist']['status'])
+        self.assertIsNone(results['does-not-exist']['provision_state'])
+        self.assertEqual(states.PROVISION_JOB_PENDING,
+                         results[self.nodes[0].uuid]['status'])
+        self.assertEqual(states.PROVISION_JOB_RUNNING, job['state'])
+        self.assertEqual(1, self.mock_bulk.call_count)
+
+    def test_create_all_rejected(self):
+        self.mock_get_conductor_for.side_effect = exception.NoValidHost(
+            reason='no conductor')
+        body = {'nodes': [self.nodes[0].uuid], 'target': states.ACTIVE}
+        job = self._post(body).json
+        self.assertEqual(states.PROVISION_JOB_FINISHED, job['state'])
+        self.assertIn('no conductor', job['nodes'][0]['error'])
+        self.assertFalse(self.mock_bulk.called)
+
+    def test_create_cast_failure(self):
+        cfg.CONF.set_override('provision_job_batch_size', 2, group='api')
+        self.mock_bulk.side_effect = [RuntimeError('boom'), None]
+        body = {'nodes': [node.uuid for node in self.nodes],
+                'target': states.ACTIVE}
+        job = self._post(body).json
+
+        self.assertEqual(states.PROVISION_JOB_RUNNING, job['state'])
+        self.assertEqual(
+            [states.PROVISION_JOB_REJECTED, states.PROVISION_JOB_REJECTED,
+             states.PROVISION_JOB_PENDING],
+            [item['status'] for item in job['nodes']])
+        self.assertIn('boom', job['nodes'][0]['error'])
+        batches = objects.ProvisionJobBatch.list_by_job_uuid(self.context,
+                                                             job['uuid'])
+        self.assertEqual(
+            [states.PROVISION_JOB_FINISHED, states.PROVISION_JOB_PENDING],
+            [batch.state for batch in batches])
+
+    def test_create_too_many_nodes(self):
+        cfg.CONF.set_override('provision_job_max_nodes', 2, group='api')
+        body = {'nodes': [node.uuid for node in self.nodes],
+                'target': states.ACTIVE}
+        response = self._post(body, expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+        self.assertFalse(self.mock_bulk.called)
+
+    def test_create_clean_requires_steps(self):
+        body = {'nodes': [self.nodes[0].uuid],
+                'target': states.VERBS['clean']}
+        response = self._post(body, expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+
+    def test_create_clean_steps_wrong_target(self):
+        body = {'nodes': [self.nodes[0].uuid], 'target': states.ACTIVE,
+                'clean_steps': [{'interface': 'deploy',
+                                 'step': 'erase_devices'}]}
+        response = self._post(body, expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+
+    def test_create_clean(self):
+        self.nodes[0].provision_state = states.MANAGEABLE
+        self.nodes[0].save()
+        steps = [{'interface': 'deploy', 'step': 'erase_devices'}]
+        body = {'nodes': [self.nodes[0].uuid],
+                'target': states.VERBS['clean'], 'clean_steps': steps,
+                'disable_ramdisk': False}
+        job = self._post(body).json
+        batch = objects.ProvisionJobBatch.list_by_job_uuid(
+            self.context, job['uuid'])[0]
+        self.assertEqual({'clean_steps': steps, 'disable_ramdisk': False},
+                         batch.params)
+
+    def test_create_invalid_target(self):
+        body = {'nodes': [self.nodes[0].uuid], 'target': 'rescue'}
+        response = self._post(body, expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+
+    def test_create_old_version(self):
+        body = {'nodes': [self.nodes[0].uuid], 'target': states.ACTIVE}
+        headers = {api_base.Version.string: '1.114'}
+        response = self._post(body, headers=headers, expect_errors=True)
+        self.assertEqual(http_client.METHOD_NOT_ALLOWED, response.status_int)
+
+    def test_get_one(self):
+        job_uuid = uuidutils.generate_uuid()
+        batch = objects.ProvisionJobBatch(
+            self.context, job_uuid=job_uuid, conductor='fake.conductor',
+            target=states.ACTIVE, state=states.PROVISION_JOB_FINISHED,
+            nodes=[self.nodes[0].uuid, self.nodes[1].uuid], params={},
+            results={self.nodes[0].uuid: {
+                'status': states.PROVISION_JOB_ACCEPTED},
+                self.nodes[1].uuid: {
+                'status': states.PROVISION_JOB_REJECTED,
+                'error': 'too busy'}})
+        batch.create()
+
+        job = self.get_json('/provision_jobs/%s' % job_uuid,
+                            headers=self.headers)
+        self.assertEqual(job_uuid, job['uuid'])
+        self.assertEqual(states.PROVISION_JOB_FINISHED, job['state'])
+        self.assertEqual(
+            [(self.nodes[0].uuid, states.PROVISION_JOB_ACCEPTED, None),
+             (self.nodes[1].uuid, states.PROVISION_JOB_REJECTED, 'too busy')],
+            [(item['node'], item['status'], item['error'])
+             for item in job['nodes']])
+
+    def _create_job_for_project(self, project):
+        job_uuid = uuidutils.generate_uuid()
+        objects.ProvisionJobBatch(
+            self.context, job_uuid=job_uuid, conductor='fake.conductor',
+            target=states.ACTIVE, state=states.PROVISION_JOB_PENDING,
+            project=project, nodes=[self.nodes[0].uuid], params={},
+            results={}).create()
+        return job_uuid
+
+    @mock.patch.object(policy, 'authorize', spec=True)
+    def test_get_one_project_scoped(self, mock_authorize):
+        def mock_authorize_function(rule, target, creds):
+            if (rule == 'baremetal:provision_job:get'
+                    and target['provision_job.owner'] != '12345'):
+                raise exception.HTTPForbidden(resource='fake')
+            return True
+        mock_authorize.side_effect = mock_authorize_function
+        headers = dict(self.headers, **{'X-Project-Id': '12345'})
+
+        job_uuid = self._create_job_for_project('12345')
+        job = self.get_json('/provision_jobs/%s' % job_uuid,
+                            headers=headers)
+        self.assertEqual(job_uuid, job['uuid'])
+
+        job_uuid = self._create_job_for_project('54321')
+        response = self.get_json('/provision_jobs/%s' % job_uuid,
+                                 headers=headers, expect_errors=True)
+        self.assertEqual(http_client.NOT_FOUND, response.status_int)
+
+    def test_get_one_not_found(self):
+        response = self.get_json(
+            '/provision_jobs/%s' % uuidutils.generate_uuid(),
+            headers=self.headers, expect_errors=True)
+        self.assertEqual(http_client.NOT_FOUND, response.status_int)
+
+    def test_get_one_old_version(self):
+        headers = {api_base.Version.string: '1.114'}
+        response = self.get_json(
+            '/provision_jobs/%s' % uuidutils.generate_uuid(),
+            headers=headers, expect_errors=True)
+        self.assertEqual(http_client.NOT_FOUND, response.status_int)
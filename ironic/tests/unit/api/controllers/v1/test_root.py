@@ -181,6 +181,12 @@ class TestV1Routing(api_base.BaseApiTest):
                 {'href': 'http://localhost/v1/ports/', 'rel': 'self'},
                 {'href': 'http://localhost/ports/', 'rel': 'bookmark'}
             ],
+            'provision_jobs': [
+                {'href': 'http://localhost/v1/provision_jobs/',
+                 'rel': 'self'},
+                {'href': 'http://localhost/provision_jobs/',
+                 'rel': 'bookmark'}
+            ],
             'shards': [
                 {'href': 'http://localhost/v1/shards/', 'rel': 'self'},
                 {'href': 'http://localhost/shards/', 'rel': 'bookmark'}
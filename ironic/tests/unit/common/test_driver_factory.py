@@ -537,6 +537,64 @@ class HardwareTypeLoadTestCase(db_base.DbTestCase):
                 getattr(task.driver, 'network').__class__.__name__,
                 'NeutronNetwork')
 
+    @mock.patch.object(driver_factory, 'get_hardware_type',
+                       wraps=driver_factory.get_hardware_type)
+    def test_build_driver_for_task_cached(self, mock_get_hw_type):
+        self.config(enabled_network_interfaces=['noop', 'neutron'])
+        node = obj_utils.create_test_node(self.context, driver='fake-hardware',
+                                          **self.node_kwargs)
+        with task_manager.acquire(self.context, node.id) as task:
+            driver = task.driver
+        with task_manager.acquire(self.context, node.id) as task:
+            self.assertIsNot(driver, task.driver)
+            for iface in drivers_base.ALL_INTERFACES:
+                self.assertIs(getattr(driver, iface),
+                              getattr(task.driver, iface))
+        mock_get_hw_type.assert_called_once_with('fake-hardware')
+
+        # A different composition is validated
+        instance_info = {'network_interface': 'neutron'}
+        node = obj_utils.create_test_node(self.context, driver='fake-hardware',
+                                          uuid=uuidutils.generate_uuid(),
+                                          instance_info=instance_info,
+                                          **self.node_kwargs)
+        with task_manager.acquire(self.context, node.id) as task:
+            self.assertEqual('NeutronNetwork',
+                             task.driver.network.__class__.__name__)
+        self.assertEqual(2, mock_get_hw_type.call_count)
+
+    @mock.patch.object(driver_factory, 'get_hardware_type',
+                       wraps=driver_factory.get_hardware_type)
+    def test_build_driver_for_task_cached_defaults(self, mock_get_hw_type):
+        self.config(default_deploy_interface='fake',
+                    enabled_deploy_interfaces=['fake', 'direct'])
+        nodes = [obj_utils.create_test_node(self.context,
+                                            driver='fake-hardware',
+                                            uuid=uuidutils.generate_uuid())
+                 for _ in range(2)]
+        for node in nodes:
+            with task_manager.acquire(self.context, node.id) as task:
+                self.assertEqual('fake', task.node.deploy_interface)
+                for iface in drivers_base.ALL_INTERFACES:
+                    self.assertIsNotNone(
+                        getattr(task.node, '%s_interface' % iface))
+        mock_get_hw_type.assert_called_once_with('fake-hardware')
+
+        # The configured default is part of the composition
+        self.config(default_deploy_interface='direct')
+        with task_manager.acquire(self.context, nodes[0].id) as task:
+            self.assertEqual('direct', task.node.deploy_interface)
+        self.assertEqual(2, mock_get_hw_type.call_count)
+
+    def test_build_driver_for_task_incorrect_not_cached(self):
+        self.node_kwargs['power_interface'] = 'foobar'
+        node = obj_utils.create_test_node(self.context, driver='fake-hardware',
+                                          **self.node_kwargs)
+        for _ in range(2):
+            self.assertRaises(exception.InterfaceNotFoundInEntrypoint,
+                              task_manager.acquire, self.context, node.id)
+        self.assertEqual({}, driver_factory._COMPOSITIONS)
+
     def test_no_storage_interface(self):
         node = obj_utils.get_test_node(self.context)
         self.assertTrue(driver_factory.check_and_update_node_interfaces(node))
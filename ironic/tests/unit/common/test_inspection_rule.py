@@ -10,10 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+import os
 from unittest import mock
-import yaml
 
+import fixtures
 from oslo_utils import uuidutils
+import yaml
 
 from ironic.common import exception
 from ironic.common import inspection_rules
@@ -22,6 +25,7 @@ from ironic.common.inspection_rules import engine
 from ironic.common.inspection_rules import utils
 from ironic.common.inspection_rules import validation
 from ironic.conductor import task_manager
+from ironic import objects
 from ironic.tests.unit.db import base as db_base
 from ironic.tests.unit.db import utils as db_utils
 from ironic.tests.unit.objects import utils as obj_utils
@@ -225,6 +229,152 @@ class TestApplyRules(TestInspectionRules):
         mock_log.error.assert_called_once()
         self.assertEqual(1, mock_apply_actions.call_count)
 
+    @mock.patch.object(engine, 'get_built_in_rules', autospec=True)
+    def test_apply_rules_does_not_modify_rules(self, mock_get_built_in,
+                                               mock_list):
+        actions = [{'op': 'set-plugin-data', 'args': ['list_key', 'value']},
+                   {'op': 'set-plugin-data',
+                    'args': {'path': 'dict_key', 'value': 'value'}}]
+        rule = {'uuid': 'rule-1', 'priority': 100, 'conditions': [],
+                'actions': actions}
+        mock_list.return_value = [rule]
+        mock_get_built_in.return_value = []
+        expected_actions = copy.deepcopy(actions)
+
+        for node_data in ('first', 'second'):
+            plugin_data = {'node': node_data}
+            with task_manager.acquire(self.context, self.node.uuid) as task:
+                engine.apply_rules(task, self.inventory, plugin_data, 'main')
+            self.assertEqual({'node': node_data, 'list_key': 'value',
+                              'dict_key': 'value'}, plugin_data)
+            self.assertEqual(expected_actions, rule['actions'])
+
+
+class TestRuleRepository(TestInspectionRules):
+    def setUp(self):
+        super(TestRuleRepository, self).setUp()
+        self.repository = engine.RuleRepository()
+        self.rules_file = os.path.join(self.useFixture(
+            fixtures.TempDir()).path, 'rules.yaml')
+
+    def _write_rules(self, *descriptions):
+        rules = [{'description': description,
+                  'actions': [{'op': 'set-attribute',
+                               'args': {'path': '/foo', 'value': 'bar'}}]}
+                 for description in descriptions]
+        with open(self.rules_file, 'w') as fp:
+            yaml.safe_dump(rules, fp)
+
+    def _uuids(self, rules):
+        return sorted(rule['uuid'] for rule in rules)
+
+    @mock.patch.object(engine, 'get_built_in_rules',
+                       wraps=engine.get_built_in_rules)
+    def test_built_in_rules_cached(self, mock_load):
+        self.config(built_in_rules=self.rules_file, group='inspection_rules')
+        self._write_rules('rule-a')
+
+        rules = self.repository.get_built_in_rules()
+        self.assertEqual(['rule-a'], [r['description'] for r in rules])
+        self.assertIs(rules, self.repository.get_built_in_rules())
+        mock_load.assert_called_once_with(self.rules_file)
+
+        # The size changes, the file is parsed again
+        self._write_rules('rule-a', 'rule-b')
+        rules = self.repository.get_built_in_rules()
+        self.assertEqual(['rule-a', 'rule-b'],
+                         [r['description'] for r in rules])
+        self.assertEqual(2, mock_load.call_count)
+
+    @mock.patch.object(engine, 'get_built_in_rules', autospec=True,
+                       return_value=[])
+    def test_built_in_rules_not_configured(self, mock_load):
+        self.assertEqual([], self.repository.get_built_in_rules())
+        self.assertEqual([], self.repository.get_built_in_rules())
+        self.assertEqual(2, mock_load.call_count)
+
+    def test_built_in_rules_missing_file(self):
+        self.config(built_in_rules=self.rules_file, group='inspection_rules')
+        self.assertRaises(FileNotFoundError,
+                          self.repository.get_built_in_rules)
+
+    @mock.patch.object(objects.InspectionRule, 'list',
+                       wraps=objects.InspectionRule.list)
+    def test_db_rules_cached(self, mock_list):
+        expected = self._uuids([self.rule1, self.rule2, self.sensitive_rule])
+        rules = self.repository.get_db_rules(self.context, 'main')
+        self.assertEqual(expected, self._uuids(rules))
+        self.assertIs(rules, self.repository.get_db_rules(self.context,
+                                                          'main'))
+        mock_list.assert_called_once_with(context=self.context,
+                                          filters={'phase': 'main'})
+
+        # Phases are cached separately
+        self.assertEqual([], self.repository.get_db_rules(self.context,
+                                                          'other'))
+        self.assertEqual(2, mock_list.call_count)
+
+    @mock.patch.object(objects.InspectionRule, 'list',
+                       wraps=objects.InspectionRule.list)
+    def test_db_rules_reloaded_on_change(self, mock_list):
+        self.repository.get_db_rules(self.context, 'main')
+
+        rule = obj_utils.create_test_inspection_rule(self.context)
+        rules = self.repository.get_db_rules(self.context, 'main')
+        self.assertIn(rule.uuid, self._uuids(rules))
+        self.assertEqual(2, mock_list.call_count)
+
+        rule.description = 'updated'
+        rule.save()
+        rules = self.repository.get_db_rules(self.context, 'main')
+        self.assertIn('updated', [r.description for r in rules])
+        self.assertEqual(3, mock_list.call_count)
+
+        rule.destroy()
+        rules = self.repository.get_db_rules(self.context, 'main')
+        self.assertNotIn(rule.uuid, self._uuids(rules))
+        self.assertEqual(4, mock_list.call_count)
+
+    @mock.patch.object(objects.InspectionRule, 'list',
+                       wraps=objects.InspectionRule.list)
+    def test_db_rules_reloaded_on_generation_change(self, mock_list):
+        self.repository.get_db_rules(self.context, 'main')
+        with mock.patch.object(objects.InspectionRule, 'get_generation',
+                               autospec=True, return_value=42):
+            self.repository.get_db_rules(self.context, 'main')
+            self.repository.get_db_rules(self.context, 'main')
+        self.assertEqual(2, mock_list.call_count)
+
+    @mock.patch.object(objects.InspectionRule, 'get_generation',
+                       autospec=True)
+    @mock.patch.object(objects.InspectionRule, 'list',
+                       wraps=objects.InspectionRule.list)
+    def test_db_rules_not_cached_when_pinned(self, mock_list,
+                                             mock_generation):
+        self.config(pin_release_version='2025.2')
+        self.repository.get_db_rules(self.context, 'main')
+        self.repository.get_db_rules(self.context, 'main')
+        self.assertEqual(2, mock_list.call_count)
+        mock_generation.assert_not_called()
+
+    @mock.patch.object(objects.InspectionRule, 'list',
+                       wraps=objects.InspectionRule.list)
+    def test_reset(self, mock_list):
+        self.repository.get_db_rules(self.context, 'main')
+        self.repository.reset()
+        self.repository.get_db_rules(self.context, 'main')
+        self.assertEqual(2, mock_list.call_count)
+
+    def test_get_rules(self):
+        self.config(built_in_rules=self.rules_file, group='inspection_rules')
+        self._write_rules('rule-a')
+        rules = self.repository.get_rules(self.context, 'main')
+        self.assertEqual(4, len(rules))
+        # A new list is returned every time
+        rules.pop()
+        self.assertEqual(4, len(self.repository.get_rules(self.context,
+                                                          'main')))
+
 
 class TestCheckRule(TestInspectionRules):
 
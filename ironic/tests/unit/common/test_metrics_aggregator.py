@@ -0,0 +1,69 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from ironic.common import metrics_aggregator
+from ironic.tests import base
+
+
+class TestAggregatingMetricLogger(base.TestCase):
+    def setUp(self):
+        super(TestAggregatingMetricLogger, self).setUp()
+        cfg.CONF.set_override('aggregator_buckets', [10, 100, 1000],
+                              group='metrics')
+        cfg.CONF.set_override('aggregator_quantiles', [0.5, 0.9],
+                              group='metrics')
+        self.ml = metrics_aggregator.AggregatingMetricLogger('prefix', '.')
+        self.addCleanup(metrics_aggregator.STATISTIC_DATA.clear)
+
+    def test_counter_and_gauge(self):
+        self.ml.send_counter('part1.counter', 1)
+        self.ml.send_counter('part1.counter', 2)
+        self.ml._counter('part1.sampled', 1, sample_rate=0.5)
+        self.ml.send_gauge('part1.gauge', 66)
+        self.ml.send_gauge('part1.gauge', 42)
+        self.assertEqual(
+            {'part1.counter': {'count': 3, 'type': 'counter'},
+             'part1.sampled': {'count': 2.0, 'type': 'counter'},
+             'part1.gauge': {'value': 42, 'type': 'gauge'}},
+            self.ml.get_metrics_data())
+
+    def test_timer(self):
+        for value in (2, 4, 50, 60, 70, 80, 90, 500, 5000, 10):
+            self.ml.send_timer('part1.timer', value)
+        data = self.ml.get_metrics_data()['part1.timer']
+        self.assertEqual('timer', data['type'])
+        self.assertEqual(10, data['count'])
+        self.assertEqual(5866, data['sum'])
+        self.assertEqual(2, data['min'])
+        self.assertEqual(5000, data['max'])
+        # Buckets are cumulative, upper bounds are inclusive
+        self.assertEqual({'10.0': 3, '100.0': 8, '1000.0': 9, '+Inf': 10},
+                         data['buckets'])
+        # The median falls into the (10, 100] bucket: 2 of its 5 values
+        self.assertEqual(10 + 90 * 2 / 5, data['quantiles']['0.5'])
+        # The 90th percentile falls into the (100, 1000] bucket
+        self.assertEqual(1000, data['quantiles']['0.9'])
+
+    def test_timer_quantiles_clamped(self):
+        self.ml.send_timer('part1.timer', 20)
+        data = self.ml.get_metrics_data()['part1.timer']
+        self.assertEqual({'0.5': 20, '0.9': 20}, data['quantiles'])
+
+    def test_snapshot(self):
+        self.ml.send_counter('part1.counter', 1)
+        data = self.ml.get_metrics_data()
+        self.ml.send_counter('part1.counter', 1)
+        self.assertEqual(1, data['part1.counter']['count'])
+        self.assertEqual(2,
+                         self.ml.get_metrics_data()['part1.counter']['count'])
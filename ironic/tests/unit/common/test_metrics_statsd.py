@@ -16,6 +16,7 @@
 import socket
 from unittest import mock
 
+from oslo_config import cfg
 
 from ironic.common import metrics_statsd
 from ironic.tests import base
@@ -102,3 +103,65 @@ class TestStatsdMetricLogger(base.TestCase):
             b'part1.part2:5|type@0.5',
             ('test-host', 4321))
         mock_socket.close.assert_called_once_with()
+
+
+@mock.patch.object(metrics_statsd.StatsdMetricLogger, '_ensure_flusher',
+                   autospec=True)
+@mock.patch.object(metrics_statsd.StatsdMetricLogger, '_send_packet',
+                   autospec=True)
+class TestStatsdMetricLoggerBatching(base.TestCase):
+    def setUp(self):
+        super(TestStatsdMetricLoggerBatching, self).setUp()
+        cfg.CONF.set_override('statsd_flush_interval', 10,
+                              group='metrics_statsd')
+        cfg.CONF.set_override('statsd_max_packet_size', 64,
+                              group='metrics_statsd')
+        self.ml = metrics_statsd.StatsdMetricLogger('prefix', '.',
+                                                    'test-host', 4321)
+        self.addCleanup(metrics_statsd._BUFFERS.clear)
+
+    def test_send_buffered(self, mock_send_packet, mock_flusher):
+        self.ml._send('part1.part2', 2, 'c')
+        self.ml._send('part1.part3', 3.5, 'ms')
+        mock_send_packet.assert_not_called()
+        mock_flusher.assert_called_with(self.ml)
+
+        metrics_statsd.flush('test-host', 4321)
+        mock_send_packet.assert_called_once_with(
+            mock.ANY, 'part1.part2:2|c\npart1.part3:3.5|ms')
+
+        mock_send_packet.reset_mock()
+        metrics_statsd.flush('test-host', 4321)
+        mock_send_packet.assert_not_called()
+
+    def test_send_packet_full(self, mock_send_packet, mock_flusher):
+        cfg.CONF.set_override('statsd_max_packet_size', 70,
+                              group='metrics_statsd')
+        for i in range(5):
+            self.ml._send('metric.number.%d' % i, 100, 'ms')
+        # Three metrics of 23 bytes (with the separator) fit into 70 bytes
+        mock_send_packet.assert_called_once_with(
+            self.ml, 'metric.number.0:100|ms\nmetric.number.1:100|ms\n'
+            'metric.number.2:100|ms')
+        mock_send_packet.reset_mock()
+        metrics_statsd.flush('test-host', 4321)
+        mock_send_packet.assert_called_once_with(
+            mock.ANY, 'metric.number.3:100|ms\nmetric.number.4:100|ms')
+
+    @mock.patch.object(metrics_statsd.time, 'monotonic', autospec=True)
+    def test_send_interval_elapsed(self, mock_time, mock_send_packet,
+                                   mock_flusher):
+        mock_time.return_value = 100
+        self.ml._send('part1.part2', 2, 'c')
+        mock_send_packet.assert_not_called()
+        mock_time.return_value = 110
+        self.ml._send('part1.part3', 3, 'c')
+        mock_send_packet.assert_called_once_with(
+            self.ml, 'part1.part2:2|c\npart1.part3:3|c')
+
+    def test_send_not_buffered(self, mock_send_packet, mock_flusher):
+        cfg.CONF.set_override('statsd_flush_interval', 0,
+                              group='metrics_statsd')
+        self.ml._send('part1.part2', 2, 'c')
+        mock_send_packet.assert_called_once_with(self.ml, 'part1.part2:2|c')
+        mock_flusher.assert_not_called()
@@ -17,6 +17,7 @@ from oslo_config import cfg
 
 from ironic.common import exception
 from ironic.common import metrics
+from ironic.common import metrics_aggregator
 from ironic.common import metrics_statsd
 from ironic.common import metrics_utils
 from ironic.tests import base
@@ -39,9 +40,17 @@ class TestGetLogger(base.TestCase):
         self.assertIsInstance(_metrics, metrics_statsd.StatsdMetricLogger)
         CONF.clear_override('backend', group='metrics')
 
+    def test_aggregator_backend(self):
+        CONF.set_override('backend', 'aggregator', group='metrics')
+
+        _metrics = metrics_utils.get_metrics_logger('foo')
+        self.assertIsInstance(_metrics,
+                              metrics_aggregator.AggregatingMetricLogger)
+
     def test_nonexisting_backend(self):
-        self.assertRaises(exception.InvalidMetricConfig,
-                          metrics_utils.get_metrics_logger, 'foo', 'test')
+        self.assertRaisesRegex(exception.InvalidMetricConfig,
+                               "'aggregator'",
+                               metrics_utils.get_metrics_logger, 'foo', 'test')
 
     def test_numeric_prefix(self):
         self.assertRaises(exception.InvalidMetricConfig,
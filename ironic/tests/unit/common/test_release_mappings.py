@@ -114,7 +114,9 @@ class ReleaseMappingsTestCase(base.TestCase):
         # NodeBase is also excluded as it is covered by Node.
         exceptions = set(['NodeTag', 'ConductorHardwareInterfaces',
                           'NodeTrait', 'DeployTemplateStep',
-                          'NodeBase', 'RunbookStep', 'RunbookTrait'])
+                          'NodeBase', 'RunbookStep', 'RunbookTrait',
+                          'NodeLookupAddress', 'NodeAsyncOperation',
+                          'Revision'])
         model_names -= exceptions
         # NodeTrait maps to two objects
         model_names |= set(['Trait', 'TraitList'])
@@ -12,10 +12,12 @@
 
 import multiprocessing.reduction
 import pickle
+from unittest import mock
 
 from oslo_config import cfg
 
 from ironic.common import service as ironic_service
+from ironic.conductor import task_manager
 from ironic.conf import CONF
 from ironic.tests import base
 
@@ -95,3 +97,16 @@ class TestConfSpawnSafe(base.TestCase):
         ironic_service._make_conf_spawn_safe()
         self.assertTrue(
             getattr(cfg.ConfigOpts, '_ironic_spawn_safe', False))
+
+
+class TestHeldLocksReport(base.TestCase):
+
+    @mock.patch.object(task_manager, 'get_held_locks', autospec=True)
+    def test_report(self, mock_locks):
+        mock_locks.return_value = [
+            {'node': 'node-1', 'purpose': 'node deployment', 'age': 42.123},
+        ]
+        report = ironic_service._held_locks_report()
+        self.assertEqual(['node-1: node deployment (held 42.1 seconds)'],
+                         report['locks'])
+        self.assertIn('node-1: node deployment', report.to_text())
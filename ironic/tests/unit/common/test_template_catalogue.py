@@ -0,0 +1,139 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from oslo_utils import uuidutils
+
+from ironic.common import exception
+from ironic.common import template_catalogue
+from ironic import objects
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+
+class CatalogueTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.template1 = obj_utils.create_test_deploy_template(self.context)
+        self.template2 = obj_utils.create_test_deploy_template(
+            self.context, name='CUSTOM_DT2', uuid=uuidutils.generate_uuid())
+        self.runbook = obj_utils.create_test_runbook(self.context)
+
+    def _names(self, templates):
+        return [template.name for template in templates]
+
+    @mock.patch.object(objects.DeployTemplate, 'list',
+                       wraps=objects.DeployTemplate.list)
+    def test_get_deploy_templates_by_names(self, mock_list):
+        templates = template_catalogue.get_deploy_templates_by_names(
+            self.context, ['CUSTOM_DT2', 'CUSTOM_FOO', 'CUSTOM_DT1'])
+        self.assertEqual(['CUSTOM_DT1', 'CUSTOM_DT2'], self._names(templates))
+        self.assertEqual(['create_configuration'],
+                         [step['step'] for step in templates[0].steps])
+
+        # Callers get their own copies
+        templates[0].name = 'CUSTOM_CHANGED'
+        templates = template_catalogue.get_deploy_templates_by_names(
+            self.context, ['CUSTOM_DT1'])
+        self.assertEqual(['CUSTOM_DT1'], self._names(templates))
+        self.assertIs(self.context, templates[0]._context)
+        mock_list.assert_called_once_with(self.context, limit=1001)
+
+    @mock.patch.object(objects.DeployTemplate, 'list',
+                       wraps=objects.DeployTemplate.list)
+    def test_get_deploy_templates_by_names_changed(self, mock_list):
+        template_catalogue.get_deploy_templates_by_names(self.context,
+                                                         ['CUSTOM_DT1'])
+        self.template1.steps = [{'interface': 'bios',
+                                 'step': 'apply_configuration',
+                                 'args': {}, 'priority': 50}]
+        self.template1.save()
+        templates = template_catalogue.get_deploy_templates_by_names(
+            self.context, ['CUSTOM_DT1'])
+        self.assertEqual('bios', templates[0].steps[0]['interface'])
+
+        self.template2.destroy()
+        self.assertEqual([], template_catalogue.get_deploy_templates_by_names(
+            self.context, ['CUSTOM_DT2']))
+        self.assertEqual(3, mock_list.call_count)
+
+    @mock.patch.object(objects.DeployTemplate, 'list_by_names',
+                       wraps=objects.DeployTemplate.list_by_names)
+    def test_get_deploy_templates_by_names_too_many(self, mock_list_by_names):
+        self.config(template_cache_size=1)
+        for _i in range(2):
+            templates = template_catalogue.get_deploy_templates_by_names(
+                self.context, ['CUSTOM_DT1', 'CUSTOM_DT2'])
+            self.assertCountEqual(['CUSTOM_DT1', 'CUSTOM_DT2'],
+                                  self._names(templates))
+        self.assertEqual(2, mock_list_by_names.call_count)
+
+    @mock.patch.object(objects.DeployTemplate, 'get_generation',
+                       autospec=True)
+    @mock.patch.object(objects.DeployTemplate, 'list_by_names',
+                       wraps=objects.DeployTemplate.list_by_names)
+    def test_get_deploy_templates_by_names_disabled(self, mock_list_by_names,
+                                                    mock_generation):
+        self.config(template_cache_size=0)
+        templates = template_catalogue.get_deploy_templates_by_names(
+            self.context, ['CUSTOM_DT1'])
+        self.assertEqual(['CUSTOM_DT1'], self._names(templates))
+        mock_list_by_names.assert_called_once_with(self.context,
+                                                   ['CUSTOM_DT1'])
+        mock_generation.assert_not_called()
+
+    @mock.patch.object(objects.Runbook, 'list', wraps=objects.Runbook.list)
+    def test_get_runbook(self, mock_list):
+        for ident in (self.runbook.uuid, self.runbook.name):
+            runbook = template_catalogue.get_runbook(self.context, ident)
+            self.assertEqual(self.runbook.uuid, runbook.uuid)
+            self.assertEqual(1, len(runbook.steps))
+        self.assertEqual(1, mock_list.call_count)
+
+        objects.Runbook.dbapi.add_runbook_trait(self.runbook.id, 'CUSTOM_A',
+                                                version='1.0')
+        runbook = template_catalogue.get_runbook(self.context,
+                                                 self.runbook.name)
+        self.assertEqual(['CUSTOM_A'], runbook.traits)
+        self.assertEqual(2, mock_list.call_count)
+
+    def test_get_runbook_not_found(self):
+        for ident in (uuidutils.generate_uuid(), 'CUSTOM_FOO'):
+            self.assertRaises(exception.RunbookNotFound,
+                              template_catalogue.get_runbook,
+                              self.context, ident)
+
+    @mock.patch.object(objects.DeployTemplate, 'list',
+                       wraps=objects.DeployTemplate.list)
+    def test_reset(self, mock_list):
+        template_catalogue.get_deploy_templates_by_names(self.context,
+                                                         ['CUSTOM_DT1'])
+        template_catalogue.reset_template_catalogue()
+        template_catalogue.get_deploy_templates_by_names(self.context,
+                                                         ['CUSTOM_DT1'])
+        self.assertEqual(2, mock_list.call_count)
+
+    @mock.patch.object(objects.DeployTemplate, 'get_generation',
+                       autospec=True)
+    @mock.patch.object(objects.DeployTemplate, 'list_by_names',
+                       wraps=objects.DeployTemplate.list_by_names)
+    def test_get_deploy_templates_by_names_pinned(self, mock_list_by_names,
+                                                  mock_generation):
+        self.config(pin_release_version='2025.2')
+        for _i in range(2):
+            templates = template_catalogue.get_deploy_templates_by_names(
+                self.context, ['CUSTOM_DT1'])
+            self.assertEqual(['CUSTOM_DT1'], self._names(templates))
+        self.assertEqual(2, mock_list_by_names.call_count)
+        mock_generation.assert_not_called()
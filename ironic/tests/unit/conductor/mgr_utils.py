@@ -26,6 +26,7 @@ from oslo_config import cfg
 from oslo_utils import strutils
 from oslo_utils import uuidutils
 
+from ironic.common import context as ironic_context
 from ironic.common import driver_factory
 from ironic.common import exception
 from ironic.common import hash_ring
@@ -209,6 +210,8 @@ class ServiceSetUpMixin(object):
         # service startup in BaseConductorManager's prepare_host method
         self.dbapi.clear_node_target_power_state(self.service.host)
         self.dbapi.clear_node_reservations_for_conductor(self.service.host)
+        self.service._reject_unfinished_provision_job_batches(
+            ironic_context.get_admin_context())
 
         if not start_periodic_tasks:
             with mock.patch.object(periodics, 'PeriodicWorker', autospec=True):
@@ -226,6 +229,9 @@ class ServiceSetUpMixin(object):
         if CONF.conductor.enable_mdns:
             self.service._publish_endpoint()
 
+        if CONF.redfish_events.enabled:
+            self.service._start_event_listener()
+
 
 def mock_record_keepalive(func_or_class):
     return mock.patch.object(
@@ -0,0 +1,154 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for the concurrent action admission control."""
+
+from unittest import mock
+
+import fixtures
+from oslo_config import cfg
+from oslo_utils import uuidutils
+
+from ironic.common import states
+from ironic.conductor import admission
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+CONF = cfg.CONF
+
+
+@mock.patch.object(admission.time, 'monotonic', autospec=True,
+                   return_value=1000.0)
+class ConcurrentActionCountersTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super(ConcurrentActionCountersTestCase, self).setUp()
+        self.counters = admission.ConcurrentActionCounters()
+        CONF.set_override('max_concurrent_deploy', 100, group='conductor')
+        CONF.set_override('max_concurrent_clean', 50, group='conductor')
+        CONF.set_override('concurrent_action_count_interval', 10,
+                          group='conductor')
+        CONF.set_override('concurrent_action_count_margin', 5,
+                          group='conductor')
+
+    def _mock_count(self):
+        return self.useFixture(fixtures.MockPatchObject(
+            self.dbapi, 'count_nodes_in_provision_state',
+            autospec=True)).mock
+
+    def _create_nodes(self, count, provision_state, **kwargs):
+        for _ in range(count):
+            obj_utils.create_test_node(
+                self.context, uuid=uuidutils.generate_uuid(),
+                provision_state=provision_state, **kwargs)
+
+    def test_capacity(self, mock_time):
+        self._create_nodes(2, states.DEPLOYING)
+        self._create_nodes(1, states.DEPLOYWAIT)
+        self._create_nodes(1, states.CLEANWAIT)
+        self._create_nodes(1, states.DELETING)
+        self.assertEqual(97, self.counters.capacity('provisioning'))
+        self.assertEqual(48, self.counters.capacity('cleaning'))
+        self.assertEqual(48, self.counters.capacity('unprovisioning'))
+        self.assertIsNone(self.counters.capacity('service'))
+
+    def test_capacity_cached(self, mock_time):
+        mock_count = self._mock_count()
+        mock_count.return_value = 10
+        self.assertEqual(90, self.counters.capacity('provisioning'))
+        self.assertEqual(90, self.counters.capacity('provisioning'))
+        mock_count.assert_called_once_with(
+            [states.DEPLOYING, states.DEPLOYWAIT],
+            conductor_group=None)
+
+        # Cleaning and unprovisioning share a counter
+        self.assertEqual(40, self.counters.capacity('cleaning'))
+        self.assertEqual(40, self.counters.capacity('unprovisioning'))
+        self.assertEqual(2, mock_count.call_count)
+
+    def test_capacity_expired(self, mock_time):
+        mock_count = self._mock_count()
+        mock_count.side_effect = [10, 20]
+        self.assertEqual(90, self.counters.capacity('provisioning'))
+        mock_time.return_value = 1010.0
+        self.assertEqual(80, self.counters.capacity('provisioning'))
+        self.assertEqual(2, mock_count.call_count)
+
+    def test_capacity_no_cache(self, mock_time):
+        mock_count = self._mock_count()
+        CONF.set_override('concurrent_action_count_interval', 0,
+                          group='conductor')
+        mock_count.return_value = 10
+        self.counters.capacity('provisioning')
+        self.counters.capacity('provisioning')
+        self.assertEqual(2, mock_count.call_count)
+
+    def test_capacity_near_limit(self, mock_time):
+        mock_count = self._mock_count()
+        mock_count.side_effect = [94, 96, 90]
+        # 6 actions left, above the margin
+        self.assertEqual(6, self.counters.capacity('provisioning'))
+        self.counters.record_start('provisioning')
+        # 5 actions left according to the cache, recount
+        self.assertEqual(4, self.counters.capacity('provisioning'))
+        # Still within the margin, recount
+        self.assertEqual(10, self.counters.capacity('provisioning'))
+        self.assertEqual(3, mock_count.call_count)
+
+    def test_capacity_other_conductors(self, mock_time):
+        mock_count = self._mock_count()
+        mock_count.side_effect = [80, 84]
+        mock_conductors = self.useFixture(fixtures.MockPatchObject(
+            self.dbapi, 'get_online_conductors', autospec=True)).mock
+        mock_conductors.return_value = ['c1', 'c2', 'c3']
+        self.assertEqual(20, self.counters.capacity('provisioning'))
+        for _i in range(4):
+            self.counters.record_start('provisioning')
+        # The other conductors may have started 4 actions each, 8 left
+        self.assertEqual(8, self.counters.capacity('provisioning'))
+        self.counters.record_start('provisioning')
+        # Only 5 left according to the estimate, recount
+        self.assertEqual(16, self.counters.capacity('provisioning'))
+        self.assertEqual(2, mock_count.call_count)
+        mock_conductors.assert_called_with(conductor_group=None)
+
+    def test_record_start(self, mock_time):
+        mock_count = self._mock_count()
+        mock_count.return_value = 10
+        self.counters.record_start('provisioning')
+        self.assertEqual(90, self.counters.capacity('provisioning'))
+        self.counters.record_start('provisioning')
+        self.counters.record_start('cleaning')
+        self.counters.record_start('service')
+        self.assertEqual(89, self.counters.capacity('provisioning'))
+        self.assertEqual(1, mock_count.call_count)
+
+    def test_capacity_per_conductor_group(self, mock_time):
+        mock_count = self._mock_count()
+        CONF.set_override('max_concurrent_per_conductor_group', True,
+                          group='conductor')
+        CONF.set_override('conductor_group', 'group-a', group='conductor')
+        mock_count.side_effect = [10, 20]
+        self.assertEqual(90, self.counters.capacity('provisioning'))
+        CONF.set_override('conductor_group', 'group-b', group='conductor')
+        self.assertEqual(80, self.counters.capacity('provisioning'))
+        mock_count.assert_called_with(
+            [states.DEPLOYING, states.DEPLOYWAIT],
+            conductor_group='group-b')
+
+    def test_reset(self, mock_time):
+        mock_count = self._mock_count()
+        mock_count.return_value = 10
+        self.counters.capacity('provisioning')
+        self.counters.reset()
+        self.counters.capacity('provisioning')
+        self.assertEqual(2, mock_count.call_count)
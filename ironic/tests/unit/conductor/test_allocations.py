@@ -12,6 +12,7 @@
 
 """Unit tests for functionality related to allocations."""
 
+import threading
 from unittest import mock
 
 import oslo_messaging as messaging
@@ -57,8 +58,7 @@ class AllocationTestCase(mgr_utils.ServiceSetUpMixin, db_base.DbTestCase):
         self.assertEqual(self.service.conductor.id, res['conductor_affinity'])
 
         mock_spawn.assert_called_once_with(self.service,
-                                           allocations.do_allocate,
-                                           self.context, mock.ANY)
+                                           self.service._allocations._process)
 
     @mock.patch.object(manager.ConductorManager, '_spawn_worker', mock.Mock())
     @mock.patch.object(allocations, 'backfill_allocation', autospec=True)
@@ -349,6 +349,47 @@ class DoAllocateTestCase(db_base.DbTestCase):
         # All nodes are filtered out on the database level.
         self.assertFalse(mock_acquire.called)
 
+    @mock.patch.object(task_manager, 'acquire', autospec=True,
+                       side_effect=task_manager.acquire)
+    def test_nodes_filtered_out_traits(self, mock_acquire):
+        node = obj_utils.create_test_node(self.context,
+                                          uuid=uuidutils.generate_uuid(),
+                                          resource_class='x-large',
+                                          power_state='power off',
+                                          provision_state='available')
+        db_utils.create_test_node_traits(['tr1'], node_id=node.id)
+
+        allocation = obj_utils.create_test_allocation(self.context,
+                                                      resource_class='x-large',
+                                                      traits=['tr1', 'tr2'])
+        allocations.do_allocate(self.context, allocation)
+        self.assertIn('no suitable nodes have the requested traits',
+                      allocation['last_error'])
+        self.assertEqual('error', allocation['state'])
+
+        # All nodes are filtered out on the database level.
+        self.assertFalse(mock_acquire.called)
+
+    def test_candidate_limit(self):
+        self.config(allocation_candidate_limit=2, group='conductor')
+        nodes = [obj_utils.create_test_node(self.context,
+                                            uuid=uuidutils.generate_uuid(),
+                                            name='node-%d' % i,
+                                            resource_class='x-large',
+                                            power_state='power off',
+                                            provision_state='available')
+                 for i in range(5)]
+        allocation = obj_utils.create_test_allocation(self.context,
+                                                      name='node-4',
+                                                      resource_class='x-large')
+
+        candidates = allocations._candidate_nodes(self.context, allocation)
+        self.assertEqual(2, len(candidates))
+        # The node matching the allocation name is always tried first
+        self.assertEqual(nodes[4].uuid, candidates[0].uuid)
+        self.assertLess({c.uuid for c in candidates},
+                        {n.uuid for n in nodes})
+
     @mock.patch.object(task_manager, 'acquire', autospec=True,
                        side_effect=task_manager.acquire)
     def test_nodes_filtered_out_project(self, mock_acquire):
@@ -377,9 +418,9 @@ class DoAllocateTestCase(db_base.DbTestCase):
         # All nodes are filtered out on the database level.
         self.assertFalse(mock_acquire.called)
 
-    @mock.patch.object(task_manager, 'acquire', autospec=True,
-                       side_effect=task_manager.acquire)
-    def test_nodes_locked(self, mock_acquire):
+    @mock.patch.object(objects.Allocation, 'claim_node', autospec=True,
+                       side_effect=objects.Allocation.claim_node)
+    def test_nodes_locked(self, mock_claim):
         self.config(node_locked_retry_attempts=2, group='conductor')
         node1 = obj_utils.create_test_node(self.context,
                                            uuid=uuidutils.generate_uuid(),
@@ -401,17 +442,40 @@ class DoAllocateTestCase(db_base.DbTestCase):
         self.assertIn('could not reserve any of 2', allocation['last_error'])
         self.assertEqual('error', allocation['state'])
 
-        self.assertEqual(6, mock_acquire.call_count)
-        # NOTE(dtantsur): node are tried in random order by design, so we
-        # cannot directly use assert_has_calls. Check that all nodes are tried
-        # before going into retries (rather than each tried 3 times in a row).
-        nodes = [call[0][1] for call in mock_acquire.call_args_list]
-        for offset in (0, 2, 4):
-            self.assertEqual(set(nodes[offset:offset + 2]),
-                             {node1.uuid, node2.uuid})
-
-    @mock.patch.object(task_manager, 'acquire', autospec=True)
-    def test_nodes_changed_after_lock(self, mock_acquire):
+        # All nodes are offered to the database at once on each attempt.
+        self.assertEqual(3, mock_claim.call_count)
+        for call in mock_claim.call_args_list:
+            self.assertEqual({node1.uuid, node2.uuid}, set(call[0][1]))
+
+    @mock.patch.object(allocations, '_CLAIM_CHUNK_SIZE', 2)
+    @mock.patch.object(objects.Allocation, 'claim_node', autospec=True,
+                       side_effect=objects.Allocation.claim_node)
+    def test_nodes_claimed_in_chunks(self, mock_claim):
+        nodes = [obj_utils.create_test_node(self.context,
+                                            uuid=uuidutils.generate_uuid(),
+                                            resource_class='x-large',
+                                            power_state='power off',
+                                            provision_state='available',
+                                            reservation='example.com')
+                 for _ in range(4)]
+        node = obj_utils.create_test_node(self.context,
+                                          uuid=uuidutils.generate_uuid(),
+                                          resource_class='x-large',
+                                          power_state='power off',
+                                          provision_state='available')
+
+        allocation = obj_utils.create_test_allocation(self.context,
+                                                      resource_class='x-large')
+        result = allocations._claim_node(self.context, allocation,
+                                         nodes + [node])
+        self.assertEqual(node.uuid, result.uuid)
+        self.assertEqual(3, mock_claim.call_count)
+        self.assertEqual('active', allocation.state)
+        self.assertEqual(node.id, allocation.node_id)
+
+    @mock.patch.object(objects.Allocation, 'claim_node', autospec=True,
+                       side_effect=objects.Allocation.claim_node)
+    def test_nodes_changed_after_listing(self, mock_claim):
         nodes = [obj_utils.create_test_node(self.context,
                                             uuid=uuidutils.generate_uuid(),
                                             resource_class='x-large',
@@ -421,7 +485,13 @@ class DoAllocateTestCase(db_base.DbTestCase):
         for node in nodes:
             db_utils.create_test_node_trait(trait='tr1', node_id=node.id)
 
-        # Modify nodes in-memory so that they no longer match the allocation:
+        allocation = obj_utils.create_test_allocation(self.context,
+                                                      resource_class='x-large',
+                                                      traits=['tr1'])
+        candidates = allocations._candidate_nodes(self.context, allocation)
+        self.assertEqual(5, len(candidates))
+
+        # Modify nodes so that they no longer match the allocation:
 
         # Resource class does not match
         nodes[0].resource_class = 'x-small'
@@ -431,23 +501,19 @@ class DoAllocateTestCase(db_base.DbTestCase):
         nodes[2].maintenance = True
         # Already associated
         nodes[3].instance_uuid = uuidutils.generate_uuid()
+        for node in nodes[:4]:
+            node.save()
         # Traits changed
-        nodes[4].traits.objects[:] = []
-
-        mock_acquire.side_effect = [
-            mock.MagicMock(**{'__enter__.return_value.node': node})
-            for node in nodes
-        ]
+        objects.TraitList.destroy(self.context, nodes[4].id)
 
-        allocation = obj_utils.create_test_allocation(self.context,
-                                                      resource_class='x-large',
-                                                      traits=['tr1'])
-        allocations.do_allocate(self.context, allocation)
+        with mock.patch.object(allocations, '_candidate_nodes',
+                               autospec=True, return_value=candidates):
+            allocations.do_allocate(self.context, allocation)
         self.assertIn('all nodes were filtered out', allocation['last_error'])
         self.assertEqual('error', allocation['state'])
 
         # No retries for these failures.
-        self.assertEqual(5, mock_acquire.call_count)
+        self.assertEqual(1, mock_claim.call_count)
 
     @mock.patch.object(task_manager, 'acquire', autospec=True,
                        side_effect=task_manager.acquire)
@@ -512,6 +578,177 @@ class DoAllocateTestCase(db_base.DbTestCase):
         self.assertEqual('node-2', node['name'])
 
 
+class AllocationBatchTestCase(db_base.DbTestCase):
+    def setUp(self):
+        super(AllocationBatchTestCase, self).setUp()
+        self.nodes = [obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid(),
+            power_state='power on', resource_class='x-large',
+            provision_state='available') for _ in range(3)]
+
+    def _create_allocations(self, count, **kwargs):
+        kwargs.setdefault('resource_class', 'x-large')
+        return [obj_utils.create_test_allocation(
+            self.context, uuid=uuidutils.generate_uuid(),
+            name=uuidutils.generate_uuid(), **kwargs) for _ in range(count)]
+
+    def _node_ids(self, allocations):
+        return [objects.Allocation.get_by_uuid(self.context, a.uuid).node_id
+                for a in allocations]
+
+    @mock.patch.object(objects.Allocation, 'claim_node', autospec=True,
+                       side_effect=objects.Allocation.claim_node)
+    @mock.patch.object(allocations, '_candidate_nodes', autospec=True,
+                       side_effect=allocations._candidate_nodes)
+    def test_allocate_batch(self, mock_candidates, mock_claim):
+        batch = self._create_allocations(3)
+        allocations._allocate_batch([(self.context, a) for a in batch])
+
+        self.assertEqual(sorted(n.id for n in self.nodes),
+                         sorted(self._node_ids(batch)))
+        mock_candidates.assert_called_once_with(self.context, batch[0],
+                                                count=3)
+        # The allocations do not compete for the same nodes.
+        self.assertEqual(3, mock_claim.call_count)
+
+    def test_allocate_batch_not_enough_nodes(self):
+        batch = self._create_allocations(4)
+        allocations._allocate_batch([(self.context, a) for a in batch])
+
+        node_ids = self._node_ids(batch)
+        self.assertEqual(sorted(n.id for n in self.nodes),
+                         sorted(n for n in node_ids if n is not None))
+        failed = [a for a, n in zip(batch, node_ids) if n is None]
+        self.assertEqual(1, len(failed))
+        failed[0].refresh()
+        self.assertEqual('error', failed[0].state)
+        self.assertIn('no available nodes', failed[0].last_error)
+
+    def test_allocate_batch_no_nodes(self):
+        batch = self._create_allocations(2, resource_class='x-small')
+        allocations._allocate_batch([(self.context, a) for a in batch])
+
+        for allocation in batch:
+            allocation.refresh()
+            self.assertEqual('error', allocation.state)
+            self.assertIn(allocation.uuid, allocation.last_error)
+
+    @mock.patch.object(allocations, '_allocate_batch', autospec=True,
+                       return_value=[])
+    def test_batcher(self, mock_allocate):
+        batcher = allocations.AllocationBatcher()
+        spawn = mock.Mock()
+        large = self._create_allocations(2)
+        small = self._create_allocations(1, resource_class='x-small')
+
+        batcher.submit(self.context, large[0], spawn)
+        spawn.assert_called_once_with(batcher._process)
+        # A worker is already processing allocations.
+        batcher.submit(self.context, large[1], spawn)
+        batcher.submit(self.context, small[0], spawn)
+        spawn.assert_called_once_with(batcher._process)
+
+        batcher._process()
+        mock_allocate.assert_has_calls([
+            mock.call([(self.context, large[0]), (self.context, large[1])],
+                      retry=True),
+            mock.call([(self.context, small[0])], retry=True),
+        ])
+        self.assertFalse(batcher._processing)
+        self.assertEqual([], batcher._pending)
+
+        # A new worker is spawned for new allocations
+        batcher.submit(self.context, small[0], spawn)
+        self.assertEqual(2, spawn.call_count)
+
+    @mock.patch.object(allocations, '_claim_node', autospec=True)
+    def test_batcher_retries(self, mock_claim):
+        self.config(node_locked_retry_interval=0, group='conductor')
+        mock_claim.side_effect = exception.AllocationFailed(
+            uuid='fake', error='locked')
+        batcher = allocations.AllocationBatcher()
+        allocation = self._create_allocations(1)[0]
+
+        batcher.submit(self.context, allocation, mock.Mock())
+        batcher._process()
+
+        self.assertEqual(3, mock_claim.call_count)
+        allocation.refresh()
+        self.assertEqual('error', allocation.state)
+        self.assertIn('locked', allocation.last_error)
+        self.assertFalse(batcher._processing)
+        self.assertEqual([], batcher._retries)
+
+    @mock.patch.object(allocations, '_allocate_once', autospec=True,
+                       return_value=None)
+    @mock.patch.object(allocations, '_allocate_batch', autospec=True)
+    def test_batcher_retry_does_not_block(self, mock_allocate,
+                                          mock_allocate_once):
+        self.config(node_locked_retry_interval=60, group='conductor')
+        first, second = self._create_allocations(2)
+        processed = threading.Event()
+
+        def _allocate(batch, retry):
+            if batch[0][1] is first:
+                return [(self.context, first, self.nodes)]
+            processed.set()
+            return []
+
+        mock_allocate.side_effect = _allocate
+        batcher = allocations.AllocationBatcher()
+
+        def spawn(func):
+            thread = threading.Thread(target=func, daemon=True)
+            thread.start()
+            self.addCleanup(thread.join, 5)
+
+        batcher.submit(self.context, first, spawn)
+        for _i in range(500):
+            with batcher._cond:
+                if batcher._retries:
+                    break
+            processed.wait(0.01)
+        # The worker waits for the retry, but processes new allocations.
+        batcher.submit(self.context, second, spawn)
+        self.assertTrue(processed.wait(5))
+        self.assertFalse(mock_allocate_once.called)
+
+        with batcher._cond:
+            self.assertEqual(1, len(batcher._retries))
+            self.assertIs(first, batcher._retries[0][3])
+            # Let the worker finish.
+            batcher._retries = []
+            batcher._cond.notify()
+
+    @mock.patch.object(allocations, '_allocate_batch', autospec=True,
+                       side_effect=RuntimeError('boom'))
+    def test_batcher_batch_failed(self, mock_allocate):
+        batcher = allocations.AllocationBatcher()
+        batch = self._create_allocations(2)
+        for allocation in batch:
+            batcher.submit(self.context, allocation, mock.Mock())
+
+        batcher._process()
+
+        mock_allocate.assert_called_once_with(
+            [(self.context, a) for a in batch], retry=True)
+        for allocation in batch:
+            allocation.refresh()
+            self.assertEqual('error', allocation.state)
+            self.assertIn('boom', allocation.last_error)
+        self.assertFalse(batcher._processing)
+
+    def test_batcher_spawn_failed(self):
+        batcher = allocations.AllocationBatcher()
+        spawn = mock.Mock(side_effect=exception.NoFreeConductorWorker())
+        allocation = self._create_allocations(1)[0]
+
+        self.assertRaises(exception.NoFreeConductorWorker,
+                          batcher.submit, self.context, allocation, spawn)
+        self.assertFalse(batcher._processing)
+        self.assertEqual([], batcher._pending)
+
+
 class BackfillAllocationTestCase(db_base.DbTestCase):
     def test_with_associated_node(self):
         uuid = uuidutils.generate_uuid()
@@ -30,12 +30,14 @@ from ironic.common import utils as common_utils
 from ironic.conductor import base_manager
 from ironic.conductor import manager
 from ironic.conductor import notification_utils
+from ironic.conductor import power_waiter
 from ironic.conductor import task_manager
 from ironic.db import api as dbapi
 from ironic.drivers import fake_hardware
 from ironic.drivers import generic
 from ironic.drivers.modules import deploy_utils
 from ironic.drivers.modules import fake
+from ironic.drivers.modules.redfish import events as redfish_events
 from ironic import objects
 from ironic.objects import fields
 from ironic.tests import base as tests_base
@@ -65,6 +67,36 @@ class StartStopTestCase(mgr_utils.ServiceSetUpMixin, db_base.DbTestCase):
         node.refresh()
         self.assertIsNone(node.reservation)
 
+    def test_start_rejects_unfinished_provision_job_batches(self):
+        batches = {}
+        for conductor, state in [
+                (self.hostname, states.PROVISION_JOB_PENDING),
+                (self.hostname, states.PROVISION_JOB_RUNNING),
+                (self.hostname, states.PROVISION_JOB_FINISHED),
+                ('other-host', states.PROVISION_JOB_RUNNING)]:
+            batch = objects.ProvisionJobBatch(
+                self.context, job_uuid=uuidutils.generate_uuid(),
+                conductor=conductor, target=states.ACTIVE, state=state,
+                nodes=[uuidutils.generate_uuid()], params={}, results={})
+            batch.create()
+            batches[conductor, state] = batch.uuid
+        self._start_service()
+
+        for (conductor, state), batch_uuid in batches.items():
+            batch = objects.ProvisionJobBatch.get_by_uuid(self.context,
+                                                          batch_uuid)
+            if conductor == self.hostname and state in (
+                    states.PROVISION_JOB_PENDING,
+                    states.PROVISION_JOB_RUNNING):
+                self.assertEqual(states.PROVISION_JOB_FINISHED, batch.state)
+                result = batch.results[batch.nodes[0]]
+                self.assertEqual(states.PROVISION_JOB_REJECTED,
+                                 result['status'])
+                self.assertIn('restarted', result['error'])
+            else:
+                self.assertEqual(state, batch.state)
+                self.assertEqual({}, batch.results)
+
     def test_stop_clears_conductor_locks(self):
         node = obj_utils.create_test_node(self.context,
                                           reservation=self.hostname)
@@ -306,6 +338,55 @@ class StartStopTestCase(mgr_utils.ServiceSetUpMixin, db_base.DbTestCase):
         mock_zc.close.assert_called_once_with()
         self.assertIsNone(self.service._zeroconf)
 
+    @mock.patch.object(power_waiter, 'stop_power_waiter', autospec=True)
+    def test_del_host_stops_power_waiter(self, mock_stop):
+        self._start_service()
+        executor = self.service._executor
+        # Stopped while the workers can still finish the power actions
+        mock_stop.side_effect = lambda timeout: self.assertTrue(
+            executor.alive)
+        self.service.del_host()
+        mock_stop.assert_called_once_with(
+            CONF.conductor.power_state_change_timeout)
+
+    @mock.patch.object(redfish_events, 'EventListener', autospec=True)
+    def test_start_with_event_listener(self, mock_listener):
+        self.config(enabled=True, group='redfish_events')
+        self._start_service()
+        mock_listener.return_value.start.assert_called_once_with()
+        self.service.del_host()
+        mock_listener.return_value.stop.assert_called_once_with()
+        self.assertIsNone(self.service._event_listener)
+
+    def test_start_event_listener_invalid_config(self):
+        self.config(enabled=True, destination_url=None,
+                    group='redfish_events')
+        with mock.patch.object(self.dbapi, 'register_conductor',
+                               autospec=True) as mock_reg:
+            self.assertRaises(exception.ConfigInvalid,
+                              self.service.init_host)
+            self.assertFalse(mock_reg.called)
+
+    @mock.patch.object(base_manager, 'LOG', autospec=True)
+    @mock.patch.object(redfish_events, 'EventListener', autospec=True)
+    @mock.patch.object(base_manager.BaseConductorManager, 'del_host',
+                       autospec=True)
+    def test_start_event_listener_failure(self, del_mock, mock_listener,
+                                          log_mock):
+        self.config(enabled=True, group='redfish_events')
+        mock_listener.return_value.start.side_effect = OSError(
+            'Address already in use')
+        self.assertRaises(OSError, self.service.init_host)
+        self.assertTrue(log_mock.error.called)
+        del_mock.assert_called_once()
+        self.assertIsNone(self.service._event_listener)
+
+    @mock.patch.object(redfish_events, 'EventListener', autospec=True)
+    def test_start_without_event_listener(self, mock_listener):
+        self._start_service()
+        mock_listener.assert_not_called()
+        self.assertIsNone(self.service._event_listener)
+
     @mock.patch.object(dbapi, 'get_instance', autospec=True)
     def test_start_dbapi_single_call(self, mock_dbapi):
         self._start_service()
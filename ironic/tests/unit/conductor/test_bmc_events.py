@@ -0,0 +1,130 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for :mod:`ironic.conductor.bmc_events`."""
+
+import threading
+import time
+from unittest import mock
+
+from ironic.conductor import bmc_events
+from ironic.tests import base
+
+_UUID = '1be26c0b-03f2-4d2e-ae87-c02d7f33c123'
+
+
+class EventHubTestCase(base.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.hub = bmc_events.EventHub()
+
+    def test_subscribe(self):
+        self.assertFalse(self.hub.is_subscribed(_UUID))
+        token = self.hub.subscribe(_UUID)
+        self.assertTrue(self.hub.is_subscribed(_UUID))
+        self.assertTrue(self.hub.check_token(_UUID, token))
+        self.assertFalse(self.hub.check_token(_UUID, token + 'x'))
+        self.assertFalse(self.hub.check_token(_UUID, None))
+        self.assertFalse(self.hub.check_token('other', token))
+
+        # A new subscription invalidates the previous token
+        self.assertNotEqual(token, self.hub.subscribe(_UUID))
+        self.assertFalse(self.hub.check_token(_UUID, token))
+
+        self.hub.unsubscribe(_UUID)
+        self.assertFalse(self.hub.is_subscribed(_UUID))
+
+    def test_should_poll_not_subscribed(self):
+        for _i in range(3):
+            self.assertTrue(self.hub.should_poll(_UUID, bmc_events.POWER,
+                                                 'sync'))
+
+    def _poll(self, kind, consumer):
+        if not self.hub.should_poll(_UUID, kind, consumer):
+            return False
+        self.hub.record_poll(_UUID, kind, consumer)
+        return True
+
+    def test_should_poll(self):
+        self.config(safety_poll_interval=600, group='redfish_events')
+        self.hub.subscribe(_UUID)
+        # The first poll always happens
+        self.assertTrue(self._poll(bmc_events.POWER, 'sync'))
+        self.assertFalse(self._poll(bmc_events.POWER, 'sync'))
+
+        self.hub.notify(_UUID, [bmc_events.TASK])
+        self.assertFalse(self._poll(bmc_events.POWER, 'sync'))
+
+        self.hub.notify(_UUID, [bmc_events.POWER])
+        # Each consumer is woken up once
+        self.assertTrue(self._poll(bmc_events.POWER, 'sync'))
+        self.assertFalse(self._poll(bmc_events.POWER, 'sync'))
+        self.assertTrue(self._poll(bmc_events.POWER, 'other'))
+
+    def test_should_poll_not_recorded(self):
+        self.config(safety_poll_interval=600, group='redfish_events')
+        self.hub.subscribe(_UUID)
+        self.hub.record_poll(_UUID, bmc_events.POWER, 'sync')
+        self.hub.notify(_UUID, [bmc_events.POWER])
+        # E.g. the node is locked, the event is not consumed
+        for _i in range(2):
+            self.assertTrue(self.hub.should_poll(_UUID, bmc_events.POWER,
+                                                 'sync'))
+        self.hub.record_poll(_UUID, bmc_events.POWER, 'sync')
+        self.assertFalse(self.hub.should_poll(_UUID, bmc_events.POWER,
+                                              'sync'))
+
+    @mock.patch.object(time, 'monotonic', autospec=True)
+    def test_should_poll_safety_interval(self, mock_monotonic):
+        self.config(safety_poll_interval=600, group='redfish_events')
+        mock_monotonic.return_value = 1000
+        self.hub.subscribe(_UUID)
+        self.assertTrue(self._poll(bmc_events.TASK, 'raid'))
+        mock_monotonic.return_value = 1599
+        self.assertFalse(self._poll(bmc_events.TASK, 'raid'))
+        mock_monotonic.return_value = 1600
+        self.assertTrue(self._poll(bmc_events.TASK, 'raid'))
+
+    @mock.patch.object(time, 'sleep', autospec=True)
+    def test_wait_not_subscribed(self, mock_sleep):
+        self.assertFalse(self.hub.wait(_UUID, [bmc_events.POWER], 5))
+        mock_sleep.assert_called_once_with(5)
+
+    @mock.patch.object(time, 'sleep', autospec=True)
+    def test_wait_event_since(self, mock_sleep):
+        self.hub.subscribe(_UUID)
+        since = time.monotonic() - 1
+        self.hub.notify(_UUID, [bmc_events.POWER])
+        self.assertTrue(self.hub.wait(_UUID, [bmc_events.POWER], 60,
+                                      since=since))
+        mock_sleep.assert_not_called()
+
+    def test_wait_timeout(self):
+        self.hub.subscribe(_UUID)
+        self.hub.notify(_UUID, [bmc_events.TASK])
+        self.assertFalse(self.hub.wait(_UUID, [bmc_events.POWER], 0.01,
+                                       since=time.monotonic() - 1))
+
+    def test_wait_woken_up(self):
+        self.hub.subscribe(_UUID)
+        result = []
+        waiter = threading.Thread(
+            target=lambda: result.append(
+                self.hub.wait(_UUID, [bmc_events.POWER], 60)))
+        waiter.start()
+        while not self.hub._watchers:
+            time.sleep(0.01)
+        self.hub.notify(_UUID, [bmc_events.POWER])
+        waiter.join(10)
+        self.assertEqual([True], result)
+        self.assertEqual({}, dict(self.hub._watchers))
@@ -0,0 +1,179 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for the agent heartbeat fast path."""
+
+from unittest import mock
+
+from oslo_config import cfg
+from oslo_utils import uuidutils
+
+from ironic.common import exception
+from ironic.common import states
+from ironic.conductor import heartbeats
+from ironic.conductor import utils as conductor_utils
+from ironic import objects
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+CONF = cfg.CONF
+
+
+@mock.patch.object(heartbeats.time, 'monotonic', autospec=True,
+                   return_value=1000.0)
+class HeartbeatCoalescerTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super(HeartbeatCoalescerTestCase, self).setUp()
+        self.coalescer = heartbeats.HeartbeatCoalescer()
+        self.info = {'agent_secret_token': 'magic',
+                     'agent_url': 'https://url',
+                     'agent_version': '10.0.0'}
+
+    def _create_node(self, provision_state=states.CLEANWAIT, **kwargs):
+        info = dict(self.info, **kwargs.pop('driver_internal_info', {}))
+        return obj_utils.create_test_node(
+            self.context, provision_state=provision_state,
+            driver_internal_info=info, **kwargs)
+
+    def _record(self, node, **kwargs):
+        kwargs.setdefault('agent_token', 'magic')
+        return self.coalescer.record(
+            self.context, node.uuid, kwargs.pop('callback_url', 'https://url'),
+            kwargs.pop('agent_version', '10.0.0'), **kwargs)
+
+    def test_record_polling(self, mock_time):
+        node = self._create_node(
+            clean_step={'step': 'erase_devices'},
+            driver_internal_info={'cleaning_polling': True})
+        self.assertTrue(self._record(node))
+        node.refresh()
+        self.assertIn('agent_last_heartbeat', node.driver_internal_info)
+        self.assertIsNotNone(node.provision_updated_at)
+        self.assertIsNone(node.reservation)
+
+    def test_record_only_state(self, mock_time):
+        node = self._create_node(provision_state=states.DEPLOYHOLD)
+        self.assertTrue(self._record(node))
+        node.refresh()
+        self.assertIn('agent_last_heartbeat', node.driver_internal_info)
+        self.assertIsNone(node.provision_updated_at)
+
+    def test_disabled(self, mock_time):
+        CONF.set_override('heartbeat_fast_path', False, group='conductor')
+        node = self._create_node(provision_state=states.DEPLOYHOLD)
+        self.assertFalse(self._record(node))
+        node.refresh()
+        self.assertNotIn('agent_last_heartbeat', node.driver_internal_info)
+
+    def test_requires_processing(self, mock_time):
+        for provision_state, kwargs in [
+                # Steps not started yet
+                (states.CLEANWAIT, {}),
+                # Step not polled
+                (states.CLEANWAIT, {'clean_step': {'step': 'erase'}}),
+                (states.RESCUEWAIT, {}),
+                (states.AVAILABLE, {}),
+                (states.DEPLOYHOLD, {'maintenance': True}),
+                (states.DEPLOYHOLD, {'reservation': 'host'})]:
+            node = self._create_node(provision_state=provision_state,
+                                     uuid=uuidutils.generate_uuid(), **kwargs)
+            self.assertFalse(self._record(node), provision_state)
+            node.refresh()
+            self.assertNotIn('agent_last_heartbeat',
+                             node.driver_internal_info)
+
+    def test_agent_changed(self, mock_time):
+        node = self._create_node(provision_state=states.DEPLOYHOLD)
+        self.assertFalse(self._record(node, callback_url='https://new'))
+        self.assertFalse(self._record(node, agent_version='11.0.0'))
+        self.assertFalse(self._record(node, agent_token='wrong'))
+        self.assertFalse(self._record(node, agent_status='end'))
+        self.assertFalse(self._record(node, agent_verify_ca='cert'))
+
+    def test_require_tls(self, mock_time):
+        CONF.set_override('require_tls', True, group='agent')
+        node = self._create_node(provision_state=states.DEPLOYHOLD,
+                                 driver_internal_info={'agent_url':
+                                                       'http://url'})
+        self.assertFalse(self._record(node, callback_url='http://url'))
+
+        CONF.set_override('require_tls', False, group='agent')
+        self.assertTrue(self._record(node, callback_url='http://url'))
+
+    @mock.patch.object(conductor_utils, 'store_agent_certificate',
+                       autospec=True)
+    def test_verify_ca(self, mock_store, mock_time):
+        node = self._create_node(
+            provision_state=states.DEPLOYHOLD,
+            driver_internal_info={'agent_verify_ca': '/path'})
+        mock_store.return_value = '/path'
+        self.assertTrue(self._record(node, agent_verify_ca='cert'))
+
+        mock_store.side_effect = exception.InvalidParameterValue('changed')
+        self.assertRaises(exception.InvalidParameterValue,
+                          self._record, node, agent_verify_ca='other')
+
+    @mock.patch.object(objects.Node, 'record_heartbeat', autospec=True,
+                       return_value=False)
+    def test_record_failed(self, mock_record, mock_time):
+        node = self._create_node(provision_state=states.DEPLOYHOLD)
+        self.assertFalse(self._record(node))
+        mock_record.assert_called_once_with(
+            mock.ANY, {'agent_last_heartbeat': mock.ANY},
+            touch_provisioning=False)
+
+    def test_coalesce(self, mock_time):
+        CONF.set_override('heartbeat_coalesce_window', 60, group='conductor')
+        node = self._create_node(clean_step={'step': 'erase'})
+        # The first heartbeat is processed
+        self.assertFalse(self._record(node))
+        mock_time.return_value = 1030.0
+        self.assertTrue(self._record(node))
+        node.refresh()
+        self.assertIn('agent_last_heartbeat', node.driver_internal_info)
+        # The window has passed
+        mock_time.return_value = 1060.0
+        self.assertFalse(self._record(node))
+        mock_time.return_value = 1061.0
+        self.assertTrue(self._record(node))
+
+    def test_coalesce_deploy_steps_not_cached(self, mock_time):
+        CONF.set_override('heartbeat_coalesce_window', 60, group='conductor')
+        node = self._create_node(provision_state=states.DEPLOYWAIT,
+                                 deploy_step={'step': 'deploy'})
+        self.assertFalse(self._record(node))
+        self.assertFalse(self._record(node))
+
+        node.set_driver_internal_info('agent_cached_deploy_steps',
+                                      {'deploy': []})
+        node.save()
+        self.assertTrue(self._record(node))
+
+    def test_coalesce_no_step(self, mock_time):
+        CONF.set_override('heartbeat_coalesce_window', 60, group='conductor')
+        node = self._create_node()
+        self.assertFalse(self._record(node))
+        self.assertFalse(self._record(node))
+
+    def test_coalesce_prune(self, mock_time):
+        CONF.set_override('heartbeat_coalesce_window', 60, group='conductor')
+        self.coalescer = heartbeats.HeartbeatCoalescer()
+        node = self._create_node(clean_step={'step': 'erase'})
+        self.assertFalse(self._record(node))
+        self.assertIn(node.uuid, self.coalescer._processed)
+
+        other = self._create_node(uuid=uuidutils.generate_uuid(),
+                                  provision_state=states.AVAILABLE)
+        mock_time.return_value = 1100.0
+        self.assertFalse(self._record(other))
+        self.assertEqual([other.uuid], list(self.coalescer._processed))
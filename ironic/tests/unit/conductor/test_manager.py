@@ -29,6 +29,7 @@ import futurist
 from futurist import waiters
 from oslo_config import cfg
 import oslo_messaging as messaging
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from oslo_versionedobjects import base as ovo_base
 from oslo_versionedobjects import fields
@@ -46,11 +47,13 @@ from ironic.common import indicator_states
 from ironic.common import metrics as ironic_metrics
 from ironic.common import nova
 from ironic.common import states
+from ironic.conductor import bmc_events
 from ironic.conductor import cleaning
 from ironic.conductor import deployments
 from ironic.conductor import inspection
 from ironic.conductor import manager
 from ironic.conductor import notification_utils
+from ironic.conductor import power_waiter
 from ironic.conductor import servicing
 from ironic.conductor import steps as conductor_steps
 from ironic.conductor import task_manager
@@ -176,8 +179,11 @@ class ChangeNodePowerStateTestCase(mgr_utils.ServiceSetUpMixin,
             # Compare true exception hidden by @messaging.expected_exceptions
             self.assertEqual(exception.NoFreeConductorWorker, exc.exc_info[0])
 
-            spawn_mock.assert_called_once_with(mock.ANY, mock.ANY,
-                                               mock.ANY, timeout=mock.ANY)
+            # The wait for the power state is deferred
+            spawn_mock.assert_called_once_with(
+                power_waiter._WAITER._run_deferring, mock.ANY,
+                conductor_utils.node_power_action, mock.ANY, mock.ANY,
+                timeout=mock.ANY)
             node.refresh()
             self.assertEqual(initial_state, node.power_state)
             self.assertIsNone(node.target_power_state)
@@ -185,6 +191,23 @@ class ChangeNodePowerStateTestCase(mgr_utils.ServiceSetUpMixin,
             # Verify the picked reservation has been cleared due to full pool.
             self.assertIsNone(node.reservation)
 
+    def test_change_node_power_state_no_background_wait(self):
+        self.config(background_power_state_wait=False, group='conductor')
+        node = obj_utils.create_test_node(self.context, driver='fake-hardware',
+                                          power_state=states.POWER_OFF)
+        self._start_service()
+
+        with mock.patch.object(self.service,
+                               '_spawn_worker', autospec=True) as spawn_mock:
+            spawn_mock.side_effect = exception.NoFreeConductorWorker()
+            self.assertRaises(messaging.rpc.ExpectedException,
+                              self.service.change_node_power_state,
+                              self.context, node.uuid, states.POWER_ON)
+
+            spawn_mock.assert_called_once_with(
+                conductor_utils.node_power_action, mock.ANY, states.POWER_ON,
+                timeout=None)
+
     @mock.patch.object(fake.FakePower, 'set_power_state', autospec=True)
     @mock.patch.object(fake.FakePower, 'get_power_state', autospec=True)
     def test_change_node_power_state_exception_in_background_task(
@@ -380,6 +403,7 @@ class ChangeNodePowerStateTestCase(mgr_utils.ServiceSetUpMixin,
                               states.POWER_ON)
 
             spawn_mock.assert_called_once_with(
+                power_waiter._WAITER._run_deferring, mock.ANY,
                 conductor_utils.node_power_action, mock.ANY, states.POWER_ON,
                 timeout=None)
             self.assertFalse(mock_notif.called)
@@ -5213,6 +5237,62 @@ class SensorsTestCase(mgr_utils.ServiceSetUpMixin, db_base.DbTestCase):
         notifier_mock.assert_has_calls([n_call, n_call, n_call,
                                         n_call, n_call])
 
+    @mock.patch.object(messaging.Notifier, 'info', autospec=True)
+    @mock.patch.object(task_manager, 'acquire', autospec=True)
+    def test_send_sensor_task_batched(self, acquire_mock, notifier_mock):
+        nodes = queue.Queue()
+        for i in range(5):
+            nodes.put_nowait(('fake_uuid-%d' % i, 'fake-hardware', '', None))
+        self._start_service()
+        CONF.set_override('batch_size', 2, group='sensor_data')
+        CONF.set_override('send_changes_only', True, group='sensor_data')
+
+        task = acquire_mock.return_value.__enter__.return_value
+        task.node.maintenance = False
+        task.node.driver = 'fake'
+        task.driver.management.get_sensors_data.return_value = {
+            'Temperature': {'CPU': {'reading': 42}}}
+        self.service._sensors_nodes_task(self.context, nodes)
+
+        # The last batch is sent when the worker is done
+        self.assertEqual(3, notifier_mock.call_count)
+        batches = [c[0][3] for c in notifier_mock.call_args_list]
+        self.assertEqual([2, 2, 1], [len(b['payload']) for b in batches])
+        for call in notifier_mock.call_args_list:
+            self.assertEqual('hardware.metrics.batch', call[0][2])
+        message = batches[0]['payload'][0]
+        self.assertEqual('hardware.fake.metrics.update',
+                         message['event_type'])
+        self.assertEqual('fake_uuid-0', message['node_uuid'])
+        self.assertEqual('full', message['payload_type'])
+
+        # Unchanged sensors are not sent again
+        notifier_mock.reset_mock()
+        nodes.put_nowait(('fake_uuid-0', 'fake-hardware', '', None))
+        self.service._sensors_nodes_task(self.context, nodes)
+        notifier_mock.assert_not_called()
+
+    @mock.patch.object(task_manager.ResourcePrefetcher, 'prefetch',
+                       autospec=True)
+    @mock.patch.object(task_manager, 'acquire', autospec=True)
+    def test_send_sensor_task_prefetch(self, acquire_mock, prefetch_mock):
+        nodes = queue.Queue()
+        for i in range(6):
+            nodes.put_nowait(('fake_uuid-%d' % i, 'fake-hardware', '', None))
+        self._start_service()
+        CONF.set_override('workers', 2, group='sensor_data')
+        prefetched = []
+        prefetch_mock.side_effect = (
+            lambda _self, uuids: prefetched.append(list(uuids)))
+
+        task = acquire_mock.return_value.__enter__.return_value
+        task.node.maintenance = True
+        self.service._sensors_nodes_task(self.context, nodes)
+        self.assertEqual(6, acquire_mock.call_count)
+        self.assertEqual([['fake_uuid-%d' % i for i in range(3)],
+                          ['fake_uuid-%d' % i for i in range(3, 6)]],
+                         prefetched)
+
     @mock.patch.object(task_manager, 'acquire', autospec=True)
     def test_send_sensor_task_shutdown(self, acquire_mock):
         nodes = queue.Queue()
@@ -5281,7 +5361,7 @@ class SensorsTestCase(mgr_utils.ServiceSetUpMixin, db_base.DbTestCase):
         self.service._send_sensor_data(self.context)
         mock_spawn.assert_called_with(self.service,
                                       self.service._sensors_nodes_task,
-                                      self.context, mock.ANY)
+                                      self.context, mock.ANY, mock.ANY)
 
     @mock.patch.object(manager.ConductorManager, '_sensors_conductor',
                        autospec=True)
@@ -6442,6 +6522,46 @@ class ManagerSyncPowerStatesTestCase(mgr_utils.CommonMixIn,
         self.filters = {'maintenance': False}
         self.columns = ['uuid', 'driver', 'conductor_group', 'id']
 
+    def test_node_subscribed_to_events(self, get_nodeinfo_mock, mapped_mock,
+                                       acquire_mock, sync_mock):
+        get_nodeinfo_mock.side_effect = (
+            lambda **kw: self._get_nodeinfo_list_response())
+        mapped_mock.return_value = True
+        task = self._create_task(node_attrs=dict(uuid=self.node.uuid,
+                                                 driver_internal_info={}))
+        acquire_mock.side_effect = self._get_acquire_side_effect([task, task])
+        bmc_events.subscribe(self.node.uuid)
+
+        # Polled once, then only after a power event
+        for _i in range(2):
+            self.service._sync_power_states(self.context)
+        bmc_events.notify(self.node.uuid, [bmc_events.TASK])
+        self.service._sync_power_states(self.context)
+        self.assertEqual(1, sync_mock.call_count)
+
+        bmc_events.notify(self.node.uuid, [bmc_events.POWER])
+        self.service._sync_power_states(self.context)
+        self.assertEqual(2, sync_mock.call_count)
+        self.assertEqual(2, acquire_mock.call_count)
+
+    def test_node_subscribed_to_events_locked(self, get_nodeinfo_mock,
+                                              mapped_mock, acquire_mock,
+                                              sync_mock):
+        get_nodeinfo_mock.side_effect = (
+            lambda **kw: self._get_nodeinfo_list_response())
+        mapped_mock.return_value = True
+        task = self._create_task(node_attrs=dict(uuid=self.node.uuid,
+                                                 driver_internal_info={}))
+        acquire_mock.side_effect = self._get_acquire_side_effect(
+            [exception.NodeLocked(node=self.node.uuid, host='fake'), task])
+        bmc_events.subscribe(self.node.uuid)
+
+        # The locked node is polled on the next run
+        for _i in range(2):
+            self.service._sync_power_states(self.context)
+        self.assertEqual(1, sync_mock.call_count)
+        self.assertEqual(2, acquire_mock.call_count)
+
     def test_node_not_mapped(self, get_nodeinfo_mock,
                              mapped_mock, acquire_mock, sync_mock):
         get_nodeinfo_mock.return_value = self._get_nodeinfo_list_response()
@@ -7258,6 +7378,18 @@ class ParallelPowerSyncTestCase(mgr_utils.CommonMixIn, db_base.DbTestCase):
             self.assertEqual(1, sync_mock.call_count)
             self.assertEqual(1, waiter_mock.call_count)
 
+    def test__prefetch_page_size(self, sync_mock, spawn_mock, waiter_mock):
+        CONF.set_override('periodic_prefetch_page_size', 10,
+                          group='conductor')
+        nodes = mock.Mock(spec=queue.Queue)
+        for qsize, workers, expected in [(100, 4, 10), (100, 20, 5),
+                                         (10, 8, 0), (10, 0, 10),
+                                         (0, 1, 0)]:
+            nodes.qsize.return_value = qsize
+            self.assertEqual(
+                expected,
+                self.service._prefetch_page_size(nodes, workers))
+
     @mock.patch.object(queue, 'Queue', autospec=True)
     def test__sync_power_states_node_prioritization(
             self, queue_mock, sync_mock, spawn_mock, waiter_mock):
@@ -8937,6 +9069,30 @@ class HeartbeatTestCase(mgr_utils.ServiceSetUpMixin, db_base.DbTestCase):
                                           'https://callback', None,
                                           None, 'start', None)
 
+    @mock.patch('ironic.drivers.modules.fake.FakeDeploy.heartbeat',
+                autospec=True)
+    @mock.patch.object(task_manager, 'acquire', autospec=True)
+    def test_heartbeat_fast_path(self, mock_acquire, mock_heartbeat):
+        node = obj_utils.create_test_node(
+            self.context, driver='fake-hardware',
+            provision_state=states.CLEANWAIT,
+            target_provision_state=states.AVAILABLE,
+            clean_step={'interface': 'deploy', 'step': 'erase_devices'},
+            driver_internal_info={'agent_secret_token': 'magic',
+                                  'agent_url': 'https://callback',
+                                  'agent_version': '1.4.1',
+                                  'cleaning_polling': True})
+        self._start_service()
+
+        self.service.heartbeat(self.context, node.uuid, 'https://callback',
+                               '1.4.1', agent_token='magic')
+
+        self.assertFalse(mock_acquire.called)
+        self.assertFalse(mock_heartbeat.called)
+        node.refresh()
+        self.assertIn('agent_last_heartbeat', node.driver_internal_info)
+        self.assertIsNotNone(node.provision_updated_at)
+
     @mock.patch('ironic.drivers.modules.fake.FakeDeploy.heartbeat',
                 autospec=True)
     @mock.patch('ironic.conductor.manager.ConductorManager._spawn_worker',
@@ -9988,6 +10144,196 @@ class ConcurrentActionLimitTestCase(mgr_utils.ServiceSetUpMixin,
         CONF.set_override('conductor_group', 'group-b', group='conductor')
         self.service._concurrent_action_limit('cleaning')
 
+    def test_concurrent_action_capacity(self):
+        self.node1.provision_state = states.DEPLOYING
+        self.node2.provision_state = states.CLEANING
+        self.node1.save()
+        self.node2.save()
+        CONF.set_override('max_concurrent_deploy', 3, group='conductor')
+        CONF.set_override('max_concurrent_clean', 1, group='conductor')
+        self.assertEqual(
+            2, self.service._concurrent_action_capacity('provisioning'))
+        self.assertEqual(
+            0, self.service._concurrent_action_capacity('cleaning'))
+        self.assertIsNone(self.service._concurrent_action_capacity(None))
+
+
+@mgr_utils.mock_record_keepalive
+class DoBulkProvisioningTestCase(mgr_utils.ServiceSetUpMixin,
+                                 db_base.DbTestCase):
+
+    def setUp(self):
+        super(DoBulkProvisioningTestCase, self).setUp()
+        self._start_service()
+        self.nodes = [
+            obj_utils.create_test_node(
+                self.context, driver='fake-hardware',
+                uuid=uuidutils.generate_uuid(),
+                provision_state=states.AVAILABLE)
+            for _ in range(3)
+        ]
+        self.batch = objects.ProvisionJobBatch(
+            self.context, job_uuid=uuidutils.generate_uuid(),
+            conductor=self.hostname, target=states.ACTIVE,
+            state=states.PROVISION_JOB_PENDING,
+            nodes=[node.uuid for node in self.nodes], params={}, results={})
+        self.batch.create()
+
+    def _get_batch(self):
+        return objects.ProvisionJobBatch.get_by_uuid(self.context,
+                                                     self.batch.uuid)
+
+    @mock.patch.object(manager.ConductorManager, '_start_node_deploy',
+                       autospec=True)
+    def test_do_bulk_provisioning(self, mock_deploy):
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+        self._stop_service()
+
+        self.assertEqual(3, mock_deploy.call_count)
+        mock_deploy.assert_any_call(self.service, self.context,
+                                    self.nodes[0].uuid, rebuild=False,
+                                    deploy_steps=None)
+        batch = self._get_batch()
+        self.assertEqual(states.PROVISION_JOB_FINISHED, batch.state)
+        self.assertEqual(
+            {node.uuid: {'status': states.PROVISION_JOB_ACCEPTED}
+             for node in self.nodes},
+            batch.results)
+
+    @mock.patch.object(manager.ConductorManager, '_start_node_deploy',
+                       autospec=True)
+    def test_do_bulk_provisioning_records_started(self, mock_deploy):
+        recorded = []
+
+        def _deploy(service, context, node_id, **kwargs):
+            recorded.append(dict(self._get_batch().results))
+
+        mock_deploy.side_effect = _deploy
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+        self._stop_service()
+
+        # The outcome of a node is saved before the next one is started.
+        accepted = {'status': states.PROVISION_JOB_ACCEPTED}
+        self.assertEqual([{}, {self.nodes[0].uuid: accepted},
+                          {self.nodes[0].uuid: accepted,
+                           self.nodes[1].uuid: accepted}], recorded)
+
+    @mock.patch.object(manager.ConductorManager, '_start_node_deploy',
+                       autospec=True)
+    def test_do_bulk_provisioning_capacity(self, mock_deploy):
+        CONF.set_override('max_concurrent_deploy', 2, group='conductor')
+        # The action is mocked, so capacity must be tracked per batch
+        # rather than by counting nodes in the database.
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+        self._stop_service()
+
+        self.assertEqual(2, mock_deploy.call_count)
+        results = self._get_batch().results
+        self.assertEqual(states.PROVISION_JOB_ACCEPTED,
+                         results[self.nodes[1].uuid]['status'])
+        self.assertEqual(states.PROVISION_JOB_REJECTED,
+                         results[self.nodes[2].uuid]['status'])
+        self.assertIn('provisioning', results[self.nodes[2].uuid]['error'])
+
+    @mock.patch.object(manager.ConductorManager, '_start_node_deploy',
+                       autospec=True)
+    def test_do_bulk_provisioning_node_failure(self, mock_deploy):
+        mock_deploy.side_effect = [
+            None, exception.NodeLocked(node=self.nodes[1].uuid,
+                                       host='other'),
+            RuntimeError('boom')]
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+        self._stop_service()
+
+        batch = self._get_batch()
+        self.assertEqual(states.PROVISION_JOB_FINISHED, batch.state)
+        self.assertEqual(states.PROVISION_JOB_ACCEPTED,
+                         batch.results[self.nodes[0].uuid]['status'])
+        self.assertEqual(states.PROVISION_JOB_REJECTED,
+                         batch.results[self.nodes[1].uuid]['status'])
+        self.assertIn('locked',
+                      batch.results[self.nodes[1].uuid]['error'])
+        self.assertEqual('boom', batch.results[self.nodes[2].uuid]['error'])
+
+    @mock.patch.object(manager.ConductorManager, '_start_node_clean',
+                       autospec=True)
+    def test_do_bulk_provisioning_clean(self, mock_clean):
+        steps = [{'interface': 'deploy', 'step': 'erase_devices'}]
+        self.batch.target = states.VERBS['clean']
+        self.batch.params = {'clean_steps': steps, 'disable_ramdisk': True}
+        self.batch.save()
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+        self._stop_service()
+
+        mock_clean.assert_any_call(self.service, self.context,
+                                   self.nodes[0].uuid, steps,
+                                   disable_ramdisk=True)
+        self.assertEqual(3, mock_clean.call_count)
+
+    @mock.patch.object(manager.ConductorManager, '_spawn_worker',
+                       autospec=True)
+    def test_do_bulk_provisioning_no_free_worker(self, mock_spawn):
+        mock_spawn.side_effect = exception.NoFreeConductorWorker()
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+
+        batch = self._get_batch()
+        self.assertEqual(states.PROVISION_JOB_FINISHED, batch.state)
+        self.assertEqual(
+            {states.PROVISION_JOB_REJECTED},
+            {result['status'] for result in batch.results.values()})
+
+    @mock.patch.object(manager.ConductorManager, '_start_node_deploy',
+                       autospec=True)
+    def test_do_bulk_provisioning_not_pending(self, mock_deploy):
+        self.batch.reject_unprocessed('conductor restarted')
+        self.service.do_bulk_provisioning(self.context, self.batch.uuid)
+        self._stop_service()
+
+        self.assertFalse(mock_deploy.called)
+        batch = self._get_batch()
+        self.assertEqual(states.PROVISION_JOB_FINISHED, batch.state)
+        self.assertEqual('conductor restarted',
+                         batch.results[self.nodes[0].uuid]['error'])
+
+    @mock.patch.object(dbapi.IMPL, 'get_offline_conductors', autospec=True)
+    def test__check_orphan_provision_job_batches(self, mock_off_cond):
+        self.batch.conductor = 'offline-host'
+        self.batch.state = states.PROVISION_JOB_RUNNING
+        self.batch.save()
+        other = objects.ProvisionJobBatch(
+            self.context, job_uuid=uuidutils.generate_uuid(),
+            conductor=self.hostname, target=states.ACTIVE,
+            state=states.PROVISION_JOB_PENDING,
+            nodes=[self.nodes[0].uuid], params={}, results={})
+        other.create()
+        mock_off_cond.return_value = ['offline-host', self.hostname]
+
+        self.service._check_orphan_provision_job_batches(self.context)
+
+        batch = self._get_batch()
+        self.assertEqual(states.PROVISION_JOB_FINISHED, batch.state)
+        self.assertEqual(
+            {node.uuid: states.PROVISION_JOB_REJECTED for node in self.nodes},
+            {node: result['status']
+             for node, result in batch.results.items()})
+        self.assertIn('offline-host',
+                      batch.results[self.nodes[0].uuid]['error'])
+        other = objects.ProvisionJobBatch.get_by_uuid(self.context,
+                                                      other.uuid)
+        self.assertEqual(states.PROVISION_JOB_PENDING, other.state)
+
+
+    @mock.patch.object(dbapi.IMPL, 'destroy_finished_provision_jobs',
+                       autospec=True, return_value=1)
+    def test_cleanup_provision_jobs(self, mock_destroy):
+        CONF.set_override('provision_job_max_age', 3600, group='conductor')
+        now = timeutils.utcnow()
+        with mock.patch.object(timeutils, 'utcnow', autospec=True,
+                               return_value=now):
+            self.service.cleanup_provision_jobs(self.context)
+        mock_destroy.assert_called_once_with(
+            now - datetime.timedelta(seconds=3600), 100)
+
 
 @mgr_utils.mock_record_keepalive
 class ContinueInspectionTestCase(mgr_utils.ServiceSetUpMixin,
@@ -0,0 +1,126 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for :class:`ironic.conductor.node_cache`."""
+
+import datetime
+from unittest import mock
+
+import fixtures
+from oslo_utils import uuidutils
+
+from ironic.common import exception
+from ironic.conductor import node_cache
+from ironic.conductor import task_manager
+from ironic import objects
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+
+class NodeCacheTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super(NodeCacheTestCase, self).setUp()
+        self.config(node_cache_size=10, group='conductor')
+        self.cache = node_cache.NodeCache()
+        # Never updated, so it can be cached right away
+        self.node = obj_utils.create_test_node(self.context)
+        self.get_mock = self.useFixture(fixtures.MockPatchObject(
+            objects.Node, 'get', wraps=objects.Node.get)).mock
+
+    def test_cached(self):
+        for node_id in (self.node.uuid, self.node.id, str(self.node.id)):
+            node = self.cache.get(self.context, node_id)
+            self.assertEqual(self.node.uuid, node.uuid)
+            self.assertEqual(self.node.driver_info, node.driver_info)
+            self.assertEqual({}, node.obj_get_changes())
+        self.get_mock.assert_called_once_with(self.context, self.node.uuid)
+
+    def test_disabled(self):
+        self.config(node_cache_size=0, group='conductor')
+        for _i in range(2):
+            self.cache.get(self.context, self.node.uuid)
+        self.assertEqual(2, self.get_mock.call_count)
+
+    def test_copies(self):
+        node = self.cache.get(self.context, self.node.uuid)
+        node.driver_info = {'changed': True}
+        node = self.cache.get(self.context, self.node.uuid)
+        self.assertEqual(self.node.driver_info, node.driver_info)
+        self.assertEqual({}, node.obj_get_changes())
+        self.get_mock.assert_called_once_with(self.context, self.node.uuid)
+
+    def test_updated(self):
+        self.cache.get(self.context, self.node.uuid)
+        self.node.driver_info = {'changed': True}
+        self.node.save()
+
+        node = self.cache.get(self.context, self.node.uuid)
+        self.assertEqual({'changed': True}, node.driver_info)
+        # Updated too recently to be cached
+        node = self.cache.get(self.context, self.node.uuid)
+        self.assertEqual({'changed': True}, node.driver_info)
+        self.assertEqual(3, self.get_mock.call_count)
+
+    def test_updated_database_clock(self):
+        # Updated long ago by this conductor's clock, but not by the clock of
+        # the database the generation is checked against
+        updated_at = datetime.datetime(2020, 1, 1)
+        with mock.patch.object(
+                objects.Node, 'get_generation', autospec=True,
+                return_value=(updated_at, frozenset(),
+                              updated_at + datetime.timedelta(
+                                  milliseconds=500))):
+            for _i in range(2):
+                self.cache.get(self.context, self.node.uuid)
+        self.assertEqual(2, self.get_mock.call_count)
+
+    def test_traits_changed(self):
+        self.cache.get(self.context, self.node.uuid)
+        objects.TraitList.create(self.context, self.node.id, ['CUSTOM_1'])
+
+        node = self.cache.get(self.context, self.node.uuid)
+        self.assertEqual(['CUSTOM_1'], node.traits.get_trait_names())
+        self.assertEqual(2, self.get_mock.call_count)
+
+    def test_evicted(self):
+        self.config(node_cache_size=1, group='conductor')
+        node2 = obj_utils.create_test_node(self.context,
+                                           uuid=uuidutils.generate_uuid())
+        self.cache.get(self.context, self.node.uuid)
+        self.cache.get(self.context, node2.uuid)
+        self.cache.get(self.context, node2.uuid)
+        self.cache.get(self.context, self.node.uuid)
+        self.assertEqual(3, self.get_mock.call_count)
+
+    def test_deleted(self):
+        self.cache.get(self.context, self.node.uuid)
+        self.node.destroy()
+        self.assertRaises(exception.NodeNotFound,
+                          self.cache.get, self.context, self.node.uuid)
+
+    def test_name(self):
+        self.assertRaises(exception.InvalidIdentity,
+                          self.cache.get, self.context, self.node.name)
+
+    def test_shared_task(self):
+        for _i in range(2):
+            with task_manager.acquire(self.context, self.node.uuid,
+                                      shared=True) as task:
+                self.assertEqual(self.node.uuid, task.node.uuid)
+        self.get_mock.assert_called_once_with(self.context, self.node.uuid)
+
+    @mock.patch.object(objects.Node, 'get_generation', autospec=True)
+    def test_exclusive_task(self, generation_mock):
+        with task_manager.acquire(self.context, self.node.uuid):
+            pass
+        generation_mock.assert_not_called()
@@ -12,20 +12,23 @@
 
 from unittest import mock
 
+from oslo_config import cfg
 from oslo_utils import uuidutils
 
+from ironic.common import async_operations
 from ironic.common import context as ironic_context
-from oslo_config import cfg
-
+from ironic.common import exception
 from ironic.conductor import base_manager
+from ironic.conductor import bmc_events
 from ironic.conductor import periodics
-
-CONF = cfg.CONF
 from ironic.conductor import task_manager
 from ironic.drivers.modules import fake
+from ironic import objects
 from ironic.tests.unit.db import base as db_base
 from ironic.tests.unit.objects import utils as obj_utils
 
+CONF = cfg.CONF
+
 
 _FILTERS = {'maintenance': False}
 
@@ -78,6 +81,20 @@ class PeriodicTestService(base_manager.BaseConductorManager):
     def never_run(self, task, context):
         self.test.fail(f"Was not supposed to run, ran with {task.node}")
 
+    @periodics.node_periodic(purpose="polling cats", spacing=42,
+                             filters=_FILTERS, async_operation='cat_nap')
+    def async_operation(self, task, context):
+        self.nodes.append(task.node.uuid)
+
+    @periodics.node_periodic(purpose="watching cats", spacing=42,
+                             poll_event=bmc_events.TASK)
+    def poll_event(self, task, context):
+        self.nodes.append(task.node.uuid)
+
+    @periodics.node_periodic(purpose="counting paws", spacing=42)
+    def ports(self, task, context):
+        self.nodes.append((task.node.uuid, [p.uuid for p in task.ports]))
+
     @periodics.node_periodic(purpose="herding cats", spacing=42, limit=3)
     def limit(self, task, context):
         self.test.assertIsInstance(context, ironic_context.RequestContext)
@@ -146,6 +163,63 @@ class NodePeriodicTestCase(db_base.DbTestCase):
                                                 fields=())
         self.assertEqual([self.uuid], self.service.nodes)
 
+    def test_async_operation(self, mock_iter_nodes):
+        mock_iter_nodes.return_value = iter([
+            (self.uuid, 'driver1', ''),
+        ])
+
+        self.service.async_operation(self.ctx)
+
+        mock_iter_nodes.assert_called_once_with(
+            self.service, filters=dict(_FILTERS, async_operation='cat_nap'),
+            fields=())
+        self.assertEqual([self.uuid], self.service.nodes)
+        self.assertIn('cat_nap', async_operations.registered())
+
+    def test_async_operation_pinned(self, mock_iter_nodes):
+        self.config(pin_release_version='2025.2')
+        mock_iter_nodes.return_value = iter([])
+
+        self.service.async_operation(self.ctx)
+
+        mock_iter_nodes.assert_called_once_with(self.service,
+                                                filters=_FILTERS,
+                                                fields=())
+
+    def test_poll_event(self, mock_iter_nodes):
+        node2 = obj_utils.create_test_node(self.context,
+                                           uuid=uuidutils.generate_uuid())
+        bmc_events.subscribe(self.uuid)
+
+        for _i in range(3):
+            mock_iter_nodes.return_value = iter([
+                (self.uuid, 'driver1', ''),
+                (node2.uuid, 'driver1', ''),
+            ])
+            self.service.poll_event(self.ctx)
+        # The subscribed node is only polled once until an event arrives
+        self.assertEqual([self.uuid, node2.uuid, node2.uuid, node2.uuid],
+                         self.service.nodes)
+
+        bmc_events.notify(self.uuid, [bmc_events.TASK])
+        mock_iter_nodes.return_value = iter([(self.uuid, 'driver1', '')])
+        self.service.poll_event(self.ctx)
+        self.assertEqual(self.uuid, self.service.nodes[-1])
+
+    def test_poll_event_node_locked(self, mock_iter_nodes):
+        bmc_events.subscribe(self.uuid)
+        with mock.patch.object(task_manager, 'acquire', autospec=True,
+                               side_effect=exception.NodeLocked(
+                                   node=self.uuid, host='other')):
+            mock_iter_nodes.return_value = iter([(self.uuid, 'driver1', '')])
+            self.service.poll_event(self.ctx)
+        self.assertEqual([], self.service.nodes)
+
+        # The skipped node is polled on the next run
+        mock_iter_nodes.return_value = iter([(self.uuid, 'driver1', '')])
+        self.service.poll_event(self.ctx)
+        self.assertEqual([self.uuid], self.service.nodes)
+
     @mock.patch.object(task_manager, 'acquire', autospec=True)
     def test_never_run(self, mock_acquire, mock_iter_nodes):
         mock_iter_nodes.return_value = iter([
@@ -242,3 +316,31 @@ class NodePeriodicTestCase(db_base.DbTestCase):
         # ...while the subclass-bound periodic processes it.
         sub_iface.simple(self.service, self.context)
         self.assertEqual([self.uuid], sub_iface.nodes)
+
+    @mock.patch.object(objects.Port, 'list_by_node_id', autospec=True)
+    def test_prefetch(self, mock_list_ports, mock_iter_nodes):
+        port = obj_utils.create_test_port(self.context, node_id=self.node.id)
+        node2 = obj_utils.create_test_node(self.context,
+                                           uuid=uuidutils.generate_uuid())
+        mock_iter_nodes.return_value = iter([
+            (self.uuid, 'driver1', ''),
+            (node2.uuid, 'driver2', ''),
+        ])
+
+        self.service.ports(self.ctx)
+
+        self.assertEqual([(self.uuid, [port.uuid]), (node2.uuid, [])],
+                         self.service.nodes)
+        mock_list_ports.assert_not_called()
+
+    @mock.patch.object(task_manager.ResourcePrefetcher, 'prefetch',
+                       autospec=True)
+    def test_prefetch_exclusive(self, mock_prefetch, mock_iter_nodes):
+        mock_iter_nodes.return_value = iter([
+            (self.uuid, 'driver2', 'group'),
+        ])
+
+        self.service.exclusive(self.ctx)
+
+        self.assertEqual([self.uuid], self.service.nodes)
+        mock_prefetch.assert_not_called()
@@ -0,0 +1,198 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for :mod:`ironic.conductor.power_waiter`."""
+
+from unittest import mock
+
+import fixtures
+import futurist
+
+from ironic.common import exception
+from ironic.common import states
+from ironic.conductor import power_waiter
+from ironic.drivers.modules import fake
+from ironic.tests import base
+
+
+class PowerWaiterTestCase(base.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.waiter = power_waiter.PowerWaiter()
+        self.executor = futurist.SynchronousExecutor()
+        self.power = mock.Mock(spec=fake.FakePower)
+        self.task = self._task('1be26c0b-03f2-4d2e-ae87-c02d7f33c123')
+        self.callback = mock.Mock()
+        self.useFixture(fixtures.MockPatchObject(
+            power_waiter, '_INITIAL_INTERVAL', 0.01))
+
+    def _task(self, uuid):
+        return mock.Mock(node=mock.Mock(uuid=uuid),
+                         driver=mock.Mock(power=self.power))
+
+    def _action(self, task, new_state=states.POWER_OFF, timeout=60):
+        self.assertTrue(power_waiter.defer_wait(task, new_state, timeout))
+        # Only a single wait can be deferred
+        self.assertFalse(power_waiter.defer_wait(task, new_state, timeout))
+        self.assertTrue(power_waiter.defer_completion(task, self.callback))
+
+    def _spawn(self, func):
+        return self.waiter.spawn(self.executor.submit, func, self.task)
+
+    def test_not_deferred(self):
+        action = mock.Mock()
+        done = self._spawn(action)
+        self.assertIsNone(done.result(timeout=0))
+        action.assert_called_once_with(self.task)
+        self.assertIsNone(self.waiter._thread)
+
+    def test_failure(self):
+        done = self._spawn(mock.Mock(side_effect=exception.IPMIFailure(
+            cmd='power off')))
+        self.assertIsInstance(done.exception(timeout=0),
+                              exception.IPMIFailure)
+        self.assertIsNone(self.waiter._thread)
+
+    def test_defer_outside_of_spawn(self):
+        self.assertFalse(power_waiter.defer_wait(self.task, states.POWER_ON,
+                                                 60))
+        self.assertFalse(power_waiter.defer_completion(self.task,
+                                                       self.callback))
+
+    def test_defer_other_task(self):
+        def action(task):
+            other = self._task('other')
+            self.assertFalse(power_waiter.defer_wait(other, states.POWER_ON,
+                                                     60))
+            self.assertFalse(power_waiter.defer_completion(other,
+                                                           self.callback))
+
+        self.assertIsNone(self._spawn(action).result(timeout=0))
+
+    def test_deferred(self):
+        self.power.get_power_states.side_effect = [[states.POWER_ON],
+                                                   [states.POWER_OFF]]
+        done = self._spawn(self._action)
+
+        self.assertIsNone(done.result(timeout=10))
+        self.callback.assert_called_once_with(None)
+        self.assertEqual(2, self.power.get_power_states.call_count)
+        self.power.get_power_states.assert_called_with([self.task])
+
+    def test_deferred_timeout(self):
+        self.power.get_power_states.return_value = [states.POWER_ON]
+        done = self._spawn(lambda task: self._action(task, timeout=0))
+
+        error = done.exception(timeout=10)
+        self.assertIsInstance(error, exception.PowerStateFailure)
+        self.callback.assert_called_once_with(error)
+
+    def test_deferred_poll_failure(self):
+        self.power.get_power_states.side_effect = exception.IPMIFailure(
+            cmd='power status')
+        done = self._spawn(self._action)
+
+        error = done.exception(timeout=10)
+        self.assertIsInstance(error, exception.IPMIFailure)
+        self.callback.assert_called_once_with(error)
+
+    def test_deferred_callback_failure(self):
+        self.power.get_power_states.return_value = [states.POWER_OFF]
+        self.callback.side_effect = RuntimeError('boom')
+        done = self._spawn(self._action)
+
+        self.assertIsInstance(done.exception(timeout=10), RuntimeError)
+
+    def test_deferred_spawn_failure(self):
+        calls = []
+
+        def spawn_method(func, *args):
+            # The executor is shut down after the power action
+            if calls:
+                raise RuntimeError('cannot schedule new futures')
+            calls.append(func)
+            return self.executor.submit(func, *args)
+
+        self.power.get_power_states.side_effect = [[states.POWER_ON],
+                                                   [states.POWER_OFF]]
+        done = self.waiter.spawn(spawn_method, self._action, self.task)
+
+        self.assertIsNone(done.result(timeout=10))
+        self.callback.assert_called_once_with(None)
+        self.assertEqual(2, self.power.get_power_states.call_count)
+
+    def test_deferred_unexpected_poll_failure(self):
+        with mock.patch.object(self.waiter, '_check', autospec=True,
+                               side_effect=RuntimeError('boom')):
+            done = self._spawn(self._action)
+            error = done.exception(timeout=10)
+        self.assertIsInstance(error, RuntimeError)
+        self.callback.assert_called_once_with(error)
+
+    def test_stop(self):
+        self.power.get_power_states.return_value = [states.POWER_ON]
+        done = self._spawn(self._action)
+
+        self.waiter.stop(0.1)
+
+        error = done.exception(timeout=0)
+        self.assertIsInstance(error, exception.PowerStateFailure)
+        self.callback.assert_called_once_with(error)
+        self.assertEqual(set(), self.waiter._pending)
+
+    def test_stop_waits(self):
+        self.power.get_power_states.side_effect = [[states.POWER_ON],
+                                                   [states.POWER_OFF]]
+        done = self._spawn(self._action)
+
+        self.waiter.stop(10)
+
+        self.assertIsNone(done.result(timeout=0))
+        self.callback.assert_called_once_with(None)
+
+    def test_stop_nothing_pending(self):
+        self.waiter.stop(10)
+        self.assertIsNone(self.waiter._thread)
+
+    def test_poll_batch_failure(self):
+        tasks = [self._task('node%d' % i) for i in range(2)]
+        batch = []
+        for task in tasks:
+            deferral = power_waiter._Deferral(task, self.executor.submit)
+            deferral.target_state = states.POWER_OFF
+            deferral.deadline = 0
+            deferral.callback = mock.Mock()
+            batch.append(deferral)
+        self.waiter._pending.update(batch)
+        self.power.get_power_states.side_effect = exception.IPMIFailure(
+            cmd='power status')
+        self.power.get_power_state.side_effect = [
+            states.POWER_OFF, exception.IPMIFailure(cmd='power status')]
+
+        self.waiter._poll(batch)
+
+        # Each node is polled separately to find the failing one
+        batch[0].callback.assert_called_once_with(None)
+        self.assertIsInstance(batch[1].callback.call_args[0][0],
+                              exception.IPMIFailure)
+
+    def test_batches(self):
+        other_power = mock.Mock(spec=fake.FakePower)
+        deferrals = [power_waiter._Deferral(self._task('node%d' % i), None)
+                     for i in range(12)]
+        other = power_waiter._Deferral(self._task('other'), None)
+        other.task.driver.power = other_power
+
+        batches = list(power_waiter._batches(deferrals + [other]))
+
+        self.assertEqual([deferrals[:10], deferrals[10:], [other]], batches)
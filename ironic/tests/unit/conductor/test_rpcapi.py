@@ -740,6 +740,12 @@ class RPCAPITestCase(db_base.DbTestCase):
                           disable_ramdisk=False,
                           version='1.57')
 
+    def test_do_bulk_provisioning(self):
+        self._test_rpcapi('do_bulk_provisioning',
+                          'cast',
+                          batch_uuid='fake-batch',
+                          version='1.63')
+
     @mock.patch.object(rpc, 'GLOBAL_MANAGER',
                        spec_set=conductor_manager.ConductorManager)
     def test_local_call(self, mock_manager):
@@ -0,0 +1,155 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for :mod:`ironic.conductor.sensor_publisher`."""
+
+import time
+from unittest import mock
+
+from ironic.conductor import sensor_publisher
+from ironic.tests import base
+
+_UUID = '1be26c0b-03f2-4d2e-ae87-c02d7f33c123'
+
+
+def _payload(temperature, fan=8640):
+    return {'Temperature': {'CPU': {'reading_celsius': temperature,
+                                    'health': 'OK'}},
+            'Fan': {'Fan1': {'reading': fan, 'health': 'OK'}},
+            'Extra': {'Model': 'Model'}}
+
+
+@mock.patch.object(time, 'monotonic', autospec=True)
+class SensorDeltasTestCase(base.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.deltas = sensor_publisher.SensorDeltas()
+        self.config(full_snapshot_interval=600, group='sensor_data')
+
+    def test_encode(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        self.assertEqual((_payload(40), sensor_publisher.FULL),
+                         self.deltas.encode(_UUID, _payload(40)))
+        self.assertEqual(({}, sensor_publisher.DELTA),
+                         self.deltas.encode(_UUID, _payload(40)))
+        self.assertEqual(
+            ({'Temperature': {'CPU': {'reading_celsius': 41,
+                                      'health': 'OK'}}},
+             sensor_publisher.DELTA),
+            self.deltas.encode(_UUID, _payload(41)))
+
+        payload = _payload(41)
+        payload['Fan']['Fan2'] = {'reading': 0}
+        payload['Fan']['Fan1']['health'] = 'Warning'
+        self.assertEqual(({'Fan': payload['Fan']}, sensor_publisher.DELTA),
+                         self.deltas.encode(_UUID, payload))
+
+    def test_encode_threshold(self, mock_monotonic):
+        self.config(change_threshold=0.05, group='sensor_data')
+        mock_monotonic.return_value = 1000
+        self.deltas.encode(_UUID, _payload(40))
+        # 42 is within 5% of 40, the last reading sent
+        self.assertEqual({}, self.deltas.encode(_UUID, _payload(41))[0])
+        self.assertEqual({}, self.deltas.encode(_UUID, _payload(42))[0])
+        self.assertEqual({'CPU': {'reading_celsius': 43, 'health': 'OK'}},
+                         self.deltas.encode(_UUID,
+                                            _payload(43))[0]['Temperature'])
+        self.assertEqual({'Fan1': {'reading': 0, 'health': 'OK'}},
+                         self.deltas.encode(_UUID,
+                                            _payload(43, fan=0))[0]['Fan'])
+
+    def test_encode_full_snapshot(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        self.deltas.encode(_UUID, _payload(40))
+        mock_monotonic.return_value = 1599
+        self.assertEqual(sensor_publisher.DELTA,
+                         self.deltas.encode(_UUID, _payload(40))[1])
+        mock_monotonic.return_value = 1600
+        self.assertEqual((_payload(40), sensor_publisher.FULL),
+                         self.deltas.encode(_UUID, _payload(40)))
+
+    def test_encode_always_full(self, mock_monotonic):
+        self.config(full_snapshot_interval=0, group='sensor_data')
+        mock_monotonic.return_value = 1000
+        for _i in range(2):
+            self.assertEqual((_payload(40), sensor_publisher.FULL),
+                             self.deltas.encode(_UUID, _payload(40)))
+
+    def test_expire(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        self.deltas.encode(_UUID, _payload(40))
+        self.deltas.encode('other', _payload(40))
+        mock_monotonic.return_value = 1100
+        self.deltas.encode(_UUID, _payload(40))
+        mock_monotonic.return_value = 1150
+        self.deltas.expire(100)
+        self.assertEqual({_UUID}, set(self.deltas._nodes))
+
+
+class SensorPublisherTestCase(base.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.notifier = mock.Mock()
+        self.context = mock.sentinel.context
+        self.publisher = sensor_publisher.SensorPublisher(self.notifier,
+                                                          self.context)
+
+    def _message(self, node_uuid=_UUID, payload=None):
+        return {'node_uuid': node_uuid,
+                'event_type': 'hardware.fake.metrics.update',
+                'payload': _payload(40) if payload is None else payload}
+
+    def test_publish(self):
+        message = self._message()
+        self.publisher.publish('hardware.fake.metrics', message)
+        self.notifier.info.assert_called_once_with(
+            self.context, 'hardware.fake.metrics', message)
+
+    def test_publish_empty(self):
+        self.publisher.publish('hardware.fake.metrics',
+                               self._message(payload={}))
+        self.publisher.flush()
+        self.notifier.info.assert_not_called()
+
+    def test_publish_changes_only(self):
+        self.config(send_changes_only=True, group='sensor_data')
+        for _i in range(2):
+            self.publisher.publish('hardware.fake.metrics', self._message())
+        self.notifier.info.assert_called_once_with(
+            self.context, 'hardware.fake.metrics',
+            dict(self._message(), payload_type=sensor_publisher.FULL))
+
+    @mock.patch.object(sensor_publisher.METRICS, 'send_timer', autospec=True)
+    @mock.patch.object(sensor_publisher.METRICS, 'send_gauge', autospec=True)
+    def test_publish_batch(self, mock_gauge, mock_timer):
+        self.config(batch_size=2, group='sensor_data')
+        messages = [self._message('node%d' % i) for i in range(3)]
+        for message in messages:
+            self.publisher.publish('hardware.fake.metrics', message)
+        self.notifier.info.assert_called_once_with(
+            self.context, sensor_publisher.BATCH_EVENT_TYPE,
+            {'message_id': mock.ANY, 'timestamp': mock.ANY,
+             'event_type': 'hardware.metrics.batch.update',
+             'payload': messages[:2]})
+        mock_gauge.assert_called_once_with('SensorPublisher.batch_size', 2)
+        mock_timer.assert_called_once_with('SensorPublisher.batch_latency',
+                                           mock.ANY)
+
+        self.notifier.info.reset_mock()
+        self.publisher.flush()
+        self.assertEqual(messages[2:],
+                         self.notifier.info.call_args[0][2]['payload'])
+        self.notifier.info.reset_mock()
+        self.publisher.flush()
+        self.notifier.info.assert_not_called()
@@ -19,11 +19,11 @@ from oslo_utils import uuidutils
 from ironic.common import exception
 from ironic.common import policy
 from ironic.common import states
+from ironic.common import template_catalogue
 from ironic.conductor import steps as conductor_steps
 from ironic.conductor import task_manager
 from ironic.conductor import utils as conductor_utils
 from ironic.conductor import verify as verify_steps
-from ironic import objects
 from ironic.tests.unit.db import base as db_base
 from ironic.tests.unit.db import utils as db_utils
 from ironic.tests.unit.objects import utils as obj_utils
@@ -130,7 +130,8 @@ class NodeDeployStepsTestCase(db_base.DbTestCase):
             mock_power_steps.assert_called_once_with(mock.ANY, task)
             mock_deploy_steps.assert_called_once_with(mock.ANY, task)
 
-    @mock.patch.object(objects.DeployTemplate, 'list_by_names', autospec=True)
+    @mock.patch.object(template_catalogue, 'get_deploy_templates_by_names',
+                       autospec=True)
     def test__get_deployment_templates_no_traits(self, mock_list):
         with task_manager.acquire(
                 self.context, self.node.uuid, shared=False) as task:
@@ -138,7 +139,7 @@ class NodeDeployStepsTestCase(db_base.DbTestCase):
             self.assertEqual([], templates)
             self.assertFalse(mock_list.called)
 
-    @mock.patch.object(objects.DeployTemplate, 'list_by_names',
+    @mock.patch.object(template_catalogue, 'get_deploy_templates_by_names',
                        autospec=True)
     def test__get_deployment_templates(self, mock_list):
         traits = ['CUSTOM_DT1', 'CUSTOM_DT2']
@@ -1017,6 +1018,92 @@ class NodeCleaningStepsTestCase(db_base.DbTestCase):
             mock_steps.assert_not_called()
 
 
+class StepCacheTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super(StepCacheTestCase, self).setUp()
+        self.cache = conductor_steps.StepCache()
+        self.step = {'step': 'erase_disks', 'priority': 20,
+                     'interface': 'deploy'}
+        self.interface = mock.Mock()
+        self.interface.get_clean_steps.return_value = [self.step]
+        self.task = self._task('node1')
+
+    def _task(self, node_uuid):
+        return mock.Mock(node=mock.Mock(uuid=node_uuid))
+
+    def _get(self, task=None):
+        return self.cache.get_steps(task or self.task, 'deploy',
+                                    self.interface, 'clean')
+
+    def test_same_for_all_nodes(self):
+        self.interface.get_steps_cache_key.return_value = ()
+        steps = self._get()
+        self.assertEqual([self.step], steps)
+        # The caller owns the steps
+        steps[0]['priority'] = 99
+        self.assertEqual([self.step], self._get(self._task('node2')))
+        self.interface.get_clean_steps.assert_called_once_with(self.task)
+        self.interface.get_steps_cache_key.assert_called_with(mock.ANY,
+                                                              'clean')
+
+    def test_per_node(self):
+        self.interface.get_steps_cache_key.return_value = ('refreshed1',)
+        self._get()
+        self._get()
+        self.assertEqual(1, self.interface.get_clean_steps.call_count)
+
+        self._get(self._task('node2'))
+        self.assertEqual(2, self.interface.get_clean_steps.call_count)
+
+        self.interface.get_steps_cache_key.return_value = ('refreshed2',)
+        self._get()
+        self.assertEqual(3, self.interface.get_clean_steps.call_count)
+
+        self.cache.forget('node1')
+        self._get()
+        self.assertEqual(4, self.interface.get_clean_steps.call_count)
+
+    def test_not_cached(self):
+        self.interface.get_steps_cache_key.return_value = None
+        for _i in range(2):
+            self.assertEqual([self.step], self._get())
+        self.assertEqual(2, self.interface.get_clean_steps.call_count)
+
+    def test_disabled(self):
+        self.config(step_cache_size=0, group='conductor')
+        for _i in range(2):
+            self.assertEqual([self.step], self._get())
+        self.assertEqual(2, self.interface.get_clean_steps.call_count)
+        self.interface.get_steps_cache_key.assert_not_called()
+
+    def test_evicted(self):
+        self.config(step_cache_size=1, group='conductor')
+        self.interface.get_steps_cache_key.return_value = ('refreshed',)
+        self._get()
+        self._get(self._task('node2'))
+        self._get()
+        self.assertEqual(3, self.interface.get_clean_steps.call_count)
+
+    @mock.patch('ironic.drivers.modules.fake.FakeDeploy.get_clean_steps',
+                autospec=True)
+    def test__get_cleaning_steps(self, mock_deploy_steps):
+        node = obj_utils.create_test_node(self.context,
+                                          driver='fake-hardware')
+        mock_deploy_steps.return_value = [self.step]
+        self.config(clean_step_priority_override=[
+            {'deploy.erase_disks': '30'}], group='conductor')
+
+        with task_manager.acquire(self.context, node.uuid) as task:
+            for _i in range(2):
+                steps = conductor_steps._get_cleaning_steps(task)
+                self.assertEqual(dict(self.step, priority=30),
+                                 conductor_steps.find_step(steps, self.step))
+
+        # Overrides do not modify the steps of the interface
+        self.assertEqual(20, self.step['priority'])
+
+
 @mock.patch.object(conductor_steps, '_get_deployment_templates',
                    autospec=True)
 @mock.patch.object(conductor_steps, '_get_steps_from_deployment_templates',
@@ -19,6 +19,7 @@
 
 from unittest import mock
 
+import fixtures
 import futurist
 from oslo_utils import uuidutils
 import tenacity
@@ -54,6 +55,8 @@ class TaskManagerTestCase(db_base.DbTestCase):
         self.config(node_locked_retry_interval=0, group='conductor')
         self.node = obj_utils.create_test_node(self.context)
         self.future_mock = mock.Mock(spec=['cancel', 'add_done_callback'])
+        self.useFixture(fixtures.MockPatchObject(task_manager, '_HELD_LOCKS',
+                                                 {}))
 
     @mock.patch(
         'ironic.conductor.task_manager.tbn_config_file_traits',
@@ -765,6 +768,212 @@ class TaskManagerTestCase(db_base.DbTestCase):
             start_state=self.node.provision_state,
             target_state=self.node.target_provision_state)
 
+    @mock.patch.object(task_manager.METRICS, 'send_counter', autospec=True)
+    @mock.patch.object(task_manager.METRICS, 'send_timer', autospec=True)
+    def test_lock_metrics(
+            self, timer_mock, counter_mock, get_voltgt_mock,
+            get_volconn_mock, get_portgroups_mock, get_ports_mock,
+            build_driver_mock, reserve_mock, release_mock, node_get_mock):
+        self.config(node_locked_retry_attempts=3, group='conductor')
+        reserve_mock.side_effect = [
+            exception.NodeLocked(node='foo', host='foo'), self.node]
+
+        with task_manager.TaskManager(self.context, 'fake-node-id',
+                                      purpose='power state sync'):
+            timer_mock.assert_called_once_with(
+                'TaskManager.lock_wait.power_state_sync', mock.ANY)
+            counter_mock.assert_called_once_with(
+                'TaskManager.lock_retries.power_state_sync', 1)
+            locks = task_manager.get_held_locks()
+            self.assertEqual([(self.node.uuid, 'power state sync')],
+                             [(lock['node'], lock['purpose'])
+                              for lock in locks])
+            self.assertGreaterEqual(locks[0]['age'], 0)
+
+        timer_mock.assert_called_with(
+            'TaskManager.lock_hold.power_state_sync', mock.ANY)
+        self.assertEqual([], task_manager.get_held_locks())
+
+    @mock.patch.object(task_manager.METRICS, 'send_counter', autospec=True)
+    def test_lock_metrics_failed(
+            self, counter_mock, get_voltgt_mock, get_volconn_mock,
+            get_portgroups_mock, get_ports_mock, build_driver_mock,
+            reserve_mock, release_mock, node_get_mock):
+        self.config(node_locked_retry_attempts=2, group='conductor')
+        reserve_mock.side_effect = exception.NodeLocked(node='foo',
+                                                        host='foo')
+
+        self.assertRaises(exception.NodeLocked,
+                          task_manager.TaskManager, self.context,
+                          'fake-node-id', purpose='provision action deploy')
+
+        counter_mock.assert_has_calls([
+            mock.call('TaskManager.lock_failed.provision_action_deploy', 1),
+            mock.call('TaskManager.lock_retries.provision_action_deploy', 1),
+        ])
+        self.assertEqual([], task_manager.get_held_locks())
+
+    @mock.patch.object(task_manager.METRICS, 'send_timer', autospec=True)
+    def test_lock_metrics_shared(
+            self, timer_mock, get_voltgt_mock, get_volconn_mock,
+            get_portgroups_mock, get_ports_mock, build_driver_mock,
+            reserve_mock, release_mock, node_get_mock):
+        node_get_mock.return_value = self.node
+        reserve_mock.return_value = self.node
+
+        with task_manager.TaskManager(self.context, 'fake-node-id',
+                                      shared=True, purpose='ham') as task:
+            self.assertEqual([], task_manager.get_held_locks())
+            self.assertFalse(timer_mock.called)
+
+            task.upgrade_lock(purpose='spam')
+            self.assertEqual(['spam'], [lock['purpose'] for lock in
+                                        task_manager.get_held_locks()])
+
+            task.downgrade_lock()
+            self.assertEqual([], task_manager.get_held_locks())
+            timer_mock.assert_has_calls([
+                mock.call('TaskManager.lock_wait.spam', mock.ANY),
+                mock.call('TaskManager.lock_hold.spam', mock.ANY),
+            ])
+
+        self.assertEqual(2, timer_mock.call_count)
+
+
+@mock.patch.object(objects.Portgroup, 'list_by_node_id', autospec=True)
+@mock.patch.object(objects.Port, 'list_by_node_id', autospec=True)
+class ResourcePrefetcherTestCase(db_base.DbTestCase):
+    def setUp(self):
+        super(ResourcePrefetcherTestCase, self).setUp()
+        self.node = obj_utils.create_test_node(self.context)
+        self.port = obj_utils.create_test_port(self.context,
+                                               node_id=self.node.id)
+        self.portgroup = obj_utils.create_test_portgroup(
+            self.context, node_id=self.node.id)
+        self.node2 = obj_utils.create_test_node(
+            self.context, uuid=uuidutils.generate_uuid())
+
+    def test_shared(self, get_ports_mock, get_portgroups_mock):
+        with task_manager.ResourcePrefetcher(self.context) as prefetcher:
+            prefetcher.prefetch([self.node.uuid, self.node2.uuid])
+            with task_manager.acquire(self.context, self.node.uuid,
+                                      shared=True) as task:
+                self.assertEqual([self.port.uuid],
+                                 [p.uuid for p in task.ports])
+                self.assertEqual([self.portgroup.uuid],
+                                 [pg.uuid for pg in task.portgroups])
+            with task_manager.acquire(self.context, self.node2.uuid,
+                                      shared=True) as task:
+                self.assertEqual([], task.ports)
+                self.assertEqual([], task.portgroups)
+
+        get_ports_mock.assert_not_called()
+        get_portgroups_mock.assert_not_called()
+
+    def test_handed_out_once(self, get_ports_mock, get_portgroups_mock):
+        with task_manager.ResourcePrefetcher(self.context) as prefetcher:
+            prefetcher.prefetch([self.node.uuid])
+            for _i in range(2):
+                with task_manager.acquire(self.context, self.node.uuid,
+                                          shared=True) as task:
+                    task.ports
+                    task.portgroups
+
+        get_ports_mock.assert_called_once_with(self.context, self.node.id)
+        get_portgroups_mock.assert_called_once_with(self.context,
+                                                    self.node.id)
+
+    def test_not_prefetched(self, get_ports_mock, get_portgroups_mock):
+        with task_manager.ResourcePrefetcher(self.context) as prefetcher:
+            prefetcher.prefetch([self.node2.uuid])
+            with task_manager.acquire(self.context, self.node.uuid,
+                                      shared=True) as task:
+                self.assertIs(get_ports_mock.return_value, task.ports)
+
+        get_ports_mock.assert_called_once_with(self.context, self.node.id)
+
+    def test_exclusive(self, get_ports_mock, get_portgroups_mock):
+        with task_manager.ResourcePrefetcher(self.context) as prefetcher:
+            prefetcher.prefetch([self.node.uuid])
+            with task_manager.acquire(self.context, self.node.uuid) as task:
+                self.assertIs(get_ports_mock.return_value, task.ports)
+
+        get_ports_mock.assert_called_once_with(self.context, self.node.id)
+
+    def test_upgrade_lock(self, get_ports_mock, get_portgroups_mock):
+        with task_manager.ResourcePrefetcher(self.context) as prefetcher:
+            prefetcher.prefetch([self.node.uuid])
+            with task_manager.acquire(self.context, self.node.uuid,
+                                      shared=True) as task:
+                self.assertEqual(1, len(task.ports))
+                task.upgrade_lock()
+                self.assertIs(get_ports_mock.return_value, task.ports)
+                self.assertIs(get_portgroups_mock.return_value,
+                              task.portgroups)
+
+        get_ports_mock.assert_called_once_with(self.context, self.node.id)
+
+    def test_inactive(self, get_ports_mock, get_portgroups_mock):
+        prefetcher = task_manager.ResourcePrefetcher(self.context)
+        with prefetcher:
+            prefetcher.prefetch([self.node.uuid])
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task:
+            self.assertIs(get_ports_mock.return_value, task.ports)
+
+    @mock.patch.object(task_manager.ResourcePrefetcher, 'prefetch',
+                       autospec=True)
+    def test_iterate(self, prefetch_mock, get_ports_mock,
+                     get_portgroups_mock):
+        prefetcher = task_manager.ResourcePrefetcher(self.context,
+                                                     page_size=2)
+        nodes = [('uuid%d' % i, 'driver') for i in range(5)]
+        prefetched = []
+        prefetch_mock.side_effect = (
+            lambda _self, uuids: prefetched.append(list(uuids)))
+
+        self.assertEqual(nodes, list(prefetcher.iterate(iter(nodes))))
+        self.assertEqual([['uuid0', 'uuid1'], ['uuid2', 'uuid3'],
+                          ['uuid4']], prefetched)
+
+    @mock.patch.object(task_manager.ResourcePrefetcher, 'prefetch',
+                       autospec=True)
+    def test_iterate_disabled(self, prefetch_mock, get_ports_mock,
+                              get_portgroups_mock):
+        self.config(periodic_prefetch_page_size=0, group='conductor')
+        prefetcher = task_manager.ResourcePrefetcher(self.context)
+        nodes = [('uuid%d' % i, 'driver') for i in range(5)]
+
+        self.assertEqual(nodes, list(prefetcher.iterate(nodes)))
+        prefetch_mock.assert_not_called()
+
+
+@mock.patch.object(task_manager.time, 'monotonic', autospec=True)
+class HeldLocksTestCase(tests_base.TestCase):
+
+    def setUp(self):
+        super(HeldLocksTestCase, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(
+            task_manager, '_HELD_LOCKS', {'node-1': ('deploy', 10.0),
+                                          'node-2': ('power state sync',
+                                                     40.0)}))
+
+    def test_get_held_locks(self, mock_time):
+        mock_time.return_value = 50.0
+        self.assertEqual(
+            [{'node': 'node-1', 'purpose': 'deploy', 'age': 40.0},
+             {'node': 'node-2', 'purpose': 'power state sync', 'age': 10.0}],
+            task_manager.get_held_locks())
+
+    def test_metric_purpose(self, mock_time):
+        self.assertEqual('provision_action_deploy',
+                         task_manager._metric_purpose(
+                             'provision action deploy'))
+        self.assertEqual('node_power_state_change',
+                         task_manager._metric_purpose(
+                             'node power state change.'))
+        self.assertEqual('unspecified', task_manager._metric_purpose('...'))
+
 
 class TaskManagerStateModelTestCases(tests_base.TestCase):
     def setUp(self):
@@ -16,6 +16,7 @@ import tempfile
 import time
 from unittest import mock
 
+import futurist
 from oslo_config import cfg
 from oslo_context import context as oslo_context
 from oslo_utils import timeutils
@@ -29,6 +30,8 @@ from ironic.common import network
 from ironic.common import neutron
 from ironic.common import nova
 from ironic.common import states
+from ironic.conductor import bmc_events
+from ironic.conductor import power_waiter
 from ironic.conductor import rpcapi
 from ironic.conductor import task_manager
 from ironic.conductor import utils as conductor_utils
@@ -193,6 +196,41 @@ class NodeSetBootModeTestCase(db_base.DbTestCase):
 
 
 class NodePowerActionTestCase(db_base.DbTestCase):
+    @mock.patch.object(power_waiter, '_INITIAL_INTERVAL', 0.01)
+    @mock.patch.object(fake.FakePower, 'get_power_states', autospec=True)
+    @mock.patch.object(fake.FakePower, 'set_power_state', autospec=True)
+    @mock.patch.object(fake.FakePower, 'get_power_state', autospec=True)
+    def test_node_power_action_background_wait(self, get_power_mock,
+                                               set_power_mock,
+                                               get_states_mock):
+        """Test node_power_action with the wait deferred to the waiter."""
+        node = obj_utils.create_test_node(self.context,
+                                          uuid=uuidutils.generate_uuid(),
+                                          driver='fake-hardware',
+                                          power_state=states.POWER_ON)
+        task = task_manager.TaskManager(self.context, node.uuid)
+        get_power_mock.return_value = states.POWER_ON
+        set_power_mock.side_effect = (
+            lambda _self, task, power_state, timeout=None:
+            conductor_utils.node_wait_for_power_state(task, power_state,
+                                                      timeout=timeout))
+        get_states_mock.side_effect = [[states.POWER_ON], [states.POWER_OFF]]
+        executor = futurist.SynchronousExecutor()
+
+        done = power_waiter.spawn(executor.submit)(
+            conductor_utils.node_power_action, task, states.POWER_OFF)
+        # The worker is done, the waiter finishes the power action
+        node.refresh()
+        self.assertEqual(states.POWER_ON, node.power_state)
+        self.assertEqual(states.POWER_OFF, node.target_power_state)
+
+        self.assertIsNone(done.result(timeout=10))
+        node.refresh()
+        self.assertEqual(states.POWER_OFF, node.power_state)
+        self.assertIsNone(node.target_power_state)
+        self.assertEqual(2, get_states_mock.call_count)
+        task.release_resources()
+
     @mock.patch.object(fake.FakePower, 'get_power_state', autospec=True)
     def test_node_power_action_power_on(self, get_power_mock):
         """Test node_power_action to turn node power on."""
@@ -1173,6 +1211,46 @@ class NodePowerActionTestCase(db_base.DbTestCase):
         self.assertIn('unexpected keyword argument', node['last_error'])
 
 
+class NodeWaitForPowerStateEventTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.node = obj_utils.create_test_node(self.context,
+                                               driver='fake-hardware')
+        bmc_events.subscribe(self.node.uuid)
+
+    @mock.patch.object(bmc_events, 'wait', autospec=True)
+    @mock.patch.object(fake.FakePower, 'get_power_state', autospec=True)
+    def test_wait(self, get_power_mock, wait_mock):
+        get_power_mock.side_effect = [states.POWER_ON, states.POWER_ON,
+                                      states.POWER_OFF]
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.assertEqual(
+                states.POWER_OFF,
+                conductor_utils.node_wait_for_power_state(
+                    task, states.POWER_OFF, timeout=60))
+        self.assertEqual(3, get_power_mock.call_count)
+        # Exponential back-off in case the events are lost
+        self.assertEqual([1, 2],
+                         [c[0][2] for c in wait_mock.call_args_list])
+        wait_mock.assert_called_with(self.node.uuid, [bmc_events.POWER],
+                                     2, since=mock.ANY)
+
+    @mock.patch.object(bmc_events, 'wait', autospec=True)
+    @mock.patch.object(fake.FakePower, 'get_power_state', autospec=True)
+    def test_timeout(self, get_power_mock, wait_mock):
+        get_power_mock.return_value = states.POWER_ON
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            with mock.patch.object(time, 'monotonic', autospec=True,
+                                   side_effect=[0, 0, 0, 1, 61]):
+                self.assertRaises(exception.PowerStateFailure,
+                                  conductor_utils.node_wait_for_power_state,
+                                  task, states.POWER_OFF, timeout=60)
+        self.assertEqual(2, get_power_mock.call_count)
+        wait_mock.assert_called_once_with(self.node.uuid, [bmc_events.POWER],
+                                          1, since=0)
+
+
 class NodeSoftPowerActionTestCase(db_base.DbTestCase):
 
     @mock.patch.object(fake.FakePower, 'get_power_state', autospec=True)
@@ -1416,6 +1416,128 @@ class MigrationCheckersMixin(object):
         self.assertIsInstance(node_history.c.duration_seconds.type,
                               sqlalchemy.types.Integer)
 
+    def _check_3f1e2c8d9a47(self, engine, data):
+        batches = db_utils.get_table(engine, 'provision_job_batches')
+        col_names = [column.name for column in batches.c]
+
+        expected_names = ['version', 'created_at', 'updated_at', 'id', 'uuid',
+                          'job_uuid', 'conductor', 'target', 'state',
+                          'project', 'nodes', 'params', 'results']
+        self.assertEqual(sorted(expected_names), sorted(col_names))
+
+        self.assertIsInstance(batches.c.job_uuid.type,
+                              sqlalchemy.types.String)
+        self.assertIsInstance(batches.c.state.type,
+                              sqlalchemy.types.String)
+        self.assertIsInstance(batches.c.nodes.type,
+                              sqlalchemy.types.Text)
+
+        with engine.begin() as connection:
+            insert_batch = batches.insert().values(
+                uuid=uuidutils.generate_uuid(),
+                job_uuid=uuidutils.generate_uuid(),
+                target='active', state='pending', nodes='[]')
+            connection.execute(insert_batch)
+            self.assertRaises(db_exc.DBDuplicateEntry, connection.execute,
+                              insert_batch)
+
+    def _check_6f6b7ac1c266(self, engine, data):
+        node_inventory = db_utils.get_table(engine, 'node_inventory')
+        self.assertIn('data_digest', node_inventory.c)
+        self.assertIsInstance(node_inventory.c.data_digest.type,
+                              sqlalchemy.types.String)
+
+    def _pre_upgrade_3a8c5e1f9b27(self, engine):
+        nodes = db_utils.get_table(engine, 'nodes')
+        data = [{'uuid': uuidutils.generate_uuid(),
+                 'driver_internal_info': json.dumps(
+                     {'redfish_fw_updates': [{'url': 'http://fw'}],
+                      'raid_configs': {},
+                      'other': True})},
+                {'uuid': uuidutils.generate_uuid(),
+                 'driver_internal_info': json.dumps({})},
+                {'uuid': uuidutils.generate_uuid(),
+                 'driver_internal_info': None}]
+        with engine.begin() as connection:
+            connection.execute(nodes.insert().values(data))
+        return data
+
+    def _check_3a8c5e1f9b27(self, engine, data):
+        operations = db_utils.get_table(engine, 'node_async_operations')
+        col_names = [column.name for column in operations.c]
+
+        expected_names = ['version', 'created_at', 'updated_at', 'id',
+                          'node_id', 'kind']
+        self.assertEqual(sorted(expected_names), sorted(col_names))
+
+        self.assertIsInstance(operations.c.node_id.type,
+                              sqlalchemy.types.Integer)
+        self.assertIsInstance(operations.c.kind.type,
+                              sqlalchemy.types.String)
+
+        nodes = db_utils.get_table(engine, 'nodes')
+        with engine.begin() as connection:
+            rows = connection.execute(
+                sqlalchemy.select(nodes.c.uuid, operations.c.kind).join(
+                    operations, nodes.c.id == operations.c.node_id).where(
+                        nodes.c.uuid.in_([n['uuid'] for n in data]))).all()
+            self.assertEqual([(data[0]['uuid'], 'redfish_fw_updates')],
+                             [tuple(row) for row in rows])
+
+            node_id = connection.execute(
+                sqlalchemy.select(nodes.c.id).where(
+                    nodes.c.uuid == data[1]['uuid'])).scalar()
+            insert_operation = operations.insert().values(
+                node_id=node_id, kind='raid_configs')
+            connection.execute(insert_operation)
+            self.assertRaises(db_exc.DBDuplicateEntry, connection.execute,
+                              insert_operation)
+
+    def _check_7d2f4b9c1e63(self, engine, data):
+        revisions = db_utils.get_table(engine, 'revisions')
+        col_names = [column.name for column in revisions.c]
+
+        expected_names = ['version', 'created_at', 'updated_at', 'id',
+                          'name', 'revision']
+        self.assertEqual(sorted(expected_names), sorted(col_names))
+
+        self.assertIsInstance(revisions.c.name.type,
+                              sqlalchemy.types.String)
+        self.assertIsInstance(revisions.c.revision.type,
+                              sqlalchemy.types.BigInteger)
+
+        with engine.begin() as connection:
+            insert_revision = revisions.insert().values(
+                name='inspection_rules', revision=1)
+            connection.execute(insert_revision)
+            self.assertRaises(db_exc.DBDuplicateEntry, connection.execute,
+                              insert_revision)
+
+    def _check_b2908b37e4a0(self, engine, data):
+        addresses = db_utils.get_table(engine, 'node_lookup_addresses')
+        col_names = [column.name for column in addresses.c]
+
+        expected_names = ['version', 'created_at', 'updated_at', 'id',
+                          'node_id', 'address']
+        self.assertEqual(sorted(expected_names), sorted(col_names))
+
+        self.assertIsInstance(addresses.c.node_id.type,
+                              sqlalchemy.types.Integer)
+        self.assertIsInstance(addresses.c.address.type,
+                              sqlalchemy.types.String)
+
+        nodes = db_utils.get_table(engine, 'nodes')
+        with engine.begin() as connection:
+            connection.execute(nodes.insert().values(
+                uuid=uuidutils.generate_uuid()))
+            node_id = connection.execute(
+                sqlalchemy.select(sqlalchemy.func.max(nodes.c.id))).scalar()
+            insert_address = addresses.insert().values(
+                node_id=node_id, address='192.0.2.1')
+            connection.execute(insert_address)
+            self.assertRaises(db_exc.DBDuplicateEntry, connection.execute,
+                              insert_address)
+
     def _check_0ac0f39bc5aa(self, engine, data):
         node_inventory = db_utils.get_table(engine, 'node_inventory')
         col_names = [column.name for column in node_inventory.c]
@@ -12,10 +12,13 @@
 
 """Tests for manipulating allocations via the DB API"""
 
+from unittest import mock
+
 from oslo_utils import uuidutils
 
 from ironic.common import exception
 from ironic.db import api as db_api
+from ironic.db.sqlalchemy import api as sqlalchemy_api
 from ironic.tests.unit.db import base
 from ironic.tests.unit.db import utils as db_utils
 
@@ -244,6 +247,93 @@ class AllocationsTestCase(base.DbTestCase):
         self.assertIsNone(node.instance_uuid)
         self.assertNotIn('traits', node.instance_info)
 
+    def _claim(self, node_uuids, **filters):
+        return self.dbapi.claim_node_for_allocation(
+            self.allocation.id, node_uuids,
+            dict(filters, provision_state='available'))
+
+    def test_claim_node(self):
+        self.dbapi.update_allocation(self.allocation.id, {'traits': ['foo']})
+        node = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                         provision_state='available')
+        res = self._claim([node.uuid])
+        self.assertEqual('active', res.state)
+        self.assertEqual(node.id, res.node_id)
+
+        node = self.dbapi.get_node_by_id(node.id)
+        self.assertEqual(res.id, node.allocation_id)
+        self.assertEqual(res.uuid, node.instance_uuid)
+        self.assertEqual(['foo'], node.instance_info['traits'])
+        self.assertEqual(res.node_id,
+                         self.dbapi.get_allocation_by_id(res.id).node_id)
+
+    def test_claim_node_skips_unsuitable(self):
+        node1 = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                          provision_state='available',
+                                          reservation='host')
+        node2 = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                          provision_state='available',
+                                          instance_uuid='uuid')
+        node3 = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                          provision_state='available',
+                                          resource_class='small')
+        node4 = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                          provision_state='available',
+                                          resource_class='large')
+        uuids = [node1.uuid, node2.uuid, node3.uuid, node4.uuid]
+        self.assertIsNone(self._claim(uuids, resource_class='medium'))
+        self.assertIsNone(self._claim(uuids[:3], resource_class='large'))
+        res = self._claim(uuids, resource_class='large')
+        self.assertEqual(node4.id, res.node_id)
+
+        allocation = self.dbapi.get_allocation_by_id(self.allocation.id)
+        self.assertEqual(node4.id, allocation.node_id)
+        for node in (node1, node2, node3):
+            self.assertIsNone(
+                self.dbapi.get_node_by_id(node.id).allocation_id)
+
+    def test_claim_node_not_claimed(self):
+        node = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                         provision_state='available',
+                                         reservation='host')
+        self.assertIsNone(self._claim([node.uuid]))
+        allocation = self.dbapi.get_allocation_by_id(self.allocation.id)
+        self.assertEqual('allocating', allocation.state)
+        self.assertIsNone(allocation.node_id)
+
+    def test_supports_skip_locked(self):
+        for name, mariadb, version, expected in [
+                ('mysql', False, (8, 0, 32), True),
+                ('mysql', False, (5, 7, 42), False),
+                ('mysql', True, (10, 6, 12), True),
+                ('mysql', True, (10, 5, 19), False),
+                ('postgresql', False, (9, 5), True),
+                ('postgresql', False, (9, 4, 26), False),
+                ('sqlite', False, (3, 40, 1), True)]:
+            dialect = mock.Mock(server_version_info=version,
+                                is_mariadb=mariadb)
+            dialect.name = name
+            self.assertIs(expected,
+                          sqlalchemy_api._supports_skip_locked(dialect),
+                          (name, mariadb, version))
+
+    def test_claim_node_allocation_not_found(self):
+        self.assertRaises(exception.AllocationNotFound,
+                          self.dbapi.claim_node_for_allocation, 999,
+                          [self.node.uuid], {})
+
+    def test_claim_node_associated_with_another_node(self):
+        db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                  instance_uuid=self.allocation.uuid)
+        node = db_utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                                         provision_state='available')
+        self.assertRaises(exception.InstanceAssociated,
+                          self._claim, [node.uuid])
+
+        allocation = self.dbapi.get_allocation_by_id(self.allocation.id)
+        self.assertIsNone(allocation.node_id)
+        self.assertIsNone(self.dbapi.get_node_by_id(node.id).instance_uuid)
+
     def test_take_over_success(self):
         for i in range(2):
             db_utils.create_test_conductor(id=i, hostname='host-%d' % i)
@@ -426,3 +426,54 @@ class MigrateRunbookNamesToTraitsTestCase(base.DbTestCase):
             self.runbook1['id'])
         self.assertEqual(1, len(traits))
         self.assertEqual('MANUAL_TRAIT', traits[0].trait)
+
+
+class BackfillNodeAsyncOperationsTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.context = context.get_admin_context()
+        self.dbapi = db_api.get_instance()
+        self.node1 = utils.create_test_node(
+            driver_internal_info={'raid_configs': {'task': 1},
+                                  'redfish_fw_updates': [{'url': 'http://fw'}],
+                                  'other': True})
+        self.node2 = utils.create_test_node(
+            uuid=uuidutils.generate_uuid(),
+            driver_internal_info={'redfish_bios_state': {'step': 1}})
+        utils.create_test_node(uuid=uuidutils.generate_uuid(),
+                               driver_internal_info={
+                                   'raid_configs': {},
+                                   'firmware_updates': [],
+                                   'raid_task_monitor_uris': None,
+                                   'redfish_bios_state': ''})
+
+    def _pending(self, kind):
+        return sorted(node.id for node in self.dbapi.get_node_list(
+            filters={'async_operation': kind}))
+
+    def test_backfill(self):
+        total, migrated = self.dbapi.backfill_node_async_operations(
+            self.context, 0)
+        self.assertEqual((3, 3), (total, migrated))
+        self.assertEqual([self.node1.id], self._pending('raid_configs'))
+        self.assertEqual([self.node1.id], self._pending('redfish_fw_updates'))
+        self.assertEqual([self.node2.id], self._pending('redfish_bios_state'))
+
+        total, migrated = self.dbapi.backfill_node_async_operations(
+            self.context, 0)
+        self.assertEqual((0, 0), (total, migrated))
+
+    def test_backfill_with_limit(self):
+        self.dbapi.add_node_async_operations(self.node1.id, ['raid_configs'])
+        total, migrated = self.dbapi.backfill_node_async_operations(
+            self.context, 1)
+        self.assertEqual((2, 1), (total, migrated))
+
+        total, migrated = self.dbapi.backfill_node_async_operations(
+            self.context, 1)
+        self.assertEqual((1, 1), (total, migrated))
+
+        total, migrated = self.dbapi.backfill_node_async_operations(
+            self.context, 1)
+        self.assertEqual((0, 0), (total, migrated))
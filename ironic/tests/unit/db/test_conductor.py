@@ -415,6 +415,17 @@ class DbConductorTestCase(base.DbTestCase):
         self.assertEqual([], self.dbapi.get_online_conductors())
         self.assertEqual(2, mock_is_sqlite.call_count)
 
+    def test_get_online_conductors_by_group(self):
+        c1 = self._create_test_cdr(id=1, hostname='c1', conductor_group='g1')
+        self._create_test_cdr(id=2, hostname='c2', conductor_group='g2')
+        c3 = self._create_test_cdr(id=3, hostname='c3', conductor_group='g1')
+        self.assertEqual({c1.hostname, c3.hostname},
+                         set(self.dbapi.get_online_conductors(
+                             conductor_group='g1')))
+        self.assertEqual([], self.dbapi.get_online_conductors(
+            conductor_group='g3'))
+        self.assertEqual(3, len(self.dbapi.get_online_conductors()))
+
     @mock.patch.object(timeutils, 'utcnow', autospec=True)
     def test_get_online_conductors_with_sqlite(self, mock_utcnow):
         # NOTE(TheJulia): Explicitly skipping the mock so the underlying
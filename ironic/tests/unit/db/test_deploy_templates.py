@@ -207,3 +207,26 @@ class DbDeployTemplateTestCase(base.DbTestCase):
         names = ['CUSTOM_FOO']
         res = self.dbapi.get_deploy_template_list_by_names(names=names)
         self.assertEqual([], res)
+
+    def test_get_deploy_templates_generation(self):
+        generations = [self.dbapi.get_deploy_templates_generation()]
+        step = {'interface': 'bios', 'step': 'apply_configuration',
+                'args': {}, 'priority': 50}
+        self.dbapi.update_deploy_template(self.template.id,
+                                          {'steps': [step]})
+        generations.append(self.dbapi.get_deploy_templates_generation())
+        self.dbapi.update_deploy_template(self.template.id,
+                                          {'steps': []})
+        generations.append(self.dbapi.get_deploy_templates_generation())
+        db_utils.create_test_deploy_template(
+            uuid=uuidutils.generate_uuid(), name='CUSTOM_DT2')
+        generations.append(self.dbapi.get_deploy_templates_generation())
+        self.dbapi.destroy_deploy_template(self.template.id)
+        generations.append(self.dbapi.get_deploy_templates_generation())
+        # A template replacing a deleted one in the same second
+        db_utils.create_test_deploy_template(
+            uuid=uuidutils.generate_uuid(), name='CUSTOM_DT1')
+        generations.append(self.dbapi.get_deploy_templates_generation())
+        self.assertEqual(len(generations), len(set(generations)))
+        self.assertEqual(generations[-1],
+                         self.dbapi.get_deploy_templates_generation())
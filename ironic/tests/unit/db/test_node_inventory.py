@@ -10,7 +10,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+import json
+
+from oslo_db.sqlalchemy import enginefacade
+from oslo_serialization import jsonutils
+from oslo_utils import uuidutils
+import sqlalchemy as sa
+
 from ironic.common import exception
+from ironic.db.sqlalchemy import models
 from ironic.tests.unit.db import base
 from ironic.tests.unit.db import utils as db_utils
 
@@ -34,3 +43,85 @@ class DBNodeInventoryTestCase(base.DbTestCase):
     def test_get_inventory_by_node_id(self):
         res = self.dbapi.get_node_inventory_by_node_id(self.inventory.node_id)
         self.assertEqual(self.inventory.id, res.id)
+
+    def _get_raw_data(self, node_id):
+        with enginefacade.reader.using(self.context) as session:
+            return session.execute(
+                sa.select(sa.column('inventory_data'),
+                          sa.column('plugin_data'),
+                          sa.column('data_digest'))
+                .select_from(sa.table('node_inventory'))
+                .where(sa.column('node_id') == node_id)
+            ).one()
+
+    def test_create_node_inventory_compressed(self):
+        raw = self._get_raw_data(self.node.id)
+        self.assertTrue(raw.inventory_data.startswith(
+            models.COMPRESSED_JSON_HEADER))
+        self.assertTrue(raw.plugin_data.startswith(
+            models.COMPRESSED_JSON_HEADER))
+        res = self.dbapi.get_node_inventory_by_node_id(self.node.id)
+        self.assertEqual({"inventory": "test"}, res.inventory_data)
+        self.assertEqual({"plugin_data": "test_plugin_data"},
+                         res.plugin_data)
+
+    def _test_create_node_inventory_not_compressed(self):
+        node = db_utils.create_test_node(uuid=uuidutils.generate_uuid())
+        db_utils.create_test_inventory(node_id=node.id,
+                                       inventory={'cpu': {'count': 4}})
+        raw = self._get_raw_data(node.id)
+        self.assertEqual({'cpu': {'count': 4}},
+                         json.loads(raw.inventory_data))
+        res = self.dbapi.get_node_inventory_by_node_id(node.id)
+        self.assertEqual({'cpu': {'count': 4}}, res.inventory_data)
+
+    def test_create_node_inventory_compression_disabled(self):
+        self.config(data_compression='none', group='inventory')
+        self._test_create_node_inventory_not_compressed()
+
+    def test_create_node_inventory_pinned(self):
+        self.config(pin_release_version='2025.2')
+        self._test_create_node_inventory_not_compressed()
+
+    def test_create_node_inventory_unchanged(self):
+        digest = self._get_raw_data(self.node.id).data_digest
+        self.assertIsNotNone(digest)
+        res = db_utils.create_test_inventory(
+            node_id=self.node.id,
+            inventory={"inventory": "test"},
+            plugin_data={"plugin_data": "test_plugin_data"})
+        self.assertEqual(self.inventory.id, res.id)
+        self.assertEqual(self.inventory.created_at, res.created_at)
+        self.assertIsNotNone(res.updated_at)
+        self.assertEqual(digest, self._get_raw_data(self.node.id).data_digest)
+        self.assertEqual(
+            res.updated_at.replace(tzinfo=None),
+            self.dbapi.get_node_inventory_by_node_id(
+                self.node.id).updated_at.replace(tzinfo=None))
+
+    def test_create_node_inventory_digest(self):
+        self.assertEqual(
+            hashlib.sha256(jsonutils.dumps(
+                [{"inventory": "test"}, {"plugin_data": "test_plugin_data"}],
+                sort_keys=True).encode('utf-8')).hexdigest(),
+            self._get_raw_data(self.node.id).data_digest)
+
+    def test_create_node_inventory_changed(self):
+        digest = self._get_raw_data(self.node.id).data_digest
+        res = db_utils.create_test_inventory(
+            node_id=self.node.id, inventory={"inventory": "new"},
+            plugin_data={"plugin_data": "test_plugin_data"})
+        self.assertNotEqual(self.inventory.id, res.id)
+        self.assertNotEqual(digest,
+                            self._get_raw_data(self.node.id).data_digest)
+        res = self.dbapi.get_node_inventory_by_node_id(self.node.id)
+        self.assertEqual({"inventory": "new"}, res.inventory_data)
+
+    def test_create_node_inventory_skip_unchanged_disabled(self):
+        self.config(skip_unchanged_data=False, group='inventory')
+        res = db_utils.create_test_inventory(
+            node_id=self.node.id,
+            inventory={"inventory": "test"},
+            plugin_data={"plugin_data": "test_plugin_data"})
+        self.assertNotEqual(self.inventory.id, res.id)
+        self.assertIsNone(self._get_raw_data(self.node.id).data_digest)
@@ -20,6 +20,7 @@ import datetime
 from unittest import mock
 
 from oslo_config import cfg
+from oslo_db.sqlalchemy import enginefacade
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from sqlalchemy import exc as sa_exc
@@ -33,6 +34,7 @@ from ironic.common import states
 from ironic.common import utils as common_utils
 from ironic.db.sqlalchemy import api as dbapi
 from ironic.db.sqlalchemy.api import Connection as db_conn
+from ironic.db.sqlalchemy import models
 from ironic.db.sqlalchemy.models import NodeInventory
 from ironic.tests.unit.db import base
 from ironic.tests.unit.db import utils
@@ -102,6 +104,32 @@ class DbNodeTestCase(base.DbTestCase):
         self.assertCountEqual(['trait1', 'trait2'],
                               [trait.trait for trait in res.traits])
 
+    def test_get_node_generation(self):
+        node = utils.create_test_node()
+        updated_at, traits, checked_at = self.dbapi.get_node_generation(
+            node.uuid)
+        self.assertEqual((None, frozenset()), (updated_at, traits))
+        self.assertIsInstance(checked_at, datetime.datetime)
+
+        utils.create_test_node_traits(node_id=node.id,
+                                      traits=['trait1', 'trait2'])
+        self.assertEqual((None, frozenset(['trait1', 'trait2'])),
+                         self.dbapi.get_node_generation(node.id)[:2])
+
+        res = self.dbapi.update_node(node.id, {'extra': {'foo': 'bar'}})
+        updated_at, traits, checked_at = self.dbapi.get_node_generation(
+            str(node.id))
+        self.assertEqual((res.updated_at, frozenset(['trait1', 'trait2'])),
+                         (updated_at, traits))
+        # The time of the database is used, truncated to seconds on SQLite
+        self.assertLess(abs(checked_at - res.updated_at),
+                        datetime.timedelta(seconds=2))
+
+    def test_get_node_generation_not_found(self):
+        self.assertRaises(exception.NodeNotFound,
+                          self.dbapi.get_node_generation,
+                          uuidutils.generate_uuid())
+
     def test_get_node_by_name(self):
         node = utils.create_test_node()
         self.dbapi.set_node_tags(node.id, ['tag1', 'tag2'])
@@ -474,6 +502,28 @@ class DbNodeTestCase(base.DbTestCase):
             'description_contains': 'World!'})
         self.assertEqual([node2.id], [r.id for r in res])
 
+    def test_get_node_list_with_traits(self):
+        node1 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        utils.create_test_node(uuid=uuidutils.generate_uuid())
+        utils.create_test_node_traits(['tr1', 'tr2', 'tr3'],
+                                      node_id=node1.id)
+        utils.create_test_node_traits(['tr2'], node_id=node2.id)
+
+        res = self.dbapi.get_node_list(filters={'with_traits': ['tr2']})
+        self.assertEqual([node1.id, node2.id], [r.id for r in res])
+
+        res = self.dbapi.get_node_list(filters={
+            'with_traits': ['tr1', 'tr2', 'tr2']})
+        self.assertEqual([node1.id], [r.id for r in res])
+
+        res = self.dbapi.get_node_list(filters={
+            'with_traits': ['tr2', 'tr4']})
+        self.assertEqual([], [r.id for r in res])
+
+        res = self.dbapi.get_nodeinfo_list(filters={'with_traits': ['tr3']})
+        self.assertEqual([node1.id], [r[0] for r in res])
+
     def test_get_node_list_chassis_not_found(self):
         self.assertRaises(exception.ChassisNotFound,
                           self.dbapi.get_node_list,
@@ -796,6 +846,8 @@ class DbNodeTestCase(base.DbTestCase):
 
         node_inventory = self.dbapi.get_node_inventory_by_node_id(
             node_id=node.id)
+        digest = node_inventory.data_digest
+        self.assertIsNotNone(digest)
         expected_inventory = NodeInventory(node_id=node.id,
                                            id=2,
                                            inventory_data={"inventory":
@@ -803,6 +855,7 @@ class DbNodeTestCase(base.DbTestCase):
                                            created_at=second_timestamp,
                                            plugin_data={"pdata":
                                                         {"plugin": "data"}},
+                                           data_digest=digest,
                                            version='1.1')
         self.assertJsonEqual(expected_inventory, node_inventory)
 
@@ -815,6 +868,89 @@ class DbNodeTestCase(base.DbTestCase):
         self.assertRaises(exception.NodeInventoryNotFound,
                           self.dbapi.get_node_inventory_by_node_id, node.id)
 
+    def _lookup(self, addresses):
+        return sorted(node.uuid for node in self.dbapi.get_node_list(
+            filters={'lookup_address_in': addresses}))
+
+    def test_set_node_lookup_addresses(self):
+        node1 = utils.create_test_node()
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        self.dbapi.set_node_lookup_addresses(
+            node1.id, ['192.0.2.1', '192.0.2.2', '192.0.2.1'])
+        self.dbapi.set_node_lookup_addresses(node2.id, ['192.0.2.2'])
+
+        self.assertEqual([node1.uuid], self._lookup(['192.0.2.1']))
+        self.assertEqual(sorted([node1.uuid, node2.uuid]),
+                         self._lookup(['192.0.2.2', '192.0.2.3']))
+        self.assertEqual([], self._lookup(['192.0.2.3']))
+
+        self.dbapi.set_node_lookup_addresses(node1.id, ['192.0.2.3'])
+        self.assertEqual([], self._lookup(['192.0.2.1']))
+        self.assertEqual([node1.uuid], self._lookup(['192.0.2.3']))
+
+        self.dbapi.set_node_lookup_addresses(node1.id, [])
+        self.assertEqual([], self._lookup(['192.0.2.3']))
+
+    def test_lookup_addresses_after_destroying_a_node(self):
+        node = utils.create_test_node()
+        self.dbapi.set_node_lookup_addresses(node.id, ['192.0.2.1'])
+
+        self.dbapi.destroy_node(node.uuid)
+        with enginefacade.reader.using(self.context) as session:
+            self.assertEqual([], session.query(
+                models.NodeLookupAddress).all())
+
+    def _async_operation(self, kind):
+        return sorted(node.uuid for node in self.dbapi.get_node_list(
+            filters={'async_operation': kind}))
+
+    def test_node_async_operations(self):
+        node1 = utils.create_test_node()
+        node2 = utils.create_test_node(uuid=uuidutils.generate_uuid())
+        self.dbapi.add_node_async_operations(node1.id, ['raid', 'bios'])
+        self.dbapi.add_node_async_operations(node2.id, ['raid'])
+        # Already recorded operations are ignored
+        self.dbapi.add_node_async_operations(node1.id, ['raid'])
+
+        self.assertEqual(sorted([node1.uuid, node2.uuid]),
+                         self._async_operation('raid'))
+        self.assertEqual([node1.uuid], self._async_operation('bios'))
+        self.assertEqual([], self._async_operation('firmware'))
+
+        self.dbapi.remove_node_async_operations(node1.id,
+                                                ['raid', 'firmware'])
+        self.assertEqual([node2.uuid], self._async_operation('raid'))
+        self.assertEqual([node1.uuid], self._async_operation('bios'))
+
+    def test_update_node_async_operations(self):
+        node = utils.create_test_node()
+        self.dbapi.add_node_async_operations(node.id, ['bios'])
+        self.dbapi.update_node(node.uuid, {'driver_internal_info': {'r': 1}},
+                               add_async_operations=['raid'],
+                               remove_async_operations=['bios'])
+        self.assertEqual([node.uuid], self._async_operation('raid'))
+        self.assertEqual([], self._async_operation('bios'))
+
+    @mock.patch.object(db_conn, '_add_node_async_operations', autospec=True)
+    def test_update_node_async_operations_failure(self, mock_add):
+        # The node is not updated when recording the operations fails.
+        mock_add.side_effect = RuntimeError('boom')
+        node = utils.create_test_node(driver_internal_info={})
+        self.assertRaises(RuntimeError, self.dbapi.update_node, node.uuid,
+                          {'driver_internal_info': {'raid': 1}},
+                          add_async_operations=['raid'])
+        self.assertEqual({}, self.dbapi.get_node_by_uuid(
+            node.uuid).driver_internal_info)
+
+    def test_async_operations_after_destroying_a_node(self):
+        node = utils.create_test_node()
+        self.dbapi.add_node_async_operations(node.id, ['raid'])
+
+        self.dbapi.destroy_node(node.uuid)
+        with enginefacade.reader.using(self.context) as session:
+            self.assertEqual([], session.query(
+                models.NodeAsyncOperation).all())
+
     def test_firmware_component_list_after_destroying_a_node_by_uuid(self):
         node = utils.create_test_node()
 
@@ -858,6 +994,50 @@ class DbNodeTestCase(base.DbTestCase):
         res = self.dbapi.update_node(node.id, {'extra': new_extra})
         self.assertEqual([trait.trait], [t.trait for t in res.traits])
 
+    def test_update_node_without_relationships(self):
+        node = utils.create_test_node()
+        utils.create_test_node_tag(node_id=node.id)
+        utils.create_test_node_trait(node_id=node.id)
+
+        with mock.patch.object(dbapi, '_get_node_select',
+                               autospec=True) as mock_select:
+            res = self.dbapi.update_node(node.id, {'extra': {'foo': 'bar'}},
+                                         load_relationships=False)
+        self.assertFalse(mock_select.called)
+        self.assertEqual({'foo': 'bar'}, res.extra)
+        self.assertEqual(node.uuid, res['uuid'])
+        self.assertIsNotNone(res.updated_at)
+
+    def test_update_node_no_returning(self):
+        node = utils.create_test_node(provision_state=states.INSPECTWAIT)
+        engine = enginefacade.writer.get_engine()
+        with mock.patch.object(engine.dialect, 'update_returning', False):
+            res = self.dbapi.update_node(
+                node.id, {'provision_state': states.MANAGEABLE},
+                load_relationships=False)
+            self.assertEqual(states.MANAGEABLE, res.provision_state)
+            self.assertIsNotNone(res.inspection_finished_at)
+            self.assertRaises(exception.NodeNotFound, self.dbapi.update_node,
+                              uuidutils.generate_uuid(), {'extra': {}})
+
+    def test_update_node_no_values(self):
+        node = utils.create_test_node()
+        res = self.dbapi.update_node(node.id, {}, load_relationships=False)
+        self.assertIsNone(res.updated_at)
+        self.assertRaises(exception.NodeNotFound, self.dbapi.update_node,
+                          uuidutils.generate_uuid(), {})
+
+    @mock.patch.object(timeutils, 'utcnow', autospec=True)
+    def test_update_node_inspection_started_at_explicit(self, mock_utcnow):
+        mocked_time = datetime.datetime(2000, 1, 1, 0, 0)
+        mock_utcnow.return_value = mocked_time
+        node = utils.create_test_node()
+        res = self.dbapi.update_node(
+            node.id, {'provision_state': states.INSPECTING,
+                      'inspection_started_at': None})
+        self.assertEqual(mocked_time,
+                         timeutils.normalize_time(res.inspection_started_at))
+
     def test_update_node_not_found(self):
         node_uuid = uuidutils.generate_uuid()
         new_extra = {'foo': 'bar'}
@@ -1178,6 +1358,54 @@ class DbNodeTestCase(base.DbTestCase):
             exception.NodeNotFound,
             self.dbapi.touch_node_provisioning, uuidutils.generate_uuid())
 
+    @mock.patch.object(timeutils, 'utcnow', autospec=True)
+    def test_record_node_heartbeat(self, mock_utcnow):
+        test_time = datetime.datetime(2000, 1, 1, 0, 0)
+        mock_utcnow.return_value = test_time
+        node = utils.create_test_node(
+            provision_state=states.CLEANWAIT,
+            driver_internal_info={'agent_url': 'https://url'})
+
+        self.assertTrue(self.dbapi.record_node_heartbeat(
+            node.uuid, states.CLEANWAIT, {'agent_last_heartbeat': 'now'},
+            touch_provisioning=True))
+        node = self.dbapi.get_node_by_uuid(node.uuid)
+        self.assertEqual({'agent_url': 'https://url',
+                          'agent_last_heartbeat': 'now'},
+                         node.driver_internal_info)
+        self.assertEqual(test_time,
+                         timeutils.normalize_time(node.provision_updated_at))
+
+    def test_record_node_heartbeat_no_touch(self):
+        node = utils.create_test_node(provision_state=states.CLEANWAIT)
+        self.assertTrue(self.dbapi.record_node_heartbeat(
+            node.id, states.CLEANWAIT, {'agent_last_heartbeat': 'now'}))
+        node = self.dbapi.get_node_by_uuid(node.uuid)
+        self.assertEqual('now',
+                         node.driver_internal_info['agent_last_heartbeat'])
+        self.assertIsNone(node.provision_updated_at)
+
+    def test_record_node_heartbeat_reserved(self):
+        node = utils.create_test_node(provision_state=states.CLEANWAIT,
+                                      reservation='host')
+        self.assertFalse(self.dbapi.record_node_heartbeat(
+            node.id, states.CLEANWAIT, {'agent_last_heartbeat': 'now'}))
+        node = self.dbapi.get_node_by_uuid(node.uuid)
+        self.assertNotIn('agent_last_heartbeat', node.driver_internal_info)
+
+    def test_record_node_heartbeat_state_changed(self):
+        node = utils.create_test_node(provision_state=states.CLEANING)
+        self.assertFalse(self.dbapi.record_node_heartbeat(
+            node.id, states.CLEANWAIT, {'agent_last_heartbeat': 'now'}))
+        node = self.dbapi.get_node_by_uuid(node.uuid)
+        self.assertNotIn('agent_last_heartbeat', node.driver_internal_info)
+
+    def test_record_node_heartbeat_not_found(self):
+        self.assertRaises(
+            exception.NodeNotFound,
+            self.dbapi.record_node_heartbeat, uuidutils.generate_uuid(),
+            states.CLEANWAIT, {})
+
     def test_get_node_by_port_addresses(self):
         wrong_node = utils.create_test_node(
             driver='driver-one',
@@ -111,6 +111,20 @@ class DbportgroupTestCase(base.DbTestCase):
     def test_get_portgroups_by_node_id_that_does_not_exist(self):
         self.assertEqual([], self.dbapi.get_portgroups_by_node_id(99))
 
+    def test_get_portgroups_by_node_uuids(self):
+        node2 = db_utils.create_test_node(uuid=uuidutils.generate_uuid())
+        portgroup2 = db_utils.create_test_portgroup(
+            uuid=uuidutils.generate_uuid(), name='pg2',
+            address='52:54:00:cf:2d:40', node_id=node2.id)
+        node3 = db_utils.create_test_node(uuid=uuidutils.generate_uuid())
+        db_utils.create_test_portgroup(
+            uuid=uuidutils.generate_uuid(), name='pg3',
+            address='52:54:00:cf:2d:41', node_id=node3.id)
+        res = self.dbapi.get_portgroups_by_node_uuids(
+            [self.node.uuid, node2.uuid, uuidutils.generate_uuid()])
+        self.assertEqual({self.portgroup.id, portgroup2.id},
+                         {pg.id for pg in res})
+
     def test_get_portgoups_by_conductor_groups(self):
         group_a_node = db_utils.create_test_node(
             uuid=uuidutils.generate_uuid(),
@@ -226,6 +226,22 @@ class DbPortTestCase(base.DbTestCase):
     def test_get_ports_by_node_id_that_does_not_exist(self):
         self.assertEqual([], self.dbapi.get_ports_by_node_id(99))
 
+    def test_get_ports_by_node_uuids(self):
+        node2 = db_utils.create_test_node(uuid=uuidutils.generate_uuid())
+        port2 = db_utils.create_test_port(uuid=uuidutils.generate_uuid(),
+                                          address='52:54:00:cf:2d:40',
+                                          node_id=node2.id)
+        node3 = db_utils.create_test_node(uuid=uuidutils.generate_uuid())
+        db_utils.create_test_port(uuid=uuidutils.generate_uuid(),
+                                  address='52:54:00:cf:2d:41',
+                                  node_id=node3.id)
+        res = self.dbapi.get_ports_by_node_uuids(
+            [self.node.uuid, node2.uuid, uuidutils.generate_uuid()])
+        self.assertEqual({self.port.id, port2.id}, {p.id for p in res})
+
+    def test_get_ports_by_node_uuids_empty(self):
+        self.assertEqual([], self.dbapi.get_ports_by_node_uuids([]))
+
     def test_get_ports_by_portgroup_id(self):
         res = self.dbapi.get_ports_by_portgroup_id(self.portgroup.id)
         self.assertEqual(self.port.address, res[0].address)
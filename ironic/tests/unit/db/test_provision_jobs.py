@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for manipulating provision job batches via the DB API"""
+
+import datetime
+
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+from ironic.common import exception
+from ironic.common import states
+from ironic.tests.unit.db import base
+from ironic.tests.unit.db import utils as db_utils
+
+
+class DbProvisionJobTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DbProvisionJobTestCase, self).setUp()
+        self.job_uuid = uuidutils.generate_uuid()
+        self.batch = db_utils.create_test_provision_job_batch(
+            job_uuid=self.job_uuid)
+
+    def test_create_generates_uuid(self):
+        values = db_utils.get_test_provision_job_batch(
+            job_uuid=self.job_uuid)
+        del values['id']
+        del values['uuid']
+        batch = self.dbapi.create_provision_job_batch(values)
+        self.assertTrue(uuidutils.is_uuid_like(batch.uuid))
+        self.assertNotEqual(self.batch.uuid, batch.uuid)
+
+    def test_get_by_uuid(self):
+        res = self.dbapi.get_provision_job_batch_by_uuid(self.batch.uuid)
+        self.assertEqual(self.batch.id, res.id)
+        self.assertEqual(self.batch.nodes, res.nodes)
+
+    def test_get_by_uuid_not_found(self):
+        self.assertRaises(exception.ProvisionJobNotFound,
+                          self.dbapi.get_provision_job_batch_by_uuid,
+                          uuidutils.generate_uuid())
+
+    def test_get_batches(self):
+        other = db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=self.job_uuid,
+            conductor='host-2')
+        # Belongs to another job
+        db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(),
+            job_uuid=uuidutils.generate_uuid())
+        res = self.dbapi.get_provision_job_batches(self.job_uuid)
+        self.assertEqual([self.batch.uuid, other.uuid],
+                         [batch.uuid for batch in res])
+
+    def test_get_batches_not_found(self):
+        self.assertRaises(exception.ProvisionJobNotFound,
+                          self.dbapi.get_provision_job_batches,
+                          uuidutils.generate_uuid())
+
+    def test_get_unfinished_batches(self):
+        running = db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=self.job_uuid,
+            state=states.PROVISION_JOB_RUNNING)
+        db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=self.job_uuid,
+            state=states.PROVISION_JOB_FINISHED)
+        db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=self.job_uuid,
+            conductor='host-2')
+        res = self.dbapi.get_unfinished_provision_job_batches(
+            ['host-1', 'host-3'])
+        self.assertEqual([self.batch.uuid, running.uuid],
+                         [batch.uuid for batch in res])
+        self.assertEqual(
+            [], self.dbapi.get_unfinished_provision_job_batches(['host-3']))
+
+    def test_update(self):
+        results = {self.batch.nodes[0]: {
+            'status': states.PROVISION_JOB_ACCEPTED}}
+        res = self.dbapi.update_provision_job_batch(
+            self.batch.uuid,
+            {'state': states.PROVISION_JOB_FINISHED, 'results': results})
+        self.assertEqual(states.PROVISION_JOB_FINISHED, res.state)
+        self.assertEqual(results, res.results)
+        res = self.dbapi.get_provision_job_batch_by_uuid(self.batch.uuid)
+        self.assertEqual(states.PROVISION_JOB_FINISHED, res.state)
+
+    def test_update_not_found(self):
+        self.assertRaises(exception.ProvisionJobNotFound,
+                          self.dbapi.update_provision_job_batch,
+                          uuidutils.generate_uuid(), {'state': 'running'})
+
+    def test_destroy_finished_jobs(self):
+        old = timeutils.utcnow() - datetime.timedelta(days=10)
+        limit = timeutils.utcnow() - datetime.timedelta(days=7)
+        # self.batch is pending, its job is kept
+        db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=self.job_uuid,
+            state=states.PROVISION_JOB_FINISHED, created_at=old)
+        finished = uuidutils.generate_uuid()
+        for _i in range(2):
+            db_utils.create_test_provision_job_batch(
+                uuid=uuidutils.generate_uuid(), job_uuid=finished,
+                state=states.PROVISION_JOB_FINISHED, created_at=old)
+        recent = uuidutils.generate_uuid()
+        db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=recent,
+            state=states.PROVISION_JOB_FINISHED, created_at=old)
+        db_utils.create_test_provision_job_batch(
+            uuid=uuidutils.generate_uuid(), job_uuid=recent,
+            state=states.PROVISION_JOB_FINISHED, created_at=old,
+            updated_at=timeutils.utcnow())
+
+        self.assertEqual(
+            1, self.dbapi.destroy_finished_provision_jobs(limit, 10))
+        self.assertRaises(exception.ProvisionJobNotFound,
+                          self.dbapi.get_provision_job_batches, finished)
+        self.assertEqual(
+            2, len(self.dbapi.get_provision_job_batches(self.job_uuid)))
+        self.assertEqual(
+            2, len(self.dbapi.get_provision_job_batches(recent)))
+        self.assertEqual(
+            0, self.dbapi.destroy_finished_provision_jobs(limit, 10))
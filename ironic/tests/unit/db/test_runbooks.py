@@ -297,3 +297,30 @@ class DbRunbookTestCase(base.DbTestCase):
             self.dbapi.runbook_trait_exists(self.runbook.id, 'CUSTOM_TRAIT'))
         self.assertFalse(
             self.dbapi.runbook_trait_exists(self.runbook.id, 'CUSTOM_OTHER'))
+
+    def test_get_runbooks_generation(self):
+        generations = [self.dbapi.get_runbooks_generation()]
+        step = {'interface': 'bios', 'step': 'apply_configuration',
+                'args': {}, 'order': 50}
+        self.dbapi.update_runbook(self.runbook.id, {'steps': [step]})
+        generations.append(self.dbapi.get_runbooks_generation())
+        self.dbapi.add_runbook_trait(self.runbook.id, 'CUSTOM_A',
+                                     version='1.0')
+        generations.append(self.dbapi.get_runbooks_generation())
+        self.dbapi.add_runbook_trait(self.runbook.id, 'CUSTOM_B',
+                                     version='1.0')
+        self.dbapi.delete_runbook_trait(self.runbook.id, 'CUSTOM_A')
+        generations.append(self.dbapi.get_runbooks_generation())
+        db_utils.create_test_runbook(uuid=uuidutils.generate_uuid(),
+                                     name='CUSTOM_DT2')
+        generations.append(self.dbapi.get_runbooks_generation())
+        self.dbapi.set_runbook_traits(self.runbook.id, ['CUSTOM_C'],
+                                      version='1.0')
+        generations.append(self.dbapi.get_runbooks_generation())
+        self.dbapi.unset_runbook_traits(self.runbook.id)
+        generations.append(self.dbapi.get_runbooks_generation())
+        self.dbapi.destroy_runbook(self.runbook.id)
+        generations.append(self.dbapi.get_runbooks_generation())
+        self.assertEqual(len(generations), len(set(generations)))
+        self.assertEqual(generations[-1],
+                         self.dbapi.get_runbooks_generation())
@@ -33,6 +33,7 @@ from ironic.objects import node_history
 from ironic.objects import node_inventory
 from ironic.objects import port
 from ironic.objects import portgroup
+from ironic.objects import provision_job
 from ironic.objects import runbook
 from ironic.objects import trait
 from ironic.objects import volume_connector
@@ -856,3 +857,35 @@ def create_test_inspection_rule(**kw):
     if 'uuid' not in kw:
         del inspection_rule['uuid']
     return dbapi.create_inspection_rule(inspection_rule)
+
+
+def get_test_provision_job_batch(**kw):
+    return {
+        'id': kw.get('id', 345),
+        'version': kw.get('version', provision_job.ProvisionJobBatch.VERSION),
+        'uuid': kw.get('uuid', '9b5cb0ea-3e1c-4cd7-a7b2-9c4b3c8e3f51'),
+        'job_uuid': kw.get('job_uuid', 'cc6c7b6e-1f4e-44a4-9d3d-7b3b6ad3b0c1'),
+        'conductor': kw.get('conductor', 'host-1'),
+        'target': kw.get('target', states.ACTIVE),
+        'state': kw.get('state', states.PROVISION_JOB_PENDING),
+        'project': kw.get('project', 'fake-project'),
+        'nodes': kw.get('nodes', ['1be26c0b-03f2-4d2e-ae87-c02d7f33c123']),
+        'params': kw.get('params', {}),
+        'results': kw.get('results', {}),
+        'created_at': kw.get('created_at'),
+        'updated_at': kw.get('updated_at'),
+    }
+
+
+def create_test_provision_job_batch(**kw):
+    """Create a provision job batch in the DB and return its DB object.
+
+    :param kw: kwargs with overriding values for the batch's attributes.
+    :returns: Test ProvisionJobBatch DB object.
+    """
+    batch = get_test_provision_job_batch(**kw)
+    # Let DB generate ID if it isn't specified explicitly
+    if 'id' not in kw:
+        del batch['id']
+    dbapi = db_api.get_instance()
+    return dbapi.create_provision_job_batch(batch)
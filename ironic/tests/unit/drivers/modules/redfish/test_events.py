@@ -0,0 +1,212 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import io
+from unittest import mock
+
+import sushy
+import webob
+
+from ironic.common import exception
+from ironic.conductor import bmc_events
+from ironic.conductor import task_manager
+from ironic.drivers.modules.redfish import events as redfish_events
+from ironic.drivers.modules.redfish import utils as redfish_utils
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.db import utils as db_utils
+from ironic.tests.unit.objects import utils as obj_utils
+
+INFO_DICT = db_utils.get_test_redfish_info()
+
+_Node = collections.namedtuple('Node', ['uuid', 'driver_internal_info'])
+
+
+class EventKindsTestCase(db_base.DbTestCase):
+
+    def test_task(self):
+        self.assertEqual(
+            {bmc_events.TASK},
+            redfish_events.event_kinds(
+                {'MessageId': 'TaskEvent.1.0.TaskCompletedOK'}))
+
+    def test_power(self):
+        self.assertEqual(
+            {bmc_events.POWER, bmc_events.RESOURCE},
+            redfish_events.event_kinds(
+                {'MessageId': 'ResourceEvent.1.3.ResourcePoweredOff'}))
+
+    def test_other(self):
+        for record in ({'MessageId': 'ResourceEvent.1.0.ResourceChanged'},
+                       {}, {'MessageId': 42}):
+            self.assertEqual(bmc_events.ALL,
+                             redfish_events.event_kinds(record))
+
+
+@mock.patch.object(redfish_utils, 'get_event_service', autospec=True)
+class SubscribeTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.config(enabled_hardware_types=['redfish'],
+                    enabled_power_interfaces=['redfish'],
+                    enabled_management_interfaces=['redfish'])
+        self.config(destination_url='https://conductor:8091/',
+                    group='redfish_events')
+        self.node = obj_utils.create_test_node(
+            self.context, driver='redfish', driver_info=INFO_DICT)
+
+    def _event_service(self, mock_get_event_service):
+        event_service = mock_get_event_service.return_value
+        event_service.get_event_types_for_subscription.return_value = {
+            sushy.EventType.ALERT, sushy.EventType.METRIC_REPORT}
+        event_service.subscriptions.create.return_value.path = '/sub/1'
+        return event_service
+
+    def test_subscribe(self, mock_get_event_service):
+        event_service = self._event_service(mock_get_event_service)
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.assertTrue(redfish_events.subscribe(task, 'host1'))
+
+        payload = event_service.subscriptions.create.call_args[0][0]
+        self.assertEqual(
+            'https://conductor:8091/%s' % self.node.uuid,
+            payload['Destination'])
+        self.assertEqual(['Alert'], payload['EventTypes'])
+        self.assertTrue(bmc_events.check_token(self.node.uuid,
+                                               payload['Context']))
+        event_service.subscriptions.get_member.assert_not_called()
+        self.node.refresh()
+        self.assertEqual(
+            {'host': 'host1', 'path': '/sub/1'},
+            self.node.driver_internal_info[redfish_events.SUBSCRIPTION_INFO])
+        self.assertFalse(redfish_events.needs_subscription(
+            _Node(self.node.uuid, self.node.driver_internal_info),
+            mock.Mock(host='host1')))
+        self.assertTrue(redfish_events.needs_subscription(
+            _Node(self.node.uuid, self.node.driver_internal_info),
+            mock.Mock(host='host2')))
+
+    def test_subscribe_replace(self, mock_get_event_service):
+        event_service = self._event_service(mock_get_event_service)
+        self.node.set_driver_internal_info(
+            redfish_events.SUBSCRIPTION_INFO,
+            {'host': 'host0', 'path': '/sub/0'})
+        self.node.save()
+        event_service.subscriptions.get_member.return_value.delete.\
+            side_effect = sushy.exceptions.SushyError()
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.assertTrue(redfish_events.subscribe(task, 'host1'))
+
+        event_service.subscriptions.get_member.assert_called_once_with(
+            '/sub/0')
+        self.node.refresh()
+        self.assertEqual(
+            {'host': 'host1', 'path': '/sub/1'},
+            self.node.driver_internal_info[redfish_events.SUBSCRIPTION_INFO])
+
+    def test_subscribe_failure(self, mock_get_event_service):
+        event_service = self._event_service(mock_get_event_service)
+        event_service.subscriptions.create.side_effect = (
+            sushy.exceptions.SushyError())
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            self.assertFalse(redfish_events.subscribe(task, 'host1'))
+
+        self.assertFalse(bmc_events.is_subscribed(self.node.uuid))
+        self.node.refresh()
+        self.assertNotIn(redfish_events.SUBSCRIPTION_INFO,
+                         self.node.driver_internal_info)
+
+
+class EventListenerTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.config(destination_url='https://conductor:8091',
+                    group='redfish_events')
+        self.listener = redfish_events.EventListener()
+        self.uuid = '1be26c0b-03f2-4d2e-ae87-c02d7f33c123'
+        self.token = bmc_events.subscribe(self.uuid)
+
+    def _post(self, body, path=None, method='POST'):
+        request = webob.Request.blank(path or '/events/%s' % self.uuid,
+                                      method=method)
+        if body is not None:
+            request.json_body = body
+        return self.listener._handle(request)
+
+    @mock.patch.object(bmc_events, 'notify', autospec=True)
+    def test_event(self, mock_notify):
+        response = self._post({
+            'Context': self.token,
+            'Events': [{'MessageId': 'TaskEvent.1.0.TaskCompletedOK'},
+                       {'MessageId': 'ResourceEvent.1.3.ResourcePoweredOn'}],
+        })
+        self.assertEqual(204, response.status_code)
+        mock_notify.assert_called_once_with(
+            self.uuid, {bmc_events.TASK, bmc_events.POWER,
+                        bmc_events.RESOURCE})
+
+    @mock.patch.object(bmc_events, 'notify', autospec=True)
+    def test_invalid_token(self, mock_notify):
+        for body in ({'Context': 'wrong', 'Events': [{}]},
+                     {'Events': [{}]}, ['list']):
+            self.assertEqual(403, self._post(body).status_code)
+        self.assertEqual(
+            403, self._post({'Context': self.token, 'Events': [{}]},
+                            path='/events/other').status_code)
+        mock_notify.assert_not_called()
+
+    def test_invalid_request(self):
+        self.assertEqual(405, self._post(None, method='GET').status_code)
+        request = webob.Request.blank('/events/%s' % self.uuid,
+                                      method='POST', body=b'{not json')
+        self.assertEqual(400, self.listener._handle(request).status_code)
+
+    def test_body_too_large(self):
+        body = b'[' + b'0,' * redfish_events._MAX_BODY_SIZE + b'0]'
+        request = webob.Request.blank('/events/%s' % self.uuid,
+                                      method='POST', body=body)
+        self.assertEqual(413, self.listener._handle(request).status_code)
+
+    def test_chunked_body_too_large(self):
+        body = io.BytesIO(b'[' + b'0,' * redfish_events._MAX_BODY_SIZE
+                          + b'0]')
+        request = webob.Request.blank(
+            '/events/%s' % self.uuid, method='POST',
+            environ={'wsgi.input': body,
+                     'HTTP_TRANSFER_ENCODING': 'chunked'})
+        self.assertIsNone(request.content_length)
+        self.assertEqual(413, self.listener._handle(request).status_code)
+        # No more than the limit is read
+        self.assertEqual(redfish_events._MAX_BODY_SIZE + 1, body.tell())
+
+    @mock.patch.object(bmc_events, 'notify', autospec=True)
+    def test_chunked_body_too_large_application(self, mock_notify):
+        size = redfish_events._MAX_BODY_SIZE
+        body = io.BytesIO(b'{"Events": [' + b'{},' * size + b'{}]}')
+        request = webob.Request.blank(
+            '/events/%s' % self.uuid, method='POST',
+            content_type='application/json',
+            environ={'wsgi.input': body,
+                     'HTTP_TRANSFER_ENCODING': 'chunked'})
+        self.assertIsNone(request.content_length)
+        response = request.get_response(self.listener.server.wsgi_app)
+        self.assertEqual(413, response.status_code)
+        # The middleware reads no more than the limit either
+        self.assertEqual(size + 1, body.tell())
+        mock_notify.assert_not_called()
+
+    def test_no_destination_url(self):
+        self.config(destination_url=None, group='redfish_events')
+        self.assertRaises(exception.ConfigInvalid,
+                          redfish_events.EventListener)
@@ -1915,7 +1915,7 @@ class RedfishFirmwareTestCase(db_base.DbTestCase):
                 # When system_mock raises exception, other calls are not made
                 call_count = 0
 
-                def system_side_effect(*args):
+                def system_side_effect(*args, **kwargs):
                     nonlocal call_count
                     call_count += 1
                     if call_count == 3:  # Third call fails
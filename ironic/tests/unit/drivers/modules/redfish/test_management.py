@@ -29,12 +29,14 @@ from ironic.common import exception
 from ironic.common import health_states
 from ironic.common import indicator_states
 from ironic.common import states
+from ironic.conductor import bmc_events
 from ironic.conductor import task_manager
 from ironic.conductor import utils as manager_utils
 from ironic.conf import CONF
 from ironic.drivers.modules import boot_mode_utils
 from ironic.drivers.modules import deploy_utils
 from ironic.drivers.modules.redfish import boot as redfish_boot
+from ironic.drivers.modules.redfish import events as redfish_events
 from ironic.drivers.modules.redfish import firmware_utils
 from ironic.drivers.modules.redfish import management as redfish_mgmt
 from ironic.drivers.modules.redfish import power as redfish_power
@@ -1299,6 +1301,29 @@ class RedfishManagementTestCase(db_base.DbTestCase):
 
         management._check_node_firmware_update.assert_not_called()
 
+    @mock.patch.object(redfish_events, 'subscribe', autospec=True)
+    @mock.patch.object(task_manager, 'acquire', autospec=True)
+    def test__subscribe_to_events(self, mock_acquire, mock_subscribe):
+        subscribed = {redfish_events.SUBSCRIPTION_INFO: {'host': 'host1'}}
+        bmc_events.subscribe('other')
+        management = redfish_mgmt.RedfishManagement()
+        mock_manager = mock.Mock(host='host1')
+        mock_manager.iter_nodes.return_value = [
+            (self.node.uuid, 'redfish', '', {}),
+            ('other', 'redfish', '', subscribed),
+        ]
+        task = mock.Mock(node=self.node,
+                         driver=mock.Mock(management=management))
+        mock_acquire.return_value = mock.MagicMock(
+            __enter__=mock.MagicMock(return_value=task))
+
+        management._subscribe_to_events(mock_manager, self.context)
+
+        mock_acquire.assert_called_once_with(self.context, self.node.uuid,
+                                             purpose=mock.ANY, shared=True)
+        task.upgrade_lock.assert_called_once_with()
+        mock_subscribe.assert_called_once_with(task, 'host1')
+
     @mock.patch.object(task_manager, 'acquire', autospec=True)
     def test__query_firmware_update_failed_deployfail(self, mock_acquire):
         driver_internal_info = {
@@ -2933,3 +2958,34 @@ class SensorDataTestCase(db_base.DbTestCase):
 
         expected = {'Drive': {}}
         self.assertEqual(result, expected)
+
+    @mock.patch.object(redfish_utils, 'parse_driver_info', autospec=True)
+    def test__process_storage_sensors_drives(self, mock_parse_driver):
+        mock_storage = mock.Mock(identity='RAID.1',
+                                 drives_identities=['/Drives/1', '/Drives/2'])
+        failing_storage = mock.Mock(identity='RAID.2',
+                                    drives_identities=['/Drives/3'])
+        drives = {}
+        for name in ('1', '2'):
+            drives['/Drives/%s' % name] = mock.Mock(
+                capacity_bytes=42, model='model',
+                status=mock.Mock(state='Enabled', health='OK'))
+            drives['/Drives/%s' % name].name = name
+        mock_storage.get_drive.side_effect = drives.get
+        failing_storage.get_drive.side_effect = (
+            sushy.exceptions.ConnectionError(url='/Drives/3', error='boom'))
+
+        mock_system = mock.Mock(path='/redfish/v1/Systems/1')
+        mock_system.storage_expanded.get_members.return_value = [
+            mock_storage, failing_storage]
+
+        with task_manager.acquire(self.context, self.node.uuid,
+                                  shared=True) as task:
+            result = task.driver.management._process_storage_sensors(
+                task.node, mock_system)
+
+        self.assertEqual({'1:RAID.1@1', '2:RAID.1@1'}, set(result['Drive']))
+        self.assertEqual(
+            {'name': '1', 'model': 'model', 'capacity_bytes': 42,
+             'state': 'Enabled', 'health': 'OK'},
+            result['Drive']['1:RAID.1@1'])
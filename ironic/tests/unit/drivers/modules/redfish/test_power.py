@@ -73,7 +73,8 @@ class RedfishPowerTestCase(db_base.DbTestCase):
                 mock_get_system.return_value = mock.Mock(power_state=current)
                 self.assertEqual(expected,
                                  task.driver.power.get_power_state(task))
-                mock_get_system.assert_called_once_with(task.node)
+                mock_get_system.assert_called_once_with(task.node,
+                                                        refresh=True)
                 mock_get_system.reset_mock()
 
     @mock.patch.object(lc.BackOffLoopingCall, '_sleep', autospec=True)
@@ -112,7 +113,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
 
                 # Asserts
                 system_result[0].reset_system.assert_called_once_with(expected)
-                mock_get_system.assert_called_with(task.node)
+                mock_get_system.assert_called_with(task.node, refresh=True)
                 self.assertEqual(4, mock_get_system.call_count)
                 if restore_bootdev:
                     mock_restore_bootdev.assert_called_once_with(
@@ -158,7 +159,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
 
                 # Asserts
                 fake_system.reset_system.assert_called_once_with(expected)
-                mock_get_system.assert_called_with(task.node)
+                mock_get_system.assert_called_with(task.node, refresh=True)
 
                 # Reset mocks
                 mock_get_system.reset_mock()
@@ -456,7 +457,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
             # Asserts
             system_result[0].reset_system.assert_called_once_with(
                 sushy.RESET_ON)
-            mock_get_system.assert_called_with(task.node)
+            mock_get_system.assert_called_with(task.node, refresh=True)
             self.assertEqual(3, mock_get_system.call_count)
             mock_restore_bootdev.assert_called_once_with(
                 task.driver.management, task, system_result[0])
@@ -488,7 +489,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
             # Asserts
             system_result[0].reset_system.assert_called_once_with(
                 sushy.RESET_ON)
-            mock_get_system.assert_called_with(task.node)
+            mock_get_system.assert_called_with(task.node, refresh=True)
             self.assertEqual(3, mock_get_system.call_count)
             mock_restore_bootdev.assert_called_once_with(
                 task.driver.management, task, system_result[0])
@@ -518,7 +519,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
                 mock.call(sushy.RESET_FORCE_OFF),
                 mock.call(sushy.RESET_ON),
             ])
-            mock_get_system.assert_called_with(task.node)
+            mock_get_system.assert_called_with(task.node, refresh=True)
             self.assertEqual(3, mock_get_system.call_count)
             mock_restore_bootdev.assert_called_once_with(
                 task.driver.management, task, system_result[0])
@@ -549,7 +550,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
             # Asserts
             system_result[0].reset_system.assert_called_once_with(
                 sushy.RESET_FORCE_RESTART)
-            mock_get_system.assert_called_with(task.node)
+            mock_get_system.assert_called_with(task.node, refresh=True)
             self.assertEqual(3, mock_get_system.call_count)
             mock_restore_bootdev.assert_called_once_with(
                 task.driver.management, task, system_result[0])
@@ -571,7 +572,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
 
             # Asserts
             fake_system.reset_system.assert_called_once_with(sushy.RESET_ON)
-            mock_get_system.assert_called_with(task.node)
+            mock_get_system.assert_called_with(task.node, refresh=True)
             mock_sleep.assert_called_with(0)
 
     @mock.patch.object(sushy, 'Sushy', autospec=True)
@@ -589,7 +590,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
                 task.driver.power.reboot, task)
             fake_system.reset_system.assert_called_once_with(
                 sushy.RESET_FORCE_OFF)
-            mock_get_system.assert_called_once_with(task.node)
+            mock_get_system.assert_called_once_with(task.node, refresh=True)
 
     @mock.patch.object(lc.BackOffLoopingCall, '_sleep', autospec=True)
     @mock.patch.object(sushy, 'Sushy', autospec=True)
@@ -620,7 +621,7 @@ class RedfishPowerTestCase(db_base.DbTestCase):
                 mock.call(sushy.RESET_FORCE_OFF),
                 mock.call(sushy.RESET_ON),
             ])
-            mock_get_system.assert_called_with(task.node)
+            mock_get_system.assert_called_with(task.node, refresh=True)
 
     def test_get_supported_power_states(self):
         with task_manager.acquire(self.context, self.node.uuid,
@@ -175,6 +175,144 @@ class RedfishRAIDTestCase(db_base.DbTestCase):
             logical_disk, self.physical_disks[0:4], spans_count=spans)
         self.assertEqual(26843545600, usage_bytes)
 
+    def _jbod(self, count, controllers=('RAID.1',), capacity_gb=8000,
+              media_type='HDD', protocol=sushy.PROTOCOL_TYPE_SAS):
+        disks = []
+        disk_to_storage = {}
+        for controller in controllers:
+            storage = mock.MagicMock(identity=controller)
+            for i in range(count):
+                disk = _mock_drive('%s-%d' % (controller, i),
+                                   capacity_bytes=capacity_gb * units.Gi,
+                                   media_type=media_type, protocol=protocol)
+                disks.append(disk)
+                disk_to_storage[disk] = storage
+        return disks, disk_to_storage
+
+    @mock.patch.object(redfish_raid, '_calculate_volume_props',
+                       wraps=redfish_raid._calculate_volume_props)
+    def test__find_configuration_many_disks(self, mock_props,
+                                            mock_get_system):
+        disks, disk_to_storage = self._jbod(60)
+        logical_disks = [
+            {'raid_level': '1', 'size_bytes': 200 * units.Gi,
+             'is_root_volume': True}]
+        logical_disks += [{'raid_level': '6', 'size_bytes': 80000 * units.Gi}
+                          for _i in range(4)]
+        volumes = redfish_raid._find_configuration(logical_disks, disks,
+                                                   disk_to_storage)
+        # volumes are returned in the reverse order
+        self.assertEqual(['6', '6', '6', '6', '1'],
+                         [volume['raid_level'] for volume in volumes])
+        self.assertEqual([12, 12, 12, 12, 2],
+                         [len(volume['physical_disks'])
+                          for volume in volumes])
+        used = [disk for volume in volumes
+                for disk in volume['physical_disks']]
+        self.assertEqual(['RAID.1-%d' % i for i in range(50)],
+                         sorted(used, key=lambda d: int(d.split('-')[1])))
+        self.assertEqual({'RAID.1'},
+                         {volume['controller'] for volume in volumes})
+        self.assertLess(mock_props.call_count, 100)
+
+    @mock.patch.object(redfish_raid, '_calculate_volume_props',
+                       wraps=redfish_raid._calculate_volume_props)
+    def test__find_configuration_many_disks_not_enough(self, mock_props,
+                                                       mock_get_system):
+        disks, disk_to_storage = self._jbod(90)
+        # one disk short: 6 volumes of 14 disks and one of 7 disks
+        logical_disks = [{'raid_level': '6', 'size_bytes': 96000 * units.Gi}
+                         for _i in range(6)]
+        logical_disks.append({'raid_level': '6',
+                              'size_bytes': 40000 * units.Gi})
+        self.assertRaisesRegex(exception.RedfishError,
+                               'failed to find matching physical disks',
+                               redfish_raid._find_configuration,
+                               logical_disks, disks, disk_to_storage)
+        self.assertLess(mock_props.call_count, 100)
+
+    def test__find_configuration_controllers(self, mock_get_system):
+        disks, disk_to_storage = self._jbod(
+            4, controllers=('RAID.1', 'RAID.2'), capacity_gb=1000)
+        logical_disks = [{'raid_level': '5', 'size_bytes': 2500 * units.Gi}
+                         for _i in range(2)]
+        volumes = redfish_raid._find_configuration(logical_disks, disks,
+                                                   disk_to_storage)
+        self.assertEqual(['RAID.2', 'RAID.1'],
+                         [volume['controller'] for volume in volumes])
+        for volume in volumes:
+            self.assertEqual(['%s-%d' % (volume['controller'], i)
+                              for i in range(4)],
+                             volume['physical_disks'])
+
+    def test__find_configuration_controllers_not_mixed(self,
+                                                       mock_get_system):
+        disks, disk_to_storage = self._jbod(
+            4, controllers=('RAID.1', 'RAID.2'), capacity_gb=1000)
+        logical_disks = [{'raid_level': '5', 'size_bytes': 5000 * units.Gi}]
+        self.assertRaises(exception.RedfishError,
+                          redfish_raid._find_configuration,
+                          logical_disks, disks, disk_to_storage)
+
+    def test__find_configuration_shared_filled_disks(self, mock_get_system):
+        disks, disk_to_storage = self._jbod(
+            4, capacity_gb=1000, media_type='SSD',
+            protocol=sushy.PROTOCOL_TYPE_SATA)
+        logical_disks = [{'raid_level': '1', 'size_bytes': 450 * units.Gi,
+                          'share_physical_disks': True}
+                         for _i in range(3)]
+        volumes = redfish_raid._find_configuration(logical_disks, disks,
+                                                   disk_to_storage)
+        self.assertEqual([['RAID.1-2', 'RAID.1-3'],
+                          ['RAID.1-0', 'RAID.1-1'],
+                          ['RAID.1-0', 'RAID.1-1']],
+                         [volume['physical_disks'] for volume in volumes])
+
+    def test__find_configuration_shared_filled_disks_max(self,
+                                                         mock_get_system):
+        disks, disk_to_storage = self._jbod(
+            4, capacity_gb=100, media_type='SSD',
+            protocol=sushy.PROTOCOL_TYPE_SATA)
+        logical_disks = [
+            {'raid_level': '1', 'size_bytes': 60 * units.Gi,
+             'share_physical_disks': True},
+            {'raid_level': '1', 'size_bytes': 60 * units.Gi,
+             'share_physical_disks': True},
+            {'raid_level': '5', 'size_bytes': 'MAX',
+             'share_physical_disks': True}]
+        volumes = redfish_raid._find_configuration(logical_disks, disks,
+                                                   disk_to_storage)
+        self.assertEqual([['RAID.1-0', 'RAID.1-1', 'RAID.1-2'],
+                          ['RAID.1-2', 'RAID.1-3'],
+                          ['RAID.1-0', 'RAID.1-1']],
+                         [volume['physical_disks'] for volume in volumes])
+        self.assertEqual('MAX', volumes[0]['size_bytes'])
+
+    def test__find_configuration_unmatched_volume(self, mock_get_system):
+        disks, disk_to_storage = self._jbod(
+            8, capacity_gb=1000, media_type='SSD',
+            protocol=sushy.PROTOCOL_TYPE_SATA)
+        logical_disks = [
+            {'raid_level': '6', 'size_bytes': 800 * units.Gi,
+             'share_physical_disks': True},
+            {'raid_level': '1+0', 'size_bytes': 1500 * units.Gi},
+            {'raid_level': '0', 'size_bytes': 100 * units.Gi}]
+        # no logical disk is left out of the configuration
+        self.assertRaisesRegex(exception.RedfishError,
+                               'failed to find matching physical disks',
+                               redfish_raid._find_configuration,
+                               logical_disks, disks, disk_to_storage)
+
+    def test__find_configuration_search_limit(self, mock_get_system):
+        self.config(raid_config_search_limit=3, group='redfish')
+        disks, disk_to_storage = self._jbod(60)
+        logical_disks = [{'raid_level': '6', 'size_bytes': 80000 * units.Gi}
+                         for _i in range(5)]
+        self.assertRaisesRegex(exception.RedfishError,
+                               'raid_config_search_limit',
+                               redfish_raid._find_configuration,
+                               logical_disks, disks, disk_to_storage)
+
     @mock.patch.object(redfish_boot.RedfishVirtualMediaBoot, 'prepare_ramdisk',
                        spec_set=True, autospec=True)
     @mock.patch.object(deploy_utils, 'build_agent_options', autospec=True)
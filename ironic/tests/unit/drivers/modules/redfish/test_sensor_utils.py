@@ -0,0 +1,68 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+from unittest import mock
+
+from ironic.drivers.modules.redfish import sensor_utils
+from ironic.tests import base
+
+
+class SubmitTestCase(base.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.node = mock.Mock(driver_info={'redfish_address': 'https://bmc'})
+
+    def test_submit(self):
+        future = sensor_utils.submit(self.node, lambda: threading.get_ident())
+        self.assertNotEqual(threading.get_ident(), future.result(timeout=10))
+
+    def test_submit_sequential(self):
+        self.config(sensor_data_concurrency=0, group='redfish')
+        func = mock.Mock(return_value=42)
+        future = sensor_utils.submit(self.node, func, 'a', b='c')
+        self.assertTrue(future.done())
+        self.assertEqual(42, future.result())
+        func.assert_called_once_with('a', b='c')
+
+    def test_submit_sequential_failure(self):
+        self.config(sensor_data_concurrency=0, group='redfish')
+        future = sensor_utils.submit(self.node,
+                                     mock.Mock(side_effect=RuntimeError))
+        self.assertIsInstance(future.exception(), RuntimeError)
+
+    def test_submit_failure(self):
+        self.config(sensor_data_bmc_concurrency=1, group='redfish')
+        slots = sensor_utils._get_bmc_slots(self.node)
+        future = sensor_utils.submit(self.node,
+                                     mock.Mock(side_effect=RuntimeError))
+        self.assertIsInstance(future.exception(timeout=10), RuntimeError)
+        # The slot is released
+        self.assertTrue(slots.acquire(timeout=10))
+        slots.release()
+
+    def test_bmc_limit(self):
+        self.config(sensor_data_bmc_concurrency=1, group='redfish')
+        event = threading.Event()
+        future = sensor_utils.submit(self.node, event.wait, 10)
+        slots = sensor_utils._get_bmc_slots(self.node)
+        # The only slot of the BMC is taken by the read in flight
+        self.assertFalse(slots.acquire(blocking=False))
+        other = mock.Mock(driver_info={'redfish_address': 'https://other'})
+        self.assertTrue(
+            sensor_utils.submit(other, lambda: True).result(timeout=10))
+
+        event.set()
+        self.assertTrue(future.result(timeout=10))
+        self.assertTrue(slots.acquire(timeout=10))
+        slots.release()
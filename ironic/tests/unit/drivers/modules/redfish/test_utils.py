@@ -25,6 +25,7 @@ import sushy
 
 from ironic.common import exception
 from ironic.drivers.modules.redfish import utils as redfish_utils
+from ironic import objects
 from ironic.tests.unit.db import base as db_base
 from ironic.tests.unit.db import utils as db_utils
 from ironic.tests.unit.objects import utils as obj_utils
@@ -690,6 +691,60 @@ class RedfishUtilsSystemTestCase(db_base.DbTestCase):
         fake_conn.get_system.assert_called_once_with(
             '/redfish/v1/Systems/FAKESYSTEM')
 
+    @mock.patch.object(sushy, 'Sushy', autospec=True)
+    @mock.patch('ironic.drivers.modules.redfish.utils.'
+                'SessionCache._sessions', {})
+    def test_get_system_snapshot(self, mock_sushy):
+        fake_conn = mock_sushy.return_value
+        fake_connector = fake_conn.get_system.return_value._conn
+        system = redfish_utils.get_system(self.node)
+        self.assertIs(system, redfish_utils.get_system(self.node))
+        fake_conn.get_system.assert_called_once_with(
+            '/redfish/v1/Systems/FAKESYSTEM')
+
+        # Reads through the System keep the snapshot
+        system._conn.get('/redfish/v1/Systems/FAKESYSTEM/Bios')
+        fake_connector.get.assert_called_once_with(
+            '/redfish/v1/Systems/FAKESYSTEM/Bios')
+        system._conn.timeout = 10
+        self.assertEqual(10, fake_connector.timeout)
+        redfish_utils.get_system(self.node)
+        self.assertEqual(1, fake_conn.get_system.call_count)
+
+        # A different node object fetches the System
+        node = objects.Node.get_by_uuid(self.context, self.node.uuid)
+        redfish_utils.get_system(node)
+        self.assertEqual(2, fake_conn.get_system.call_count)
+
+    @mock.patch.object(sushy, 'Sushy', autospec=True)
+    @mock.patch('ironic.drivers.modules.redfish.utils.'
+                'SessionCache._sessions', {})
+    def test_get_system_snapshot_stale(self, mock_sushy):
+        fake_conn = mock_sushy.return_value
+        system = redfish_utils.get_system(self.node)
+        system._conn.patch('/redfish/v1/Systems/FAKESYSTEM', data={})
+        redfish_utils.get_system(self.node)
+        self.assertEqual(2, fake_conn.get_system.call_count)
+
+        redfish_utils.get_system(self.node, refresh=True)
+        self.assertEqual(3, fake_conn.get_system.call_count)
+
+        self.node.driver_info = dict(self.node.driver_info,
+                                     redfish_password='new')
+        redfish_utils.get_system(self.node)
+        self.assertEqual(4, fake_conn.get_system.call_count)
+
+    @mock.patch.object(sushy, 'Sushy', autospec=True)
+    @mock.patch('ironic.drivers.modules.redfish.utils.'
+                'SessionCache._sessions', {})
+    def test_get_system_snapshot_disabled(self, mock_sushy):
+        self.config(task_system_snapshot=False, group='redfish')
+        fake_conn = mock_sushy.return_value
+        redfish_utils.get_system(self.node)
+        redfish_utils.get_system(self.node)
+        self.assertEqual(2, fake_conn.get_system.call_count)
+        self.assertIsNone(redfish_utils._SNAPSHOTS.get(self.node))
+
     @mock.patch.object(sushy, 'Sushy', autospec=True)
     @mock.patch('ironic.drivers.modules.redfish.utils.'
                 'SessionCache._sessions', {})
@@ -35,6 +35,7 @@ from ironic.drivers.modules import agent_client
 from ironic.drivers.modules import boot_mode_utils
 from ironic.drivers.modules import deploy_utils
 from ironic.drivers.modules import fake
+from ironic.drivers.modules import image_prefetch
 from ironic.drivers.modules.network import flat as flat_network
 from ironic.drivers.modules.network import neutron as neutron_network
 from ironic.drivers.modules import pxe
@@ -898,6 +899,42 @@ class TestAgentDeploy(CommonTestsMixin, db_base.DbTestCase):
         self.node.refresh()
         self.assertEqual('bar', self.node.instance_info['foo'])
 
+    @mock.patch.object(image_prefetch, 'start', autospec=True)
+    @mock.patch.object(noop_storage.NoopStorage, 'attach_volumes',
+                       autospec=True)
+    @mock.patch.object(deploy_utils, 'populate_storage_driver_internal_info',
+                       autospec=True)
+    @mock.patch.object(pxe.PXEBoot, 'prepare_ramdisk', autospec=True)
+    @mock.patch.object(deploy_utils, 'build_agent_options', autospec=True)
+    @mock.patch.object(deploy_utils, 'build_instance_info_for_deploy',
+                       autospec=True)
+    @mock.patch.object(flat_network.FlatNetwork, 'add_provisioning_network',
+                       spec_set=True, autospec=True)
+    @mock.patch.object(flat_network.FlatNetwork,
+                       'unconfigure_tenant_networks',
+                       spec_set=True, autospec=True)
+    @mock.patch.object(flat_network.FlatNetwork, 'validate',
+                       spec_set=True, autospec=True)
+    def test_prepare_image_prefetch(
+            self, validate_net_mock,
+            unconfigure_tenant_net_mock, add_provisioning_net_mock,
+            build_instance_info_mock, build_options_mock,
+            pxe_prepare_ramdisk_mock, storage_driver_info_mock,
+            storage_attach_volumes_mock, prefetch_mock):
+        self.config(image_prefetch=True, group='agent')
+        self.node.network_interface = 'flat'
+        self.node.save()
+        with task_manager.acquire(
+                self.context, self.node['uuid'], shared=False) as task:
+            task.node.provision_state = states.DEPLOYING
+            build_options_mock.return_value = {'a': 'b'}
+            self.driver.prepare(task)
+            prefetch_mock.assert_called_once_with(task,
+                                                  build_instance_info_mock)
+            build_instance_info_mock.assert_not_called()
+            pxe_prepare_ramdisk_mock.assert_called_once_with(
+                task.driver.boot, task, {'a': 'b'})
+
     @mock.patch.object(noop_storage.NoopStorage, 'attach_volumes',
                        autospec=True)
     @mock.patch.object(deploy_utils, 'populate_storage_driver_internal_info',
@@ -1346,6 +1383,12 @@ class TestAgentDeploy(CommonTestsMixin, db_base.DbTestCase):
     def test_write_image(self):
         self._test_write_image()
 
+    @mock.patch.object(image_prefetch, 'apply', autospec=True)
+    def test_write_image_image_prefetch(self, apply_mock):
+        self._test_write_image()
+        apply_mock.assert_called_once_with(
+            mock.ANY, deploy_utils.build_instance_info_for_deploy)
+
     def test_write_image_with_proxies(self):
         self._test_write_image(
             additional_driver_info={'image_https_proxy': 'https://spam.ni',
@@ -1425,15 +1425,17 @@ class TestRefreshCleanSteps(AgentDeployMixinBaseTest):
             'deploy_steps': self.clean_steps['clean_steps'],
         }
 
+    @mock.patch.object(conductor_steps, 'forget_node_steps', autospec=True)
     @mock.patch.object(agent_client.AgentClient, 'get_clean_steps',
                        autospec=True)
-    def test_refresh_steps(self, client_mock):
+    def test_refresh_steps(self, client_mock, forget_mock):
         client_mock.return_value = {
             'command_result': self.clean_steps}
 
         with task_manager.acquire(
                 self.context, self.node.uuid, shared=False) as task:
             self.deploy.refresh_steps(task, 'clean')
+            forget_mock.assert_called_once_with(task.node.uuid)
 
             client_mock.assert_called_once_with(mock.ANY, task.node,
                                                 task.ports)
@@ -1623,6 +1625,45 @@ class StepMethodsTestCase(db_base.DbTestCase):
                 self.context, self.node.uuid, shared=False) as task:
             self.assertEqual([], agent_base.get_steps(task, 'clean'))
 
+    def test_get_steps_cache_key(self):
+        with task_manager.acquire(
+                self.context, self.node.uuid, shared=False) as task:
+            # The cached steps were not stored by refresh_steps
+            self.assertIsNone(agent_base.get_steps_cache_key(task, 'clean'))
+            self.assertEqual((False, 42), agent_base.get_steps_cache_key(
+                task, 'deploy', 42))
+
+            task.node.set_driver_internal_info(
+                'agent_cached_clean_steps_refreshed', '2026-01-01T00:00:00')
+            task.node.set_driver_internal_info('hardware_manager_version',
+                                               '1')
+            self.assertEqual(
+                (True, '2026-01-01T00:00:00', '1', 42),
+                agent_base.get_steps_cache_key(task, 'clean', 42))
+
+    def test_get_steps_cache_key_interfaces(self):
+        self.config(erase_devices_priority=5, group='deploy')
+        self.config(create_configuration_priority=7, group='deploy')
+        with task_manager.acquire(
+                self.context, self.node.uuid, shared=False) as task:
+            for step_type in ('clean', 'deploy', 'service'):
+                task.node.set_driver_internal_info(
+                    'agent_cached_%s_steps_refreshed' % step_type,
+                    '2026-01-01T00:00:00')
+            self.assertEqual(
+                (True, '2026-01-01T00:00:00', None, 5, None),
+                self.deploy.get_steps_cache_key(task, 'clean'))
+            self.assertEqual(
+                (False,), self.deploy.get_steps_cache_key(task, 'deploy'))
+            self.assertEqual(
+                (False,), self.deploy.get_steps_cache_key(task, 'service'))
+            # Verify steps are declared with decorators
+            self.assertEqual(
+                (), self.deploy.get_steps_cache_key(task, 'verify'))
+            self.assertEqual(
+                (True, '2026-01-01T00:00:00', None, None, 7),
+                agent.AgentRAID().get_steps_cache_key(task, 'clean'))
+
     def test_find_step(self):
         with task_manager.acquire(
                 self.context, self.node.uuid, shared=False) as task:
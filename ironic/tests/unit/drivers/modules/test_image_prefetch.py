@@ -0,0 +1,141 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+from unittest import mock
+
+from ironic.common import exception
+from ironic.conductor import task_manager
+from ironic.drivers.modules import image_prefetch
+from ironic.tests.unit.db import base as db_base
+from ironic.tests.unit.objects import utils as obj_utils
+
+
+class ImagePrefetchTestCase(db_base.DbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.node = obj_utils.create_test_node(
+            self.context,
+            instance_info={'image_source': 'http://image'},
+            driver_internal_info={'image_source': 'http://old'})
+
+    def _build(self, task):
+        self.assertTrue(task.shared)
+        task.node.del_driver_internal_info('image_source')
+        task.node.set_driver_internal_info('container_image_type',
+                                           'oci_artifact')
+        return dict(task.node.instance_info, image_url='http://cached')
+
+    def test_start_apply(self):
+        build = mock.Mock(side_effect=self._build)
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.start(task, build)
+            self.assertTrue(task.node.driver_internal_info[
+                image_prefetch.PREFETCH_FLAG])
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.apply(task, build)
+
+        self.node.refresh()
+        self.assertEqual({'image_source': 'http://image',
+                          'image_url': 'http://cached'},
+                         self.node.instance_info)
+        self.assertEqual({'container_image_type': 'oci_artifact'},
+                         self.node.driver_internal_info)
+        build.assert_called_once_with(mock.ANY)
+
+    def test_apply_instance_info_changed(self):
+        build = mock.Mock(side_effect=lambda task: dict(
+            task.node.instance_info, image_url='http://cached'))
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.start(task, build)
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            task.node.set_instance_info('image_source', 'http://other')
+            image_prefetch.apply(task, build)
+            self.assertEqual(2, build.call_count)
+
+        self.node.refresh()
+        self.assertEqual({'image_source': 'http://other',
+                          'image_url': 'http://cached'},
+                         self.node.instance_info)
+
+    def test_apply_waits(self):
+        event = threading.Event()
+
+        def build(task):
+            event.wait(10)
+            return self._build(task)
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.start(task, build)
+            threading.Timer(0.1, event.set).start()
+            image_prefetch.apply(task, build)
+            self.assertEqual('http://cached',
+                             task.node.instance_info['image_url'])
+
+    def test_apply_not_started(self):
+        build = mock.Mock(return_value={'image_url': 'http://cached'})
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.apply(task, build)
+        build.assert_not_called()
+        self.node.refresh()
+        self.assertNotIn('image_url', self.node.instance_info)
+
+    def test_apply_started_elsewhere(self):
+        self.node.set_driver_internal_info(image_prefetch.PREFETCH_FLAG, True)
+        self.node.save()
+        build = mock.Mock(return_value={'image_url': 'http://cached'})
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.apply(task, build)
+            build.assert_called_once_with(task)
+
+        self.node.refresh()
+        self.assertEqual({'image_url': 'http://cached'},
+                         self.node.instance_info)
+        self.assertNotIn(image_prefetch.PREFETCH_FLAG,
+                         self.node.driver_internal_info)
+
+    def test_apply_failure(self):
+        build = mock.Mock(side_effect=exception.InvalidImage(
+            details='corrupted'))
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.start(task, build)
+            self.assertRaises(exception.InvalidImage,
+                              image_prefetch.apply, task, build)
+
+        self.node.refresh()
+        self.assertEqual({'image_source': 'http://image'},
+                         self.node.instance_info)
+        self.assertNotIn(image_prefetch.PREFETCH_FLAG,
+                         self.node.driver_internal_info)
+
+    def test_discard(self):
+        event = threading.Event()
+        done = []
+
+        def build(task):
+            event.wait(10)
+            done.append(True)
+            return {}
+
+        with task_manager.acquire(self.context, self.node.uuid) as task:
+            image_prefetch.start(task, build)
+            threading.Timer(0.1, event.set).start()
+            image_prefetch.discard(task.node.uuid)
+            # A running preparation is waited for
+            self.assertEqual([True], done)
+            self.assertEqual({}, image_prefetch._prefetches)
+
+    def test_discard_nothing(self):
+        image_prefetch.discard(self.node.uuid)
@@ -296,10 +296,7 @@ class LookupNodeTestCase(db_base.DbTestCase):
     def setUp(self):
         super().setUp()
         self.bmc = '192.0.2.1'
-        self.node = obj_utils.create_test_node(
-            self.context,
-            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [self.bmc]},
-            provision_state=states.INSPECTWAIT)
+        self.node = self._create_node(self.bmc)
 
         self.macs = ['11:22:33:44:55:66', '12:34:56:78:90:ab']
         self.unknown_mac = '66:55:44:33:22:11'
@@ -313,15 +310,20 @@ class LookupNodeTestCase(db_base.DbTestCase):
 
         self.bmc2 = '1.2.1.2'
         self.mac2 = '00:11:00:11:00:11'
-        self.node2 = obj_utils.create_test_node(
-            self.context,
-            uuid=uuidutils.generate_uuid(),
-            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [self.bmc2]},
-            provision_state=states.INSPECTWAIT)
+        self.node2 = self._create_node(self.bmc2,
+                                       uuid=uuidutils.generate_uuid())
         obj_utils.create_test_port(self.context,
                                    node_id=self.node2.id,
                                    address=self.mac2)
 
+    def _create_node(self, bmc, **kwargs):
+        node = obj_utils.create_test_node(
+            self.context,
+            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [bmc]},
+            provision_state=states.INSPECTWAIT, **kwargs)
+        node.set_lookup_addresses([bmc])
+        return node
+
     def test_no_input(self):
         self.assertRaises(exception.BadRequest, utils.lookup_node,
                           self.context, [], [], None)
@@ -393,29 +395,17 @@ class LookupNodeTestCase(db_base.DbTestCase):
     def test_duplicate_bmc(self):
         # This can happen with Redfish. There is no way to resolve the conflict
         # other than by using MACs.
-        obj_utils.create_test_node(
-            self.context,
-            uuid=uuidutils.generate_uuid(),
-            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [self.bmc]},
-            provision_state=states.INSPECTWAIT)
+        self._create_node(self.bmc, uuid=uuidutils.generate_uuid())
         self.assertRaises(exception.NotFound, utils.lookup_node,
                           self.context, [], [self.bmc], None)
 
     def test_duplicate_bmc_and_unknown_mac(self):
-        obj_utils.create_test_node(
-            self.context,
-            uuid=uuidutils.generate_uuid(),
-            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [self.bmc]},
-            provision_state=states.INSPECTWAIT)
+        self._create_node(self.bmc, uuid=uuidutils.generate_uuid())
         self.assertRaises(exception.NotFound, utils.lookup_node,
                           self.context, [self.unknown_mac], [self.bmc], None)
 
     def test_duplicate_bmc_resolved_by_macs(self):
-        obj_utils.create_test_node(
-            self.context,
-            uuid=uuidutils.generate_uuid(),
-            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [self.bmc]},
-            provision_state=states.INSPECTWAIT)
+        self._create_node(self.bmc, uuid=uuidutils.generate_uuid())
         result = utils.lookup_node(
             self.context, [self.macs[0]], [self.bmc], None)
         self.assertEqual(self.node.uuid, result.uuid)
@@ -448,6 +438,20 @@ class LookupNodeTestCase(db_base.DbTestCase):
                           self.context, self.macs, [self.bmc], self.node2.uuid)
 
 
+class LegacyLookupNodeTestCase(LookupNodeTestCase):
+    """Lookup by the addresses cached in driver_internal_info."""
+
+    def setUp(self):
+        super().setUp()
+        self.config(pin_release_version='2025.2')
+
+    def _create_node(self, bmc, **kwargs):
+        return obj_utils.create_test_node(
+            self.context,
+            driver_internal_info={utils.LOOKUP_CACHE_FIELD: [bmc]},
+            provision_state=states.INSPECTWAIT, **kwargs)
+
+
 class GetBMCAddressesTestCase(db_base.DbTestCase):
 
     def test_localhost_ignored(self):
@@ -529,10 +533,18 @@ class LookupCacheTestCase(db_base.DbTestCase):
             driver_internal_info={utils.LOOKUP_CACHE_FIELD: [self.bmc]},
             provision_state=states.INSPECTWAIT)
 
+        self.node.set_lookup_addresses([self.bmc])
+
+    def _lookup(self, address):
+        return [node.uuid for node in objects.Node.list(
+            self.context, filters={'lookup_address_in': [address]},
+            fields=['uuid'])]
+
     def test_clear(self):
         result = utils.clear_lookup_addresses(self.node)
         self.assertEqual([self.bmc], result)
         self.assertEqual({}, self.node.driver_internal_info)
+        self.assertEqual([], self._lookup(self.bmc))
 
     @mock.patch.object(utils, '_get_bmc_addresses', autospec=True)
     def test_new_value(self, mock_get_addr):
@@ -540,12 +552,26 @@ class LookupCacheTestCase(db_base.DbTestCase):
         utils.cache_lookup_addresses(self.node)
         self.assertEqual({utils.LOOKUP_CACHE_FIELD: ['192.0.2.42']},
                          self.node.driver_internal_info)
+        self.assertEqual([self.node.uuid], self._lookup('192.0.2.42'))
+        self.assertEqual([], self._lookup(self.bmc))
 
     @mock.patch.object(utils, '_get_bmc_addresses', autospec=True)
     def test_replace_with_empty(self, mock_get_addr):
         mock_get_addr.return_value = set()
         utils.cache_lookup_addresses(self.node)
         self.assertEqual({}, self.node.driver_internal_info)
+        self.assertEqual([], self._lookup(self.bmc))
+
+    @mock.patch.object(utils, '_get_bmc_addresses', autospec=True)
+    def test_replace_with_empty_not_in_driver_internal_info(self,
+                                                            mock_get_addr):
+        # e.g. cached by a conductor which did not record it on the node
+        self.node.del_driver_internal_info(utils.LOOKUP_CACHE_FIELD)
+        self.node.save()
+        mock_get_addr.return_value = set()
+        utils.cache_lookup_addresses(self.node)
+        self.assertEqual({}, self.node.driver_internal_info)
+        self.assertEqual([], self._lookup(self.bmc))
 
 
 class RunInspectionHooksTestCase(db_base.DbTestCase):
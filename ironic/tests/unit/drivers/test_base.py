@@ -639,6 +639,28 @@ class DeployStepTestCase(base.TestCase):
         self.assertTrue(abortable_step['abortable'])  # defaults to True
         self.assertFalse(non_abortable_step['abortable'])
 
+    def test_get_steps_cache_key(self):
+        class TestClass(driver_base.BaseInterface):
+            interface_type = 'test'
+
+            def get_properties(self):
+                return {}
+
+            def validate(self, task):
+                pass
+
+            def get_clean_steps(self, task):
+                return []
+
+        obj = TestClass()
+        task_mock = mock.MagicMock(spec_set=[])
+        # Steps declared with decorators are the same for all nodes
+        for step_type in ('deploy', 'verify', 'service'):
+            self.assertEqual((), obj.get_steps_cache_key(task_mock,
+                                                         step_type))
+        # Overridden steps are not cached by default
+        self.assertIsNone(obj.get_steps_cache_key(task_mock, 'clean'))
+
 
 class MyRAIDInterface(driver_base.RAIDInterface):
 
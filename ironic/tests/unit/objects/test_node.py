@@ -20,6 +20,7 @@ from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 from testtools import matchers
 
+from ironic.common import async_operations
 from ironic.common import context
 from ironic.common import exception
 from ironic.db.sqlalchemy.api import Connection as db_conn
@@ -209,12 +210,177 @@ class TestNodeObject(db_base.DbTestCase, obj_utils.SchemasTestMixIn):
                 mock_update_node.assert_called_once_with(
                     uuid, {'properties': {"fake": "property"},
                            'driver': 'fake-driver',
-                           'version': objects.Node.VERSION})
+                           'version': objects.Node.VERSION},
+                    load_relationships=False)
                 self.assertEqual(self.context, n._context)
                 res_updated_at = (n.updated_at).replace(tzinfo=None)
                 self.assertEqual(test_time, res_updated_at)
                 self.assertEqual({}, n.driver_internal_info)
 
+    def test_save_keeps_traits(self):
+        node = obj_utils.create_test_node(self.context)
+        db_utils.create_test_node_traits(['CUSTOM_1'], node_id=node.id)
+        node = objects.Node.get(self.context, node.uuid)
+        node.extra = {'foo': 'bar'}
+        with mock.patch.object(self.dbapi, 'update_node',
+                               wraps=self.dbapi.update_node) as mock_update:
+            node.save()
+            mock_update.assert_called_once_with(
+                node.uuid, mock.ANY, load_relationships=False)
+        self.assertEqual(['CUSTOM_1'], node.traits.get_trait_names())
+        self.assertEqual({'foo': 'bar'}, node.extra)
+        self.assertEqual({}, node.obj_get_changes())
+
+    def _save_updates(self, node):
+        with mock.patch.object(self.dbapi, 'update_node',
+                               wraps=self.dbapi.update_node) as mock_update:
+            node.save()
+        return mock_update.call_args[0][1]
+
+    def test_save_unchanged_json_fields(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1, 'b': [1, 2]},
+            instance_info={'image_source': 'img'}, properties={'cpus': 4})
+        node = objects.Node.get(self.context, node.uuid)
+        node.set_driver_internal_info('a', 1)
+        node.set_instance_info('image_source', 'img')
+        node.set_property('cpus', 4)
+        node.del_driver_internal_info('b')
+        node.set_driver_internal_info('b', [1, 2])
+        node.extra = {'foo': 'bar'}
+        updates = self._save_updates(node)
+        self.assertEqual({'extra': {'foo': 'bar'},
+                          'version': objects.Node.VERSION}, updates)
+        self.assertEqual({'a': 1, 'b': [1, 2]}, node.driver_internal_info)
+        self.assertEqual({}, node.obj_get_changes())
+
+    def test_save_changed_json_fields(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1})
+        node = objects.Node.get(self.context, node.uuid)
+        node.set_driver_internal_info('a', 2)
+        updates = self._save_updates(node)
+        self.assertEqual({'a': 2}, updates['driver_internal_info'])
+
+        # The digest is taken again after saving
+        node.set_driver_internal_info('a', 1)
+        updates = self._save_updates(node)
+        self.assertEqual({'a': 1}, updates['driver_internal_info'])
+        node.refresh()
+        self.assertEqual({'a': 1}, node.driver_internal_info)
+
+    def test_save_json_field_assigned(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1})
+        node = objects.Node.get(self.context, node.uuid)
+        node.driver_internal_info = {'a': 1}
+        updates = self._save_updates(node)
+        self.assertNotIn('driver_internal_info', updates)
+
+    def test_save_json_field_modified_in_place(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': [{'b': 1}]})
+        node = objects.Node.get(self.context, node.uuid)
+        value = node.driver_internal_info['a']
+        value[0]['b'] = 2
+        node.set_driver_internal_info('a', value)
+        updates = self._save_updates(node)
+        self.assertEqual({'a': [{'b': 2}]}, updates['driver_internal_info'])
+
+    def test_save_json_field_reset(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1})
+        node = objects.Node.get(self.context, node.uuid)
+        node.obj_reset_changes(['driver_internal_info'])
+        node.set_driver_internal_info('a', 1)
+        updates = self._save_updates(node)
+        self.assertEqual({'a': 1}, updates['driver_internal_info'])
+
+    def test_save_json_field_not_loaded(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1})
+        node = objects.Node.list(self.context)[0]
+        node.set_driver_internal_info('a', 1)
+        updates = self._save_updates(node)
+        self.assertEqual({'a': 1}, updates['driver_internal_info'])
+
+    def test_save_json_field_after_refresh(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1})
+        node = objects.Node.list(self.context)[0]
+        node.refresh()
+        node.set_driver_internal_info('a', 1)
+        updates = self._save_updates(node)
+        self.assertNotIn('driver_internal_info', updates)
+
+    def test_save_json_field_updated_concurrently(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'a': 1})
+        node = objects.Node.get(self.context, node.uuid)
+        self.dbapi.update_node(node.uuid, {'driver_internal_info': {'a': 2}})
+        node.extra = {'foo': 'bar'}
+        node.save()
+        self.assertEqual({'a': 2}, node.driver_internal_info)
+
+        # The digest describes the reloaded value, not the loaded one
+        node.set_driver_internal_info('a', 1)
+        updates = self._save_updates(node)
+        self.assertEqual({'a': 1}, updates['driver_internal_info'])
+        node.refresh()
+        self.assertEqual({'a': 1}, node.driver_internal_info)
+
+    def _pending(self, kind='cat_nap'):
+        return [node.uuid for node in self.dbapi.get_node_list(
+            filters={'async_operation': kind})]
+
+    @mock.patch.object(async_operations, '_KINDS', {'cat_nap'})
+    def test_save_async_operations(self):
+        node = obj_utils.create_test_node(self.context)
+        node = objects.Node.get(self.context, node.uuid)
+        node.set_driver_internal_info('cat_nap', {'task': 1})
+        node.save()
+        self.assertEqual([node.uuid], self._pending())
+
+        node.extra = {'foo': 'bar'}
+        node.save()
+        with mock.patch.object(self.dbapi, 'update_node',
+                               wraps=self.dbapi.update_node) as mock_update:
+            node.set_driver_internal_info('cat_nap', {'task': 2})
+            node.save()
+            mock_update.assert_called_once_with(
+                node.uuid, mock.ANY, load_relationships=False)
+        self.assertEqual([node.uuid], self._pending())
+
+        with mock.patch.object(self.dbapi, 'remove_node_async_operations',
+                               autospec=True) as mock_remove:
+            node.del_driver_internal_info('cat_nap')
+            node.save()
+            # Forgotten in the transaction of the node update
+            mock_remove.assert_not_called()
+        self.assertEqual([], self._pending())
+
+    @mock.patch.object(async_operations, '_KINDS', {'cat_nap'})
+    def test_save_async_operations_not_loaded(self):
+        db_node = db_utils.create_test_node(
+            driver_internal_info={'cat_nap': True})
+        self.dbapi.add_node_async_operations(db_node.id, ['unregistered'])
+        node = objects.Node.list(self.context)[0]
+        node.set_driver_internal_info('other', True)
+        node.save()
+        self.assertEqual([node.uuid], self._pending())
+        self.assertEqual([node.uuid], self._pending('unregistered'))
+
+        node = objects.Node.list(self.context)[0]
+        node.del_driver_internal_info('cat_nap')
+        node.save()
+        self.assertEqual([], self._pending())
+
+    @mock.patch.object(async_operations, '_KINDS', {'cat_nap'})
+    def test_create_async_operations(self):
+        node = obj_utils.create_test_node(
+            self.context, driver_internal_info={'cat_nap': True})
+        self.assertEqual([node.uuid], self._pending())
+
     @mock.patch.object(node_objects, 'LOG', autospec=True)
     def test_save_truncated(self, log_mock):
         uuid = self.fake_node['uuid']
@@ -265,7 +431,8 @@ class TestNodeObject(db_base.DbTestCase, obj_utils.SchemasTestMixIn):
                         'last_error':
                             last_error[
                             0:node_objects.CONF.log_in_db_max_size]
-                    }
+                    },
+                    load_relationships=False
                 )
                 self.assertEqual(self.context, n._context)
                 res_updated_at = (n.updated_at).replace(tzinfo=None)
@@ -298,7 +465,8 @@ class TestNodeObject(db_base.DbTestCase, obj_utils.SchemasTestMixIn):
                            'driver': 'fake-driver',
                            'driver_internal_info': {},
                            'extra': {'test': 123},
-                           'version': objects.Node.VERSION})
+                           'version': objects.Node.VERSION},
+                    load_relationships=False)
                 self.assertEqual(self.context, n._context)
                 res_updated_at = n.updated_at.replace(tzinfo=None)
                 self.assertEqual(test_time, res_updated_at)
@@ -332,7 +500,8 @@ class TestNodeObject(db_base.DbTestCase, obj_utils.SchemasTestMixIn):
                 self.assertTrue(mock_update_node.called)
                 mock_update_node.assert_called_once_with(
                     uuid, {'conductor_group': 'group1',
-                           'version': objects.Node.VERSION})
+                           'version': objects.Node.VERSION},
+                    load_relationships=False)
 
     def test_save_with_conductor_group_uppercase(self):
         uuid = self.fake_node['uuid']
@@ -348,7 +517,8 @@ class TestNodeObject(db_base.DbTestCase, obj_utils.SchemasTestMixIn):
                 n.save()
                 mock_update_node.assert_called_once_with(
                     uuid, {'conductor_group': 'group1',
-                           'version': objects.Node.VERSION})
+                           'version': objects.Node.VERSION},
+                    load_relationships=False)
 
     def test_save_with_conductor_group_fail(self):
         uuid = self.fake_node['uuid']
@@ -506,6 +676,20 @@ class TestNodeObject(db_base.DbTestCase, obj_utils.SchemasTestMixIn):
                 node.touch_provisioning()
                 mock_touch.assert_called_once_with(mock.ANY, node.id)
 
+    def test_record_heartbeat(self):
+        with mock.patch.object(db_conn, 'get_node_by_uuid',
+                               autospec=True) as mock_get_node:
+            mock_get_node.return_value = self.fake_node
+            with mock.patch.object(db_conn, 'record_node_heartbeat',
+                                   autospec=True) as mock_record:
+                node = objects.Node.get(self.context, self.fake_node['uuid'])
+                self.assertIs(mock_record.return_value,
+                              node.record_heartbeat({'key': 'value'},
+                                                    touch_provisioning=True))
+                mock_record.assert_called_once_with(
+                    mock.ANY, node.id, node.provision_state,
+                    {'key': 'value'}, touch_provisioning=True)
+
     def test_create(self):
         node = obj_utils.get_test_node(self.ctxt, **self.fake_node)
         with mock.patch.object(db_conn, 'create_node',
@@ -733,6 +733,7 @@ expected_object_fingerprints = {
     'InspectionRule': '1.1-6ee14959b85a90a13f3c7b48c53522c7',
     'InspectionRuleCRUDNotification': '1.0-59acc533c11d306f149846f922739c15',
     'InspectionRuleCRUDPayload': '1.0-85d1cf2105308534a630299a897bf562',
+    'ProvisionJobBatch': '1.0-c160e025c6c61b59001615d45550b509',
 }
 
 
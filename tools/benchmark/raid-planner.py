@@ -0,0 +1,146 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Time the matching of physical disks to logical disks by redfish RAID.
+
+Runs the planning done by the create_configuration step of the redfish RAID
+interface on synthetic disk inventories, and checks that every run finds
+the same configuration. Nothing is sent to a BMC.
+
+Usage: python tools/benchmark/raid-planner.py [runs]
+"""
+
+import collections
+import copy
+import logging
+import sys
+import time
+
+from oslo_utils import units
+import sushy
+
+from ironic.common import exception
+from ironic.drivers.modules.redfish import raid as redfish_raid
+
+
+class Drive(object):
+    """A drive, compared by identity like sushy resources."""
+
+    def __init__(self, identity, media_type, protocol, capacity_bytes):
+        self.identity = identity
+        self.media_type = media_type
+        self.protocol = protocol
+        self.capacity_bytes = capacity_bytes
+
+
+Storage = collections.namedtuple('Storage', ['identity'])
+
+HDD = ('HDD', sushy.PROTOCOL_TYPE_SAS)
+SSD = ('SSD', sushy.PROTOCOL_TYPE_SATA)
+
+
+def _inventory(*shelves):
+    """Build drives from (controller, count, (media, protocol), size_gb)."""
+    disks = []
+    disk_to_storage = {}
+    for controller, count, (media_type, protocol), size_gb in shelves:
+        storage = Storage(controller)
+        for i in range(count):
+            disk = Drive('%s-%s-%d' % (controller, media_type, i),
+                         media_type, protocol, size_gb * units.Gi)
+            disks.append(disk)
+            disk_to_storage[disk] = storage
+    return disks, disk_to_storage
+
+
+def _volume(raid_level, size_gb, **properties):
+    return dict(properties, raid_level=raid_level,
+                size_bytes=size_gb * units.Gi)
+
+
+SCENARIOS = [
+    ('60 HDD, root and 4 RAID6 volumes',
+     _inventory(('RAID.1', 60, HDD, 8000)),
+     [_volume('1', 200, is_root_volume=True)]
+     + [_volume('6', 80000) for _i in range(4)]),
+    ('60 HDD, 5 RAID6 volumes using all drives',
+     _inventory(('RAID.1', 60, HDD, 8000)),
+     [_volume('6', 80000) for _i in range(5)]),
+    ('60 HDD, 5 RAID6 volumes needing one drive too many',
+     _inventory(('RAID.1', 60, HDD, 8000)),
+     [_volume('6', 80000) for _i in range(4)] + [_volume('6', 88000)]),
+    ('90 HDD, 7 RAID6 volumes needing one drive too many',
+     _inventory(('RAID.1', 90, HDD, 8000)),
+     [_volume('6', 96000) for _i in range(6)] + [_volume('6', 40000)]),
+    ('48 HDD and 12 SSD, RAID10 root and 2 RAID60 volumes',
+     _inventory(('RAID.1', 48, HDD, 4000), ('RAID.1', 12, SSD, 960)),
+     [_volume('1+0', 1000, is_root_volume=True, disk_type='ssd'),
+      _volume('6+0', 60000, disk_type='hdd'),
+      _volume('6+0', 60000, disk_type='hdd')]),
+    ('2 controllers with 45 HDD, 6 RAID5 volumes',
+     _inventory(('RAID.1', 45, HDD, 4000), ('RAID.2', 45, HDD, 4000)),
+     [_volume('5', 50000) for _i in range(6)]),
+    ('2 controllers with 30 HDD, RAID6 volume larger than a controller',
+     _inventory(('RAID.1', 30, HDD, 4000), ('RAID.2', 30, HDD, 4000)),
+     [_volume('6', 60000), _volume('6', 120000)]),
+    ('24 SSD, 8 RAID1 volumes sharing drives',
+     _inventory(('RAID.1', 24, SSD, 1920)),
+     [_volume('1', 900, share_physical_disks=True) for _i in range(8)]),
+]
+
+
+def _plan(disks, disk_to_storage, logical_disks):
+    logical_disks = copy.deepcopy(logical_disks)
+    try:
+        volumes = redfish_raid._find_configuration(logical_disks, disks,
+                                                   disk_to_storage)
+    except exception.RedfishError:
+        return None
+    return tuple((volume['raid_level'], volume['controller'],
+                  tuple(volume['physical_disks'])) for volume in volumes)
+
+
+def _describe(plan):
+    if plan is None:
+        return 'no configuration found'
+    return ', '.join('RAID%s on %d drives of %s' % (level, len(disks),
+                                                    controller)
+                     for level, controller, disks in reversed(plan))
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # configurations which cannot be found are logged as errors
+    logging.disable(logging.ERROR)
+    deterministic = True
+    for name, (disks, disk_to_storage), logical_disks in SCENARIOS:
+        timings = []
+        plans = set()
+        for _i in range(runs):
+            start = time.perf_counter()
+            plans.add(_plan(disks, disk_to_storage, logical_disks))
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(name)
+        print('  %s' % _describe(next(iter(plans))))
+        print('  best %.4fs, median %.4fs over %d runs'
+              % (timings[0], timings[len(timings) // 2], runs))
+        if len(plans) > 1:
+            print('  ERROR: the runs found %d different configurations'
+                  % len(plans))
+            deterministic = False
+    return 0 if deterministic else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())